@@ -0,0 +1,303 @@
+from functools import lru_cache
+from operator import attrgetter
+from types import GeneratorType
+
+# NÓS DA AST
+# Cada tipo de nó é uma classe com __slots__ (os campos mais a linha e a coluna no código
+# fonte). Os literais (int, float, bool, str) continuam a ser valores Python simples.
+#
+# Compatibilidade com a AST em tuplos: um nó indexa-se e desempacota-se como o tuplo
+# equivalente (node[0] é a etiqueta, 'binop'; _, op, esq, dir = node), e de_tuplo/como_tuplo
+# convertem entre as duas formas. Os visitantes aceitam tuplos convertendo-os com de_tuplo.
+
+
+class No:
+    __slots__ = ('linha', 'coluna')
+    etiqueta = None  # o primeiro elemento do tuplo equivalente
+    campos = ()
+
+    def __init_subclass__(cls):
+        super().__init_subclass__()
+        if not cls.campos:
+            return
+        if len(cls.campos) == 1:
+            obter = attrgetter(cls.campos[0])
+            cls._valores = staticmethod(lambda no: (obter(no),))
+        else:
+            cls._valores = staticmethod(attrgetter(*cls.campos))
+
+    def __init__(self, *valores, linha=0, coluna=0):
+        if len(valores) != len(self.campos):
+            raise TypeError(f"{type(self).__name__} espera {len(self.campos)} campos, recebeu {len(valores)}")
+        for campo, valor in zip(self.campos, valores):
+            setattr(self, campo, valor)
+        self.linha = linha
+        self.coluna = coluna
+
+    def substituir(self, *valores):
+        """Nó da mesma classe e posição com outros valores nos campos"""
+        return type(self)(*valores, linha=self.linha, coluna=self.coluna)
+
+    # Interface de tuplo
+
+    def __getitem__(self, i):
+        if i == 0:
+            return self.etiqueta
+        if isinstance(i, int) and i > 0:
+            return getattr(self, self.campos[i - 1])
+        return tuple(self)[i]
+
+    def __len__(self):
+        return len(self.campos) + 1
+
+    def __iter__(self):
+        yield self.etiqueta
+        yield from self._valores(self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(map(repr, self._valores(self)))})"
+
+
+# Base dos nós de expressão. O analisador semântico guarda em 'tipo' a categoria de cada
+# expressão ('INTEGER', 'REAL', 'CHAR', ...) e o gerador lê-a daí em vez de voltar a
+# inferir o tipo. Fica None até à análise.
+
+class Expressao(No):
+    __slots__ = ('tipo',)
+
+    def __init__(self, *valores, linha=0, coluna=0):
+        super().__init__(*valores, linha=linha, coluna=coluna)
+        self.tipo = None
+
+    def substituir(self, *valores):
+        novo = super().substituir(*valores)
+        novo.tipo = self.tipo
+        return novo
+
+
+# ESTRUTURA
+
+class Gramatica(No):
+    __slots__ = campos = ('programa',)
+    etiqueta = 'gramatica'
+
+
+class Programa(No):
+    __slots__ = campos = ('cabecalho', 'corpo')
+    etiqueta = 'programa'
+
+
+class Cabecalho(No):
+    __slots__ = campos = ('titulo', 'subprogramas', 'variaveis')
+    etiqueta = 'cabecalho'
+
+
+class Titulo(No):
+    __slots__ = campos = ('nome',)
+    etiqueta = 'titulo'
+
+
+# DECLARAÇÕES
+
+class VarSection(No):
+    __slots__ = campos = ('declaracoes',)
+    etiqueta = 'var_section'
+
+
+class VarDecl(No):
+    __slots__ = campos = ('nomes', 'tipo')
+    etiqueta = 'var_decl'
+
+
+class TipoArray(No):
+    __slots__ = campos = ('minimo', 'maximo', 'tipo_base')
+    etiqueta = 'array'
+
+
+class Function(No):
+    __slots__ = campos = ('nome', 'parametros', 'tipo', 'bloco')
+    etiqueta = 'function'
+
+
+class Procedure(No):
+    __slots__ = campos = ('nome', 'parametros', 'bloco')
+    etiqueta = 'procedure'
+
+
+class Param(No):
+    __slots__ = campos = ('nomes', 'tipo')
+    etiqueta = 'param'
+
+
+class Bloco(No):
+    __slots__ = campos = ('declaracoes', 'corpo')
+    etiqueta = 'bloco'
+
+
+# INSTRUÇÕES
+
+class BeginEnd(No):
+    __slots__ = campos = ('instrucoes',)
+    etiqueta = 'begin_end'
+
+
+class Assign(No):
+    __slots__ = campos = ('alvo', 'expressao')
+    etiqueta = 'assign'
+
+
+class If(No):
+    __slots__ = campos = ('condicao', 'entao', 'senao')
+    etiqueta = 'if'
+
+
+class While(No):
+    __slots__ = campos = ('condicao', 'corpo')
+    etiqueta = 'while'
+
+
+class For(No):
+    __slots__ = campos = ('variavel', 'inicio', 'fim', 'direcao', 'corpo')
+    etiqueta = 'for'
+
+
+class Call(Expressao):
+    __slots__ = campos = ('nome', 'argumentos')
+    etiqueta = 'call'
+
+
+class Write(No):
+    __slots__ = campos = ('itens',)
+    etiqueta = 'write'
+
+
+class Writeln(No):
+    __slots__ = campos = ('itens',)
+    etiqueta = 'writeln'
+
+
+class Read(No):
+    __slots__ = campos = ('itens',)
+    etiqueta = 'read'
+
+
+class Readln(No):
+    __slots__ = campos = ('itens',)
+    etiqueta = 'readln'
+
+
+# EXPRESSÕES
+
+class Binop(Expressao):
+    __slots__ = campos = ('op', 'esq', 'dir')
+    etiqueta = 'binop'
+
+
+class Unop(Expressao):
+    __slots__ = campos = ('op', 'operando')
+    etiqueta = 'unop'
+
+
+class Var(Expressao):
+    __slots__ = campos = ('nome',)
+    etiqueta = 'var'
+
+
+class ArrayAccess(Expressao):
+    __slots__ = campos = ('nome', 'indice')
+    etiqueta = 'array_access'
+
+
+class Char(Expressao):
+    __slots__ = campos = ('codigo',)
+    etiqueta = 'char'
+
+
+# Chamada de função expandida no sítio (expandir.py): as instruções correm e a expressão
+# vale o que vale resultado depois delas
+class Expandida(Expressao):
+    __slots__ = campos = ('instrucoes', 'resultado')
+    etiqueta = 'expandida'
+
+
+def _subclasses(classe):
+    for sub in classe.__subclasses__():
+        yield sub
+        yield from _subclasses(sub)
+
+
+CLASSES = {classe.etiqueta: classe for classe in _subclasses(No) if classe.etiqueta}
+
+
+@lru_cache(maxsize=None)
+def tabela_despacho(classe_visitante, prefixo='visit_'):
+    """{classe de nó: função} com os métodos prefixo + etiqueta que a classe do visitante define"""
+    tabela = {}
+    for etiqueta, classe in CLASSES.items():
+        metodo = getattr(classe_visitante, prefixo + etiqueta, None)
+        if metodo is not None:
+            tabela[classe] = metodo
+    return tabela
+
+
+def executar(passo, raiz, concluir=None):
+    """Percorre a AST a partir de raiz com uma pilha explícita; devolve o valor da raiz
+
+    passo(item) devolve o valor do item ou, quando tem de visitar filhos, um gerador que
+    faz `valor = yield filho` (um nó ou outro gerador) e acaba com `return valor`. Os
+    geradores à espera ficam numa lista e não na pilha do Python, por isso a profundidade
+    da árvore não está limitada pelo limite de recursão. concluir(nó, valor), se for dado,
+    é chamado quando cada nó termina, antes de o valor voltar ao pai.
+    """
+    pilha = []
+    if type(raiz) is GeneratorType:
+        pilha.append((raiz, None))
+        valor = None
+    else:
+        valor = passo(raiz)
+        if type(valor) is not GeneratorType:
+            if concluir is not None:
+                concluir(raiz, valor)
+            return valor
+        pilha.append((valor, raiz))
+        valor = None
+
+    while pilha:
+        gerador, no = pilha[-1]
+        try:
+            item = gerador.send(valor)
+        except StopIteration as fim:
+            pilha.pop()
+            valor = fim.value
+            if concluir is not None and no is not None:
+                concluir(no, valor)
+            continue
+        if type(item) is GeneratorType:
+            pilha.append((item, None))
+            valor = None
+            continue
+        valor = passo(item)
+        if type(valor) is GeneratorType:
+            pilha.append((valor, item))
+            valor = None
+        elif concluir is not None:
+            concluir(item, valor)
+    return valor
+
+
+def de_tuplo(valor):
+    """Converte uma AST em tuplos (ou mista) para nós; o que não é nó fica igual"""
+    if isinstance(valor, list):
+        return [de_tuplo(v) for v in valor]
+    if isinstance(valor, tuple) and valor and valor[0] in CLASSES:
+        return CLASSES[valor[0]](*[de_tuplo(v) for v in valor[1:]])
+    return valor
+
+
+def como_tuplo(valor):
+    """Converte uma AST de nós para a forma em tuplos"""
+    if isinstance(valor, list):
+        return [como_tuplo(v) for v in valor]
+    if isinstance(valor, (No, tuple)):
+        return tuple(como_tuplo(v) if i else v for i, v in enumerate(valor))
+    return valor
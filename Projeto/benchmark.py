@@ -0,0 +1,929 @@
+import gc
+import io
+import os
+import sys
+import time
+import contextlib
+import tempfile
+import tracemalloc
+import subprocess
+
+from sin import parse_string, criar_lexer, verificar_tabelas, print_ast
+from semantica import AnalisadorSemantico
+from maquina import GeradorCodigo, SaidaVM, escrever_vm
+from fundido import GeradorVerificado
+from otimizador import OtimizadorPeephole
+from passos import GestorPassos
+from dobragem import DobradorConstantes
+from desenrolar import DesenroladorCiclos
+from expandir import ExpansorSubprogramas
+from interpretador import MaquinaVirtual, carregar, carregar_binario, carregar_instrucoes
+from instrucoes import escrever_vmb
+from tradutor import MaquinaTraduzida
+from lote import compilar_lote
+from compilador import Compilador
+from cache import CacheCompilacao
+from cliente import pedir
+from arvore import como_tuplo, de_tuplo
+
+# BENCHMARKS
+# Uso: python3 benchmark.py [cenario ...]   (sem argumentos corre todos)
+
+
+# Programas de carga
+
+PRIMOS = """
+program ContaPrimos;
+var
+n, d, total: integer;
+primo: boolean;
+begin
+total := 0;
+n := 2;
+while n <= %(limite)d do
+begin
+primo := true;
+d := 2;
+while (d <= (n div 2)) and primo do
+begin
+if (n mod d) = 0 then
+primo := false;
+d := d + 1;
+end;
+if primo then
+total := total + 1;
+n := n + 1;
+end;
+writeln(total);
+end.
+"""
+
+SOMA_ARRAY = """
+program SomaArray;
+var
+numeros: array[1..100] of integer;
+i, k, soma: integer;
+begin
+for i := 1 to 100 do
+numeros[i] := i;
+soma := 0;
+for k := 1 to %(repeticoes)d do
+for i := 1 to 100 do
+soma := soma + numeros[i];
+writeln(soma);
+end.
+"""
+BINARIO = """
+program ContaUns;
+var
+bin: string;
+i, k, total: integer;
+begin
+readln(bin);
+total := 0;
+for k := 1 to %(repeticoes)d do
+for i := length(bin) downto 1 do
+if bin[i] = '1' then
+total := total + 1;
+writeln(total);
+end.
+"""
+
+LIMITE_CARO = """
+program LimiteCaro;
+function Limite(n: integer): integer;
+var
+j, acc: integer;
+begin
+acc := 0;
+for j := 1 to n do
+acc := acc + 1;
+Limite := acc;
+end;
+var
+s: string;
+i, k, total: integer;
+begin
+readln(s);
+total := 0;
+for k := 1 to %(repeticoes)d do
+begin
+for i := 1 to Limite(20) do
+total := total + 1;
+for i := 1 to length(s) do
+total := total + 1;
+end;
+writeln(total);
+end.
+"""
+
+GUARDAS = """
+program Guardas;
+var
+a: array[1..50] of integer;
+i, k, total: integer;
+begin
+for i := 1 to 50 do
+a[i] := i mod 7;
+total := 0;
+for k := 1 to %(repeticoes)d do
+for i := 1 to 50 do
+if (a[i] > 3) and (a[i] < 6) or (a[i] = 0) and ((i mod 2) = 0) then
+total := total + 1;
+writeln(total);
+end.
+"""
+
+BOLHA = """
+program Bolha;
+var
+a: array[1..60] of integer;
+i, j, t, k: integer;
+begin
+for k := 1 to %(repeticoes)d do
+begin
+for i := 1 to 60 do
+a[i] := (i * 37 + k) mod 61;
+for i := 1 to 59 do
+for j := 1 to 60 - i do
+if a[j] > a[j + 1] then
+begin
+t := a[j];
+a[j] := a[j + 1];
+a[j + 1] := t;
+end;
+end;
+writeln(a[1], ' ', a[60]);
+end.
+"""
+
+HISTOGRAMA = """
+program Histograma;
+var
+v: array[1..200] of integer;
+c: array[0..9] of integer;
+i, k: integer;
+begin
+for i := 1 to 200 do
+v[i] := (i * 7) mod 10;
+for k := 1 to %(repeticoes)d do
+for i := 1 to 200 do
+c[v[i]] := c[v[i]] + 1;
+writeln(c[0], ' ', c[9]);
+end.
+"""
+
+MATRIZ = """
+program Matriz;
+var
+a, b, c: array[0..399] of integer;
+i, j, k, s, r: integer;
+begin
+for i := 0 to 399 do
+begin
+a[i] := i mod 7;
+b[i] := i mod 5;
+end;
+for r := 1 to %(repeticoes)d do
+for i := 0 to 19 do
+for j := 0 to 19 do
+begin
+s := 0;
+for k := 0 to 19 do
+s := s + a[i * 20 + k] * b[k * 20 + j];
+c[i * 20 + j] := s;
+end;
+writeln(c[0], ' ', c[399]);
+end.
+"""
+
+JANELA = """
+program Janela;
+var
+v: array[1..5] of integer;
+i, k, soma: integer;
+begin
+soma := 0;
+for k := 1 to %(repeticoes)d do
+begin
+for i := 1 to 5 do
+v[i] := k + i;
+for i := 1 to 5 do
+soma := soma + v[i] * i;
+end;
+writeln(soma);
+end.
+"""
+
+AJUDANTES = """
+program Ajudantes;
+var
+v: array[1..100] of integer;
+i, k, s, m: integer;
+function quadrado(x: integer): integer;
+begin
+quadrado := x * x;
+end;
+function maior(a, b: integer): integer;
+begin
+if a > b then maior := a else maior := b;
+end;
+function limitar(x, lo, hi: integer): integer;
+begin
+limitar := maior(lo, x);
+if x > hi then limitar := hi;
+end;
+procedure acumular(x: integer);
+begin
+s := s + x;
+end;
+begin
+for i := 1 to 100 do
+v[i] := (i * 37) mod 23 - 11;
+s := 0;
+m := 0;
+for k := 1 to %(repeticoes)d do
+for i := 1 to 100 do
+begin
+acumular(limitar(quadrado(v[i]), 0, 50));
+m := maior(m, v[i] + k);
+end;
+writeln(s, ' ', m);
+end.
+"""
+
+# (nome, fonte, entrada)
+CARGAS = [
+    ('primos 3000', PRIMOS % {'limite': 3000}, ''),
+    ('soma array 2000x100', SOMA_ARRAY % {'repeticoes': 2000}, ''),
+    ('binário 500x200', BINARIO % {'repeticoes': 500}, '1011' * 50 + '\n'),
+]
+
+
+def compilar_pascal(fonte, peephole=False, dobragem=False, passos=None, desenrolar=None,
+                    expandir=None, **opcoes_gerador):
+    """Compila código Pascal para a lista de instruções de GeradorCodigo
+
+    passos: GestorPassos a correr depois do peephole (fica com as estatísticas).
+    desenrolar: DesenroladorCiclos a aplicar à AST depois da dobragem.
+    expandir: ExpansorSubprogramas a aplicar à AST depois da dobragem (antes de desenrolar).
+    """
+    ast = parse_string(fonte)
+    analisador = AnalisadorSemantico()
+    analisador.visit(ast)
+    if analisador.erros:
+        raise ValueError("\n".join(analisador.erros))
+    if dobragem:
+        ast = DobradorConstantes().dobrar(ast)
+    if expandir is not None:
+        ast = expandir.expandir(ast)
+    if desenrolar is not None:
+        ast = desenrolar.desenrolar(ast)
+    gerador = GeradorCodigo(**opcoes_gerador)
+    gerador.visit(ast)
+    codigo = gerador.codigo
+    if peephole:
+        codigo = OtimizadorPeephole().otimizar(codigo)
+    if passos is not None:
+        codigo = passos.executar(codigo)
+        if peephole and passos.mudou:
+            codigo = OtimizadorPeephole().otimizar(codigo)
+    return codigo
+
+
+def executar(codigo, modo='interpretador', entrada=''):
+    """Executa código EWVM; devolve (saída, instruções executadas, segundos)
+
+    O modo 'closures' não conta instruções (devolve 0), para não pesar na medição.
+    """
+    programa = carregar_instrucoes(codigo)
+    saida = io.StringIO()
+    if modo == 'closures':
+        vm = MaquinaTraduzida(programa, io.StringIO(entrada), saida)
+    else:
+        vm = MaquinaVirtual(programa, io.StringIO(entrada), saida)
+    inicio = time.perf_counter()
+    vm.executar()
+    duracao = time.perf_counter() - inicio
+    return saida.getvalue(), vm.instrucoes_executadas, duracao
+
+
+def linha(*colunas):
+    print("  ".join(f"{c:>14}" if i else f"{c:<24}" for i, c in enumerate(colunas)))
+
+
+# Cenários
+
+def cenario_execucao():
+    """Interpretador vs. compilação para closures"""
+    linha('programa', 'instruções', 'interp (s)', 'closures (s)', 'aceleração')
+    for nome, fonte, entrada in CARGAS:
+        codigo = compilar_pascal(fonte)
+        saida_i, n, t_interp = executar(codigo, 'interpretador', entrada)
+        saida_c, _, t_closures = executar(codigo, 'closures', entrada)
+        assert saida_i == saida_c, f"{nome}: saídas diferentes"
+        linha(nome, n, f"{t_interp:.3f}", f"{t_closures:.3f}", f"{t_interp / t_closures:.1f}x")
+
+
+def comparar_execucao(opcoes_base, opcoes_novas, cargas=None):
+    """Tabela de instruções executadas entre duas configurações de compilação"""
+    linha('programa', 'antes', 'depois', 'redução', 'tamanho')
+    for nome, fonte, entrada in cargas or CARGAS:
+        base = compilar_pascal(fonte, **opcoes_base)
+        novo = compilar_pascal(fonte, **opcoes_novas)
+        saida_b, n_b, _ = executar(base, entrada=entrada)
+        saida_n, n_n, _ = executar(novo, entrada=entrada)
+        assert saida_b == saida_n, f"{nome}: saídas diferentes"
+        linha(nome, n_b, n_n, f"{100 * (n_b - n_n) / n_b:.1f}%", f"{len(base)} -> {len(novo)}")
+
+
+def cenario_peephole():
+    """Instruções executadas sem e com o otimizador peephole"""
+    comparar_execucao({}, {'peephole': True})
+
+
+def cenario_dobragem():
+    """Instruções executadas sem e com a dobragem de constantes na AST"""
+    comparar_execucao({}, {'dobragem': True})
+
+
+def cenario_limites_for():
+    """Limite do for avaliado a cada iteração vs. uma única vez"""
+    cargas = CARGAS + [('limite caro 300', LIMITE_CARO % {'repeticoes': 300}, 'x' * 40 + '\n')]
+    comparar_execucao({'limite_for_unico': False}, {'limite_for_unico': True}, cargas)
+
+
+def cenario_curto_circuito():
+    """and/or avaliados por completo vs. condições com saltos (curto-circuito)"""
+    cargas = CARGAS + [('guardas 500x50', GUARDAS % {'repeticoes': 500}, '')]
+    comparar_execucao({'curto_circuito': False}, {'curto_circuito': True}, cargas)
+
+
+def cenario_rotacao():
+    """Ciclos com teste no início vs. ciclos rodados (teste no fim)"""
+    cargas = CARGAS + [('guardas 500x50', GUARDAS % {'repeticoes': 500}, '')]
+    comparar_execucao({'rodar_ciclos': False}, {'rodar_ciclos': True}, cargas)
+
+
+def cenario_passos():
+    """-O sem e com os passos sobre o grafo de blocos (tempo e efeito de cada passo)"""
+    cargas = CARGAS + [('limite caro 300', LIMITE_CARO % {'repeticoes': 300}, 'x' * 40 + '\n'),
+                       ('guardas 500x50', GUARDAS % {'repeticoes': 500}, '')]
+    base = {'peephole': True, 'dobragem': True, 'rodar_ciclos': True}
+    gestor = GestorPassos()
+    comparar_execucao(base, dict(base, passos=gestor), cargas)
+    print(gestor.relatorio())
+
+
+def cenario_subexpressoes():
+    """Passos sem e com a eliminação de subexpressões comuns, em ciclos com arrays"""
+    cargas = CARGAS + [('bolha 20', BOLHA % {'repeticoes': 20}, ''),
+                       ('histograma 100x200', HISTOGRAMA % {'repeticoes': 100}, ''),
+                       ('guardas 500x50', GUARDAS % {'repeticoes': 500}, '')]
+    base = {'peephole': True, 'dobragem': True, 'rodar_ciclos': True}
+    comparar_execucao(dict(base, passos=GestorPassos(desativados=['subexpressoes_comuns'])),
+                      dict(base, passos=GestorPassos()), cargas)
+
+
+def cenario_reducao_forca():
+    """Passos sem e com as bases de arrays e a redução de força, em ciclos com arrays"""
+    cargas = CARGAS + [('bolha 20', BOLHA % {'repeticoes': 20}, ''),
+                       ('histograma 100x200', HISTOGRAMA % {'repeticoes': 100}, ''),
+                       ('matriz 20x20 x5', MATRIZ % {'repeticoes': 5}, '')]
+    base = {'peephole': True, 'dobragem': True, 'rodar_ciclos': True}
+    comparar_execucao(dict(base, passos=GestorPassos(desativados=['bases_arrays',
+                                                                  'reducao_forca'])),
+                      dict(base, passos=GestorPassos()), cargas)
+
+
+def cenario_desenrolamento():
+    """Desenrolamento dos for com limites constantes: instruções executadas vs. tamanho do código"""
+    cargas = CARGAS + [('janela 2000', JANELA % {'repeticoes': 2000}, ''),
+                       ('bolha 20', BOLHA % {'repeticoes': 20}, ''),
+                       ('histograma 100x200', HISTOGRAMA % {'repeticoes': 100}, ''),
+                       ('matriz 20x20 x5', MATRIZ % {'repeticoes': 5}, '')]
+    base = {'peephole': True, 'dobragem': True, 'rodar_ciclos': True}
+    # (nome, opções de DesenroladorCiclos; None não desenrola)
+    configuracoes = [('sem', None), ('só curtos', {'fator': 1}), ('fator 2', {'fator': 2}),
+                     ('fator 4', {'fator': 4}), ('fator 8', {'fator': 8}),
+                     ('orçamento 50', {'fator': 4, 'orcamento': 50})]
+    print("instruções executadas / tamanho do código (instruções)")
+    linha('programa', *(nome for nome, _ in configuracoes))
+    for nome, fonte, entrada in cargas:
+        colunas = []
+        saidas = set()
+        for _, opcoes in configuracoes:
+            desenrolar = None
+            if opcoes is not None:
+                desenrolar = DesenroladorCiclos(dobrador=DobradorConstantes(), **opcoes)
+            codigo = compilar_pascal(fonte, passos=GestorPassos(), desenrolar=desenrolar, **base)
+            saida, n, _ = executar(codigo, entrada=entrada)
+            saidas.add(saida)
+            colunas.append(f"{n} / {len(codigo)}")
+        assert len(saidas) == 1, f"{nome}: saídas diferentes"
+        linha(nome, *colunas)
+
+
+def cenario_expansao():
+    """Passos sem e com a expansão de subprogramas pequenos no sítio da chamada"""
+    cargas = CARGAS + [('ajudantes 200x100', AJUDANTES % {'repeticoes': 200}, ''),
+                       ('limite caro 300', LIMITE_CARO % {'repeticoes': 300}, 'x' * 40 + '\n')]
+    base = {'peephole': True, 'dobragem': True, 'rodar_ciclos': True}
+    comparar_execucao(dict(base, passos=GestorPassos()),
+                      dict(base, passos=GestorPassos(), expandir=ExpansorSubprogramas()), cargas)
+
+
+def programa_sintetico(n_instrucoes, n_variaveis=None):
+    """Programa gerado com n_instrucoes atribuições num só bloco (e muitas declarações)"""
+    n_variaveis = n_variaveis or max(1, n_instrucoes // 10)
+    partes = ["program Sintetico;", "var"]
+    for v in range(n_variaveis):
+        partes.append(f"v{v}: integer;")
+    partes.append("begin")
+    for i in range(n_instrucoes):
+        partes.append(f"v{i % n_variaveis} := v{(i * 7) % n_variaveis} + {i};")
+    partes.append("writeln(v0)")
+    partes.append("end.")
+    return "\n".join(partes)
+
+
+def cenario_parsing():
+    """Tempo de parsing por instrução até 100k instruções (deve ser constante)"""
+    linha('instruções', 'declarações', 'parse (s)', 'µs/instrução')
+    for n in (1000, 10000, 100000):
+        fonte = programa_sintetico(n)
+        inicio = time.perf_counter()
+        ast = parse_string(fonte)
+        duracao = time.perf_counter() - inicio
+        assert ast is not None
+        linha(n, n // 10, f"{duracao:.3f}", f"{1e6 * duracao / n:.1f}")
+
+
+def memoria(construir):
+    """(resultado, bytes alocados) de construir()"""
+    tracemalloc.start()
+    try:
+        resultado = construir()
+        return resultado, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def percorrer(ast):
+    """Segundos da análise semântica mais a geração de código (o melhor de 3)"""
+    tempos = []
+    for _ in range(3):
+        inicio = time.perf_counter()
+        AnalisadorSemantico().visit(ast)
+        GeradorCodigo().visit(ast)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def cenario_arvore():
+    """Memória e tempo de travessia: AST em tuplos vs. nós com __slots__ (com linha e coluna)"""
+    linha('instruções', 'tuplos (MB)', 'nós (MB)', 'travessia (s)', 'µs/instrução')
+    for n in (10000, 100000):
+        nos = parse_string(programa_sintetico(n))
+        tuplos, bytes_tuplos = memoria(lambda: como_tuplo(nos))
+        _, bytes_nos = memoria(lambda: de_tuplo(tuplos))
+        duracao = percorrer(nos)
+        linha(n, f"{bytes_tuplos / 1e6:.1f}", f"{bytes_nos / 1e6:.1f}",
+              f"{duracao:.3f}", f"{1e6 * duracao / n:.1f}")
+
+
+def programa_expressoes(n_linhas, profundidade):
+    """writeln de cadeias longas: somas com profundidade termos e sinais encaixados"""
+    soma = " + ".join(["x"] * profundidade)
+    sinais = "-(" * profundidade + "x" + ")" * profundidade
+    partes = ["program Expressoes;", "var x: integer;", "begin", "x := 1;"]
+    for i in range(n_linhas):
+        partes.append(f"writeln({soma if i % 2 else sinais});")
+    partes.append("writeln(x)")
+    partes.append("end.")
+    return "\n".join(partes)
+
+
+def gerar(ast):
+    """Segundos do GeradorCodigo sobre a AST (o melhor de 3)"""
+    tempos = []
+    for _ in range(3):
+        inicio = time.perf_counter()
+        GeradorCodigo().visit(ast)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def cenario_tipos():
+    """Geração de código com os tipos inferidos de novo vs. registados pela análise semântica"""
+    linha('profundidade', 'inferir (s)', 'registados (s)', 'aceleração')
+    for profundidade in (25, 100, 200):
+        fonte = programa_expressoes(200, profundidade)
+        sem_tipos = parse_string(fonte)  # sem análise: o gerador usa inferir_tipo
+        com_tipos = parse_string(fonte)
+        AnalisadorSemantico().visit(com_tipos)
+        antes = gerar(sem_tipos)
+        depois = gerar(com_tipos)
+        linha(profundidade, f"{antes:.3f}", f"{depois:.3f}", f"{antes / depois:.1f}x")
+
+
+def duas_travessias(ast):
+    analisador = AnalisadorSemantico()
+    analisador.visit(ast)
+    gerador = GeradorCodigo()
+    gerador.visit(ast)
+    return analisador.erros, gerador.codigo
+
+
+def uma_travessia(ast):
+    gerador = GeradorVerificado()
+    gerador.visit(ast)
+    return gerador.erros, gerador.codigo
+
+
+def cenario_fundido():
+    """Análise semântica e geração: duas travessias da AST vs. uma só (fundido.py)"""
+    linha('instruções', 'duas (s)', 'uma (s)', 'aceleração')
+    for n in (10000, 100000):
+        fonte = programa_sintetico(n)
+        tempos = {}
+        resultados = {}
+        for nome, travessia in (('duas', duas_travessias), ('uma', uma_travessia)):
+            melhor = None
+            for _ in range(3):
+                ast = parse_string(fonte)  # a análise regista os tipos na AST: sempre uma nova
+                gc.collect()
+                inicio = time.perf_counter()
+                resultados[nome] = travessia(ast)
+                duracao = time.perf_counter() - inicio
+                melhor = duracao if melhor is None else min(melhor, duracao)
+            tempos[nome] = melhor
+        assert resultados['duas'] == resultados['uma']
+        linha(n, f"{tempos['duas']:.3f}", f"{tempos['uma']:.3f}", f"{tempos['duas'] / tempos['uma']:.2f}x")
+
+
+def programas_profundos(n):
+    """Programas patológicos: árvores (ou cadeias de instruções) com n níveis de profundidade"""
+    inicio = "program Profundo; var x: integer; begin x := 1; "
+    return {
+        'soma': inicio + "x := " + " + ".join(["x"] * n) + "; writeln(x) end.",
+        'parenteses': inicio + "x := " + "(" * n + "x" + ")" * n + "; writeln(x) end.",
+        'sinais': inicio + "x := " + "-(" * n + "x" + ")" * n + "; writeln(x) end.",
+        'senao_se': inicio + " else ".join(f"if x = {i} then writeln({i})" for i in range(n)) + " end.",
+        'e_logico': inicio + "if " + " and ".join(["(x > 0)"] * n) + " then writeln(x) end.",
+    }
+
+
+def cenario_profundidade():
+    """Compilação de ASTs com 100k níveis (travessias com pilha explícita, sem recursão)"""
+    n = 100000
+    esperado = {'soma': n, 'parenteses': 1, 'sinais': 1 if n % 2 == 0 else -1,
+                'senao_se': 1, 'e_logico': 1}
+    linha('programa', 'normal (s)', '-O (s)', 'pico (MB)')
+    for nome, fonte in programas_profundos(n).items():
+        tempos = []
+        for opcoes in ({}, {'otimizar': True}):
+            gc.collect()
+            inicio = time.perf_counter()
+            resultado = Compilador(**opcoes).compilar(fonte)
+            tempos.append(time.perf_counter() - inicio)
+            assert resultado.sucesso, resultado.diagnosticos
+            saida, _, _ = executar(resultado.codigo)
+            assert saida.split() == [str(esperado[nome])], f"{nome}: saída {saida!r}"
+        gc.collect()
+        tracemalloc.start()
+        try:
+            Compilador().compilar(fonte)
+            pico = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        linha(nome, *(f"{t:.2f}" for t in tempos), f"{pico / 1e6:.0f}")
+    # A saída do print_ast cresce com o quadrado da profundidade (a indentação): 3k níveis
+    ast = parse_string(programas_profundos(3000)['soma'])
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()) as destino:
+        print_ast(ast)
+    print(f"print_ast (soma, 3k níveis): {time.perf_counter() - inicio:.2f} s, "
+          f"{len(destino.getvalue()) / 1e6:.0f} MB de texto")
+
+
+def tamanho_codigo(codigo):
+    """Bytes ocupados pelo buffer de instruções e, em texto, pela lista de strings de antes"""
+    linhas = list(codigo.linhas())
+    texto = sys.getsizeof(linhas) + sum(sys.getsizeof(l) for l in linhas)
+    tabelas = (codigo.labels, codigo.cadeias, codigo.reais)
+    buffer = (sys.getsizeof(codigo.ops) + sys.getsizeof(codigo.args)
+              + sum(sys.getsizeof(t) + sum(sys.getsizeof(x) for x in t) for t in tabelas))
+    return texto, buffer
+
+
+def medir_uma(funcao):
+    inicio = time.perf_counter()
+    funcao()
+    return time.perf_counter() - inicio
+
+
+def cenario_instrucoes():
+    """Código em strings vs. buffer de arrays; carregar .vm (texto) vs. .vmb vs. o buffer"""
+    linha('instruções', 'strings (MB)', 'buffer (MB)', '.vm (KB)', '.vmb (KB)')
+    cargas = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        for n in (10000, 100000):
+            codigo = Compilador().compilar(programa_sintetico(n)).codigo
+            texto, buffer = tamanho_codigo(codigo)
+            vm = os.path.join(pasta, 'p.vm')
+            vmb = os.path.join(pasta, 'p.vmb')
+            escrever_vm(codigo, vm)
+            escrever_vmb(codigo, vmb)
+            linha(n, f"{texto / 1e6:.1f}", f"{buffer / 1e6:.1f}",
+                  f"{os.path.getsize(vm) / 1e3:.0f}", f"{os.path.getsize(vmb) / 1e3:.0f}")
+            with open(vm) as f, open(vmb, 'rb') as g:
+                cargas[n] = (codigo, f.read(), g.read())
+
+    print()
+    linha('instruções', 'texto (s)', '.vmb (s)', 'buffer (s)', 'aceleração')
+    for n, (codigo, texto, binario) in cargas.items():
+        tempos = []
+        for carregar_programa in (lambda: carregar(texto), lambda: carregar_binario(binario),
+                                  lambda: carregar_instrucoes(codigo)):
+            tempos.append(min(medir_uma(carregar_programa) for _ in range(3)))
+        assert len(carregar(texto)) == len(carregar_binario(binario)) == len(carregar_instrucoes(codigo))
+        linha(n, *(f"{t:.3f}" for t in tempos), f"{tempos[0] / tempos[1]:.1f}x")
+
+
+def programa_subprogramas(n_subprogramas, n_instrucoes):
+    """Programa com n_subprogramas procedimentos de n_instrucoes atribuições cada"""
+    partes = ["program Subprogramas;", "var x, y: integer;"]
+    for s in range(n_subprogramas):
+        partes.append(f"procedure p{s}; var k: integer; begin k := {s};")
+        partes.extend(f"x := x + k * {i}; y := y - x;" for i in range(n_instrucoes))
+        partes.append("end;")
+    partes.append("begin x := 0; y := 0;")
+    partes.extend(f"p{s};" for s in range(n_subprogramas))
+    partes.append("writeln(x) end.")
+    return "\n".join(partes)
+
+
+def pico_memoria(funcao):
+    """Pico de memória (bytes) durante funcao()"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        funcao()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def cenario_streaming():
+    """Pico de memória: gerar o programa inteiro e escrever no fim vs. emitir em streaming"""
+    programas = (('50k instruções no main', programa_sintetico(50000)),
+                 ('500 subprogramas x 50', programa_subprogramas(500, 50)))
+    with tempfile.TemporaryDirectory() as pasta:
+        inteiro = os.path.join(pasta, 'inteiro.vm')
+        streaming = os.path.join(pasta, 'streaming.vm')
+
+        def iguais():
+            with open(inteiro) as a, open(streaming) as b:
+                return a.read() == b.read()
+
+        # Compilação completa: o parsing e a AST também contam para o pico
+        linha('programa', 'modo', 'inteiro (MB)', 'streaming (MB)')
+        for nome, fonte in programas:
+            for modo, opcoes in (('normal', {}), ('-O', {'otimizar': True})):
+                compilador = Compilador(**opcoes)
+                pico_inteiro = pico_memoria(
+                    lambda: escrever_vm(compilador.compilar(fonte).codigo, inteiro))
+                pico_streaming = pico_memoria(lambda: compilador.compilar_para(fonte, streaming))
+                assert iguais(), f"{nome} ({modo}): o streaming mudou o código"
+                linha(nome, modo, f"{pico_inteiro / 1e6:.1f}", f"{pico_streaming / 1e6:.1f}")
+
+        # Só a geração e a escrita, sobre uma AST já analisada
+        print()
+        linha('programa', 'inteiro (MB)', 'streaming (MB)')
+        for nome, fonte in programas:
+            ast = parse_string(fonte)
+            AnalisadorSemantico().visit(ast)
+
+            def gerar_inteiro():
+                gerador = GeradorCodigo()
+                gerador.visit(ast)
+                escrever_vm(gerador.codigo, inteiro)
+
+            def gerar_streaming():
+                saida = SaidaVM(streaming)
+                GeradorCodigo(destino=saida).visit(ast)
+                saida.fechar()
+
+            pico_inteiro = pico_memoria(gerar_inteiro)
+            pico_streaming = pico_memoria(gerar_streaming)
+            assert iguais(), f"{nome}: o streaming mudou o código"
+            linha(nome, f"{pico_inteiro / 1e6:.1f}", f"{pico_streaming / 1e6:.1f}")
+
+
+def contar_tokens(scanner, fonte):
+    lx = criar_lexer(scanner)
+    lx.input(fonte)
+    n = 0
+    while lx.token():
+        n += 1
+    return n
+
+
+def cenario_lexer():
+    """Tokens por segundo: lexer do PLY vs. lexer de expressão mestra"""
+    comentarios = "\n".join(f"(* comentário {i} " + "* texto " * 200 + "*)" for i in range(200))
+    fontes = [
+        ('100k instruções', programa_sintetico(100000)),
+        ('comentários longos', comentarios + "\n" + programa_sintetico(1000)),
+    ]
+    linha('fonte', 'tokens', 'ply (tok/s)', 'rapido (tok/s)', 'aceleração')
+    for nome, fonte in fontes:
+        tempos = {}
+        for scanner in ('ply', 'rapido'):
+            inicio = time.perf_counter()
+            n = contar_tokens(scanner, fonte)
+            tempos[scanner] = time.perf_counter() - inicio
+        linha(nome, n, f"{n / tempos['ply']:.0f}", f"{n / tempos['rapido']:.0f}",
+              f"{tempos['ply'] / tempos['rapido']:.1f}x")
+
+
+def cenario_lote():
+    """Ficheiros por segundo: um processo por ficheiro vs. compilação em lote com N processos"""
+    with tempfile.TemporaryDirectory() as pasta:
+        ficheiros = []
+        for i in range(200):
+            nome = os.path.join(pasta, f"p{i}.pas")
+            with open(nome, 'w') as f:
+                f.write(programa_sintetico(200 + i))
+            ficheiros.append(nome)
+
+        linha('modo', 'ficheiros', 'tempo (s)', 'ficheiros/s')
+        amostra = ficheiros[:10]
+        inicio = time.perf_counter()
+        for nome in amostra:
+            subprocess.run([sys.executable, 'maquina.py', nome], capture_output=True, check=True)
+        duracao = time.perf_counter() - inicio
+        linha('maquina.py por ficheiro', len(amostra), f"{duracao:.2f}", f"{len(amostra) / duracao:.1f}")
+
+        for processos in sorted({1, 2, os.cpu_count() or 1}):
+            inicio = time.perf_counter()
+            resumos = compilar_lote(ficheiros, processos)
+            duracao = time.perf_counter() - inicio
+            assert all(r['estado'] == 'ok' for r in resumos)
+            linha(f"lote, {processos} processo(s)", len(ficheiros), f"{duracao:.2f}",
+                  f"{len(ficheiros) / duracao:.1f}")
+
+
+def cenario_cache():
+    """Compilação de teste1..5.pas sem cache, com a cache vazia e com a cache cheia"""
+    ficheiros = [f"teste{i}.pas" for i in range(1, 6)]
+    fontes = []
+    for nome in ficheiros:
+        with open(nome) as f:
+            fontes.append(f.read())
+    repeticoes = 20
+
+    def medir(compilador):
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            for fonte in fontes:
+                assert compilador.compilar(fonte).sucesso
+        return (time.perf_counter() - inicio) / repeticoes
+
+    linha('modo', 'ms por corpus', 'ms/ficheiro')
+    base = medir(Compilador())
+    linha('sem cache', f"{1000 * base:.2f}", f"{1000 * base / len(fontes):.3f}")
+    with tempfile.TemporaryDirectory() as pasta:
+        cache = CacheCompilacao(pasta)
+        # Cada repetição usa uma versão diferente, por isso todas as consultas falham
+        compilador = Compilador(cache=cache)
+        inicio = time.perf_counter()
+        for i in range(repeticoes):
+            cache.versao = f"frio-{i}"
+            for fonte in fontes:
+                compilador.compilar(fonte)
+        frio = (time.perf_counter() - inicio) / repeticoes
+        linha('cache vazia', f"{1000 * frio:.2f}", f"{1000 * frio / len(fontes):.3f}")
+        quente = medir(compilador)
+        linha('cache cheia', f"{1000 * quente:.2f}", f"{1000 * quente / len(fontes):.3f}")
+        assert cache.acertos >= repeticoes * len(fontes) - len(fontes)
+
+
+def cenario_servidor():
+    """Latência por ficheiro: maquina.py a frio vs. pedidos a um servidor.py já carregado"""
+    ficheiros = [os.path.abspath(f"teste{i}.pas") for i in range(1, 6)]
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'servidor.sock')
+        servidor = subprocess.Popen([sys.executable, 'servidor.py', '--socket', caminho],
+                                    stderr=subprocess.DEVNULL)
+        try:
+            while not os.path.exists(caminho):
+                time.sleep(0.01)
+            saidas = [os.path.join(pasta, os.path.basename(f) + '.vm') for f in ficheiros]
+
+            linha('modo', 'pedidos', 'ms/ficheiro')
+            inicio = time.perf_counter()
+            for nome in ficheiros:
+                subprocess.run([sys.executable, 'maquina.py', nome], capture_output=True, check=True)
+            duracao = time.perf_counter() - inicio
+            linha('maquina.py a frio', len(ficheiros), f"{1000 * duracao / len(ficheiros):.1f}")
+
+            inicio = time.perf_counter()
+            for nome, saida in zip(ficheiros, saidas):
+                subprocess.run([sys.executable, 'cliente.py', '--socket', caminho, nome],
+                               capture_output=True, check=True)
+            duracao = time.perf_counter() - inicio
+            linha('cliente.py', len(ficheiros), f"{1000 * duracao / len(ficheiros):.1f}")
+
+            n = 0
+            inicio = time.perf_counter()
+            for _ in range(40):
+                for nome, saida in zip(ficheiros, saidas):
+                    resposta, = pedir([{'ficheiro': nome, 'saida': saida}], caminho)
+                    assert resposta['estado'] == 'ok'
+                    n += 1
+            duracao = time.perf_counter() - inicio
+            linha('ligação por pedido', n, f"{1000 * duracao / n:.2f}")
+
+            pedidos = [{'ficheiro': nome, 'saida': saida} for nome, saida in zip(ficheiros, saidas)] * 40
+            inicio = time.perf_counter()
+            respostas = pedir(pedidos, caminho)
+            duracao = time.perf_counter() - inicio
+            assert all(r['estado'] == 'ok' for r in respostas)
+            linha('uma ligação', len(pedidos), f"{1000 * duracao / len(pedidos):.2f}")
+        finally:
+            servidor.terminate()
+            servidor.wait()
+
+
+ARRANQUE = """
+import sys, time
+inicio = time.perf_counter()
+sys.path.insert(0, %(pasta)r)
+if %(sem_tabelas)r:
+    sys.modules['tabelas_parser'] = sys.modules['tabelas_lexer'] = None  # import falha
+from sin import parse_string
+ast = parse_string("program A; var x: integer; begin x := 1; writeln(x) end.")
+assert ast is not None
+print(time.perf_counter() - inicio)
+"""
+
+
+def cenario_arranque():
+    """Tempo desde o import até à primeira AST, num processo novo (com e sem tabelas pré-calculadas)"""
+    problemas = verificar_tabelas()
+    assert not problemas, "; ".join(problemas) + " (corra: python3 sin.py --gerar-tabelas)"
+
+    pasta = os.path.dirname(os.path.abspath(__file__))
+    linha('modo', 'mediana (ms)', 'mínimo (ms)')
+    for nome, sem_tabelas in (('tabelas pré-calculadas', False), ('gerar tabelas', True)):
+        tempos = []
+        with tempfile.TemporaryDirectory() as trabalho:
+            for _ in range(7):
+                r = subprocess.run([sys.executable, '-c', ARRANQUE % {'pasta': pasta, 'sem_tabelas': sem_tabelas}],
+                                   cwd=trabalho, capture_output=True, text=True, check=True)
+                tempos.append(float(r.stdout))
+            # O arranque não pode escrever parser.out/parsetab.py (nem na pasta atual nem no projeto)
+            assert not os.listdir(trabalho), f"ficheiros escritos: {os.listdir(trabalho)}"
+        assert not {'parser.out', 'parsetab.py'} & set(os.listdir(pasta))
+        tempos.sort()
+        linha(nome, f"{1000 * tempos[len(tempos) // 2]:.1f}", f"{1000 * tempos[0]:.1f}")
+
+
+CENARIOS = {
+    'execucao': cenario_execucao,
+    'peephole': cenario_peephole,
+    'dobragem': cenario_dobragem,
+    'limites_for': cenario_limites_for,
+    'curto_circuito': cenario_curto_circuito,
+    'rotacao': cenario_rotacao,
+    'passos': cenario_passos,
+    'subexpressoes': cenario_subexpressoes,
+    'reducao_forca': cenario_reducao_forca,
+    'desenrolamento': cenario_desenrolamento,
+    'expansao': cenario_expansao,
+    'parsing': cenario_parsing,
+    'arvore': cenario_arvore,
+    'tipos': cenario_tipos,
+    'fundido': cenario_fundido,
+    'profundidade': cenario_profundidade,
+    'instrucoes': cenario_instrucoes,
+    'streaming': cenario_streaming,
+    'lexer': cenario_lexer,
+    'lote': cenario_lote,
+    'cache': cenario_cache,
+    'servidor': cenario_servidor,
+    'arranque': cenario_arranque,
+}
+
+
+if __name__ == "__main__":
+    nomes = sys.argv[1:] or list(CENARIOS)
+    for nome in nomes:
+        if nome not in CENARIOS:
+            print(f"Cenário desconhecido: {nome} (disponíveis: {', '.join(CENARIOS)})")
+            sys.exit(1)
+        print(f"== {nome}: {CENARIOS[nome].__doc__}")
+        CENARIOS[nome]()
+        print()
@@ -0,0 +1,472 @@
+from instrucoes import Instrucoes
+
+# REPRESENTAÇÃO INTERMÉDIA: GRAFO DE BLOCOS BÁSICOS
+# O código do GeradorCodigo é partido em unidades (o início do programa, cada subprograma
+# e o main) e cada unidade em blocos básicos com sucessores explícitos. Dentro de um bloco
+# as instruções são as da EWVM, de stack, no formato [op, arg] do otimizador peephole; o
+# fluxo de controlo fica no terminador do bloco (JUMP, JZ, RETURN ou STOP) e nas listas
+# de sucessores. baixar() volta a dar o buffer de instruções EWVM.
+#
+# As análises de fluxo de dados (vivacidade, definições que chegam, dominadores) tratam
+# como variáveis as posições de memória lidas e escritas diretamente: ('G', endereço) para
+# PUSHG/STOREG e ('L', deslocamento) para PUSHL/STOREL. Os acessos indiretos (LOADN,
+# STOREN, LOAD, STORE) e as chamadas são tratados de forma conservadora.
+
+TERMINADORES = ('JUMP', 'JZ', 'RETURN', 'STOP')
+LABEL_MAIN = 'main'  # a label do programa principal (GeradorCodigo.visit_programa)
+
+LEITURAS = {'PUSHG': 'G', 'PUSHL': 'L'}
+ESCRITAS = {'STOREG': 'G', 'STOREL': 'L'}
+# Leem posições que não se conhecem (arrays e, no caso de CALL, o que o subprograma ler)
+LEITURAS_INDIRETAS = ('LOADN', 'LOAD', 'CALL')
+# Podem escrever posições que não se conhecem
+ESCRITAS_INDIRETAS = ('STOREN', 'STORE', 'CALL')
+
+# Efeito na stack: (valores tirados, valores postos). PUSHN, POP e DUP dependem do operando.
+EFEITO_PILHA = dict(
+    [(op, (0, 1)) for op in ('PUSHI', 'PUSHF', 'PUSHS', 'PUSHG', 'PUSHL', 'PUSHGP', 'PUSHFP',
+                             'PUSHA', 'READ')] +
+    [(op, (1, 0)) for op in ('STOREG', 'STOREL', 'CALL', 'WRITEI', 'WRITEF', 'WRITES',
+                             'WRITECHR')] +
+    [(op, (2, 1)) for op in ('PADD', 'LOADN', 'ADD', 'SUB', 'MUL', 'DIV', 'MOD', 'FADD', 'FSUB',
+                             'FMUL', 'FDIV', 'EQUAL', 'INF', 'INFEQ', 'SUP', 'SUPEQ', 'AND',
+                             'OR', 'CHARAT')] +
+    [(op, (1, 1)) for op in ('LOAD', 'ITOF', 'FTOI', 'NOT', 'STRLEN', 'CHRCODE', 'ATOI',
+                             'ATOF')] +
+    [('STOREN', (3, 0)), ('STORE', (2, 0)), ('SWAP', (2, 2)), ('WRITELN', (0, 0)),
+     ('START', (0, 0)), ('NOP', (0, 0))])
+
+
+def efeito_pilha(op, arg):
+    """(tirados, postos) de uma instrução, ou None se não se conhece"""
+    if op == 'DUP':
+        return arg, 2 * arg  # tira os valores que copia e volta a pô-los
+    if op == 'POP':
+        return arg, 0
+    if op == 'PUSHN':
+        return 0, arg
+    return EFEITO_PILHA.get(op)
+
+
+def consumidor(instrs, p):
+    """(j, acima): a instrução j que tira da stack o valor posto pela instrução p e quantos
+    valores estão por cima dele nesse momento; None se o valor chega ao fim das instruções
+    ou se pelo caminho há uma instrução que não se conhece"""
+    acima = 0
+    for j in range(p + 1, len(instrs)):
+        efeito = efeito_pilha(*instrs[j])
+        if efeito is None:
+            return None
+        tirados, postos = efeito
+        if tirados > acima:
+            return j, acima
+        acima += postos - tirados
+    return None
+
+
+class Bloco:
+    """Bloco básico: labels que o definem, instruções e terminador (ou None se continua)"""
+
+    def __init__(self, labels=None):
+        self.labels = labels or []
+        self.instrs = []
+        self.terminador = None  # [op, arg] de JUMP, JZ, RETURN ou STOP
+        self.sucessores = []
+        self.predecessores = []
+        self.externo = False  # salta (ou continua) para fora da unidade
+
+    def __len__(self):
+        return len(self.instrs) + (self.terminador is not None)
+
+    def __repr__(self):
+        return f"Bloco({self.labels}, {len(self)} instruções)"
+
+
+class Unidade:
+    """Uma sequência de blocos com uma entrada (o primeiro bloco)"""
+
+    def __init__(self, blocos):
+        self.blocos = blocos
+        self.analises = {}  # resultados de análises (invalidados quando a unidade muda)
+        self.ligar()
+
+    def __len__(self):
+        return sum(len(b) for b in self.blocos)
+
+    def ligar(self):
+        """Calcula os sucessores e predecessores a partir dos terminadores"""
+        por_label = {label: b for b in self.blocos for label in b.labels}
+        for b in self.blocos:
+            b.sucessores = []
+            b.predecessores = []
+        for i, b in enumerate(self.blocos):
+            seguinte = self.blocos[i + 1] if i + 1 < len(self.blocos) else None
+            op = b.terminador[0] if b.terminador else None
+            b.externo = False
+            if op in ('JUMP', 'JZ'):
+                destino = por_label.get(b.terminador[1])
+                if destino is None:
+                    b.externo = True
+                else:
+                    b.sucessores.append(destino)
+            if op is None or op == 'JZ':
+                if seguinte is None:
+                    b.externo = True
+                elif seguinte not in b.sucessores:
+                    b.sucessores.append(seguinte)
+            for s in b.sucessores:
+                s.predecessores.append(b)
+        self.analises.clear()
+
+    def analise(self, funcao):
+        """Resultado de funcao(unidade), guardado até a unidade mudar"""
+        if funcao not in self.analises:
+            self.analises[funcao] = funcao(self)
+        return self.analises[funcao]
+
+    def variaveis(self):
+        """Todas as posições de memória lidas ou escritas diretamente na unidade"""
+        return {(LEITURAS.get(op) or ESCRITAS[op], arg)
+                for b in self.blocos for op, arg in b.instrs
+                if op in LEITURAS or op in ESCRITAS}
+
+
+def construir(codigo, preservar=()):
+    """Lista de Unidades do buffer de instruções (GeradorCodigo.codigo)
+
+    preservar: labels referidas de fora de codigo (quando o programa é otimizado aos
+    pedaços); também começam uma unidade, para nenhuma análise contar só com os
+    predecessores que estão no pedaço.
+    """
+    instrs = [[op, arg] for op, arg in codigo]
+    # Entradas: os subprogramas (alvos de PUSHA) e o main
+    entradas = {arg for op, arg in instrs if op == 'PUSHA'}
+    entradas.add(LABEL_MAIN)
+    entradas.update(preservar)
+
+    unidades = []
+    blocos = []
+    atual = None
+    for instr in instrs:
+        op, arg = instr
+        if op == 'LABEL':
+            if arg in entradas and blocos:
+                # Começa uma unidade nova (com as labels que estiverem à espera de instruções)
+                pendente = blocos.pop() if atual is not None and not len(atual) else None
+                if blocos:
+                    unidades.append(Unidade(blocos))
+                blocos = [pendente] if pendente else []
+                atual = pendente
+            if atual is None or len(atual):
+                atual = Bloco()
+                blocos.append(atual)
+            atual.labels.append(arg)
+            continue
+        if atual is None:
+            atual = Bloco()
+            blocos.append(atual)
+        if op in TERMINADORES:
+            atual.terminador = instr
+            atual = None
+        else:
+            atual.instrs.append(instr)
+    if blocos:
+        unidades.append(Unidade(blocos))
+    return unidades
+
+
+def baixar(unidades):
+    """Buffer de instruções EWVM das unidades (os blocos pela ordem em que estão)"""
+    codigo = Instrucoes()
+    for unidade in unidades:
+        for b in unidade.blocos:
+            for label in b.labels:
+                codigo.emitir('LABEL', label)
+            for op, arg in b.instrs:
+                codigo.emitir(op, arg)
+            if b.terminador is not None:
+                codigo.emitir(*b.terminador)
+    return codigo
+
+
+def contar(unidades):
+    return sum(len(u) for u in unidades)
+
+
+class Frame:
+    """Posições novas na frame de uma unidade, para os temporários dos passos
+
+    No main são globais a seguir às do programa (cresce o PUSHN depois do START); num
+    subprograma (uma unidade que acaba em RETURN) são locais a seguir às que já existem.
+    Se a frame não tem PUSHN entra um PUSHN 0, que fechar() tira se ficar por usar. Numa
+    unidade sem o início da frame (um pedaço do main em streaming) ou cuja entrada também
+    é alvo de saltos, tipo é None e não se reserva nada.
+    """
+
+    def __init__(self, unidade):
+        self.tipo = None
+        self.pushn = None
+        self.entrada = unidade.blocos[0] if unidade.blocos else None
+        if self.entrada is None or self.entrada.predecessores:
+            return
+        instrs = self.entrada.instrs
+        if instrs and instrs[0][0] == 'START':
+            self.tipo, pos = 'G', 1
+        elif self.entrada.labels and any(b.terminador is not None and b.terminador[0] == 'RETURN'
+                                         for b in unidade.blocos):
+            self.tipo, pos = 'L', 0
+        else:
+            return
+        if pos < len(instrs) and instrs[pos][0] == 'PUSHN':
+            self.pushn = instrs[pos]
+        else:
+            self.pushn = ['PUSHN', 0]
+            instrs.insert(pos, self.pushn)
+
+    def reservar(self):
+        """Variável ('G', endereço) ou ('L', deslocamento) nova (None se não há frame)"""
+        if self.tipo is None:
+            return None
+        n = self.pushn[1]
+        self.pushn[1] = n + 1
+        return (self.tipo, n)
+
+    def fechar(self):
+        if self.pushn is not None and self.pushn[1] == 0:
+            self.entrada.instrs = [instr for instr in self.entrada.instrs if instr is not self.pushn]
+
+
+# ANÁLISES
+
+def alcancaveis(unidade):
+    """Blocos alcançáveis a partir da entrada"""
+    vistos = set()
+    pilha = [unidade.blocos[0]] if unidade.blocos else []
+    while pilha:
+        b = pilha.pop()
+        if id(b) in vistos:
+            continue
+        vistos.add(id(b))
+        pilha.extend(b.sucessores)
+    return vistos
+
+
+class Dominadores:
+    """Árvore de dominadores (Lengauer-Tarjan para os semidominadores, depois SNCA)
+
+    idom: {id do bloco: bloco que o domina imediatamente} para os blocos alcançáveis. Os
+    intervalos de uma travessia da árvore respondem a domina(a, b) em tempo constante.
+    Tudo é iterativo e quase linear: um else-if com 100k ramos tem 100k blocos encadeados.
+    """
+
+    def __init__(self, unidade):
+        # Pré-ordem de uma travessia em profundidade a partir da entrada
+        vertices = []
+        pai = []
+        numero = {}
+        pilha = [(unidade.blocos[0], -1)] if unidade.blocos else []
+        while pilha:
+            b, p = pilha.pop()
+            if id(b) in numero:
+                continue
+            numero[id(b)] = len(vertices)
+            vertices.append(b)
+            pai.append(p)
+            pilha.extend((s, numero[id(b)]) for s in reversed(b.sucessores) if id(s) not in numero)
+        n = len(vertices)
+
+        semi = list(range(n))
+        antepassado = [-1] * n
+        rotulo = list(range(n))
+
+        def avaliar(v):
+            if antepassado[v] == -1:
+                return v
+            caminho = []
+            x = v
+            while antepassado[antepassado[x]] != -1:
+                caminho.append(x)
+                x = antepassado[x]
+            for x in reversed(caminho):  # compressão do caminho
+                a = antepassado[x]
+                if semi[rotulo[a]] < semi[rotulo[x]]:
+                    rotulo[x] = rotulo[a]
+                antepassado[x] = antepassado[a]
+            return rotulo[v]
+
+        for w in range(n - 1, 0, -1):
+            for p in vertices[w].predecessores:
+                v = numero.get(id(p))
+                if v is not None:
+                    u = avaliar(v)
+                    if semi[u] < semi[w]:
+                        semi[w] = semi[u]
+            antepassado[w] = pai[w]
+
+        idom = pai[:]
+        for w in range(1, n):
+            while idom[w] > semi[w]:
+                idom[w] = idom[idom[w]]
+        self.idom = {id(vertices[w]): vertices[idom[w] if w else 0] for w in range(n)}
+
+        filhos = {}
+        for w in range(1, n):
+            filhos.setdefault(id(vertices[idom[w]]), []).append(vertices[w])
+        self.inicio = {}
+        self.fim = {}
+        contador = 0
+        pilha = [(vertices[0], False)] if vertices else []
+        while pilha:
+            b, saida = pilha.pop()
+            contador += 1
+            if saida:
+                self.fim[id(b)] = contador
+                continue
+            self.inicio[id(b)] = contador
+            pilha.append((b, True))
+            pilha.extend((f, False) for f in filhos.get(id(b), ()))
+
+    def domina(self, a, b):
+        """a domina b (ambos alcançáveis)"""
+        if id(a) not in self.inicio or id(b) not in self.inicio:
+            return False
+        return self.inicio[id(a)] <= self.inicio[id(b)] and self.fim[id(b)] <= self.fim[id(a)]
+
+
+def dominadores(unidade):
+    return Dominadores(unidade)
+
+
+def ciclos(unidade):
+    """Ciclos naturais: lista de (cabeça, conjunto de ids dos blocos do ciclo)"""
+    dom = unidade.analise(dominadores)
+    resultado = []
+    for b in unidade.blocos:
+        for s in b.sucessores:
+            if dom.domina(s, b):  # b -> s com s a dominar b: arco de retorno
+                corpo = {id(s), id(b)}
+                pilha = [b] if b is not s else []  # não se sobe para lá da cabeça
+                while pilha:
+                    x = pilha.pop()
+                    for p in x.predecessores:
+                        if id(p) not in corpo:
+                            corpo.add(id(p))
+                            pilha.append(p)
+                resultado.append((s, corpo))
+    return resultado
+
+
+def usos_e_definicoes(instr, variaveis, globais):
+    """(lidas, escritas com certeza) por uma instrução"""
+    op, arg = instr
+    if op in LEITURAS:
+        return ((LEITURAS[op], arg),), ()
+    if op in ESCRITAS:
+        return (), ((ESCRITAS[op], arg),)
+    if op == 'CALL':
+        return globais, ()
+    if op in LEITURAS_INDIRETAS:
+        return variaveis, ()
+    return (), ()
+
+
+def vivacidade(unidade):
+    """{id do bloco: variáveis vivas à saída do bloco}
+
+    Depois de RETURN ficam vivas as globais e as posições abaixo de fp (parâmetros e o
+    resultado, que são da frame de quem chamou); depois de um salto para fora da unidade
+    fica tudo vivo e depois de STOP nada.
+    """
+    variaveis = frozenset(unidade.variaveis())
+    globais = frozenset(v for v in variaveis if v[0] == 'G')
+    retorno = globais | frozenset(v for v in variaveis if v[0] == 'L' and v[1] < 0)
+    entrada = {}
+    saida = {}
+    resumo = {}
+    for b in unidade.blocos:
+        usa = set()
+        define = set()
+        for instr in b.instrs:
+            lidas, escritas = usos_e_definicoes(instr, variaveis, globais)
+            usa.update(v for v in lidas if v not in define)
+            define.update(escritas)
+        resumo[id(b)] = (frozenset(usa), frozenset(define))
+        entrada[id(b)] = frozenset()
+        if b.externo:
+            saida[id(b)] = variaveis
+        elif b.terminador is not None and b.terminador[0] == 'RETURN':
+            saida[id(b)] = retorno
+        else:
+            saida[id(b)] = frozenset()
+    mudou = True
+    while mudou:
+        mudou = False
+        for b in reversed(unidade.blocos):
+            fora = saida[id(b)].union(*(entrada[id(s)] for s in b.sucessores))
+            usa, define = resumo[id(b)]
+            dentro = usa | (fora - define)
+            if dentro != entrada[id(b)] or fora != saida[id(b)]:
+                entrada[id(b)] = dentro
+                saida[id(b)] = fora
+                mudou = True
+    return saida
+
+
+def definicoes(unidade):
+    """{id do bloco: {variável: conjunto de definições}} à entrada de cada bloco
+
+    Uma definição é (id do bloco, índice da instrução) de um STOREG/STOREL, ou None para
+    um valor desconhecido (à entrada da unidade, depois de uma chamada ou de uma escrita
+    indireta). Uma variável que não aparece no dicionário tem só a definição None.
+    """
+    variaveis = frozenset(unidade.variaveis())
+    globais = frozenset(v for v in variaveis if v[0] == 'G')
+    entrada = {id(b): None for b in unidade.blocos}  # None: ainda não calculado
+    primeiro = unidade.blocos[0] if unidade.blocos else None
+    pendentes = list(reversed(unidade.blocos))
+    na_lista = {id(b) for b in pendentes}
+    saida = {}
+    while pendentes:
+        b = pendentes.pop()
+        na_lista.discard(id(b))
+        if b is primeiro:
+            atual = {}
+        else:
+            atual = _juntar([saida[id(p)] for p in b.predecessores if id(p) in saida])
+        entrada[id(b)] = atual
+        fim = transferir_definicoes(b, atual, variaveis, globais)
+        if saida.get(id(b)) != fim:
+            saida[id(b)] = fim
+            for s in b.sucessores:
+                if id(s) not in na_lista:
+                    na_lista.add(id(s))
+                    pendentes.append(s)
+    return entrada
+
+
+def _juntar(dicionarios):
+    if not dicionarios:
+        return {}
+    chaves = set().union(*dicionarios)
+    return {v: frozenset().union(*(d.get(v, frozenset((None,))) for d in dicionarios))
+            for v in chaves}
+
+
+def transferir_definicoes(bloco, atual, variaveis, globais, visitar=None):
+    """Definições à saída do bloco a partir das da entrada (atual)
+
+    visitar(i, instr, definicoes), se existir, é chamado antes de cada instrução.
+    """
+    atual = dict(atual)
+    desconhecida = frozenset((None,))
+    for i, instr in enumerate(bloco.instrs):
+        if visitar is not None:
+            visitar(i, instr, atual)
+        op, arg = instr
+        if op in ESCRITAS:
+            atual[(ESCRITAS[op], arg)] = frozenset(((id(bloco), i),))
+        elif op in ESCRITAS_INDIRETAS:
+            for v in (globais if op == 'CALL' else variaveis):
+                if v in atual:
+                    atual[v] = atual[v] | desconhecida
+    return atual
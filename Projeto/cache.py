@@ -0,0 +1,129 @@
+import os
+import pickle
+import hashlib
+import tempfile
+
+# CACHE DE COMPILAÇÃO
+# Guarda em disco o resultado de cada compilação (AST, instruções e diagnósticos), indexado
+# pelo hash do código fonte, das opções e da versão do compilador. A versão é o hash dos
+# próprios ficheiros do compilador, por isso qualquer alteração ao compilador invalida a cache.
+# Cada entrada é um ficheiro; um acerto atualiza a data de modificação, e quando a pasta
+# passa do limite de tamanho são apagadas as entradas usadas há mais tempo (LRU).
+
+FICHEIROS_COMPILADOR = ('lex.py', 'lex_rapido.py', 'sin.py', 'arvore.py', 'semantica.py', 'dobragem.py',
+                        'expandir.py', 'desenrolar.py', 'maquina.py', 'instrucoes.py', 'fundido.py',
+                        'otimizador.py', 'blocos.py', 'passos.py', 'compilador.py')
+
+PASTA_OMISSAO = os.path.join(os.path.expanduser('~'), '.cache', 'plc2025')
+LIMITE_OMISSAO = 64 * 1024 * 1024  # bytes
+
+
+def versao_compilador():
+    """Hash dos ficheiros do compilador (muda sempre que um deles muda)"""
+    h = hashlib.sha256()
+    pasta = os.path.dirname(os.path.abspath(__file__))
+    for nome in FICHEIROS_COMPILADOR:
+        with open(os.path.join(pasta, nome), 'rb') as f:
+            h.update(nome.encode())
+            h.update(f.read())
+    return h.hexdigest()
+
+
+class CacheCompilacao:
+    def __init__(self, pasta, limite=LIMITE_OMISSAO):
+        self.pasta = pasta
+        self.limite = limite
+        self.versao = versao_compilador()
+        self.acertos = 0
+        self.falhas = 0
+        self._total = None  # tamanho estimado da pasta (calculado no primeiro guardar)
+        os.makedirs(pasta, exist_ok=True)
+
+    def chave(self, fonte, opcoes):
+        """Hash do código fonte, das opções de compilação (um tuplo) e da versão do compilador"""
+        h = hashlib.sha256()
+        h.update(self.versao.encode())
+        h.update(repr(opcoes).encode())
+        h.update(fonte.encode())
+        return h.hexdigest()
+
+    def caminho(self, chave):
+        return os.path.join(self.pasta, chave[:2], chave[2:] + '.pkl')
+
+    def obter(self, chave):
+        """Entrada guardada para a chave (um dicionário) ou None"""
+        nome = self.caminho(chave)
+        try:
+            with open(nome, 'rb') as f:
+                entrada = pickle.load(f)
+            os.utime(nome)  # marca como usada agora, para a ordem LRU
+        except (OSError, pickle.UnpicklingError, EOFError):
+            self.falhas += 1
+            return None
+        self.acertos += 1
+        return entrada
+
+    def guardar(self, chave, entrada):
+        nome = self.caminho(chave)
+        pasta = os.path.dirname(nome)
+        os.makedirs(pasta, exist_ok=True)
+        # Escreve num temporário e muda o nome: outro processo nunca lê uma entrada a meio
+        fd, temporario = tempfile.mkstemp(dir=pasta, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(entrada, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporario, nome)
+        except BaseException:
+            os.unlink(temporario)
+            raise
+        # Só percorre a pasta quando a estimativa passa do limite
+        if self._total is None:
+            self._total = self.tamanho()
+        else:
+            self._total += os.path.getsize(nome)
+        if self._total > self.limite:
+            self.limitar()
+
+    def entradas(self):
+        """Lista de (data de uso, tamanho, caminho) de todas as entradas"""
+        lista = []
+        for raiz, _, nomes in os.walk(self.pasta):
+            for nome in nomes:
+                if nome.endswith('.pkl'):
+                    caminho = os.path.join(raiz, nome)
+                    try:
+                        info = os.stat(caminho)
+                    except OSError:
+                        continue
+                    lista.append((info.st_mtime_ns, info.st_size, caminho))
+        return lista
+
+    def tamanho(self):
+        return sum(tamanho for _, tamanho, _ in self.entradas())
+
+    def limitar(self):
+        """Apaga as entradas usadas há mais tempo até a cache ocupar 90% do limite
+
+        A folga evita voltar a percorrer a pasta logo na entrada seguinte.
+        """
+        lista = self.entradas()
+        total = sum(tamanho for _, tamanho, _ in lista)
+        alvo = self.limite * 9 // 10
+        lista.sort()
+        for _, tamanho, caminho in lista:
+            if total <= alvo:
+                break
+            try:
+                os.unlink(caminho)
+            except OSError:
+                pass
+            total -= tamanho
+        self._total = total
+
+    def limpar(self):
+        for _, _, caminho in self.entradas():
+            os.unlink(caminho)
+        self._total = 0
+
+    def relatorio(self):
+        return f"Cache: {self.acertos} acertos, {self.falhas} falhas, {self.tamanho() / 1024:.1f} KiB em {self.pasta}"
@@ -0,0 +1,66 @@
+import os
+import sys
+import json
+import socket
+import argparse
+
+# CLIENTE DO SERVIDOR DE COMPILAÇÃO
+# Só usa a biblioteca padrão (não carrega o PLY nem o compilador): envia os ficheiros ao
+# servidor.py já em execução e mostra as respostas no formato do maquina.py.
+#
+# Uso: python3 cliente.py ficheiro.pas [ficheiro.pas ...] [-O] [--socket CAMINHO]
+
+SOCKET_OMISSAO = f"/tmp/plc2025-{os.getuid()}.sock"
+
+
+def pedir(pedidos, caminho=SOCKET_OMISSAO):
+    """Envia os pedidos (dicionários) numa só ligação; devolve as respostas pela mesma ordem"""
+    for i, pedido in enumerate(pedidos):
+        pedido.setdefault('id', i)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(caminho)
+        s.sendall(b''.join(json.dumps(p).encode() + b'\n' for p in pedidos))
+        s.shutdown(socket.SHUT_WR)
+        respostas = {}
+        with s.makefile('rb') as f:
+            for linha in f:
+                resposta = json.loads(linha)
+                respostas[resposta.get('id')] = resposta
+    return [respostas.get(p['id']) for p in pedidos]
+
+
+if __name__ == "__main__":
+    cli = argparse.ArgumentParser(description="Cliente do servidor de compilação Pascal -> EWVM")
+    cli.add_argument('ficheiros', nargs='*', metavar='ficheiro')
+    cli.add_argument('-O', '--otimizar', action='store_true')
+    cli.add_argument('--socket', default=SOCKET_OMISSAO, metavar='CAMINHO')
+    cli.add_argument('--estado', action='store_true', help="mostra o estado do servidor e sai")
+    cli.add_argument('--parar', action='store_true', help="pede ao servidor para terminar e sai")
+    opcoes = cli.parse_args()
+    if not (opcoes.ficheiros or opcoes.estado or opcoes.parar):
+        cli.error("indique pelo menos um ficheiro")
+
+    try:
+        if opcoes.estado or opcoes.parar:
+            resposta, = pedir([{'comando': 'estado' if opcoes.estado else 'parar'}], opcoes.socket)
+            print(json.dumps(resposta, ensure_ascii=False))
+            sys.exit(0)
+        pedidos = [{'ficheiro': os.path.abspath(f), 'otimizar': opcoes.otimizar} for f in opcoes.ficheiros]
+        respostas = pedir(pedidos, opcoes.socket)
+    except OSError as e:
+        print(f"Erro: não foi possível contactar o servidor em {opcoes.socket} ({e})")
+        sys.exit(2)
+
+    falhou = False
+    for resposta in respostas:
+        if resposta is None:
+            print("Erro: o servidor não respondeu a um dos pedidos")
+            falhou = True
+            continue
+        for diagnostico in resposta['diagnosticos']:
+            print(diagnostico)
+        if resposta['estado'] == 'ok':
+            print(f"Sucesso! {os.path.relpath(resposta['saida'])}")
+        else:
+            falhou = True
+    sys.exit(1 if falhou else 0)
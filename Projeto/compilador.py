@@ -0,0 +1,238 @@
+import time
+
+from sin import criar_lexer, criar_parser
+from semantica import AnalisadorSemantico
+from dobragem import DobradorConstantes
+from desenrolar import DesenroladorCiclos
+from expandir import ExpansorSubprogramas
+from maquina import GeradorCodigo, SaidaVM, escrever_vm
+from fundido import GeradorVerificado
+from otimizador import OtimizadorPeephole
+from passos import GestorPassos
+
+# COMPILADOR REENTRANTE
+# Cada instância de Compilador tem o seu lexer, o seu parser e a sua lista de diagnósticos,
+# por isso várias threads podem compilar ao mesmo tempo desde que cada uma use a sua
+# instância. Os erros e avisos são devolvidos no resultado em vez de impressos.
+
+
+class ResultadoCompilacao:
+    def __init__(self, codigo, ast, diagnosticos, tempos, saida=None, da_cache=False):
+        self.codigo = codigo  # buffer de instruções EWVM (Instrucoes), ou None se a compilação falhou
+        self.ast = ast
+        self.diagnosticos = diagnosticos
+        self.tempos = tempos  # {fase: segundos}, pela ordem em que as fases correram
+        self.saida = saida  # ficheiro escrito em streaming (o código não fica em memória)
+        self.da_cache = da_cache  # acerto da cache: nenhuma fase correu
+
+    @property
+    def sucesso(self):
+        return self.codigo is not None or self.saida is not None
+
+
+class Compilador:
+    def __init__(self, scanner='ply', otimizar=False, dobragem=True, rotacao=True, desativadas=(),
+                 cache=None, fundido=False, passos_desativados=(), fator_desenrolar=4,
+                 orcamento_desenrolar=1000, maximo_expansao=40, orcamento_expansao=1000):
+        self.scanner = scanner
+        self.otimizar = otimizar
+        # Análise semântica e geração numa só travessia, com uma só tabela de símbolos
+        # (fundido.py). A dobragem, a expansão e o desenrolamento precisam de uma AST já
+        # verificada, por isso não correm neste modo; o peephole e a rotação dos ciclos sim.
+        self.fundido = fundido
+        self.dobragem = dobragem and not fundido  # só com otimizar
+        self.rotacao = rotacao    # só com otimizar
+        # Desenrolamento dos for com limites constantes (só com otimizar): cópias do corpo por
+        # volta e nós que a AST pode crescer
+        if fator_desenrolar < 1 or orcamento_desenrolar < 0:
+            raise ValueError("o fator de desenrolamento tem de ser pelo menos 1 e o orçamento não pode ser negativo")
+        self.fator_desenrolar = fator_desenrolar
+        self.orcamento_desenrolar = orcamento_desenrolar
+        # Expansão das chamadas a subprogramas pequenos (idem): nós do maior corpo expandido
+        # (0 desativa) e nós que a AST pode crescer
+        if maximo_expansao < 0 or orcamento_expansao < 0:
+            raise ValueError("o tamanho máximo e o orçamento da expansão não podem ser negativos")
+        self.maximo_expansao = maximo_expansao
+        self.orcamento_expansao = orcamento_expansao
+        # Valida já as regras, para um nome errado falhar na construção e não a meio de um lote
+        self.otimizador = OtimizadorPeephole(desativadas=desativadas) if otimizar else None
+        self.passos = GestorPassos(desativados=passos_desativados) if otimizar else None
+        self.dobrador = None
+        self.desenrolador = None
+        self.expansor = None
+        self.cache = cache  # CacheCompilacao ou None
+        # Opções que mudam o código gerado (o scanner não muda), para a chave da cache
+        self.opcoes_codigo = (otimizar, fundido, otimizar and self.dobragem, otimizar and rotacao,
+                              tuple(sorted(desativadas)) if otimizar else (),
+                              tuple(sorted(passos_desativados)) if otimizar else (),
+                              (fator_desenrolar, orcamento_desenrolar) if otimizar else (),
+                              (maximo_expansao, orcamento_expansao) if otimizar else ())
+        self.diagnosticos = []
+        self.parser = criar_parser(self._diagnostico)
+
+    def _diagnostico(self, msg):
+        # O parser guarda uma referência a esta função; a lista muda a cada unidade
+        self.diagnosticos.append(msg)
+
+    def analisar(self, fonte):
+        """Análise léxica e sintática de uma unidade; devolve (ast, diagnosticos)"""
+        self.diagnosticos = []
+        lexer = criar_lexer(self.scanner, self.diagnosticos)
+        ast = self.parser.parse(fonte, lexer=lexer)
+        return ast, self.diagnosticos
+
+    def compilar(self, fonte):
+        """Compila uma unidade de código Pascal; devolve um ResultadoCompilacao
+
+        Com cache, um acerto devolve o resultado guardado sem correr nenhuma fase.
+        """
+        if self.cache is None:
+            return self._compilar(fonte)
+
+        inicio = time.perf_counter()
+        chave = self.cache.chave(fonte, self.opcoes_codigo)
+        entrada = self.cache.obter(chave)
+        if entrada is not None:
+            return ResultadoCompilacao(entrada['codigo'], entrada['ast'], entrada['diagnosticos'],
+                                       {'cache': time.perf_counter() - inicio}, da_cache=True)
+
+        resultado = self._compilar(fonte)
+        try:
+            self.cache.guardar(chave, {'codigo': resultado.codigo, 'ast': resultado.ast,
+                                       'diagnosticos': list(resultado.diagnosticos)})
+        except (OSError, RecursionError) as e:
+            # RecursionError: o pickle é recursivo e não guarda ASTs muito profundas
+            resultado.diagnosticos.append(f"Aviso: não foi possível guardar na cache: {e}")
+        return resultado
+
+    def compilar_para(self, fonte, nome_saida):
+        """Compila e escreve o .vm à medida que o código é gerado (streaming)
+
+        O resultado não traz o código (codigo é None e saida é o ficheiro). Com cache compila
+        como compilar() e escreve no fim, porque a cache guarda o código inteiro. Se a
+        compilação falhar, o ficheiro não fica escrito.
+        """
+        if self.cache is not None:
+            resultado = self.compilar(fonte)
+            if resultado.sucesso:
+                escrever_vm(resultado.codigo, nome_saida)
+            return resultado
+        return self._compilar(fonte, nome_saida)
+
+    def _destino(self, nome_saida, gerador):
+        """SaidaVM para o streaming do gerador (o peephole passa a correr a cada pedaço)"""
+        if nome_saida is None:
+            return None
+        otimizar = None
+        if self.otimizador:
+            # Um subprograma pode ser chamado de um pedaço que ainda não foi gerado
+            def otimizar(codigo, referidas):
+                return self._otimizar(codigo, preservar=referidas | set(gerador.funcoes))
+        return SaidaVM(nome_saida, otimizar)
+
+    def _otimizar(self, codigo, medir=None, preservar=()):
+        """Peephole, passos sobre o grafo de blocos e, se estes mudarem algo, peephole outra vez"""
+        codigo = self.otimizador.otimizar(codigo, preservar)
+        if medir:
+            medir('peephole')
+        codigo = self.passos.executar(codigo, preservar)
+        if medir:
+            medir('passos')
+        if self.passos.mudou:
+            codigo = self.otimizador.otimizar(codigo, preservar)
+            if medir:
+                medir('peephole_final')
+        return codigo
+
+    def _compilar(self, fonte, nome_saida=None):
+        tempos = {}
+        inicio = time.perf_counter()
+
+        def medir(fase):
+            nonlocal inicio
+            agora = time.perf_counter()
+            tempos[fase] = agora - inicio
+            inicio = agora
+
+        ast, diagnosticos = self.analisar(fonte)
+        medir('parsing')
+        if not ast:
+            return ResultadoCompilacao(None, ast, diagnosticos, tempos)
+
+        if self.fundido:
+            return self._compilar_fundido(ast, diagnosticos, tempos, medir, nome_saida)
+
+        analisador = AnalisadorSemantico()
+        analisador.visit(ast)
+        medir('semantica')
+        if analisador.erros:
+            return ResultadoCompilacao(None, ast, diagnosticos + analisador.erros, tempos)
+
+        if self.otimizar and self.dobragem:
+            self.dobrador = DobradorConstantes()
+            ast = self.dobrador.dobrar(ast)
+            medir('dobragem')
+        if self.otimizar:
+            self.expansor = ExpansorSubprogramas(self.maximo_expansao, self.orcamento_expansao)
+            ast = self.expansor.expandir(ast)
+            medir('expansao')
+            self.desenrolador = DesenroladorCiclos(self.fator_desenrolar,
+                                                   orcamento=self.orcamento_desenrolar,
+                                                   dobrador=self.dobrador,
+                                                   expandidas=self.expansor.funcoes > 0)
+            ast = self.desenrolador.desenrolar(ast)
+            medir('desenrolamento')
+
+        gerador = GeradorCodigo(rodar_ciclos=self.otimizar and self.rotacao)
+        destino = gerador.destino = self._destino(nome_saida, gerador)
+        try:
+            gerador.visit(ast)
+        except BaseException:
+            if destino is not None:
+                destino.descartar()
+            raise
+        if destino is not None:
+            destino.fechar()
+        diagnosticos.extend(gerador.avisos)
+        codigo = gerador.codigo
+        medir('geracao')
+        if destino is not None:
+            return ResultadoCompilacao(None, ast, diagnosticos, tempos, destino.nome)
+
+        if self.otimizador:
+            codigo = self._otimizar(codigo, medir)
+        return ResultadoCompilacao(codigo, ast, diagnosticos, tempos)
+
+    def _compilar_fundido(self, ast, diagnosticos, tempos, medir, nome_saida):
+        gerador = GeradorVerificado(rodar_ciclos=self.otimizar and self.rotacao)
+        destino = gerador.destino = self._destino(nome_saida, gerador)
+        try:
+            gerador.visit(ast)
+        except BaseException:
+            # O gerador conta com uma AST válida e pode falhar num erro que a verificação já
+            # registou; nesse caso a análise separada dá a lista completa de erros
+            if not gerador.erros:
+                if destino is not None:
+                    destino.descartar()
+                raise
+            analisador = AnalisadorSemantico()
+            analisador.visit(ast)
+            gerador.erros = analisador.erros
+        medir('semantica_geracao')
+        if gerador.erros:
+            if destino is not None:
+                destino.descartar()  # o código já escrito não serve
+            return ResultadoCompilacao(None, ast, diagnosticos + gerador.erros, tempos)
+
+        diagnosticos.extend(gerador.avisos)
+        if destino is not None:
+            destino.fechar()
+            return ResultadoCompilacao(None, ast, diagnosticos, tempos, destino.nome)
+        codigo = gerador.codigo
+        if self.otimizador:
+            codigo = self._otimizar(codigo, medir)
+        return ResultadoCompilacao(codigo, ast, diagnosticos, tempos)
+
+    def compilar_ficheiro(self, nome):
+        with open(nome, 'r') as f:
+            return self.compilar(f.read())
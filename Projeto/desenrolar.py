@@ -0,0 +1,307 @@
+from collections import Counter
+from arvore import (No, ArrayAccess, Assign, BeginEnd, Binop, Call, For, Read, Readln, Var, VarSection, While,
+                    de_tuplo, tabela_despacho, executar)
+
+# DESENROLAMENTO DE CICLOS FOR NA AST
+# Corre depois da dobragem de constantes (os limites de um for já são literais) e da
+# expansão de subprogramas, antes do GeradorCodigo. Um for com poucas voltas passa a cópias
+# do corpo, cada uma com i trocado pelo seu valor (e dobrada outra vez), sem incremento nem
+# teste: a[i] passa a um acesso direto. Com mais voltas, o corpo repete-se `fator` vezes dentro de um while com um só
+# teste no fim de cada volta (a cópia j lê i + j e i avança uma vez, ou i avança entre as
+# cópias se for muito lido fora dos índices de arrays), e as voltas que sobram da divisão
+# por `fator` vão à frente desenroladas como as de um ciclo pequeno (o número de voltas é
+# conhecido, por isso o resto não precisa de ciclo). No fim i fica com o valor que o ciclo
+# lhe deixaria.
+#
+# O custo mede-se em nós da AST, perto de uma instrução EWVM por nó: copiar o corpo k vezes
+# faz crescer o programa k - 1 vezes o tamanho do corpo. O orçamento limita o crescimento do
+# programa todo; os ciclos de dentro são vistos primeiro (são os que correm mais vezes) e um
+# for só se desenrola se já não tiver ciclos no corpo.
+
+
+def tamanho(node):
+    """Número de nós de uma subárvore (os literais numéricos contam como um nó)"""
+    n = 0
+    pilha = [node]
+    while pilha:
+        x = pilha.pop()
+        if isinstance(x, list):
+            pilha.extend(x)
+        elif isinstance(x, No):
+            n += 1
+            pilha.extend(v for v in x._valores(x) if isinstance(v, (No, list)))
+        elif isinstance(x, (bool, int, float)):
+            n += 1
+    return n
+
+
+def _analisar_corpo(corpo, var):
+    """(escreve, chama, ciclo): se o corpo atribui à variável var, se chama subprogramas e
+    se tem ciclos"""
+    escreve = chama = ciclo = False
+    pilha = [corpo]
+    while pilha:
+        x = pilha.pop()
+        if isinstance(x, list):
+            pilha.extend(x)
+            continue
+        if not isinstance(x, No):
+            continue
+        if isinstance(x, Assign) and isinstance(x.alvo, Var) and x.alvo.nome == var:
+            escreve = True
+        elif isinstance(x, For):
+            ciclo = True
+            escreve = escreve or x.variavel == var
+        elif isinstance(x, While):
+            ciclo = True
+        elif isinstance(x, (Read, Readln)) and any(isinstance(v, Var) and v.nome == var
+                                                   for v in x.itens):
+            escreve = True
+        elif isinstance(x, Call):
+            chama = True
+        pilha.extend(v for v in x._valores(x) if isinstance(v, (No, list)))
+    return escreve, chama, ciclo
+
+
+def _leituras_fora_de_indices(corpo, var):
+    """Leituras de var, sem contar as que são o índice de um array (i ou i ± c)"""
+    n = 0
+    pilha = [corpo]
+    while pilha:
+        x = pilha.pop()
+        if isinstance(x, list):
+            pilha.extend(x)
+            continue
+        if not isinstance(x, No):
+            continue
+        if isinstance(x, Var) and x.nome == var:
+            n += 1
+        elif isinstance(x, ArrayAccess):
+            indice = x.indice
+            if isinstance(indice, Binop) and indice.op in ('+', '-') and isinstance(indice.dir, int):
+                indice = indice.esq
+            if isinstance(indice, Var) and indice.nome == var:
+                continue
+        pilha.extend(v for v in x._valores(x) if isinstance(v, (No, list)))
+    return n
+
+
+def _trocar(var, valor):
+    """Passo para arvore.executar que copia uma subárvore com as leituras de var trocadas
+    por valor (o mesmo nó em todas as leituras: os nós não se alteram depois de criados)"""
+    def passo(x):
+        if isinstance(x, Var):
+            return valor if x.nome == var else x
+        if isinstance(x, list):
+            return lista(x)
+        if isinstance(x, No):
+            return no(x)
+        return x
+
+    def lista(x):
+        resultado = []
+        for item in x:
+            resultado.append((yield item))
+        return resultado
+
+    def no(x):
+        valores = []
+        for v in x._valores(x):
+            valores.append((yield v) if isinstance(v, (No, list)) else v)
+        return x.substituir(*valores)
+
+    return passo
+
+
+class DesenroladorCiclos:
+    def __init__(self, fator=4, maximo_completo=8, orcamento=1000, dobrador=None,
+                 expandidas=False):
+        """fator: cópias do corpo por volta num desenrolamento parcial (1 só desenrola os
+        ciclos inteiros); maximo_completo: voltas até às quais o ciclo sai todo; orcamento:
+        nós que o programa pode crescer; dobrador: DobradorConstantes para as cópias (com i
+        trocado por um literal há mais expressões constantes); expandidas: se há funções
+        expandidas nas expressões (nós Expandida, com ciclos lá dentro)"""
+        self.fator = fator
+        self.dobrador = dobrador
+        self.expandidas = expandidas
+        self.maximo_completo = maximo_completo
+        self.orcamento = orcamento
+        # 'completo', 'parcial', 'vazio' e 'orcamento' (os que não couberam no orçamento)
+        self.desenrolados = Counter()
+        self.crescimento = 0
+        self.locais = frozenset()  # variáveis na frame do subprograma atual
+        self.despacho = tabela_despacho(type(self), 'desenrolar_')
+
+    def desenrolar(self, node):
+        return executar(self.passo, node)
+
+    # Como na dobragem, os métodos que descem nos filhos são geradores (`novo = yield filho`)
+    def passo(self, node):
+        metodo = self.despacho.get(node.__class__)
+        if metodo is not None:
+            return metodo(self, node)
+        if isinstance(node, list):
+            return self.desenrolar_lista(node)
+        if isinstance(node, tuple):
+            return self.passo(de_tuplo(node))
+        if self.expandidas and isinstance(node, No):
+            return self.desenrolar_filhos(node)
+        return node  # expressões e instruções sem instruções lá dentro
+
+    def desenrolar_lista(self, node):
+        resultado = []
+        for item in node:
+            resultado.append((yield item))
+        return resultado
+
+    def desenrolar_filhos(self, node):
+        """Os nós sem método próprio: percorre os filhos e só copia o nó se algum mudou"""
+        valores = []
+        mudou = False
+        for v in node._valores(node):
+            if isinstance(v, (No, list)):
+                novo = yield v
+                mudou = mudou or novo is not v
+                v = novo
+            valores.append(v)
+        return node.substituir(*valores) if mudou else node
+
+    # ESTRUTURA
+
+    def desenrolar_gramatica(self, node):
+        return node.substituir((yield node.programa))
+
+    def desenrolar_programa(self, node):
+        cabecalho = yield node.cabecalho
+        corpo = yield node.corpo
+        return node.substituir(cabecalho, corpo)
+
+    def desenrolar_cabecalho(self, node):
+        return node.substituir(node.titulo, (yield node.subprogramas), node.variaveis)
+
+    def desenrolar_procedure(self, node):
+        # As variáveis de um procedimento são globais; só os parâmetros estão na frame
+        anteriores = self.locais
+        self.locais = frozenset(nome for p in node.parametros or () for nome in p.nomes)
+        bloco = yield node.bloco
+        self.locais = anteriores
+        return node.substituir(node.nome, node.parametros, bloco)
+
+    def desenrolar_function(self, node):
+        anteriores = self.locais
+        locais = {nome for p in node.parametros or () for nome in p.nomes}
+        declaracoes = node.bloco.declaracoes
+        if isinstance(declaracoes, VarSection):
+            locais.update(nome for d in declaracoes.declaracoes for nome in d.nomes)
+        self.locais = frozenset(locais)
+        bloco = yield node.bloco
+        self.locais = anteriores
+        return node.substituir(node.nome, node.parametros, node.tipo, bloco)
+
+    def desenrolar_bloco(self, node):
+        return node.substituir(node.declaracoes, (yield node.corpo))
+
+    # INSTRUÇÕES
+
+    def desenrolar_begin_end(self, node):
+        return node.substituir((yield node.instrucoes))
+
+    def desenrolar_if(self, node):
+        entao = yield node.entao
+        senao = yield node.senao
+        return node.substituir(node.condicao, entao, senao)
+
+    def desenrolar_expandida(self, node):
+        # Corpo de uma função expandida no sítio da chamada (ver expandir.py)
+        return node.substituir((yield node.instrucoes), node.resultado)
+
+    def desenrolar_while(self, node):
+        return node.substituir(node.condicao, (yield node.corpo))
+
+    def desenrolar_for(self, node):
+        corpo = yield node.corpo
+        novo = node.substituir(node.variavel, node.inicio, node.fim, node.direcao, corpo)
+        inicio, fim, var = node.inicio, node.fim, node.variavel
+        if not all(isinstance(v, int) and not isinstance(v, bool) for v in (inicio, fim)):
+            return novo
+        passo = 1 if node.direcao == 'to' else -1
+        voltas = (fim - inicio) * passo + 1
+        if voltas <= 0:
+            self.desenrolados['vazio'] += 1
+            return self.atribuir(node, var, inicio)  # o valor que o ciclo deixaria
+        escreve, chama, ciclo = _analisar_corpo(corpo, var)
+        # Um subprograma pode ler ou mudar uma variável de controlo que não é da frame. Só se
+        # desenrolam os ciclos mais interiores: copiar um ciclo de dentro faz crescer o código
+        # muito e só poupa o controlo do de fora
+        global_lida = chama and var not in self.locais
+        if escreve or global_lida or ciclo:
+            return novo
+
+        if voltas <= self.maximo_completo:
+            copias, por_volta = voltas, 0
+        elif self.fator > 1:
+            copias, por_volta = voltas % self.fator + self.fator, self.fator
+        else:
+            return novo
+        crescimento = (copias - 1) * tamanho(corpo)
+        if crescimento > self.orcamento:
+            self.desenrolados['orcamento'] += 1
+            return novo
+        self.orcamento -= crescimento
+        self.crescimento += crescimento
+
+        # As voltas desenroladas leem o valor de i como literal
+        instrucoes = []
+        resto = voltas % por_volta if por_volta else voltas
+        for k in range(resto):
+            instrucoes.append(self.copiar(corpo, var, inicio + k * passo))
+        instrucoes.append(self.atribuir(node, var, inicio + resto * passo))
+        if not por_volta:
+            self.desenrolados['completo'] += 1
+            return BeginEnd(instrucoes, linha=node.linha, coluna=node.coluna)
+
+        # As cópias dentro do while leem i + j e i avança uma vez por volta, se as leituras
+        # de i fora dos índices de arrays (cada + j custa duas instruções) não custarem mais
+        # do que os i := i + 1 que se poupam; senão i avança entre as cópias
+        self.desenrolados['parcial'] += 1
+        repetido = []
+        if _leituras_fora_de_indices(corpo, var) <= 1:
+            for j in range(por_volta):
+                repetido.append(self.copiar(corpo, var, self.somar(node, var, j * passo)))
+            repetido.append(self.atribuir(node, var, self.somar(node, var, por_volta * passo)))
+        else:
+            avancar = self.atribuir(node, var, self.somar(node, var, passo))
+            for _ in range(por_volta):
+                repetido += [corpo, avancar]
+        condicao = Binop('<=' if passo > 0 else '>=', self.ler(node, var), fim,
+                         linha=node.linha, coluna=node.coluna)
+        condicao.tipo = 'BOOLEAN'
+        instrucoes.append(While(condicao, BeginEnd(repetido, linha=node.linha, coluna=node.coluna),
+                                linha=node.linha, coluna=node.coluna))
+        return BeginEnd(instrucoes, linha=node.linha, coluna=node.coluna)
+
+    def copiar(self, corpo, var, valor):
+        """Cópia do corpo com as leituras de var trocadas por valor (um literal ou i + j),
+        dobrada outra vez se houver dobrador"""
+        copia = executar(_trocar(var, valor), corpo)
+        if self.dobrador is not None:
+            copia = self.dobrador.dobrar(copia)
+        return copia
+
+    # Nós novos, com a posição do for
+
+    def ler(self, node, var):
+        v = Var(var, linha=node.linha, coluna=node.coluna)
+        v.tipo = 'INTEGER'
+        return v
+
+    def somar(self, node, var, k):
+        if k == 0:
+            return self.ler(node, var)
+        soma = Binop('+' if k > 0 else '-', self.ler(node, var), abs(k),
+                     linha=node.linha, coluna=node.coluna)
+        soma.tipo = 'INTEGER'
+        return soma
+
+    def atribuir(self, node, var, valor):
+        return Assign(self.ler(node, var), valor, linha=node.linha, coluna=node.coluna)
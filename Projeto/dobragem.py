@@ -0,0 +1,215 @@
+from collections import Counter
+from arvore import Char, de_tuplo, tabela_despacho, executar
+
+# DOBRAGEM DE CONSTANTES NA AST
+# Corre depois do AnalisadorSemantico e antes do GeradorCodigo. As expressões cujos
+# operandos são todos literais são calculadas em tempo de compilação como o código que o
+# gerador emitiria as calcularia: div/mod truncam para zero e '/' é a divisão real (ITOF
+# nos operandos inteiros e FDIV). Os literais de um só caracter passam a nós Char (código),
+# para o gerador emitir PUSHI em vez de PUSHS + CHRCODE.
+
+OPS_ARITMETICOS = ('+', '-', '*')
+OPS_RELACIONAIS = ('=', '<>', '!=', '<', '<=', '>', '>=')
+
+
+def _numero(v):
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+def _literal(v):
+    return isinstance(v, (bool, int, float, str))
+
+
+def _div_pascal(a, b):
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+
+def _valor_comparavel(v):
+    """Os nós Char comparam-se como o respetivo caracter"""
+    if isinstance(v, Char):
+        return chr(v.codigo)
+    return v
+
+
+def _constante(v):
+    return _literal(v) or isinstance(v, Char)
+
+
+class DobradorConstantes:
+    def __init__(self):
+        self.dobragens = Counter()
+        self.despacho = tabela_despacho(type(self), 'dobrar_')
+
+    def dobrar(self, node):
+        return executar(self.passo, node)
+
+    # Os métodos que dobram filhos são geradores: `novo = yield filho` (ver arvore.executar)
+    def passo(self, node):
+        metodo = self.despacho.get(node.__class__)
+        if metodo is not None:
+            return metodo(self, node)
+        if node is None:
+            return None
+        if isinstance(node, list):
+            return self.dobrar_lista(node)
+        if isinstance(node, tuple):
+            return self.passo(de_tuplo(node))
+        return node
+
+    def dobrar_lista(self, node):
+        resultado = []
+        for item in node:
+            novo = yield item
+            if novo is not None or item is None:
+                resultado.append(novo)
+        return resultado
+
+    def expressao(self, node):
+        """O que dobrar no lugar de uma expressão: os literais str de um caracter passam a
+        Char(código), que já não muda; o resto fica igual"""
+        if isinstance(node, str) and len(node) == 1:
+            self.dobragens['char'] += 1
+            return Char(ord(node))
+        return node
+
+    def expressoes(self, nodes):
+        resultado = []
+        for e in nodes:
+            resultado.append((yield self.expressao(e)))
+        return resultado
+
+    # ESTRUTURA
+    # Os nós são reconstruídos com substituir(), que mantém a linha e a coluna do original
+
+    def dobrar_gramatica(self, node):
+        return node.substituir((yield node.programa))
+
+    def dobrar_programa(self, node):
+        cabecalho = yield node.cabecalho
+        corpo = yield node.corpo
+        return node.substituir(cabecalho, corpo)
+
+    def dobrar_cabecalho(self, node):
+        return node.substituir(node.titulo, (yield node.subprogramas), node.variaveis)
+
+    def dobrar_procedure(self, node):
+        return node.substituir(node.nome, node.parametros, (yield node.bloco))
+
+    def dobrar_function(self, node):
+        return node.substituir(node.nome, node.parametros, node.tipo, (yield node.bloco))
+
+    def dobrar_bloco(self, node):
+        return node.substituir(node.declaracoes, (yield node.corpo))
+
+    # INSTRUÇÕES
+
+    def dobrar_begin_end(self, node):
+        return node.substituir((yield node.instrucoes))
+
+    def dobrar_assign(self, node):
+        alvo = yield node.alvo
+        expressao = yield self.expressao(node.expressao)
+        return node.substituir(alvo, expressao)
+
+    def dobrar_if(self, node):
+        cond = yield self.expressao(node.condicao)
+        stmt_then = yield node.entao
+        stmt_else = yield node.senao
+        if isinstance(cond, bool):
+            self.dobragens['if'] += 1
+            return stmt_then if cond else stmt_else
+        return node.substituir(cond, stmt_then, stmt_else)
+
+    def dobrar_while(self, node):
+        cond = yield self.expressao(node.condicao)
+        if cond is False:
+            self.dobragens['while'] += 1
+            return None
+        return node.substituir(cond, (yield node.corpo))
+
+    def dobrar_for(self, node):
+        inicio = yield self.expressao(node.inicio)
+        fim = yield self.expressao(node.fim)
+        corpo = yield node.corpo
+        return node.substituir(node.variavel, inicio, fim, node.direcao, corpo)
+
+    def dobrar_call(self, node):
+        return node.substituir(node.nome, (yield self.expressoes(node.argumentos)))
+
+    def dobrar_writeln(self, node):
+        return node.substituir((yield self.expressoes(node.itens)))
+
+    dobrar_write = dobrar_writeln
+
+    def dobrar_readln(self, node):
+        itens = []
+        for v in node.itens:
+            itens.append((yield v))
+        return node.substituir(itens)
+
+    dobrar_read = dobrar_readln
+
+    # EXPRESSÕES
+
+    def dobrar_array_access(self, node):
+        return node.substituir(node.nome, (yield self.expressao(node.indice)))
+
+    def dobrar_unop(self, node):
+        op = node.op
+        e = yield self.expressao(node.operando)
+        if op == 'not' and isinstance(e, bool):
+            self.dobragens['unop'] += 1
+            return not e
+        if op in ('-', '+') and _numero(e):
+            self.dobragens['unop'] += 1
+            return -e if op == '-' else e
+        return node.substituir(op, e)
+
+    def dobrar_binop(self, node):
+        op = node.op
+        l = yield self.expressao(node.esq)
+        r = yield self.expressao(node.dir)
+        if _constante(l) and _constante(r):
+            valor = self.calcular(op, l, r)
+            if valor is not None:
+                self.dobragens['binop'] += 1
+                return valor
+        return node.substituir(op, l, r)
+
+    def calcular(self, op, l, r):
+        """Valor de 'l op r' para dois literais, ou None se não for seguro dobrar"""
+        if op in OPS_ARITMETICOS and _numero(l) and _numero(r):
+            if op == '+':
+                return l + r
+            if op == '-':
+                return l - r
+            return l * r
+        if op == '/' and _numero(l) and _numero(r) and r != 0:
+            return l / r
+        if op in ('div', 'mod') and isinstance(l, int) and isinstance(r, int) \
+                and not isinstance(l, bool) and not isinstance(r, bool) and r != 0:
+            q = _div_pascal(l, r)
+            return q if op == 'div' else l - r * q
+        if op in ('and', 'or') and isinstance(l, bool) and isinstance(r, bool):
+            return (l and r) if op == 'and' else (l or r)
+        if op in OPS_RELACIONAIS:
+            a = _valor_comparavel(l)
+            b = _valor_comparavel(r)
+            if isinstance(a, bool) or isinstance(b, bool):
+                if not (isinstance(a, bool) and isinstance(b, bool)) or op not in ('=', '<>', '!='):
+                    return None
+            elif not ((_numero(a) and _numero(b)) or (isinstance(a, str) and isinstance(b, str))):
+                return None
+            if op == '=':
+                return a == b
+            if op in ('<>', '!='):
+                return a != b
+            if op == '<':
+                return a < b
+            if op == '<=':
+                return a <= b
+            if op == '>':
+                return a > b
+            return a >= b
+        return None
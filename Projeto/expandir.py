@@ -0,0 +1,427 @@
+from collections import Counter
+from arvore import (No, ArrayAccess, Assign, BeginEnd, Call, Char, Expandida, For, Read, Readln,
+                    Var, VarDecl, VarSection, de_tuplo, tabela_despacho, executar)
+from desenrolar import tamanho
+
+# EXPANSÃO DE SUBPROGRAMAS NO SÍTIO DA CHAMADA (INLINING)
+# Corre depois da dobragem de constantes e antes do desenrolamento de ciclos. Uma chamada a
+# um subprograma pequeno passa a uma cópia do corpo: os parâmetros e as variáveis locais
+# (e o resultado de uma função) ganham nomes novos, declarados na frame de quem chama
+# (variáveis da função, ou globais no programa principal e nos procedimentos), e a cópia
+# começa por guardar neles os argumentos e zeros, como o CALL e o PUSHN fariam (menos os
+# zeros que o corpo escreve antes de ler, e os parâmetros que o corpo não muda e cujo
+# argumento é um literal ou uma variável que não muda até ao fim da cópia: as leituras
+# passam a ler o argumento). Uma função que é só `f := expressão` expande para a expressão,
+# com os parâmetros trocados. Poupa-se o PUSHI 0 do resultado, PUSHA, CALL, RETURN, o POP
+# dos argumentos e o PUSHN da frame, e os passos sobre blocos passam a ver o corpo (um CALL
+# é uma barreira para eles).
+#
+# Um procedimento expande para um begin ... end; uma função para um nó Expandida, que o
+# gerador traduz para as instruções seguidas do valor do resultado no mesmo sítio da
+# expressão: a ordem de avaliação e o curto-circuito ficam como na chamada.
+#
+# Só se expandem subprogramas sem recursão, com parâmetros e variáveis escalares e sem
+# read/readln (o gerador lê sempre para variáveis globais). As variáveis declaradas num
+# procedimento são globais e ficam com o mesmo nome. Os nomes que o corpo lê de fora não
+# podem estar tapados por um parâmetro ou variável local de quem chama.
+#
+# Custo: uma chamada ocupa os argumentos e CUSTO_CHAMADA instruções em quem chama e a
+# cópia ocupa o seu tamanho em nós (como em desenrolar.py). Expande-se quando o corpo não
+# passa de `maximo` nós e a cópia não faz crescer o programa, ou então quando a chamada
+# está num ciclo ou dentro de um subprograma (código que corre muitas vezes); o crescimento
+# total fica limitado pelo orçamento.
+
+CUSTO_CHAMADA = 4  # PUSHI 0, PUSHA, CALL e POP, além dos argumentos
+
+
+class Modelo:
+    """Um subprograma que se pode expandir"""
+
+    def __init__(self, node, parametros, locais, resultado, corpo, de_fora, chama):
+        self.node = node
+        self.parametros = parametros  # [(nome, tipo)]
+        self.locais = locais          # [(nome, tipo)] (vazio num procedimento)
+        self.resultado = resultado    # tipo do resultado (None num procedimento)
+        self.corpo = corpo
+        self.de_fora = de_fora        # nomes que o corpo lê ou escreve fora da sua frame
+        self.chama = chama            # se o corpo chama subprogramas
+        self.tamanho = tamanho(corpo)
+        instrucoes = corpo.instrucoes if isinstance(corpo, BeginEnd) else [corpo]
+        self.escritos, self.so_nomes = _escritos(corpo)
+        # Resultado e variáveis locais que o corpo atribui antes de ler (dispensam o zero)
+        self.iniciadas = _atribuidas_antes(instrucoes, {nome for nome, _ in locais} | {node.nome})
+        # Uma função que é só `f := expressão` expande para a expressão
+        self.expressao = None
+        if (resultado is not None and len(instrucoes) == 1 and isinstance(instrucoes[0], Assign)
+                and isinstance(instrucoes[0].alvo, Var) and instrucoes[0].alvo.nome == node.nome):
+            self.expressao = instrucoes[0].expressao
+
+
+def _nomes(corpo):
+    """(nomes de variáveis usados no corpo, chamadas, se tem read/readln)"""
+    nomes, chamadas, le = set(), set(), False
+    pilha = [corpo]
+    while pilha:
+        x = pilha.pop()
+        if isinstance(x, list):
+            pilha.extend(x)
+            continue
+        if not isinstance(x, No):
+            continue
+        if isinstance(x, (Var, ArrayAccess)):
+            nomes.add(x.nome)
+        elif isinstance(x, For):
+            nomes.add(x.variavel)
+        elif isinstance(x, Call):
+            chamadas.add(x.nome)
+        elif isinstance(x, (Read, Readln)):
+            le = True
+        pilha.extend(v for v in x._valores(x) if isinstance(v, (No, list)))
+    return nomes, chamadas, le
+
+
+def _escritos(corpo):
+    """(variáveis atribuídas no corpo, variáveis usadas só pelo nome: strings indexadas e
+    variáveis de controlo de for, que não se podem trocar por um valor)"""
+    escritos, so_nomes = set(), set()
+    pilha = [corpo]
+    while pilha:
+        x = pilha.pop()
+        if isinstance(x, list):
+            pilha.extend(x)
+            continue
+        if not isinstance(x, No):
+            continue
+        if isinstance(x, Assign) and isinstance(x.alvo, Var):
+            escritos.add(x.alvo.nome)
+        elif isinstance(x, For):
+            escritos.add(x.variavel)
+            so_nomes.add(x.variavel)
+        elif isinstance(x, ArrayAccess):
+            so_nomes.add(x.nome)
+        pilha.extend(v for v in x._valores(x) if isinstance(v, (No, list)))
+    return escritos, so_nomes
+
+
+def _atribuidas_antes(instrucoes, nomes):
+    """Os nomes a que as instruções de topo do corpo atribuem antes de qualquer leitura"""
+    atribuidas, lidas = set(), set()
+    for instrucao in instrucoes:
+        if isinstance(instrucao, Assign) and isinstance(instrucao.alvo, Var):
+            lidas |= _nomes(instrucao.expressao)[0] - atribuidas
+            if instrucao.alvo.nome in nomes and instrucao.alvo.nome not in lidas:
+                atribuidas.add(instrucao.alvo.nome)
+        else:
+            lidas |= _nomes(instrucao)[0] - atribuidas
+    return atribuidas
+
+
+def _tem_expandidas(node):
+    pilha = [node]
+    while pilha:
+        x = pilha.pop()
+        if isinstance(x, Expandida):
+            return True
+        if isinstance(x, list):
+            pilha.extend(x)
+        elif isinstance(x, No):
+            pilha.extend(v for v in x._valores(x) if isinstance(v, (No, list)))
+    return False
+
+
+def _categoria(v):
+    """Categoria de um argumento ('INTEGER', 'REAL', ...), ou None se não é um literal nem
+    uma variável"""
+    if isinstance(v, bool):
+        return 'BOOLEAN'
+    if isinstance(v, int):
+        return 'INTEGER'
+    if isinstance(v, float):
+        return 'REAL'
+    if isinstance(v, (Char, Var)):
+        return v.tipo
+    return None
+
+
+def _escalares(declaracoes):
+    """[(nome, tipo)] das declarações, ou None se alguma é de um array"""
+    resultado = []
+    for d in declaracoes:
+        if not isinstance(d.tipo, str):
+            return None
+        resultado.extend((nome, d.tipo) for nome in d.nomes)
+    return resultado
+
+
+def _renomear(nomes, valores):
+    """Passo para arvore.executar que copia uma subárvore com as variáveis de nomes
+    ({antigo: novo}) renomeadas e as leituras das de valores ({nome: nó}) trocadas pelo nó"""
+    def passo(x):
+        if isinstance(x, Var) and x.nome in valores:
+            return valores[x.nome]
+        if isinstance(x, list):
+            return lista(x)
+        if isinstance(x, No):
+            return no(x)
+        return x
+
+    def lista(x):
+        resultado = []
+        for item in x:
+            resultado.append((yield item))
+        return resultado
+
+    def no(x):
+        novos = []
+        for campo, v in zip(x.campos, x._valores(x)):
+            if isinstance(v, (No, list)):
+                v = yield v
+            elif campo in ('nome', 'variavel') and not isinstance(x, Call):
+                v = nomes.get(v, v)
+            novos.append(v)
+        return x.substituir(*novos)
+
+    return passo
+
+
+class ExpansorSubprogramas:
+    def __init__(self, maximo=40, orcamento=1000):
+        """maximo: nós do corpo de um subprograma que ainda se expande (0 não expande nada);
+        orcamento: nós que o programa pode crescer"""
+        self.maximo = maximo
+        self.orcamento = orcamento
+        self.modelos = {}  # {nome: Modelo}
+        self.expandidas = Counter()  # chamadas expandidas, por subprograma
+        self.funcoes = 0  # quantas deram nós Expandida (funções, nas expressões)
+        self.crescimento = 0
+        self.contador = 0
+        # Subprograma que se está a percorrer: nomes que tapam os globais (parâmetros,
+        # variáveis locais e o nome da função), declarações novas e profundidade de ciclos
+        self.tapados = frozenset()
+        self.novas = []
+        self.ciclos = 0
+        self.em_subprograma = False
+        self.despacho = tabela_despacho(type(self), 'expandir_')
+
+    def expandir(self, node):
+        return executar(self.passo, node)
+
+    # Como na dobragem, os métodos que descem nos filhos são geradores (`novo = yield filho`)
+    def passo(self, node):
+        metodo = self.despacho.get(node.__class__)
+        if metodo is not None:
+            return metodo(self, node)
+        if isinstance(node, list):
+            return self.expandir_lista(node)
+        if isinstance(node, tuple):
+            return self.passo(de_tuplo(node))
+        if isinstance(node, No):
+            return self.expandir_filhos(node)
+        return node
+
+    def expandir_lista(self, node):
+        resultado = []
+        mudou = False
+        for item in node:
+            novo = yield item
+            mudou = mudou or novo is not item
+            resultado.append(novo)
+        return resultado if mudou else node
+
+    def expandir_filhos(self, node):
+        """Os nós sem método próprio: percorre os filhos e só copia o nó se algum mudou"""
+        valores = []
+        mudou = False
+        for v in node._valores(node):
+            if isinstance(v, (No, list)):
+                novo = yield v
+                mudou = mudou or novo is not v
+                v = novo
+            valores.append(v)
+        return node.substituir(*valores) if mudou else node
+
+    # ESTRUTURA
+
+    def expandir_programa(self, node):
+        cabecalho = yield node.cabecalho
+        if not self.modelos:
+            return node.substituir(cabecalho, node.corpo)
+        self.novas = []
+        corpo = yield node.corpo
+        if self.novas:
+            variaveis = cabecalho.variaveis
+            declaracoes = (variaveis.declaracoes if variaveis else []) + self.novas
+            cabecalho = cabecalho.substituir(cabecalho.titulo, cabecalho.subprogramas,
+                                             VarSection(declaracoes, linha=cabecalho.linha,
+                                                        coluna=cabecalho.coluna))
+        return node.substituir(cabecalho, corpo)
+
+    def expandir_cabecalho(self, node):
+        subprogramas = node.subprogramas
+        if self.maximo > 0 and subprogramas:
+            subprogramas = yield subprogramas
+        return node.substituir(node.titulo, subprogramas, node.variaveis)
+
+    def expandir_procedure(self, node):
+        parametros = _escalares(node.parametros or [])
+        bloco = yield self.subprograma(node, [])
+        novo = node.substituir(node.nome, node.parametros, bloco)
+        if parametros is not None:
+            self.registar(novo, parametros, [], None)
+        return novo
+
+    def expandir_function(self, node):
+        parametros = _escalares(node.parametros or [])
+        declaracoes = node.bloco.declaracoes.declaracoes if node.bloco.declaracoes else []
+        locais = _escalares(declaracoes)
+        bloco = yield self.subprograma(node, [nome for d in declaracoes for nome in d.nomes])
+        novo = node.substituir(node.nome, node.parametros, node.tipo, bloco)
+        if parametros is not None and locais is not None and isinstance(node.tipo, str):
+            # As declarações novas deste corpo também são locais
+            declaracoes = bloco.declaracoes
+            self.registar(novo, parametros, _escalares(declaracoes.declaracoes if declaracoes else []),
+                          node.tipo)
+        return novo
+
+    def subprograma(self, node, locais):
+        """Percorre o bloco de um subprograma e junta-lhe as declarações novas"""
+        anterior = (self.tapados, self.novas, self.ciclos, self.em_subprograma)
+        self.tapados = frozenset([nome for p in node.parametros or () for nome in p.nomes]
+                                 + locais + [node.nome])
+        self.novas = []
+        self.ciclos = 0
+        self.em_subprograma = True
+        bloco = node.bloco
+        corpo = yield bloco.corpo
+        if self.novas:
+            declaracoes = (bloco.declaracoes.declaracoes if bloco.declaracoes else []) + self.novas
+            bloco = bloco.substituir(VarSection(declaracoes, linha=bloco.linha, coluna=bloco.coluna),
+                                     corpo)
+        elif corpo is not bloco.corpo:
+            bloco = bloco.substituir(bloco.declaracoes, corpo)
+        self.tapados, self.novas, self.ciclos, self.em_subprograma = anterior
+        return bloco
+
+    def registar(self, node, parametros, locais, resultado):
+        corpo = node.bloco.corpo
+        nomes, chamadas, le = _nomes(corpo)
+        # Ler o nome da função seria uma chamada recursiva
+        if le or node.nome in chamadas or (resultado is not None and _le_resultado(corpo, node.nome)):
+            return
+        frame = {nome for nome, _ in parametros} | {nome for nome, _ in locais}
+        modelo = Modelo(node, parametros, locais, resultado, corpo, nomes - frame - {node.nome},
+                        bool(chamadas))
+        if modelo.tamanho <= self.maximo:
+            self.modelos[node.nome] = modelo
+
+    # INSTRUÇÕES
+
+    def expandir_while(self, node):
+        self.ciclos += 1
+        novo = yield self.expandir_filhos(node)
+        self.ciclos -= 1
+        return novo
+
+    expandir_for = expandir_while
+
+    def expandir_call(self, node):
+        argumentos = yield node.argumentos
+        novo = node.substituir(node.nome, argumentos) if argumentos is not node.argumentos else node
+        modelo = self.modelos.get(node.nome)
+        if modelo is None or modelo.de_fora & self.tapados:
+            return novo
+        if len(argumentos) != len(modelo.parametros):
+            return novo
+        instrucoes, resultado, renomeados = self.copiar(modelo, novo)
+        crescimento = tamanho(instrucoes) + tamanho(resultado) - tamanho(novo) - CUSTO_CHAMADA
+        quente = self.ciclos > 0 or self.em_subprograma
+        if crescimento > 0 and not quente:
+            return novo
+        if crescimento > self.orcamento:
+            self.expandidas['orcamento'] += 1
+            return novo
+        self.orcamento -= max(crescimento, 0)
+        self.crescimento += crescimento
+        self.expandidas[node.nome] += 1
+        for nome, tipo in renomeados:
+            self.novas.append(VarDecl([nome], tipo, linha=node.linha, coluna=node.coluna))
+        if resultado is None:
+            return BeginEnd(instrucoes, linha=node.linha, coluna=node.coluna)
+        if not instrucoes:
+            return resultado
+        self.funcoes += 1
+        expandida = Expandida(instrucoes, resultado, linha=node.linha, coluna=node.coluna)
+        expandida.tipo = node.tipo
+        return expandida
+
+    def copiar(self, modelo, chamada):
+        """(instruções, expressão do resultado ou None, [(nome novo, tipo)]) da cópia do
+        corpo para esta chamada"""
+        self.contador += 1
+        argumentos = chamada.argumentos
+        # Um parâmetro que o corpo não muda lê diretamente um argumento literal, ou uma
+        # variável que nada muda entre a chamada e o fim do corpo (o corpo não lhe atribui nem
+        # chama subprogramas, e os outros argumentos não têm chamadas)
+        sem_chamadas = not modelo.chama and not any(_nomes(a)[1] or _tem_expandidas(a)
+                                                    for a in argumentos)
+        nomes, valores = {}, {}
+        renomeados = []
+        instrucoes = []
+        for (nome, tipo), argumento in zip(modelo.parametros, argumentos):
+            # (a chamada não converte os argumentos, por isso só se o tipo for o do parâmetro)
+            if (nome not in modelo.escritos and nome not in modelo.so_nomes
+                    and _categoria(argumento) == str(tipo).upper()):
+                if not isinstance(argumento, Var) or (sem_chamadas
+                                                      and argumento.nome not in modelo.escritos):
+                    valores[nome] = argumento
+                    continue
+            nomes[nome] = f"{modelo.node.nome}.{nome}.{self.contador}"
+            renomeados.append((nomes[nome], tipo))
+            instrucoes.append(self.atribuir(chamada, nomes[nome], tipo, argumento))
+        if modelo.expressao is not None:
+            return instrucoes, executar(_renomear(nomes, valores), modelo.expressao), renomeados
+
+        # Os zeros do PUSHI 0 do resultado e do PUSHN das variáveis locais, se o corpo os
+        # puder ler, e o corpo
+        resultado = None
+        locais = list(modelo.locais)
+        if modelo.resultado is not None:
+            locais.append((modelo.node.nome, modelo.resultado))
+        for nome, tipo in locais:
+            nomes[nome] = f"{modelo.node.nome}.{nome}.{self.contador}"
+            renomeados.append((nomes[nome], tipo))
+            if nome not in modelo.iniciadas:
+                instrucoes.append(self.atribuir(chamada, nomes[nome], tipo, 0))
+        if modelo.resultado is not None:
+            resultado = self.ler(chamada, nomes[modelo.node.nome], chamada.tipo)
+        instrucoes.append(executar(_renomear(nomes, valores), modelo.corpo))
+        return instrucoes, resultado, renomeados
+
+    # Nós novos, com a posição da chamada
+
+    def ler(self, node, nome, tipo):
+        v = Var(nome, linha=node.linha, coluna=node.coluna)
+        v.tipo = str(tipo).upper() if tipo else None
+        return v
+
+    def atribuir(self, node, nome, tipo, valor):
+        return Assign(self.ler(node, nome, tipo), valor, linha=node.linha, coluna=node.coluna)
+
+
+def _le_resultado(corpo, nome):
+    """Se o corpo da função nome lê o próprio nome (fora das atribuições ao resultado)"""
+    pilha = [corpo]
+    while pilha:
+        x = pilha.pop()
+        if isinstance(x, list):
+            pilha.extend(x)
+            continue
+        if not isinstance(x, No):
+            continue
+        if isinstance(x, Assign) and isinstance(x.alvo, Var) and x.alvo.nome == nome:
+            pilha.append(x.expressao)
+            continue
+        if isinstance(x, (Var, ArrayAccess)) and x.nome == nome:
+            return True
+        pilha.extend(v for v in x._valores(x) if isinstance(v, (No, list)))
+    return False
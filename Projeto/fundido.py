@@ -0,0 +1,177 @@
+from types import GeneratorType
+
+from arvore import No, Expressao, Assign, If, While, For, Readln, Read, CLASSES, executar
+from semantica import AnalisadorSemantico
+from maquina import GeradorCodigo
+
+# ANÁLISE SEMÂNTICA E GERAÇÃO DE CÓDIGO NUMA SÓ TRAVESSIA
+# O GeradorVerificado percorre a AST uma vez: gera o código de cada nó e, quando o nó
+# termina, aplica-lhe a regra do AnalisadorSemantico. Os filhos já passaram pelas duas
+# coisas, por isso a regra lê o tipo registado neles (Expressao.tipo) em vez de descer na
+# árvore. As expressões que o gerador não visita (o alvo de uma atribuição, as condições
+# tratadas com saltos) são verificadas quando a regra do pai pede o seu tipo.
+#
+# Há uma só tabela de símbolos, a TabelaSimbolos do verificador. Cada declaração é
+# verificada uma vez, antes do corpo que a usa, e a entrada de cada variável recebe logo a
+# sua posição: 'local' = ('L', deslocamento ao fp) ou ('G', endereço). O gerador procura os
+# nomes nessa tabela (ver GeradorCodigo.localizar e seguintes) e não preenche as suas.
+#
+# A AST tem de vir do parser sem ter passado pela análise semântica. Se houver erros o
+# código deve ser descartado (o Compilador fá-lo).
+
+
+# Um dicionário de tipo por categoria, partilhado (as regras só leem 'categoria')
+TIPOS = {}
+
+
+class VerificadorFundido(AnalisadorSemantico):
+    """Regras do AnalisadorSemantico sem a descida na árvore (que é feita pelo gerador)"""
+
+    def passo(self, node):
+        if isinstance(node, Expressao):
+            tipo = node.tipo
+            if tipo is None:
+                # Ainda não verificada (o gerador não a visitou): verifica-se agora
+                return AnalisadorSemantico.passo(self, node)
+            return (TIPOS.get(tipo) or TIPOS.setdefault(tipo, {'categoria': tipo})) if tipo else None
+        if isinstance(node, (No, list)):
+            return None  # instruções já geradas e verificadas
+        return AnalisadorSemantico.passo(self, node)  # literais
+
+    def verificar(self, node, regra):
+        """Aplica a regra do nó (os filhos já estão verificados)"""
+        tipo = regra(self, node)
+        if type(tipo) is GeneratorType:
+            # A regra pede o tipo de cada filho com `yield filho`; só um filho que ainda não
+            # foi verificado precisa de uma travessia (a do motor de arvore.executar)
+            regra_filhos = tipo
+            tipo = None
+            try:
+                while True:
+                    filho = regra_filhos.send(tipo)
+                    if isinstance(filho, Expressao) and filho.tipo is None:
+                        tipo = executar(self.passo, filho, self.concluir)
+                    else:
+                        tipo = self.passo(filho)
+            except StopIteration as fim:
+                tipo = fim.value
+        self.concluir(node, tipo)
+
+
+# Nós verificados depois de gerados, com a regra a aplicar; os restantes não têm verificações
+# próprias (só as dos filhos) ou são verificados antes (declarações e subprogramas)
+VERIFICACOES = {classe: getattr(AnalisadorSemantico, 'visit_' + classe.etiqueta)
+                for classe in CLASSES.values()
+                if issubclass(classe, Expressao) or classe in (Assign, If, While, For, Readln, Read)}
+
+
+class GeradorVerificado(GeradorCodigo):
+    def __init__(self, **opcoes):
+        super().__init__(**opcoes)
+        self.verificador = VerificadorFundido()
+        self.erros = self.verificador.erros
+        self.tabela = self.verificador.tabela
+        self.funcoes = self.tabela.funcoes
+        # Endereço de cada nome global já reservado: as variáveis de um procedimento também
+        # são globais e, como em GeradorCodigo.obter_endereco, um nome fica sempre no mesmo
+        self.enderecos = {}
+
+    def visit(self, node):
+        return executar(self.passo, node, self.concluir)
+
+    def concluir(self, node, valor):
+        regra = VERIFICACOES.get(node.__class__)
+        if regra is None:
+            return
+        if isinstance(node, Expressao) and node.tipo is not None:
+            return  # gerada duas vezes (a condição de um ciclo rodado): já verificada
+        self.verificador.verificar(node, regra)
+
+    # NOMES: as entradas da tabela do verificador
+
+    def localizar(self, nome):
+        # O nome da função (o resultado) não tem posição: escreve-se pelo caso próprio de
+        # visit_assign e, lido, é procurado fora, como no GeradorCodigo
+        for escopo in reversed(self.tabela.escopos):
+            info = escopo.get(nome)
+            if info is not None and 'local' in info:
+                frame, posicao = info['local']
+                return frame, posicao, info['categoria']
+        return None
+
+    def entrada_global(self, nome):
+        """A entrada visível de nome com posição global (as da frame de uma função não contam)"""
+        for escopo in reversed(self.tabela.escopos):
+            local = escopo[nome].get('local') if nome in escopo else None
+            if local is not None and local[0] == 'G':
+                return escopo[nome]
+        return None
+
+    def localizar_global(self, nome):
+        info = self.entrada_global(nome)
+        if info is None:
+            return None
+        return info['local'][1], info['categoria']
+
+    def info_array(self, nome):
+        info = self.entrada_global(nome)
+        if info is None or info['categoria'] != 'ARRAY':
+            return None
+        return info['min_index'], info['tipo_base']
+
+    def subprograma(self, nome):
+        info = self.tabela.procurar_funcao(nome)
+        if info is None:
+            return None
+        return {'tipo': info['tipo_retorno'] or 'VOID', 'num_params': len(info['params'])}
+
+    def registar_subprograma(self, nome, tipo, num_params):
+        pass  # já declarado pelo verificador (entrar_subprograma)
+
+    # DECLARAÇÕES: verificadas uma vez, e cada entrada fica com a sua posição
+
+    def declarar_parametros(self, params_info):
+        escopo = self.tabela.escopos[-1]
+        for i, (pid, _) in enumerate(params_info):
+            escopo[pid]['local'] = ('L', -(len(params_info) - i))
+
+    def processar_declaracoes(self, var_section):
+        # Globais do programa e variáveis dos procedimentos
+        if not var_section:
+            return
+        self.verificador.visit_var_section(var_section)
+        escopo = self.tabela.escopos[-1]
+        for decl in var_section.declaracoes:
+            for nome in decl.nomes:
+                info = escopo[nome]
+                if nome not in self.enderecos:
+                    self.enderecos[nome] = self.endereco_atual
+                    if info['categoria'] == 'ARRAY':
+                        self.endereco_atual += info['max_index'] - info['min_index'] + 1
+                    else:
+                        self.endereco_atual += 1
+                info['local'] = ('G', self.enderecos[nome])
+
+    def processar_declaracoes_locais(self, var_section):
+        # Variáveis de uma função: na frame, a partir de fp[0]
+        self.verificador.visit_var_section(var_section)
+        escopo = self.tabela.escopos[-1]
+        for decl in var_section.declaracoes:
+            for nome in decl.nomes:
+                escopo[nome]['local'] = ('L', self.local_offset)
+                self.local_offset += 1
+
+    # SUBPROGRAMAS: o escopo fica aberto enquanto o corpo é gerado
+
+    def visit_function(self, node):
+        return self.gerar_subprograma(node, GeradorCodigo.visit_function)
+
+    def visit_procedure(self, node):
+        return self.gerar_subprograma(node, GeradorCodigo.visit_procedure)
+
+    def gerar_subprograma(self, node, gerar):
+        self.verificador.entrar_subprograma(node)
+        # Um subprograma repetido é um erro, mas o corpo é gerado (e verificado) na mesma
+        self.funcoes_processadas.discard(node.nome)
+        yield gerar(self, node)
+        self.verificador.sair_subprograma()
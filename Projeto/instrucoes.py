@@ -0,0 +1,284 @@
+import sys
+import struct
+from array import array
+
+# BUFFER DE INSTRUÇÕES EWVM
+# O GeradorCodigo guarda o código em dois arrays paralelos: o opcode de cada instrução (um
+# byte) e o seu operando (um inteiro de 64 bits). Os operandos que não são inteiros ficam
+# em tabelas e o array guarda o índice: as labels são internadas em `labels`, as strings de
+# PUSHS vão para `cadeias` (sem repetidos) e os reais de PUSHF para `reais`. As labels são
+# pseudo-instruções (opcode LABEL) que marcam a posição onde estão definidas.
+#
+# O texto .vm é só uma forma de escrever o buffer (escrever_vm em maquina.py). A outra é o
+# formato binário .vmb (escrever_vmb), já com as labels resolvidas para endereços, que o
+# interpretador carrega sem analisar texto.
+
+NOMES_OPCODES = (
+    'PUSHI', 'PUSHF', 'PUSHS', 'PUSHG', 'STOREG', 'PUSHL', 'STOREL',
+    'PUSHN', 'PUSHGP', 'PUSHFP', 'PUSHA', 'PADD', 'LOADN', 'STOREN', 'LOAD', 'STORE',
+    'POP', 'DUP', 'SWAP',
+    'ADD', 'SUB', 'MUL', 'DIV', 'MOD',
+    'FADD', 'FSUB', 'FMUL', 'FDIV', 'ITOF', 'FTOI',
+    'EQUAL', 'INF', 'INFEQ', 'SUP', 'SUPEQ', 'NOT', 'AND', 'OR',
+    'JUMP', 'JZ', 'CALL', 'RETURN', 'START', 'STOP', 'NOP',
+    'CHARAT', 'STRLEN', 'CHRCODE', 'ATOI', 'ATOF', 'READ',
+    'WRITEI', 'WRITEF', 'WRITES', 'WRITECHR', 'WRITELN',
+)
+
+OPCODES = {nome: i for i, nome in enumerate(NOMES_OPCODES)}
+
+# Pseudo-instrução do buffer (não existe na máquina): a definição de uma label
+LABEL = len(NOMES_OPCODES)
+OPCODES_BUFFER = dict(OPCODES, LABEL=LABEL)
+NOMES_BUFFER = NOMES_OPCODES + ('LABEL',)
+
+PUSHF = OPCODES['PUSHF']
+PUSHS = OPCODES['PUSHS']
+# Operandos que são nomes de labels
+OPS_LABEL = frozenset(OPCODES[nome] for nome in ('JUMP', 'JZ', 'PUSHA')) | {LABEL}
+# Instruções com operando (as restantes guardam 0 no array de operandos)
+OPS_COM_OPERANDO = OPS_LABEL | frozenset(OPCODES[nome] for nome in (
+    'PUSHI', 'PUSHF', 'PUSHS', 'PUSHG', 'STOREG', 'PUSHL', 'STOREL', 'PUSHN',
+    'LOAD', 'STORE', 'POP', 'DUP'))
+
+MAGIA_VMB = b'EWVMB\x01'
+
+
+class Instrucoes:
+    """Código EWVM em arrays de opcodes e operandos, com tabelas de labels e constantes"""
+
+    def __init__(self):
+        self.ops = array('B')
+        self.args = array('q')
+        self.labels = []        # nomes das labels (o operando é o índice)
+        self.indice_labels = {}
+        self.cadeias = []       # strings dos PUSHS
+        self.indice_cadeias = {}
+        self.reais = []         # reais dos PUSHF
+
+    def label(self, nome):
+        """Índice da label (interna o nome na primeira vez)"""
+        indice = self.indice_labels.get(nome)
+        if indice is None:
+            indice = self.indice_labels[nome] = len(self.labels)
+            self.labels.append(nome)
+        return indice
+
+    def cadeia(self, texto):
+        indice = self.indice_cadeias.get(texto)
+        if indice is None:
+            indice = self.indice_cadeias[texto] = len(self.cadeias)
+            self.cadeias.append(texto)
+        return indice
+
+    def codificar(self, op, arg):
+        """Valor do operando no array (índice numa tabela ou o próprio inteiro)"""
+        if arg is None:
+            return 0
+        if op in OPS_LABEL:
+            return self.label(arg)
+        if op == PUSHS:
+            return self.cadeia(arg)
+        if op == PUSHF:
+            self.reais.append(arg)
+            return len(self.reais) - 1
+        return arg
+
+    def emitir(self, op, arg=None):
+        op = OPCODES_BUFFER[op]
+        self.ops.append(op)
+        valor = self.codificar(op, arg)
+        try:
+            self.args.append(valor)
+        except OverflowError:
+            # Um inteiro que não cabe em 64 bits: os operandos passam a uma lista
+            self.args = list(self.args)
+            self.args.append(valor)
+
+    def alterar(self, pos, arg):
+        """Muda o operando da instrução na posição pos"""
+        valor = self.codificar(self.ops[pos], arg)
+        try:
+            self.args[pos] = valor
+        except OverflowError:
+            self.args = list(self.args)
+            self.args[pos] = valor
+
+    def remover(self, pos):
+        del self.ops[pos]
+        del self.args[pos]
+
+    def descodificar(self, op, valor):
+        """Operando original (nome da label, string, real, inteiro ou None)"""
+        if op not in OPS_COM_OPERANDO:
+            return None
+        if op in OPS_LABEL:
+            return self.labels[valor]
+        if op == PUSHS:
+            return self.cadeias[valor]
+        if op == PUSHF:
+            return self.reais[valor]
+        return valor
+
+    def __len__(self):
+        return len(self.ops)
+
+    def __iter__(self):
+        """Pares (nome da instrução, operando), com 'LABEL' para as labels"""
+        descodificar = self.descodificar
+        for op, valor in zip(self.ops, self.args):
+            yield NOMES_BUFFER[op], descodificar(op, valor)
+
+    def __eq__(self, outro):
+        if not isinstance(outro, Instrucoes):
+            return NotImplemented
+        return list(self) == list(outro)
+
+    def linhas(self):
+        """As instruções em texto, uma por linha (as labels como 'LABEL nome:')"""
+        for nome, arg in self:
+            if nome == 'LABEL':
+                yield f"LABEL {arg}:"
+            else:
+                yield formatar(nome, arg)
+
+    def resolver(self):
+        """(ops, args, labels) sem as pseudo-instruções LABEL e com as labels como endereços
+
+        Os operandos ficam com o seu valor (string, real ou inteiro). ValueError se uma label
+        estiver definida duas vezes ou não estiver definida.
+        """
+        enderecos = {}
+        n = 0
+        for op, valor in zip(self.ops, self.args):
+            if op == LABEL:
+                if valor in enderecos:
+                    raise ValueError(f"Label '{self.labels[valor]}' definida mais do que uma vez")
+                enderecos[valor] = n
+            else:
+                n += 1
+        ops = []
+        args = []
+        for op, valor in zip(self.ops, self.args):
+            if op == LABEL:
+                continue
+            if op in OPS_LABEL:
+                if valor not in enderecos:
+                    raise ValueError(f"Label '{self.labels[valor]}' não definida")
+                valor = enderecos[valor]
+            else:
+                valor = self.descodificar(op, valor)
+            ops.append(op)
+            args.append(valor)
+        labels = {self.labels[indice]: endereco for indice, endereco in enderecos.items()}
+        return ops, args, labels
+
+
+def formatar(nome, arg):
+    """Texto de uma instrução ('PUSHS' com o operando entre aspas)"""
+    if arg is None:
+        return nome
+    if nome == 'PUSHS':
+        return f'{nome} "{arg}"'
+    return f"{nome} {arg}"
+
+
+# FORMATO BINÁRIO .vmb (inteiros little-endian)
+#   magia 'EWVMB\x01'
+#   cabeçalho: nº de instruções, de strings, de reais e de labels (4 x uint32)
+#   opcodes: um byte por instrução
+#   operandos: um int64 por instrução (endereço, índice de string/real ou o inteiro)
+#   reais: um double por real
+#   strings e labels: uint32 com o tamanho seguido do texto em UTF-8 (as labels com o
+#   endereço a seguir, em uint32; só servem para diagnóstico e para o tradutor)
+
+def _little_endian(arr):
+    if sys.byteorder == 'big':
+        arr.byteswap()
+    return arr
+
+
+def _escrever_texto(f, texto):
+    dados = texto.encode('utf-8')
+    f.write(struct.pack('<I', len(dados)))
+    f.write(dados)
+
+
+def escrever_vmb(instrucoes, nome_saida):
+    """Escreve o buffer no formato binário, com as labels resolvidas"""
+    ops, args, labels = instrucoes.resolver()
+    cadeias = {}
+    reais = []
+    operandos = []
+    for op, arg in zip(ops, args):
+        if op == PUSHS:
+            arg = cadeias.setdefault(arg, len(cadeias))
+        elif op == PUSHF:
+            reais.append(arg)
+            arg = len(reais) - 1
+        elif arg is None:
+            arg = 0
+        operandos.append(arg)
+    try:
+        operandos = array('q', operandos)
+    except OverflowError:
+        raise ValueError("Um operando inteiro não cabe em 64 bits (formato .vmb)")
+    with open(nome_saida, 'wb') as f:
+        f.write(MAGIA_VMB)
+        f.write(struct.pack('<4I', len(ops), len(cadeias), len(reais), len(labels)))
+        f.write(bytes(ops))
+        f.write(_little_endian(operandos).tobytes())
+        f.write(_little_endian(array('d', reais)).tobytes())
+        for texto in cadeias:
+            _escrever_texto(f, texto)
+        for nome, endereco in labels.items():
+            _escrever_texto(f, nome)
+            f.write(struct.pack('<I', endereco))
+
+
+def ler_vmb(dados):
+    """(ops, args, labels) de um .vmb já lido (bytes), como os de Instrucoes.resolver"""
+    if not dados.startswith(MAGIA_VMB):
+        raise ValueError("Não é um ficheiro .vmb")
+    pos = len(MAGIA_VMB)
+    n, n_cadeias, n_reais, n_labels = struct.unpack_from('<4I', dados, pos)
+    pos += 16
+    ops = list(dados[pos:pos + n])
+    pos += n
+    operandos = array('q')
+    operandos.frombytes(dados[pos:pos + 8 * n])
+    pos += 8 * n
+    reais = array('d')
+    reais.frombytes(dados[pos:pos + 8 * n_reais])
+    pos += 8 * n_reais
+    if len(ops) != n or len(operandos) != n or len(reais) != n_reais:
+        raise ValueError("Ficheiro .vmb truncado")
+    _little_endian(operandos)
+    _little_endian(reais)
+
+    def ler_texto():
+        nonlocal pos
+        tamanho, = struct.unpack_from('<I', dados, pos)
+        texto = dados[pos + 4:pos + 4 + tamanho].decode('utf-8')
+        pos += 4 + tamanho
+        return texto
+
+    cadeias = [ler_texto() for _ in range(n_cadeias)]
+    labels = {}
+    for _ in range(n_labels):
+        nome = ler_texto()
+        labels[nome], = struct.unpack_from('<I', dados, pos)
+        pos += 4
+
+    args = []
+    for op, valor in zip(ops, operandos):
+        if op >= LABEL:
+            raise ValueError(f"Opcode inválido no .vmb: {op}")
+        if op == PUSHS:
+            valor = cadeias[valor]
+        elif op == PUSHF:
+            valor = reais[valor]
+        elif op not in OPS_COM_OPERANDO:
+            valor = None
+        args.append(valor)
+    return ops, args, labels
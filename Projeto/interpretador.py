@@ -0,0 +1,384 @@
+import sys
+import time
+import struct
+
+from instrucoes import NOMES_OPCODES, OPCODES, Instrucoes, ler_vmb
+
+# INTERPRETADOR LOCAL DA EWVM
+# O texto .vm é lido uma única vez: as labels são resolvidas para endereços inteiros e
+# o programa é pré-descodificado em dois arrays paralelos (opcodes e operandos), que o
+# ciclo de execução percorre sem voltar a olhar para o texto. O buffer do gerador
+# (instrucoes.Instrucoes) e o formato binário .vmb já trazem as instruções separadas e
+# chegam ao mesmo Programa sem passar por texto.
+
+
+class ErroVM(Exception):
+    pass
+
+
+(PUSHI, PUSHF, PUSHS, PUSHG, STOREG, PUSHL, STOREL,
+ PUSHN, PUSHGP, PUSHFP, PUSHA, PADD, LOADN, STOREN, LOAD, STORE,
+ POP, DUP, SWAP,
+ ADD, SUB, MUL, DIV, MOD,
+ FADD, FSUB, FMUL, FDIV, ITOF, FTOI,
+ EQUAL, INF, INFEQ, SUP, SUPEQ, NOT, AND, OR,
+ JUMP, JZ, CALL, RETURN, START, STOP, NOP,
+ CHARAT, STRLEN, CHRCODE, ATOI, ATOF, READ,
+ WRITEI, WRITEF, WRITES, WRITECHR, WRITELN) = range(len(NOMES_OPCODES))
+
+# Operandos que são labels (resolvidas para endereços de código)
+OPS_LABEL = {JUMP, JZ, PUSHA}
+OPS_INTEIRO = {PUSHI, PUSHG, STOREG, PUSHL, STOREL, PUSHN, LOAD, STORE, POP, DUP}
+
+
+class Programa:
+    """Programa EWVM pré-descodificado"""
+    def __init__(self, ops, args, labels):
+        self.ops = ops          # [int] - opcode de cada instrução
+        self.args = args        # [valor] - operando já convertido (ou None)
+        self.labels = labels    # {nome: endereço}
+
+    def __len__(self):
+        return len(self.ops)
+
+
+def _separar(linha):
+    """Divide uma linha em (label, instrução) tirando comentários e a palavra LABEL"""
+    if '//' in linha and '"' not in linha:
+        linha = linha.split('//', 1)[0]
+    linha = linha.strip()
+    if not linha:
+        return None, None
+    if linha.startswith('LABEL '):
+        linha = linha[6:].strip()
+    if linha.endswith(':') and ' ' not in linha:
+        return linha[:-1], None
+    return None, linha
+
+
+def _operando(op, texto, linha):
+    if op == PUSHS:
+        if len(texto) < 2 or texto[0] != '"' or texto[-1] != '"':
+            raise ErroVM(f"String mal formada: {linha}")
+        return texto[1:-1]
+    if op == PUSHF:
+        return float(texto)
+    if op in OPS_INTEIRO:
+        return int(texto)
+    return texto
+
+
+def carregar_instrucoes(linhas):
+    """Descodifica uma sequência de linhas .vm (ou o buffer GeradorCodigo.codigo) num Programa"""
+    if isinstance(linhas, Instrucoes):
+        try:
+            return _programa(*linhas.resolver())
+        except ValueError as e:
+            raise ErroVM(str(e))
+    ops = []
+    args = []
+    labels = {}
+    pendentes = []  # (índice, nome_label) a resolver no fim
+
+    for linha in linhas:
+        label, instr = _separar(linha)
+        if label is not None:
+            if label in labels:
+                raise ErroVM(f"Label '{label}' definida mais do que uma vez")
+            labels[label] = len(ops)
+            continue
+        if instr is None:
+            continue
+
+        partes = instr.split(None, 1)
+        nome = partes[0].upper()
+        if nome not in OPCODES:
+            raise ErroVM(f"Instrução desconhecida: {instr}")
+        op = OPCODES[nome]
+        texto = partes[1].strip() if len(partes) > 1 else None
+
+        if op in OPS_LABEL:
+            if texto is None:
+                raise ErroVM(f"Falta a label em: {instr}")
+            pendentes.append((len(ops), texto))
+            arg = None
+        elif texto is not None:
+            try:
+                arg = _operando(op, texto, instr)
+            except ValueError:
+                raise ErroVM(f"Operando inválido em: {instr}")
+        elif op in (POP, DUP):
+            arg = 1
+        else:
+            arg = None
+        ops.append(op)
+        args.append(arg)
+
+    for indice, nome in pendentes:
+        if nome not in labels:
+            raise ErroVM(f"Label '{nome}' não definida")
+        args[indice] = labels[nome]
+
+    return _programa(ops, args, labels)
+
+
+def _programa(ops, args, labels):
+    # Sentinela: cair do fim do programa equivale a STOP
+    ops.append(STOP)
+    args.append(None)
+    return Programa(ops, args, labels)
+
+
+def carregar(texto):
+    return carregar_instrucoes(texto.splitlines())
+
+
+def carregar_binario(dados):
+    """Programa de um ficheiro .vmb (as labels já vêm resolvidas)"""
+    try:
+        return _programa(*ler_vmb(dados))
+    except (ValueError, IndexError, struct.error) as e:
+        raise ErroVM(f"Ficheiro .vmb inválido: {e}")
+
+
+def carregar_ficheiro(filename):
+    """Carrega um .vm (texto) ou um .vmb (binário)"""
+    if filename.endswith('.vmb'):
+        with open(filename, 'rb') as f:
+            return carregar_binario(f.read())
+    with open(filename, 'r') as f:
+        return carregar(f.read())
+
+
+def _div_inteira(a, b):
+    """Divisão inteira com truncatura para zero (como em Pascal)"""
+    q = a // b
+    if q < 0 and q * b != a:
+        q += 1
+    return q
+
+
+def _mod_inteiro(a, b):
+    r = a % b
+    if r and (a < 0) != (b < 0):
+        r -= b
+    return r
+
+
+class MaquinaVirtual:
+    def __init__(self, programa, entrada=None, saida=None):
+        self.programa = programa
+        self.entrada = entrada if entrada is not None else sys.stdin
+        self.saida = saida if saida is not None else sys.stdout
+        self.pilha = []
+        self.instrucoes_executadas = 0
+
+    def ler_linha(self):
+        linha = self.entrada.readline()
+        if not linha:
+            raise ErroVM("READ: fim da entrada")
+        return linha.rstrip('\n')
+
+    def executar(self):
+        """Executa o programa até STOP; devolve o número de instruções executadas"""
+        ops = self.programa.ops
+        args = self.programa.args
+        s = self.pilha
+        push = s.append
+        pop = s.pop
+        write = self.saida.write
+        chamadas = []
+        pc = 0
+        fp = 0
+        n = 0
+        op = None
+
+        try:
+            while True:
+                op = ops[pc]
+                a = args[pc]
+                pc += 1
+                n += 1
+
+                if op == PUSHG:
+                    push(s[a])
+                elif op == PUSHI:
+                    push(a)
+                elif op == PUSHL:
+                    push(s[fp + a])
+                elif op == STOREG:
+                    s[a] = pop()
+                elif op == STOREL:
+                    s[fp + a] = pop()
+                elif op == JZ:
+                    if not pop():
+                        pc = a
+                elif op == JUMP:
+                    pc = a
+                elif op == ADD:
+                    b = pop()
+                    s[-1] = s[-1] + b
+                elif op == SUB:
+                    b = pop()
+                    s[-1] = s[-1] - b
+                elif op == MUL:
+                    b = pop()
+                    s[-1] = s[-1] * b
+                elif op == INFEQ:
+                    b = pop()
+                    s[-1] = 1 if s[-1] <= b else 0
+                elif op == SUPEQ:
+                    b = pop()
+                    s[-1] = 1 if s[-1] >= b else 0
+                elif op == INF:
+                    b = pop()
+                    s[-1] = 1 if s[-1] < b else 0
+                elif op == SUP:
+                    b = pop()
+                    s[-1] = 1 if s[-1] > b else 0
+                elif op == EQUAL:
+                    b = pop()
+                    s[-1] = 1 if s[-1] == b else 0
+                elif op == NOT:
+                    s[-1] = 0 if s[-1] else 1
+                elif op == AND:
+                    b = pop()
+                    s[-1] = 1 if s[-1] and b else 0
+                elif op == OR:
+                    b = pop()
+                    s[-1] = 1 if s[-1] or b else 0
+                elif op == DIV:
+                    b = pop()
+                    x = s[-1]
+                    if isinstance(x, float) or isinstance(b, float):
+                        s[-1] = x / b
+                    else:
+                        s[-1] = _div_inteira(x, b)
+                elif op == MOD:
+                    b = pop()
+                    s[-1] = _mod_inteiro(s[-1], b)
+                elif op == PUSHGP:
+                    push(0)
+                elif op == PADD:
+                    b = pop()
+                    s[-1] = s[-1] + b
+                elif op == LOADN:
+                    b = pop()
+                    s[-1] = s[s[-1] + b]
+                elif op == STOREN:
+                    v = pop()
+                    b = pop()
+                    s[pop() + b] = v
+                elif op == CHARAT:
+                    b = pop()
+                    s[-1] = ord(s[-1][b])
+                elif op == STRLEN:
+                    s[-1] = len(s[-1])
+                elif op == CHRCODE:
+                    s[-1] = ord(s[-1][0])
+                elif op == PUSHS:
+                    push(a)
+                elif op == PUSHF:
+                    push(a)
+                elif op == PUSHA:
+                    push(a)
+                elif op == CALL:
+                    chamadas.append((pc, fp))
+                    pc = pop()
+                    fp = len(s)
+                elif op == RETURN:
+                    del s[fp:]
+                    pc, fp = chamadas.pop()
+                elif op == PUSHN:
+                    s.extend([0] * a)
+                elif op == POP:
+                    del s[len(s) - a:]
+                elif op == DUP:
+                    s.extend(s[len(s) - a:])
+                elif op == SWAP:
+                    s[-1], s[-2] = s[-2], s[-1]
+                elif op == PUSHFP:
+                    push(fp)
+                elif op == LOAD:
+                    s[-1] = s[s[-1] + a]
+                elif op == STORE:
+                    v = pop()
+                    s[pop() + a] = v
+                elif op == WRITEI:
+                    write(str(pop()))
+                elif op == WRITES:
+                    write(str(pop()))
+                elif op == WRITEF:
+                    write(str(float(pop())))
+                elif op == WRITECHR:
+                    write(chr(pop()))
+                elif op == WRITELN:
+                    write('\n')
+                elif op == READ:
+                    push(self.ler_linha())
+                elif op == ATOI:
+                    s[-1] = int(s[-1].strip())
+                elif op == ATOF:
+                    s[-1] = float(s[-1].strip())
+                elif op == FADD:
+                    b = pop()
+                    s[-1] = float(s[-1]) + b
+                elif op == FSUB:
+                    b = pop()
+                    s[-1] = float(s[-1]) - b
+                elif op == FMUL:
+                    b = pop()
+                    s[-1] = float(s[-1]) * b
+                elif op == FDIV:
+                    b = pop()
+                    s[-1] = float(s[-1]) / b
+                elif op == ITOF:
+                    s[-1] = float(s[-1])
+                elif op == FTOI:
+                    s[-1] = int(s[-1])
+                elif op == START:
+                    fp = len(s)
+                elif op == NOP:
+                    pass
+                elif op == STOP:
+                    break
+                else:
+                    raise ErroVM(f"Opcode inválido: {op}")
+        except ErroVM as e:
+            raise ErroVM(f"{e} (instrução {pc - 1})")
+        except (IndexError, TypeError, ValueError, ZeroDivisionError) as e:
+            nome = NOMES_OPCODES[op] if op is not None else '?'
+            raise ErroVM(f"Erro de execução em {nome} (instrução {pc - 1}): {e}")
+        finally:
+            self.instrucoes_executadas += n
+
+        return n
+
+
+def executar_ficheiro(filename, entrada=None, saida=None):
+    """Carrega e executa um ficheiro .vm; devolve a máquina (para estatísticas)"""
+    vm = MaquinaVirtual(carregar_ficheiro(filename), entrada, saida)
+    vm.executar()
+    return vm
+
+
+# MAIN
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python3 interpretador.py <ficheiro.vm|ficheiro.vmb> [--estatisticas]")
+        sys.exit(1)
+
+    filename = sys.argv[1]
+    try:
+        programa = carregar_ficheiro(filename)
+        vm = MaquinaVirtual(programa)
+        inicio = time.perf_counter()
+        vm.executar()
+        duracao = time.perf_counter() - inicio
+    except (ErroVM, OSError) as e:
+        print(f"Erro: {e}")
+        sys.exit(1)
+
+    if '--estatisticas' in sys.argv[2:]:
+        print(f"{vm.instrucoes_executadas} instruções em {duracao:.4f}s "
+              f"({vm.instrucoes_executadas / max(duracao, 1e-9):.0f} instr/s)", file=sys.stderr)
@@ -141,7 +141,47 @@ def t_newline(t):
     t.lexer.lineno += len(t.value)
 
 def t_error(t):
-    print(f"Caracter ilegal: {t.value[0]} na linha {t.lexer.lineno}")
+    reportar(t.lexer, f"Caracter ilegal: {t.value[0]} na linha {t.lexer.lineno}")
     t.lexer.skip(1)
-  
-lexer = lex.lex()
\ No newline at end of file
+
+def reportar(lexer, msg):
+    """Guarda a mensagem nos diagnósticos do lexer, se os tiver; senão imprime-a"""
+    diagnosticos = getattr(lexer, 'diagnosticos', None)
+    if diagnosticos is None:
+        print(msg)
+    else:
+        diagnosticos.append(msg)
+
+
+# CONSTRUÇÃO DO LEXER
+# As expressões regulares compiladas vêm de tabelas_lexer.py (gerado com 'python3 sin.py
+# --gerar-tabelas'), o que evita validar as regras em cada arranque. O lexer só é construído
+# na primeira utilização; sem tabelas, é construído e validado a partir das regras t_*,
+# sem escrever ficheiros.
+
+_lexer = None
+
+
+def obter_lexer():
+    """Lexer do PLY partilhado (construído na primeira chamada); use clone() para ter estado próprio"""
+    global _lexer
+    if _lexer is None:
+        try:
+            import tabelas_lexer
+        except ImportError:
+            _lexer = lex.lex(module=sys.modules[__name__])
+        else:
+            _lexer = lex.lex(module=sys.modules[__name__], optimize=True, lextab=tabelas_lexer)
+    return _lexer
+
+
+def escrever_tabela(pasta):
+    """Gera tabelas_lexer.py em pasta a partir das regras (validando-as)"""
+    lex.lex(module=sys.modules[__name__]).writetab('tabelas_lexer', pasta)
+
+
+def __getattr__(nome):
+    # Compatibilidade: 'from lex import lexer' continua a funcionar, construindo-o só aí
+    if nome == 'lexer':
+        return obter_lexer()
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
@@ -0,0 +1,101 @@
+import re
+from functools import partial
+from ply.lex import LexToken
+from lex import reserved, literals, reportar
+
+# ANALISADOR LÉXICO RÁPIDO
+# Alternativa ao lexer do PLY com os mesmos tipos e valores de tokens. Usa uma única
+# expressão regular mestra (um grupo por tipo de token) e despacha pelo nome do grupo,
+# sem uma chamada de função Python por token. Os comentários (* ... *) e as strings com
+# '' são reconhecidos por expressões sem retrocesso.
+
+# A ordem conta: os tokens mais frequentes primeiro (o motor de regex tenta as alternativas
+# por ordem) e, entre alternativas que começam pelo mesmo caracter, as mais longas antes
+# (REAL antes de NUMBER, ':=' e '..' e '(*' antes dos literais de um caracter).
+ESPECIFICACAO = [
+    ('ID', r'[a-zA-Z_][a-zA-Z0-9_]*'),
+    ('ASSIGN', r':='),
+    ('REAL_NUMBER', r'\d+\.\d+'),
+    ('NUMBER', r'\d+'),
+    ('newline', r'\n+'),
+    ('COMMENT_PAREN', r'\(\*[^*]*\*+(?:[^)*][^*]*\*+)*\)'),  # sem retrocesso
+    ('RANGE', r'\.\.'),
+    ('literal', '[' + re.escape(''.join(literals)) + ']'),
+    ('EQUALS', r'='),
+    ('NOT_EQUALS', r'<>|!='),
+    ('LESS_THAN_OR_EQUAL_TO', r'<='),
+    ('GREATER_THAN_OR_EQUAL_TO', r'>='),
+    ('LESS_THAN', r'<'),
+    ('GREATER_THAN', r'>'),
+    ('STRING_LITERAL', r"'[^']*(?:''[^']*)*'"),
+    ('COMMENT_BRACE', r'\{[^}]*\}'),
+    # Qualquer outro caracter é ilegal; com este grupo o finditer só salta espaços e tabs
+    ('erro', r'[^ \t]'),
+]
+
+# Os espaços e tabs (t_ignore) são consumidos antes de cada token, fora dos grupos. Não
+# são ilegais: os que ficam no fim do texto, sem um token a seguir, não dão nenhum match
+MESTRA = re.compile('[ \t]*(?:' + '|'.join(f'(?P<{nome}>{regex})' for nome, regex in ESPECIFICACAO) + ')')
+
+
+class LexerRapido:
+    """Lexer compatível com o PLY (input/token/lineno) para usar com parser.parse(lexer=...)"""
+
+    def __init__(self):
+        self.lineno = 1
+        self.lexdata = ''
+        self._tokens = iter(())
+        self.diagnosticos = None  # lista para recolher os erros em vez de os imprimir
+
+    def input(self, data):
+        self.lexdata = data
+        self._tokens = self._gerar(data)
+        # O yacc chama token() uma vez por token: um partial evita um nível de chamada Python
+        self.token = partial(next, self._tokens, None)
+
+    def token(self):
+        return next(self._tokens, None)
+
+    def __iter__(self):
+        return self._tokens
+
+    def _gerar(self, data):
+        get_reserved = reserved.get
+        lineno = self.lineno
+        for m in MESTRA.finditer(data):
+            tipo = m.lastgroup
+            texto = m.group(tipo)
+
+            if tipo == 'ID':
+                tipo = get_reserved(texto.lower(), 'ID')
+                if tipo == 'TRUE':
+                    texto = True
+                elif tipo == 'FALSE':
+                    texto = False
+            elif tipo == 'newline':
+                lineno += len(texto)
+                self.lineno = lineno
+                continue
+            elif tipo == 'NUMBER':
+                texto = int(texto)
+            elif tipo == 'literal':
+                tipo = texto
+            elif tipo == 'STRING_LITERAL':
+                texto = texto[1:-1].replace("''", "'")
+            elif tipo == 'REAL_NUMBER':
+                texto = float(texto)
+            elif tipo == 'COMMENT_BRACE' or tipo == 'COMMENT_PAREN':
+                lineno += texto.count('\n')
+                self.lineno = lineno
+                continue
+            elif tipo == 'erro':
+                reportar(self, f"Caracter ilegal: {texto} na linha {lineno}")
+                continue
+
+            # Atribuições diretas são mais baratas do que um __init__ por token
+            tok = LexToken()
+            tok.type = tipo
+            tok.value = texto
+            tok.lineno = lineno
+            tok.lexpos = m.start(m.lastgroup)
+            yield tok
@@ -0,0 +1,175 @@
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from sin import SCANNERS
+from compilador import Compilador
+from maquina import escrever_vm
+from cache import CacheCompilacao, PASTA_OMISSAO
+
+# COMPILAÇÃO EM LOTE
+# Compila muitos ficheiros .pas num só processo principal, repartindo-os por um conjunto de
+# processos. Cada processo cria um Compilador uma única vez (as tabelas do parser já vêm
+# carregadas do processo principal) e reutiliza-o para todos os ficheiros que lhe calham.
+#
+# Uso: python3 lote.py ENTRADA [ENTRADA ...] [-j N] [-O] [--saida DIR] [--resumo resumo.json]
+# Cada ENTRADA pode ser uma pasta (todos os .pas lá dentro), um padrão glob ('testes/**/*.pas')
+# ou um manifesto (ficheiro de texto com um caminho por linha; '#' inicia um comentário).
+
+
+def expandir_entradas(entradas):
+    """Lista ordenada e sem repetições dos ficheiros .pas indicados pelas entradas"""
+    ficheiros = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            ficheiros.extend(glob.glob(os.path.join(entrada, '**', '*.pas'), recursive=True))
+        elif glob.has_magic(entrada):
+            ficheiros.extend(glob.glob(entrada, recursive=True))
+        elif entrada.endswith('.pas'):
+            ficheiros.append(entrada)
+        else:
+            ficheiros.extend(ler_manifesto(entrada))
+    return sorted(set(os.path.normpath(f) for f in ficheiros))
+
+
+def ler_manifesto(nome):
+    """Caminhos de um manifesto, relativos à pasta do próprio manifesto"""
+    base = os.path.dirname(nome)
+    caminhos = []
+    with open(nome, 'r') as f:
+        for linha in f:
+            linha = linha.split('#', 1)[0].strip()
+            if linha:
+                caminhos.append(os.path.join(base, linha))
+    return caminhos
+
+
+def nome_saida(ficheiro, pasta_saida=None, raiz=None):
+    """Caminho do .vm: ao lado do .pas, ou em pasta_saida com a mesma estrutura relativa a raiz"""
+    base = ficheiro[:-4] if ficheiro.endswith('.pas') else ficheiro
+    if pasta_saida is None:
+        return base + '.vm'
+    return os.path.join(pasta_saida, os.path.relpath(base, raiz) + '.vm')
+
+
+# Estado de cada processo do conjunto: um Compilador criado uma vez por processo
+_compilador = None
+
+
+def _iniciar_processo(opcoes):
+    global _compilador
+    _compilador = Compilador(**opcoes)
+
+
+def compilar_um(tarefa):
+    """Compila um ficheiro no processo atual; devolve o seu resumo (um dicionário)"""
+    ficheiro, saida = tarefa
+    inicio = time.perf_counter()
+    resumo = {'ficheiro': ficheiro, 'saida': None, 'estado': 'erro', 'diagnosticos': [],
+              'instrucoes': 0, 'tempos': {}}
+    try:
+        resultado = _compilador.compilar_ficheiro(ficheiro)
+    except (OSError, UnicodeDecodeError) as e:
+        resumo['diagnosticos'] = [f"Erro ao ler ficheiro: {e}"]
+    else:
+        resumo['diagnosticos'] = resultado.diagnosticos
+        resumo['tempos'] = resultado.tempos
+        if resultado.sucesso:
+            try:
+                pasta = os.path.dirname(saida)
+                if pasta:
+                    os.makedirs(pasta, exist_ok=True)
+                escrever_vm(resultado.codigo, saida)
+                resumo['saida'] = saida
+                resumo['estado'] = 'ok'
+                resumo['instrucoes'] = len(resultado.codigo)
+            except OSError as e:
+                resumo['diagnosticos'].append(f"Erro ao escrever ficheiro: {e}")
+    resumo['tempos']['total'] = time.perf_counter() - inicio
+    return resumo
+
+
+def compilar_lote(ficheiros, processos=None, pasta_saida=None, **opcoes):
+    """Compila os ficheiros em paralelo; devolve os resumos pela ordem dos ficheiros
+
+    opcoes são os argumentos de Compilador (scanner, otimizar, ...). Com processos=1 compila
+    no próprio processo, sem criar o conjunto.
+    """
+    raiz = os.path.commonpath([os.path.dirname(os.path.abspath(f)) for f in ficheiros]) if ficheiros else None
+    tarefas = [(f, nome_saida(os.path.abspath(f) if pasta_saida else f, pasta_saida, raiz))
+               for f in ficheiros]
+    processos = processos or os.cpu_count() or 1
+
+    if processos == 1 or len(tarefas) <= 1:
+        _iniciar_processo(opcoes)
+        return [compilar_um(t) for t in tarefas]
+
+    # Blocos de várias tarefas por envio reduzem a comunicação entre processos
+    bloco = max(1, len(tarefas) // (processos * 8))
+    with ProcessPoolExecutor(processos, initializer=_iniciar_processo, initargs=(opcoes,)) as executor:
+        return list(executor.map(compilar_um, tarefas, chunksize=bloco))
+
+
+def imprimir_resumo(resumos, duracao, so_erros=False):
+    for r in resumos:
+        if so_erros and r['estado'] == 'ok':
+            continue
+        print(f"{r['estado']:<5} {r['ficheiro']:<40} {1000 * r['tempos']['total']:8.1f} ms  "
+              f"{r['instrucoes']:>6} instruções")
+        for diagnostico in r['diagnosticos']:
+            print(f"      {diagnostico}")
+    ok = sum(1 for r in resumos if r['estado'] == 'ok')
+    print(f"{ok}/{len(resumos)} compilados em {duracao:.2f} s "
+          f"({len(resumos) / duracao if duracao else 0:.1f} ficheiros/s)")
+
+
+if __name__ == "__main__":
+    cli = argparse.ArgumentParser(description="Compilação em lote Pascal -> EWVM")
+    cli.add_argument('entradas', nargs='+', metavar='ENTRADA',
+                     help="pasta, padrão glob ou manifesto com os ficheiros .pas")
+    cli.add_argument('-j', '--processos', type=int, default=None,
+                     help="número de processos (por omissão, um por core)")
+    cli.add_argument('--saida', metavar='DIR', help="pasta para os .vm (por omissão, ao lado dos .pas)")
+    cli.add_argument('--resumo', metavar='FICHEIRO', help="escreve o resumo por ficheiro em JSON")
+    cli.add_argument('--scanner', choices=SCANNERS, default='ply')
+    cli.add_argument('-O', '--otimizar', action='store_true',
+                     help="dobra constantes na AST, expande as chamadas a subprogramas pequenos, desenrola "
+                          "os for com limites constantes, roda os ciclos e aplica os passos sobre blocos e o "
+                          "peephole")
+    cli.add_argument('--fundido', action='store_true',
+                     help="verifica e gera código numa só travessia da AST, com uma só tabela de símbolos")
+    cli.add_argument('--cache', nargs='?', const='', metavar='DIR',
+                     help="reutiliza compilações guardadas em disco (por omissão em ~/.cache/plc2025)")
+    cli.add_argument('--cache-limite', type=int, default=64, metavar='MB',
+                     help="tamanho máximo da cache; apaga as entradas usadas há mais tempo")
+    cli.add_argument('-q', '--silencioso', action='store_true', help="só mostra os ficheiros com erros")
+    opcoes = cli.parse_args()
+
+    try:
+        ficheiros = expandir_entradas(opcoes.entradas)
+    except OSError as e:
+        print(f"Erro ao ler manifesto: {e}")
+        sys.exit(1)
+    if not ficheiros:
+        print("Nenhum ficheiro .pas encontrado")
+        sys.exit(1)
+
+    cache = None
+    if opcoes.cache is not None:
+        cache = CacheCompilacao(opcoes.cache or PASTA_OMISSAO, opcoes.cache_limite * 1024 * 1024)
+
+    inicio = time.perf_counter()
+    resumos = compilar_lote(ficheiros, opcoes.processos, opcoes.saida,
+                            scanner=opcoes.scanner, otimizar=opcoes.otimizar, cache=cache,
+                            fundido=opcoes.fundido)
+    duracao = time.perf_counter() - inicio
+
+    imprimir_resumo(resumos, duracao, opcoes.silencioso)
+    if opcoes.resumo:
+        with open(opcoes.resumo, 'w') as f:
+            json.dump(resumos, f, indent=2, ensure_ascii=False)
+    sys.exit(0 if all(r['estado'] == 'ok' for r in resumos) else 1)
@@ -1,10 +1,21 @@
+import os
 import sys
-from sin import parse_file
-from semantica import AnalisadorSemantico
+import shutil
+import argparse
+import tempfile
+from sin import SCANNERS
+from arvore import No, BeginEnd, Binop, Unop, Char, de_tuplo, tabela_despacho, executar
+from instrucoes import Instrucoes, formatar, escrever_vmb
+
+# Operador relacional cuja instrução EWVM dá o resultado contrário
+RELACIONAL_OPOSTO = {'<': 'SUPEQ', '<=': 'SUP', '>': 'INFEQ', '>=': 'INF'}
+
 
 class GeradorCodigo:
-    def __init__(self):
-        self.codigo = []
+    def __init__(self, limite_for_unico=True, curto_circuito=True, curto_circuito_valores=False,
+                 rodar_ciclos=False, destino=None):
+        self.codigo = Instrucoes()  # opcodes e operandos em arrays (ver instrucoes.py)
+        self.destino = destino  # SaidaVM para emitir em streaming (ou None: fica tudo em codigo)
         self.contador_labels = 0
         self.tabela_simbolos = {}  # {nome: {'addr': int, 'size': int, 'tipo': str}}
         self.endereco_atual = 0
@@ -13,8 +24,19 @@ class GeradorCodigo:
         self.info_arrays = {}  # {nome: {'min': int, 'max': int, 'tipo_base': str}}
         self.funcoes_processadas = set()
         self.params_locais = {}  # {nome_param: {'offset': int, 'tipo': str}} - parâmetros de funções
+        self.despacho = tabela_despacho(type(self))
         self.vars_locais = {}    # {nome_var: {'offset': int, 'tipo': str}} - variáveis locais
         self.local_offset = 0    # Contador para variáveis locais
+        self.em_frame_local = False  # True dentro de uma função (temporários vão para a frame)
+        self.temps_livres = {'L': [], 'G': []}
+        self.limite_for_unico = limite_for_unico  # avaliar o limite do for uma só vez
+        self.curto_circuito = curto_circuito  # and/or com saltos nas condições de if/while
+        self.curto_circuito_valores = curto_circuito_valores  # idem em expressões com valor
+        self.rodar_ciclos = rodar_ciclos  # while/for com o teste no fim do ciclo
+        self.avisos = []  # mensagens de AVISO/ERRO da geração (quem chama decide se as mostra)
+
+    def avisar(self, msg):
+        self.avisos.append(msg)
 
     def novo_label(self):
         self.contador_labels += 1
@@ -30,25 +52,102 @@ class GeradorCodigo:
             self.endereco_atual += size
         return self.tabela_simbolos[nome_var]['addr']
 
-    def emitir(self, op, arg=None):
-        if arg is None:
-            self.codigo.append(f"{op}")
+    # NOMES
+    # A geração só procura variáveis e subprogramas por estes métodos; o GeradorVerificado
+    # (fundido.py) responde-lhes com a tabela de símbolos do analisador semântico
+
+    def localizar(self, nome):
+        """(frame, posição, tipo) de uma variável: 'L' para os parâmetros e as variáveis locais
+        da função atual (posição relativa ao fp), 'G' para as globais; None se não existe"""
+        info = self.params_locais.get(nome) or self.vars_locais.get(nome)
+        if info is not None:
+            return 'L', info['offset'], info.get('tipo', 'INTEGER')
+        info = self.tabela_simbolos.get(nome)
+        if info is not None:
+            return 'G', info['addr'], info.get('tipo', 'INTEGER')
+        return None
+
+    def localizar_global(self, nome):
+        """(endereço, tipo) de uma variável global, ou None (o readln e as atribuições a
+        elementos de arrays só escrevem em globais)"""
+        info = self.tabela_simbolos.get(nome)
+        if info is None:
+            return None
+        return info['addr'], info.get('tipo', 'INTEGER')
+
+    def info_array(self, nome):
+        """(índice mínimo, tipo_base) de um array global, ou None (uma string também se indexa)"""
+        info = self.info_arrays.get(nome)
+        if info is None:
+            return None
+        return info['min'], info.get('tipo_base', 'INTEGER')
+
+    def subprograma(self, nome):
+        """{'tipo': ..., 'num_params': ...} de um subprograma já gerado, ou None"""
+        return self.funcoes.get(nome)
+
+    def registar_subprograma(self, nome, tipo, num_params):
+        self.funcoes[nome] = {'label': nome, 'num_params': num_params, 'tipo': tipo}
+
+    def declarar_parametros(self, params_info):
+        """Mapeia os parâmetros [(nome, tipo)] para posições relativas ao fp: na EWVM, após
+        CALL, o primeiro está em fp[-n] e o último em fp[-1]"""
+        self.params_locais = {}
+        for i, (pid, tipo) in enumerate(params_info):
+            # Parâmetros estão "abaixo" do fp: índice negativo
+            self.params_locais[pid] = {'offset': -(len(params_info) - i), 'tipo': tipo}
+
+    def novo_temporario(self):
+        """Reserva uma posição temporária: na frame da função atual ou global"""
+        tipo = 'L' if self.em_frame_local else 'G'
+        if self.temps_livres[tipo]:
+            return self.temps_livres[tipo].pop()
+        if tipo == 'L':
+            temp = ('L', self.local_offset)
+            self.local_offset += 1
         else:
-            self.codigo.append(f"{op} {arg}")
+            temp = ('G', self.endereco_atual)
+            self.endereco_atual += 1
+        return temp
+
+    def libertar_temporario(self, temp):
+        self.temps_livres[temp[0]].append(temp)
+
+    def carregar_temporario(self, temp):
+        self.emitir('PUSHL' if temp[0] == 'L' else 'PUSHG', temp[1])
+
+    def guardar_temporario(self, temp):
+        self.emitir('STOREL' if temp[0] == 'L' else 'STOREG', temp[1])
+
+    def emitir(self, op, arg=None):
+        self.codigo.emitir(op, arg)
+
+    def descarregar(self):
+        """Em streaming, entrega o código já terminado ao destino e começa um buffer novo"""
+        if self.destino is not None and len(self.codigo):
+            self.destino.escrever(self.codigo)
+            self.codigo = Instrucoes()
 
     def visit_generico(self, node):
         """Fallback para nós não implementados"""
-        if isinstance(node, tuple) and len(node) > 0:
-            print(f"AVISO: Nó não implementado: {node[0]}")
+        if isinstance(node, No):
+            self.avisar(f"AVISO: Nó não implementado: {node.etiqueta}")
         return None
 
     def visit(self, node):
+        return executar(self.passo, node)
+
+    # Os métodos que visitam filhos são geradores que fazem `yield filho` (ver
+    # arvore.executar); as condições com saltos também (`yield self.gerar_condicao(...)`)
+    def passo(self, node):
+        metodo = self.despacho.get(node.__class__)
+        if metodo is not None:
+            return metodo(self, node)
+
         if node is None: 
             return None
         if isinstance(node, list):
-            for item in node: 
-                self.visit(item)
-            return None
+            return self.visitar_lista(node)
 
         if isinstance(node, bool):
             valor = 1 if node else 0
@@ -62,20 +161,36 @@ class GeradorCodigo:
             self.emitir('PUSHF', node)
             return 'REAL'
         if isinstance(node, str):
-            self.emitir('PUSHS', f'"{node}"')
+            self.emitir('PUSHS', node)
             # Se é um único caractere, converter para código ASCII para comparações
             if len(node) == 1:
                 self.emitir('CHRCODE')
                 return 'CHAR'
             return 'STRING'
         
+        # Compatibilidade: uma AST em tuplos é convertida para nós
         if isinstance(node, tuple):
-            tipo = node[0]
-            metodo = getattr(self, f'visit_{tipo}', self.visit_generico)
-            return metodo(node)
+            return self.passo(de_tuplo(node))
+        if isinstance(node, No):
+            return self.visit_generico(node)
         
         return None
 
+    def visitar_lista(self, node):
+        for item in node:
+            yield item
+
+    def tipo_de(self, node):
+        """Tipo de uma expressão: o que o analisador semântico registou no nó, sem percorrer
+        a subárvore (inferir_tipo só para ASTs que não passaram pela análise)"""
+        tipo = getattr(node, 'tipo', None)
+        if tipo:
+            return tipo
+        if isinstance(node, str):
+            # Como em visit: um só caracter é empilhado como código (CHRCODE)
+            return 'CHAR' if len(node) == 1 else 'STRING'
+        return self.inferir_tipo(node)
+
     def inferir_tipo(self, node):
         """Infere o tipo de uma expressão sem gerar código"""
         if node is None:
@@ -88,20 +203,21 @@ class GeradorCodigo:
             return 'REAL'
         if isinstance(node, str):
             return 'STRING'
-        if isinstance(node, tuple):
+        if isinstance(node, (No, tuple)):
             if node[0] == 'var':
-                nome = node[1]
-                if nome in self.tabela_simbolos:
-                    return self.tabela_simbolos[nome].get('tipo', 'INTEGER')
+                global_ = self.localizar_global(node[1])
+                if global_ is not None:
+                    return global_[1]
                 return 'INTEGER'
             elif node[0] == 'array_access':
                 nome = node[1]
-                if nome in self.info_arrays:
-                    return self.info_arrays[nome].get('tipo_base', 'INTEGER')
+                array = self.info_array(nome)
+                if array is not None:
+                    return array[1]
                 # Se não é array, pode ser string
-                if nome in self.tabela_simbolos:
-                    if self.tabela_simbolos[nome].get('tipo') == 'STRING':
-                        return 'CHAR'
+                global_ = self.localizar_global(nome)
+                if global_ is not None and global_[1] == 'STRING':
+                    return 'CHAR'
                 return 'INTEGER'
             elif node[0] == 'binop':
                 op = node[1]
@@ -117,6 +233,8 @@ class GeradorCodigo:
                     if t1 == 'STRING' or t2 == 'STRING':
                         return 'STRING'
                     return 'INTEGER'
+            elif node[0] == 'char':
+                return 'CHAR'
             elif node[0] == 'unop':
                 if node[1] == 'not':
                     return 'BOOLEAN'
@@ -125,7 +243,7 @@ class GeradorCodigo:
                 nome = node[1]
                 if nome.lower() == 'length':
                     return 'INTEGER'
-                if nome in self.funcoes:
+                if self.subprograma(nome) is not None:
                     return 'INTEGER'
         return 'INTEGER'
 
@@ -133,7 +251,7 @@ class GeradorCodigo:
         """Processa declarações de variáveis para alocar espaço"""
         _, lista_id, tipo_raw = node
         
-        if isinstance(tipo_raw, tuple) and tipo_raw[0] == 'array':
+        if isinstance(tipo_raw, No) and tipo_raw.etiqueta == 'array':
             min_idx = tipo_raw[1]
             max_idx = tipo_raw[2]
             tipo_base = str(tipo_raw[3]).upper() if isinstance(tipo_raw[3], str) else 'INTEGER'
@@ -157,45 +275,46 @@ class GeradorCodigo:
             return
         self.funcoes_processadas.add(nome)
         
-        self.funcoes[nome] = {'label': nome, 'num_params': 0, 'tipo': 'VOID'}
-        self.emitir('LABEL', f"{nome}:")
+        # Parâmetros são empilhados da esquerda para direita
+        params_info = []
+        if params:
+            for p in params:
+                tipo_param = str(p[2]).upper() if len(p) > 2 else 'INTEGER'
+                for pid in p[1]:
+                    params_info.append((pid, tipo_param))
+        
+        self.registar_subprograma(nome, 'VOID', len(params_info))
+        self.emitir('LABEL', nome)
         # Guardar contexto anterior
         old_func = self.funcao_atual
         old_params = self.params_locais.copy()
         self.funcao_atual = nome
         
         # Mapear parâmetros para offsets locais (negativos a partir do fp)
-        self.params_locais = {}
-        if params:
-            todos_params = []
-            for p in params:
-                tipo_param = str(p[2]).upper() if len(p) > 2 else 'INTEGER'
-                for pid in p[1]:
-                    todos_params.append((pid, tipo_param))
-            
-            # Parâmetros são empilhados da esquerda para direita
-            # Então o último parâmetro está em fp[-1], o penúltimo em fp[-2], etc.
-            n_params = len(todos_params)
-            for i, (param_id, tipo) in enumerate(todos_params):
-                offset = -(n_params - i)  # primeiro param: -n, último: -1
-                self.params_locais[param_id] = {'offset': offset, 'tipo': tipo}
+        self.declarar_parametros(params_info)
         
         if corpo and corpo[0] == 'bloco':
             decls_locais = corpo[1]
             if decls_locais:
                 self.processar_declaracoes(decls_locais)
         
-        self.visit(corpo)
+        # Os temporários de um procedimento são globais: não podem ser reutilizados fora
+        # dele, porque um for de quem o chama pode ter o limite numa posição livre
+        old_livres = self.temps_livres['G']
+        self.temps_livres['G'] = []
+        yield corpo
         self.emitir('RETURN')
         
         # Restaurar contexto
+        self.temps_livres['G'] = old_livres
         self.funcao_atual = old_func
         self.params_locais = old_params 
+        self.descarregar()
 
     # ESTRUTURA E BLOCOS
 
     def visit_gramatica(self, node): 
-        self.visit(node[1]) 
+        yield node[1] 
     
     def visit_programa(self, node):
         label_main = "main"
@@ -213,18 +332,42 @@ class GeradorCodigo:
             if isinstance(subprogs, list):
                 for subprog in subprogs:
                     if subprog:
-                        self.visit(subprog)
+                        yield subprog
         
         # gerar o main
-        self.emitir('LABEL', f"{label_main}:")
+        self.emitir('LABEL', label_main)
         self.emitir('START')
         
         # IMPORTANTE: Alocar espaço para TODAS as variáveis globais
-        if self.endereco_atual > 0:
-            self.emitir('PUSHN', self.endereco_atual)
+        # O PUSHN é corrigido no fim porque o corpo ainda pode reservar temporários globais
+        pos_pushn = len(self.codigo)
+        self.emitir('PUSHN', self.endereco_atual)
+        
+        if self.destino is None:
+            yield node[2]
+            self.emitir('STOP')
+            inicio = self.codigo
+        else:
+            # Streaming: o início do main espera pelo PUSHN e o corpo segue para o destino
+            inicio = self.codigo
+            self.codigo = Instrucoes()
+            self.destino.reservar()
+            corpo = node[2]
+            if isinstance(corpo, BeginEnd) and self.destino.por_instrucao:
+                for instrucao in corpo.instrucoes:
+                    yield instrucao
+                    self.descarregar()
+            else:
+                yield corpo
+            self.emitir('STOP')
+            self.descarregar()
         
-        self.visit(node[2])
-        self.emitir('STOP')
+        if self.endereco_atual > 0:
+            inicio.alterar(pos_pushn, self.endereco_atual)
+        else:
+            inicio.remover(pos_pushn)
+        if self.destino is not None:
+            self.destino.preencher(inicio)
 
     def visit_cabecalho(self, node):
         pass
@@ -250,7 +393,7 @@ class GeradorCodigo:
 
     def visit_bloco(self, node):
         _, decls, corpo = node
-        self.visit(corpo)
+        yield corpo
     
     def visit_function(self, node):
         nome = node[1]
@@ -263,12 +406,6 @@ class GeradorCodigo:
         tipo_retorno = str(node[3]).upper() if node[3] else 'INTEGER'
         corpo = node[4]
         
-        # Guardar info da função
-        self.funcoes[nome] = {'label': nome, 'num_params': 0, 'tipo': tipo_retorno}
-        self.emitir('LABEL', f"{nome}:")
-        
-        # Mapear parâmetros para posições locais (relativas ao fp)
-        # Na EWVM, após CALL, os parâmetros estão em fp[-n], fp[-n+1], ..., fp[-1]
         params_info = []
         if params:
             for p in params:
@@ -276,7 +413,9 @@ class GeradorCodigo:
                 for pid in p[1]:
                     params_info.append((pid, tipo_param))
         
-        self.funcoes[nome]['num_params'] = len(params_info)
+        # Guardar info da função
+        self.registar_subprograma(nome, tipo_retorno, len(params_info))
+        self.emitir('LABEL', nome)
         
         # Guardar contexto da função
         old_func = self.funcao_atual
@@ -284,11 +423,8 @@ class GeradorCodigo:
         old_locais = getattr(self, 'vars_locais', {}).copy()
         self.funcao_atual = nome
         
-        # Mapear parâmetros: o primeiro parâmetro está em fp[-num_params], etc.
-        self.params_locais = {}
-        for i, (pid, tipo) in enumerate(params_info):
-            # Parâmetros estão "abaixo" do fp: índice negativo
-            self.params_locais[pid] = {'offset': -(len(params_info) - i), 'tipo': tipo}
+        # Mapear parâmetros para posições locais (relativas ao fp)
+        self.declarar_parametros(params_info)
         
         # Processar variáveis locais da função
         self.vars_locais = {}
@@ -299,11 +435,22 @@ class GeradorCodigo:
             if decls_locais:
                 self.processar_declaracoes_locais(decls_locais)
         
-        # Alocar espaço para variáveis locais
-        if self.local_offset > 0:
-            self.emitir('PUSHN', self.local_offset)
+        # Alocar espaço para variáveis locais (e temporários, corrigido depois do corpo)
+        pos_pushn = len(self.codigo)
+        self.emitir('PUSHN', self.local_offset)
+        old_frame = self.em_frame_local
+        old_livres = self.temps_livres['L']
+        self.em_frame_local = True
+        self.temps_livres['L'] = []
+        
+        yield corpo
         
-        self.visit(corpo)
+        self.em_frame_local = old_frame
+        self.temps_livres['L'] = old_livres
+        if self.local_offset > 0:
+            self.codigo.alterar(pos_pushn, self.local_offset)
+        else:
+            self.codigo.remover(pos_pushn)
         
         # Retorno: o valor já foi guardado em fp[-(num_params+1)] pelo BinToInt := valor
         # Precisamos carregar esse valor para a stack antes de RETURN
@@ -315,6 +462,7 @@ class GeradorCodigo:
         self.funcao_atual = old_func
         self.params_locais = old_params
         self.vars_locais = old_locais
+        self.descarregar()
 
     # CHAMADAS E ACESSOS
 
@@ -324,12 +472,12 @@ class GeradorCodigo:
         
         if nome.lower() == 'length':
             if args:
-                self.visit(args[0])
+                yield args[0]
                 self.emitir('STRLEN') 
             return 'INTEGER'
 
-        if nome in self.funcoes:
-            func_info = self.funcoes[nome]
+        func_info = self.subprograma(nome)
+        if func_info is not None:
             is_procedure = func_info.get('tipo', 'INTEGER') == 'VOID'
             
             # Reservar espaço para o valor de retorno (apenas para funções, não procedures)
@@ -337,39 +485,32 @@ class GeradorCodigo:
                 self.emitir('PUSHI', 0)
             
             for arg in args:
-                self.visit(arg)
+                yield arg
             
             self.emitir('PUSHA', nome) 
             self.emitir('CALL')
+            # O RETURN repõe sp = fp, por isso os argumentos ficam na stack do chamador
+            if args:
+                self.emitir('POP', len(args))
             return func_info.get('tipo', 'INTEGER')
         else:
-            print(f"AVISO: Função '{nome}' não definida.")
+            self.avisar(f"AVISO: Função '{nome}' não definida.")
             return 'INTEGER'
 
     def visit_array_access(self, node):
         nome_var = node[1]
         expr_index = node[2]
         
-        if nome_var not in self.info_arrays:
+        array = self.info_array(nome_var)
+        if array is None:
             # É uma string - pode ser parâmetro, variável local, ou global
-            
-            # Verificar se é um parâmetro local
-            if hasattr(self, 'params_locais') and nome_var in self.params_locais:
-                offset = self.params_locais[nome_var]['offset']
-                self.emitir('PUSHL', offset)
-            # Verificar se é uma variável local
-            elif hasattr(self, 'vars_locais') and nome_var in self.vars_locais:
-                offset = self.vars_locais[nome_var]['offset']
-                self.emitir('PUSHL', offset)
-            # Variável global
-            elif nome_var in self.tabela_simbolos:
-                addr = self.tabela_simbolos[nome_var]['addr']
-                self.emitir('PUSHG', addr)
-            else:
-                print(f"ERRO: Variável '{nome_var}' não declarada")
+            local = self.localizar(nome_var)
+            if local is None:
+                self.avisar(f"ERRO: Variável '{nome_var}' não declarada")
                 return 'CHAR'
+            self.emitir('PUSHL' if local[0] == 'L' else 'PUSHG', local[1])
             
-            self.visit(expr_index)
+            yield expr_index
             self.emitir('PUSHI', 1)
             self.emitir('SUB')
             
@@ -377,9 +518,8 @@ class GeradorCodigo:
             return 'CHAR'
         else:
             # É um array
-            addr_base = self.tabela_simbolos[nome_var]['addr']
-            min_idx = self.info_arrays[nome_var]['min']
-            tipo_base = self.info_arrays[nome_var].get('tipo_base', 'INTEGER')
+            addr_base = self.localizar_global(nome_var)[0]
+            min_idx, tipo_base = array
             
             # PUSHGP + offset do array
             self.emitir('PUSHGP')
@@ -387,7 +527,7 @@ class GeradorCodigo:
             self.emitir('PADD')
             
             # Índice - min
-            self.visit(expr_index)
+            yield expr_index
             self.emitir('PUSHI', min_idx)
             self.emitir('SUB')
             
@@ -397,7 +537,7 @@ class GeradorCodigo:
     # INSTRUÇÕES
 
     def visit_begin_end(self, node): 
-        self.visit(node[1])
+        yield node[1]
     
     def visit_assign(self, node):
         _, var_node, expr_node = node
@@ -406,14 +546,16 @@ class GeradorCodigo:
             nome_array = var_node[1]
             expr_index = var_node[2]
             
-            if nome_array not in self.tabela_simbolos:
-                print(f"ERRO: Variável '{nome_array}' não declarada")
+            global_ = self.localizar_global(nome_array)
+            if global_ is None:
+                self.avisar(f"ERRO: Variável '{nome_array}' não declarada")
                 return
                 
-            addr_base = self.tabela_simbolos[nome_array]['addr']
+            addr_base = global_[0]
+            array = self.info_array(nome_array)
             
-            if nome_array in self.info_arrays:
-                min_idx = self.info_arrays[nome_array]['min']
+            if array is not None:
+                min_idx = array[0]
                 
                 # STOREN: stores value in address[index]
                 # Stack order: address, index, value (bottom to top)
@@ -424,52 +566,41 @@ class GeradorCodigo:
                 self.emitir('PADD')
                 
                 # Índice
-                self.visit(expr_index)
+                yield expr_index
                 self.emitir('PUSHI', min_idx)
                 self.emitir('SUB')
                 
                 # Valor
-                self.visit(expr_node)
+                yield expr_node
                 
                 self.emitir('STOREN')
             else:
-                print(f"AVISO: Atribuição a caractere de string não suportada")
+                self.avisar(f"AVISO: Atribuição a caractere de string não suportada")
                 
         elif var_node[0] == 'var':
-            self.visit(expr_node)
+            yield expr_node
             nome = var_node[1]
             
             # Verificar se é atribuição do valor de retorno da função (NomeFuncao := valor)
-            if hasattr(self, 'funcao_atual') and self.funcao_atual and nome == self.funcao_atual:
+            if self.funcao_atual and nome == self.funcao_atual:
                 # Guardar o valor de retorno - fica na stack para RETURN
                 # Usar STOREL -2 para guardar no espaço de retorno (abaixo dos parâmetros)
-                num_params = len(self.params_locais) if hasattr(self, 'params_locais') else 0
+                num_params = self.subprograma(nome)['num_params']
                 self.emitir('STOREL', -(num_params + 1))
                 return
             
-            # Verificar se é um parâmetro local
-            if hasattr(self, 'params_locais') and nome in self.params_locais:
-                offset = self.params_locais[nome]['offset']
-                self.emitir('STOREL', offset)
-                return
-            
-            # Verificar se é uma variável local
-            if hasattr(self, 'vars_locais') and nome in self.vars_locais:
-                offset = self.vars_locais[nome]['offset']
-                self.emitir('STOREL', offset)
-                return
-            
-            if nome not in self.tabela_simbolos:
-                print(f"ERRO: Variável '{nome}' não declarada")
+            # Parâmetro ou variável local (STOREL) ou global (STOREG)
+            local = self.localizar(nome)
+            if local is None:
+                self.avisar(f"ERRO: Variável '{nome}' não declarada")
                 return
-            addr = self.tabela_simbolos[nome]['addr']
-            self.emitir('STOREG', addr)
+            self.emitir('STOREL' if local[0] == 'L' else 'STOREG', local[1])
 
     def visit_writeln(self, node):
         exprs = node[1]
         for expr in exprs:
-            tipo = self.inferir_tipo(expr)
-            self.visit(expr)
+            yield expr
+            tipo = self.tipo_de(expr)
             
             if tipo == 'STRING':
                 self.emitir('WRITES')
@@ -484,8 +615,8 @@ class GeradorCodigo:
     def visit_write(self, node):
         exprs = node[1]
         for expr in exprs:
-            tipo = self.inferir_tipo(expr)
-            self.visit(expr)
+            yield expr
+            tipo = self.tipo_de(expr)
             
             if tipo == 'STRING':
                 self.emitir('WRITES')
@@ -502,12 +633,12 @@ class GeradorCodigo:
             
             if var_node[0] == 'var':
                 nome = var_node[1]
-                if nome not in self.tabela_simbolos:
-                    print(f"ERRO: Variável '{nome}' não declarada")
+                global_ = self.localizar_global(nome)
+                if global_ is None:
+                    self.avisar(f"ERRO: Variável '{nome}' não declarada")
                     continue
                     
-                tipo = self.tabela_simbolos[nome].get('tipo', 'INTEGER')
-                addr = self.tabela_simbolos[nome]['addr']
+                addr, tipo = global_
                 
                 if tipo == 'INTEGER':
                     self.emitir('ATOI')
@@ -520,15 +651,16 @@ class GeradorCodigo:
                 nome_array = var_node[1]
                 expr_index = var_node[2]
                 
-                if nome_array not in self.tabela_simbolos:
-                    print(f"ERRO: Variável '{nome_array}' não declarada")
+                global_ = self.localizar_global(nome_array)
+                if global_ is None:
+                    self.avisar(f"ERRO: Variável '{nome_array}' não declarada")
                     continue
                 
-                addr_base = self.tabela_simbolos[nome_array]['addr']
+                addr_base = global_[0]
+                array = self.info_array(nome_array)
                 
-                if nome_array in self.info_arrays:
-                    min_idx = self.info_arrays[nome_array]['min']
-                    tipo_base = self.info_arrays[nome_array].get('tipo_base', 'INTEGER')
+                if array is not None:
+                    min_idx, tipo_base = array
                     
                     if tipo_base == 'INTEGER':
                         self.emitir('ATOI')
@@ -546,7 +678,7 @@ class GeradorCodigo:
                     self.emitir('PADD')
                     
                     # Índice
-                    self.visit(expr_index)
+                    yield expr_index
                     self.emitir('PUSHI', min_idx)
                     self.emitir('SUB')
                     
@@ -556,106 +688,201 @@ class GeradorCodigo:
                     self.emitir('STOREN')
 
     def visit_read(self, node):
-        self.visit_readln(node)
+        return self.visit_readln(node)
 
     def visit_if(self, node):
         _, cond, stmt_then, stmt_else = node
         lbl_else = self.novo_label()
         lbl_fim = self.novo_label()
         
-        self.visit(cond)
-        self.emitir('JZ', lbl_else if stmt_else else lbl_fim)
-        self.visit(stmt_then)
+        yield self.gerar_condicao(cond, lbl_else if stmt_else else lbl_fim)
+        yield stmt_then
         
         if stmt_else:
             self.emitir('JUMP', lbl_fim)
-            self.emitir('LABEL', f'{lbl_else}:')
-            self.visit(stmt_else)
+            self.emitir('LABEL', lbl_else)
+            yield stmt_else
         
-        self.emitir('LABEL', f'{lbl_fim}:')
+        self.emitir('LABEL', lbl_fim)
 
     def visit_while(self, node):
         lbl_ini = self.novo_label()
         lbl_fim = self.novo_label()
         
-        self.emitir('LABEL', f'{lbl_ini}:')
-        self.visit(node[1])
-        self.emitir('JZ', lbl_fim)
-        self.visit(node[2])
+        if self.rodar_ciclos:
+            # Ciclo rodado: teste de entrada e condição no fim, com um só salto por iteração
+            yield self.gerar_condicao(node[1], lbl_fim)
+            self.emitir('LABEL', lbl_ini)
+            yield node[2]
+            yield self.gerar_condicao(node[1], lbl_ini, salta_se=True)
+            self.emitir('LABEL', lbl_fim)
+            return
+        
+        self.emitir('LABEL', lbl_ini)
+        yield self.gerar_condicao(node[1], lbl_fim)
+        yield node[2]
         self.emitir('JUMP', lbl_ini)
-        self.emitir('LABEL', f'{lbl_fim}:')
+        self.emitir('LABEL', lbl_fim)
 
     def visit_for(self, node):
         _, var, ini, fim, dir, corpo = node
         lbl_ini = self.novo_label()
         lbl_fim = self.novo_label()
         
-        # Verificar se é variável local, parâmetro ou global
-        is_local = var in self.vars_locais
-        is_param = var in self.params_locais
-        is_global = var in self.tabela_simbolos
-        
-        if not is_local and not is_param and not is_global:
-            print(f"ERRO: Variável de controlo '{var}' não declarada")
+        # Variável local ou parâmetro (na frame) ou global
+        local = self.localizar(var)
+        if local is None:
+            self.avisar(f"ERRO: Variável de controlo '{var}' não declarada")
             return
+        carregar = ('PUSHL' if local[0] == 'L' else 'PUSHG', local[1])
+        guardar = ('STOREL' if local[0] == 'L' else 'STOREG', local[1])
         
         # Inicialização
-        self.visit(ini)
-        if is_local:
-            self.emitir('STOREL', self.vars_locais[var]['offset'])
-        elif is_param:
-            self.emitir('STOREL', self.params_locais[var]['offset'])
-        else:
-            self.emitir('STOREG', self.tabela_simbolos[var]['addr'])
+        yield ini
         
-        # Loop
-        self.emitir('LABEL', f'{lbl_ini}:')
-        if is_local:
-            self.emitir('PUSHL', self.vars_locais[var]['offset'])
-        elif is_param:
-            self.emitir('PUSHL', self.params_locais[var]['offset'])
-        else:
-            self.emitir('PUSHG', self.tabela_simbolos[var]['addr'])
-        self.visit(fim)
+        # O limite final é avaliado uma única vez, antes da atribuição inicial (como em
+        # Pascal), e guardado num temporário; literais são usados diretamente
+        temp_fim = None
+        if self.limite_for_unico and not self.literal(fim):
+            temp_fim = self.novo_temporario()
+            yield fim
+            self.guardar_temporario(temp_fim)
         
-        if dir == 'to':
-            self.emitir('INFEQ')
-        else:
-            self.emitir('SUPEQ')
+        self.emitir(*guardar)
+        
+        def testar(lbl, salta_se):
+            # var <= fim (to) ou var >= fim (downto); salta para lbl conforme salta_se
+            self.emitir(*carregar)
+            if temp_fim is not None:
+                self.carregar_temporario(temp_fim)
+            else:
+                yield fim
+            if salta_se:
+                self.emitir('SUP' if dir == 'to' else 'INF')
+            else:
+                self.emitir('INFEQ' if dir == 'to' else 'SUPEQ')
+            self.emitir('JZ', lbl)
         
-        self.emitir('JZ', lbl_fim)
+        # Loop
+        if self.rodar_ciclos:
+            # Teste de entrada e teste no fim com um único salto condicional para trás
+            yield testar(lbl_fim, False)
+            self.emitir('LABEL', lbl_ini)
+        else:
+            self.emitir('LABEL', lbl_ini)
+            yield testar(lbl_fim, False)
         
-        self.visit(corpo)
+        yield corpo
         
         # Incrementar/decrementar
-        if is_local:
-            self.emitir('PUSHL', self.vars_locais[var]['offset'])
-        elif is_param:
-            self.emitir('PUSHL', self.params_locais[var]['offset'])
-        else:
-            self.emitir('PUSHG', self.tabela_simbolos[var]['addr'])
+        self.emitir(*carregar)
         self.emitir('PUSHI', 1)
         if dir == 'to':
             self.emitir('ADD')
         else:
             self.emitir('SUB')
-        if is_local:
-            self.emitir('STOREL', self.vars_locais[var]['offset'])
-        elif is_param:
-            self.emitir('STOREL', self.params_locais[var]['offset'])
+        self.emitir(*guardar)
+        
+        if self.rodar_ciclos:
+            yield testar(lbl_ini, True)
         else:
-            self.emitir('STOREG', self.tabela_simbolos[var]['addr'])
+            self.emitir('JUMP', lbl_ini)
+        self.emitir('LABEL', lbl_fim)
         
-        self.emitir('JUMP', lbl_ini)
-        self.emitir('LABEL', f'{lbl_fim}:')
+        if temp_fim is not None:
+            self.libertar_temporario(temp_fim)
+
+    def literal(self, node):
+        """Verdadeiro para literais inteiros (ou caracteres já dobrados)"""
+        if isinstance(node, int) or isinstance(node, Char):
+            return True
+        return False
+
+    # CONDIÇÕES COM SALTOS (CURTO-CIRCUITO)
+
+    def gerar_condicao(self, node, lbl, salta_se=False):
+        """Gera código que salta para lbl quando o valor lógico de node é salta_se
+        (e continua na instrução seguinte no caso contrário)"""
+        if not self.curto_circuito:
+            yield node
+            if salta_se:
+                self.emitir('NOT')
+            self.emitir('JZ', lbl)
+            return
+        
+        if isinstance(node, bool):
+            if node == salta_se:
+                self.emitir('JUMP', lbl)
+            return
+        
+        if isinstance(node, Unop) and node.op == 'not':
+            yield self.gerar_condicao(node.operando, lbl, not salta_se)
+            return
+        
+        if isinstance(node, Binop):
+            op = node.op
+            if op in ('and', 'or'):
+                # 'a and b' salta para o falso logo que a for falso; 'a or b' para o
+                # verdadeiro logo que a for verdadeiro. Nos outros casos o primeiro
+                # operando salta por cima do segundo.
+                if (op == 'and') != salta_se:
+                    yield self.gerar_condicao(node.esq, lbl, salta_se)
+                    yield self.gerar_condicao(node.dir, lbl, salta_se)
+                else:
+                    lbl_seguinte = self.novo_label()
+                    yield self.gerar_condicao(node.esq, lbl_seguinte, not salta_se)
+                    yield self.gerar_condicao(node.dir, lbl, salta_se)
+                    self.emitir('LABEL', lbl_seguinte)
+                return
+            
+            if salta_se and op in RELACIONAL_OPOSTO:
+                # Saltar quando 'a < b' é verdadeiro == JZ sobre 'a >= b'
+                yield node.esq
+                yield node.dir
+                self.emitir(RELACIONAL_OPOSTO[op])
+                self.emitir('JZ', lbl)
+                return
+            if salta_se and op in ('<>', '!='):
+                yield node.esq
+                yield node.dir
+                self.emitir('EQUAL')
+                self.emitir('JZ', lbl)
+                return
+        
+        yield node
+        if salta_se:
+            self.emitir('NOT')
+        self.emitir('JZ', lbl)
 
     def visit_binop(self, node):
-        _, op, l, r = node
-        self.visit(l)
-        self.visit(r)
+        op = node.op
+        
+        if op in ('and', 'or') and self.curto_circuito and self.curto_circuito_valores:
+            # Valor lógico calculado com saltos: o segundo operando só é avaliado se preciso
+            lbl_falso = self.novo_label()
+            lbl_fim = self.novo_label()
+            yield self.gerar_condicao(node, lbl_falso)
+            self.emitir('PUSHI', 1)
+            self.emitir('JUMP', lbl_fim)
+            self.emitir('LABEL', lbl_falso)
+            self.emitir('PUSHI', 0)
+            self.emitir('LABEL', lbl_fim)
+            return 'BOOLEAN'
+        
+        if op == '/':
+            # Divisão real: os operandos inteiros passam a REAL antes do FDIV
+            for operando in (node.esq, node.dir):
+                yield operando
+                if self.tipo_de(operando) != 'REAL':
+                    self.emitir('ITOF')
+            self.emitir('FDIV')
+            return 'REAL'
+        
+        yield node.esq
+        yield node.dir
         
         ops = {
-            '+': 'ADD', '-': 'SUB', '*': 'MUL', '/': 'DIV', 
+            '+': 'ADD', '-': 'SUB', '*': 'MUL', 
             'div': 'DIV', 'mod': 'MOD',
             'and': 'AND', 'or': 'OR', 
             '=': 'EQUAL', '<': 'INF', '>': 'SUP', 
@@ -673,74 +900,224 @@ class GeradorCodigo:
         return 'INTEGER'
 
     def visit_unop(self, node):
-        _, op, e = node
-        self.visit(e)
+        op = node.op
+        e = node.operando
+        yield e
         if op == 'not':
             self.emitir('NOT')
             return 'BOOLEAN'
         elif op == '-':
             self.emitir('PUSHI', -1)
             self.emitir('MUL')
-        return self.inferir_tipo(e)
+        return self.tipo_de(e)
+
+    def visit_expandida(self, node):
+        # Chamada expandida no sítio (expandir.py): o corpo e depois o valor do resultado
+        yield node.instrucoes
+        return (yield node.resultado)
+
+    def visit_char(self, node):
+        # Literal de um caracter já convertido para código pela dobragem de constantes
+        self.emitir('PUSHI', node.codigo)
+        return 'CHAR'
 
     def visit_var(self, node):
-        nome = node[1]
-        
-        # Verificar se é um parâmetro local da função atual
-        if hasattr(self, 'params_locais') and nome in self.params_locais:
-            offset = self.params_locais[nome]['offset']
-            self.emitir('PUSHL', offset)
-            return self.params_locais[nome].get('tipo', 'INTEGER')
-        
-        # Verificar se é uma variável local da função atual
-        if hasattr(self, 'vars_locais') and nome in self.vars_locais:
-            offset = self.vars_locais[nome]['offset']
-            self.emitir('PUSHL', offset)
-            return self.vars_locais[nome].get('tipo', 'INTEGER')
+        nome = node.nome
         
-        if nome not in self.tabela_simbolos:
-            print(f"ERRO: Variável '{nome}' não declarada")
+        # Parâmetro ou variável local da função atual, ou global
+        local = self.localizar(nome)
+        if local is None:
+            self.avisar(f"ERRO: Variável '{nome}' não declarada")
             return 'INTEGER'
-        addr = self.tabela_simbolos[nome]['addr']
-        self.emitir('PUSHG', addr)
-        return self.tabela_simbolos[nome].get('tipo', 'INTEGER')
+        frame, posicao, tipo = local
+        self.emitir('PUSHL' if frame == 'L' else 'PUSHG', posicao)
+        return tipo
+
+
+TAMANHO_BUFFER = 1 << 16  # buffer dos ficheiros .vm (as linhas são escritas em blocos)
+
+
+def linhas_vm(codigo):
+    """As linhas do buffer de instruções no formato .vm (labels na coluna 0)"""
+    for op, arg in codigo:
+        if op == 'LABEL':
+            yield f"{arg}:\n"
+        else:
+            yield f"\t{formatar(op, arg)}\n"
+
+
+def escrever_vm(codigo, nome_saida):
+    with open(nome_saida, "w", buffering=TAMANHO_BUFFER) as f:
+        f.writelines(linhas_vm(codigo))
+
+
+# STREAMING
+# Com um destino, o GeradorCodigo não guarda o programa inteiro: no fim de cada subprograma
+# (e de cada instrução do main) entrega o código ao destino e começa um buffer novo. As
+# labels ficam por nome no .vm, por isso um salto para a frente (o JUMP main do início) não
+# precisa de ser corrigido. O que precisa é o PUSHN do main, que só se sabe no fim: o início
+# do main fica em memória e o corpo vai para um temporário até o PUSHN estar certo.
+
+class SaidaVM:
+    """Destino em streaming: escreve cada pedaço de código no .vm assim que está pronto
+
+    otimizar(codigo, referidas), se existir, é aplicado a cada pedaço antes de o escrever;
+    referidas são as labels usadas nos pedaços já escritos (que o peephole não pode tirar).
+    Nesse caso o main é entregue de uma vez, porque o peephole não otimiza entre pedaços.
+    """
+
+    def __init__(self, nome_saida, otimizar=None):
+        self.nome = nome_saida
+        self.otimizar = otimizar
+        self.referidas = set()
+        self.ficheiro = open(nome_saida, "w", buffering=TAMANHO_BUFFER)
+        self.atual = self.ficheiro
+        self.instrucoes = 0
+
+    @property
+    def por_instrucao(self):
+        return self.otimizar is None
+
+    def escrever(self, codigo):
+        if self.otimizar is not None:
+            codigo = self.otimizar(codigo, self.referidas)
+            self.referidas.update(arg for op, arg in codigo if op in ('JUMP', 'JZ', 'PUSHA'))
+        self.instrucoes += len(codigo)
+        self.atual.writelines(linhas_vm(codigo))
+
+    def reservar(self):
+        """Os pedaços seguintes vão para um temporário até preencher()"""
+        self.atual = tempfile.TemporaryFile("w+", buffering=TAMANHO_BUFFER)
+
+    def preencher(self, codigo):
+        """Escreve codigo (o que ficou para trás) seguido do que foi para o temporário"""
+        temporario = self.atual
+        self.atual = self.ficheiro
+        self.escrever(codigo)
+        temporario.seek(0)
+        shutil.copyfileobj(temporario, self.ficheiro, TAMANHO_BUFFER)
+        temporario.close()
+
+    def fechar(self):
+        if self.atual is not self.ficheiro:
+            self.atual.close()
+        self.ficheiro.close()
+
+    def descartar(self):
+        """Fecha e apaga o ficheiro (a compilação falhou a meio)"""
+        self.fechar()
+        os.remove(self.nome)
 
 
 # MAIN
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Uso: python3 maquina.py <ficheiro.pas>")
+    cli = argparse.ArgumentParser(description="Compilador Pascal -> EWVM")
+    cli.add_argument('ficheiro', help="ficheiro .pas a compilar")
+    cli.add_argument('--scanner', choices=SCANNERS, default='ply',
+                     help="analisador léxico: o do PLY ou o de expressão mestra (rapido)")
+    cli.add_argument('-O', '--otimizar', action='store_true',
+                     help="dobra constantes na AST, expande as chamadas a subprogramas pequenos, desenrola "
+                          "os for com limites constantes, roda os ciclos e aplica os passos sobre blocos e o "
+                          "peephole")
+    cli.add_argument('--sem-dobragem', action='store_true',
+                     help="com -O, não dobra constantes na AST")
+    cli.add_argument('--sem-rotacao', action='store_true',
+                     help="com -O, mantém o teste dos ciclos no início")
+    cli.add_argument('--sem-regra', action='append', default=[], metavar='REGRA',
+                     help="desativa uma regra do peephole (pode repetir-se)")
+    cli.add_argument('--sem-passo', action='append', default=[], metavar='PASSO',
+                     help="desativa um passo sobre o grafo de blocos (pode repetir-se)")
+    cli.add_argument('--desenrolar', type=int, default=4, metavar='FATOR',
+                     help="com -O, cópias do corpo por volta nos for longos (1 só desenrola os curtos)")
+    cli.add_argument('--orcamento-desenrolar', type=int, default=1000, metavar='NOS',
+                     help="com -O, quantos nós da AST o desenrolamento pode acrescentar ao programa")
+    cli.add_argument('--expandir', type=int, default=40, metavar='NOS',
+                     help="com -O, tamanho máximo (nós da AST) dos subprogramas expandidos no sítio da "
+                          "chamada (0 não expande)")
+    cli.add_argument('--orcamento-expansao', type=int, default=1000, metavar='NOS',
+                     help="com -O, quantos nós da AST a expansão de subprogramas pode acrescentar ao programa")
+    cli.add_argument('--fundido', action='store_true',
+                     help="verifica e gera código numa só travessia da AST, com uma só tabela de símbolos "
+                          "(com -O, só a rotação dos ciclos, os passos sobre blocos e o peephole)")
+    cli.add_argument('--streaming', action='store_true',
+                     help="escreve o .vm à medida que o código é gerado, sem o guardar todo em memória")
+    cli.add_argument('--vmb', action='store_true',
+                     help="escreve o formato binário .vmb (labels já resolvidas) em vez do .vm")
+    cli.add_argument('--estatisticas', action='store_true',
+                     help="mostra quantas vezes cada otimização foi aplicada")
+    cli.add_argument('--cache', nargs='?', const='', metavar='DIR',
+                     help="reutiliza compilações guardadas em disco (por omissão em ~/.cache/plc2025)")
+    cli.add_argument('--cache-limite', type=int, default=64, metavar='MB',
+                     help="tamanho máximo da cache; apaga as entradas usadas há mais tempo")
+    opcoes = cli.parse_args()
+    if opcoes.streaming and opcoes.vmb:
+        cli.error("--streaming só escreve o formato .vm (o .vmb precisa das labels resolvidas)")
+    
+    from compilador import Compilador
+    from cache import CacheCompilacao, PASTA_OMISSAO
+    cache = None
+    if opcoes.cache is not None:
+        cache = CacheCompilacao(opcoes.cache or PASTA_OMISSAO, opcoes.cache_limite * 1024 * 1024)
+    try:
+        compilador = Compilador(opcoes.scanner, otimizar=opcoes.otimizar,
+                                dobragem=not opcoes.sem_dobragem, rotacao=not opcoes.sem_rotacao,
+                                desativadas=opcoes.sem_regra, cache=cache, fundido=opcoes.fundido,
+                                passos_desativados=opcoes.sem_passo, fator_desenrolar=opcoes.desenrolar,
+                                orcamento_desenrolar=opcoes.orcamento_desenrolar,
+                                maximo_expansao=opcoes.expandir, orcamento_expansao=opcoes.orcamento_expansao)
+    except ValueError as e:
+        print(f"Erro: {e}")
         sys.exit(1)
     
-    filename = sys.argv[1]
-    ast = parse_file(filename)
+    filename = opcoes.ficheiro
+    extensao = '.vmb' if opcoes.vmb else '.vm'
+    nome_saida = filename.replace('.pas', extensao)
+    if nome_saida == filename: 
+        nome_saida += extensao
+    
+    try:
+        if opcoes.streaming:
+            with open(filename, 'r') as f:
+                fonte = f.read()
+            resultado = compilador.compilar_para(fonte, nome_saida)
+        else:
+            resultado = compilador.compilar_ficheiro(filename)
+    except FileNotFoundError:
+        print(f"Erro: Arquivo '{filename}' não encontrado.")
+        sys.exit(1)
+    except OSError as e:
+        print(f"Erro ao escrever ficheiro: {e}")
+        sys.exit(1)
     
-    if ast:
-        # Análise semântica
-        analisador = AnalisadorSemantico()
-        analisador.visit(ast)
-        
-        if analisador.erros:
-            for erro in analisador.erros:
-                print(erro)
-            sys.exit(1)
-        
-        # Geração de código EWVM se passar no semantica
-        gerador = GeradorCodigo()
-        gerador.visit(ast)
-        
-        nome_saida = filename.replace('.pas', '.vm')
-        if nome_saida == filename: 
-            nome_saida += ".vm"
-        
-        try:
-            with open(nome_saida, "w") as f:
-                for instr in gerador.codigo:
-                    if instr.startswith('LABEL') or instr.endswith(':'):
-                        clean_instr = instr.replace('LABEL ', '')
-                        f.write(f"{clean_instr}\n")
-                    else:
-                        f.write(f"\t{instr}\n")
-            print(f"Sucesso! {nome_saida}")
-        except Exception as e: 
-            print(f"Erro ao escrever ficheiro: {e}")
+    for diagnostico in resultado.diagnosticos:
+        print(diagnostico)
+    if not resultado.sucesso:
+        sys.exit(1)
+    
+    # Num acerto da cache nenhuma fase correu: os relatórios das otimizações estariam a zeros
+    estatisticas = opcoes.estatisticas and not resultado.da_cache
+    if estatisticas and compilador.dobrador:
+        print(f"Dobragem: {dict(compilador.dobrador.dobragens)}")
+    if estatisticas and compilador.expansor:
+        print(f"Expansão: {dict(compilador.expansor.expandidas)}, +{compilador.expansor.crescimento} nós")
+    if estatisticas and compilador.desenrolador:
+        print(f"Desenrolamento: {dict(compilador.desenrolador.desenrolados)}, "
+              f"+{compilador.desenrolador.crescimento} nós")
+    if estatisticas and compilador.passos:
+        print(compilador.passos.relatorio())
+    if estatisticas and compilador.otimizador:
+        print(compilador.otimizador.relatorio())
+    if opcoes.estatisticas and cache:
+        print(cache.relatorio())
+    
+    if resultado.saida:
+        print(f"Sucesso! {nome_saida}")
+        sys.exit(0)
+    try:
+        if opcoes.vmb:
+            escrever_vmb(resultado.codigo, nome_saida)
+        else:
+            escrever_vm(resultado.codigo, nome_saida)
+        print(f"Sucesso! {nome_saida}")
+    except Exception as e: 
+        print(f"Erro ao escrever ficheiro: {e}")
@@ -0,0 +1,365 @@
+from collections import Counter
+
+from blocos import consumidor
+from instrucoes import Instrucoes
+
+# OTIMIZADOR PEEPHOLE
+# Corre sobre GeradorCodigo.codigo entre a geração de código e a escrita do ficheiro.
+# Cada regra da tabela REGRAS recebe a lista de instruções (já separadas em [op, arg]),
+# altera-a no lugar e devolve o número de vezes que foi aplicada. O otimizador repete
+# as regras até nenhuma mudar nada (ponto fixo) e guarda as contagens por regra.
+
+MAX_ITERACOES = 50
+
+SALTOS = ('JUMP', 'JZ')
+FIM_FLUXO = ('JUMP', 'STOP', 'RETURN')
+EMPILHA_UM = ('PUSHI', 'PUSHF', 'PUSHS', 'PUSHG', 'PUSHL')
+
+OPS_CONSTANTES = {
+    'ADD': lambda a, b: a + b,
+    'SUB': lambda a, b: a - b,
+    'MUL': lambda a, b: a * b,
+    'EQUAL': lambda a, b: int(a == b),
+    'INF': lambda a, b: int(a < b),
+    'INFEQ': lambda a, b: int(a <= b),
+    'SUP': lambda a, b: int(a > b),
+    'SUPEQ': lambda a, b: int(a >= b),
+    'AND': lambda a, b: int(bool(a) and bool(b)),
+    'OR': lambda a, b: int(bool(a) or bool(b)),
+}
+
+# not (a < b) == (a >= b), etc. (só antes de um JZ, onde apenas interessa o valor lógico)
+RELACIONAL_INVERSO = {'INF': 'SUPEQ', 'INFEQ': 'SUP', 'SUP': 'INFEQ', 'SUPEQ': 'INF'}
+RELACIONAIS = ('EQUAL', 'INF', 'INFEQ', 'SUP', 'SUPEQ')
+
+
+def decompor(codigo):
+    """Converte o buffer GeradorCodigo.codigo em [op, arg] (arg já com o seu valor)"""
+    return [[op, arg] for op, arg in codigo]
+
+
+def compor(instrs):
+    codigo = Instrucoes()
+    for op, arg in instrs:
+        codigo.emitir(op, arg)
+    return codigo
+
+
+def _inteiro(instr):
+    """Valor de um PUSHI (ou None se não for um PUSHI inteiro)"""
+    if instr[0] != 'PUSHI' or not isinstance(instr[1], int):
+        return None
+    return instr[1]
+
+
+def regra_local(funcao):
+    """Transforma uma regra de janela (codigo, i) -> None | (n, substituto) numa regra de passagem"""
+    def aplicar(instrs):
+        hits = 0
+        i = 0
+        while i < len(instrs):
+            resultado = funcao(instrs, i)
+            if resultado is None:
+                i += 1
+                continue
+            n, substituto = resultado
+            instrs[i:i + n] = substituto
+            hits += 1
+            # Recuar um pouco: a substituição pode criar um padrão com a instrução anterior
+            i = max(i - 3, 0)
+        return hits
+    aplicar.__name__ = funcao.__name__
+    aplicar.__doc__ = funcao.__doc__
+    return aplicar
+
+
+# REGRAS LOCAIS
+
+@regra_local
+def dobrar_constantes(instrs, i):
+    """PUSHI a / PUSHI b / OP -> PUSHI (a OP b)"""
+    if i + 2 >= len(instrs):
+        return None
+    a = _inteiro(instrs[i])
+    b = _inteiro(instrs[i + 1])
+    op = instrs[i + 2][0]
+    if a is None or b is None:
+        return None
+    if op in OPS_CONSTANTES:
+        return 3, [['PUSHI', OPS_CONSTANTES[op](a, b)]]
+    if op in ('DIV', 'MOD') and b != 0:
+        q = abs(a) // abs(b) * (1 if (a < 0) == (b < 0) else -1)
+        return 3, [['PUSHI', q if op == 'DIV' else a - b * q]]
+    return None
+
+
+@regra_local
+def not_constante(instrs, i):
+    """PUSHI a / NOT -> PUSHI (not a)"""
+    if i + 1 >= len(instrs) or instrs[i + 1][0] != 'NOT':
+        return None
+    a = _inteiro(instrs[i])
+    if a is None:
+        return None
+    return 2, [['PUSHI', 0 if a else 1]]
+
+
+@regra_local
+def elemento_neutro(instrs, i):
+    """PUSHI 0 / ADD|SUB|PADD e PUSHI 1 / MUL|DIV desaparecem"""
+    if i + 1 >= len(instrs):
+        return None
+    a = _inteiro(instrs[i])
+    op = instrs[i + 1][0]
+    if a == 0 and op in ('ADD', 'SUB', 'PADD'):
+        return 2, []
+    if a == 1 and op in ('MUL', 'DIV'):
+        return 2, []
+    return None
+
+
+@regra_local
+def negacao_dupla(instrs, i):
+    """REL / NOT / NOT -> REL e NOT / NOT / JZ -> JZ"""
+    if i + 2 >= len(instrs) or instrs[i + 1][0] != 'NOT':
+        return None
+    if instrs[i][0] in RELACIONAIS and instrs[i + 2][0] == 'NOT':
+        return 3, [instrs[i]]
+    if instrs[i][0] == 'NOT' and instrs[i + 2][0] == 'JZ':
+        return 3, [instrs[i + 2]]
+    return None
+
+
+@regra_local
+def inverter_comparacao(instrs, i):
+    """INF / NOT / JZ L -> SUPEQ / JZ L (e os restantes relacionais de ordem)"""
+    if i + 2 >= len(instrs):
+        return None
+    op = instrs[i][0]
+    if op in RELACIONAL_INVERSO and instrs[i + 1][0] == 'NOT' and instrs[i + 2][0] == 'JZ':
+        return 3, [[RELACIONAL_INVERSO[op], None], instrs[i + 2]]
+    return None
+
+
+@regra_local
+def condicao_constante(instrs, i):
+    """PUSHI 0 / JZ L -> JUMP L e PUSHI k / JZ L -> (nada) para k != 0"""
+    if i + 1 >= len(instrs) or instrs[i + 1][0] != 'JZ':
+        return None
+    a = _inteiro(instrs[i])
+    if a is None:
+        return None
+    if a == 0:
+        return 2, [['JUMP', instrs[i + 1][1]]]
+    return 2, []
+
+
+@regra_local
+def acesso_array_constante(instrs, i):
+    """PUSHGP / PUSHI k / PADD / PUSHI j / LOADN -> PUSHG k+j (e o STOREN equivalente)"""
+    if i + 2 >= len(instrs) or instrs[i][0] != 'PUSHGP':
+        return None
+    # Forma já reduzida: PUSHGP / PUSHI n / LOADN
+    n = _inteiro(instrs[i + 1])
+    if n is not None and instrs[i + 2][0] == 'LOADN':
+        return 3, [['PUSHG', n]]
+    if n is not None and i + 3 < len(instrs) and instrs[i + 2][0] in EMPILHA_UM and instrs[i + 3][0] == 'STOREN':
+        return 4, [instrs[i + 2], ['STOREG', n]]
+    if i + 4 >= len(instrs) or instrs[i + 2][0] != 'PADD':
+        return None
+    k = _inteiro(instrs[i + 1])
+    j = _inteiro(instrs[i + 3])
+    if k is None or j is None:
+        return None
+    if instrs[i + 4][0] == 'LOADN':
+        return 5, [['PUSHG', k + j]]
+    if i + 5 < len(instrs) and instrs[i + 4][0] in EMPILHA_UM and instrs[i + 5][0] == 'STOREN':
+        return 6, [instrs[i + 4], ['STOREG', k + j]]
+    return None
+
+
+@regra_local
+def base_array(instrs, i):
+    """PUSHGP / PUSHI k / PADD / X / PUSHI m / SUB -> PUSHGP / X / PUSHI k-m / ADD
+
+    O par (endereço, índice) gerado para um acesso a array só é consumido por LOADN ou
+    STOREN, que somam os dois; por isso o deslocamento da base pode passar para o índice,
+    mas só se o SUB acaba o índice (em v[(x - 1) * 2] o resultado do SUB vai para o MUL).
+    """
+    if i + 5 >= len(instrs) or instrs[i][0] != 'PUSHGP' or instrs[i + 2][0] != 'PADD':
+        return None
+    if instrs[i + 3][0] not in EMPILHA_UM or instrs[i + 5][0] != 'SUB':
+        return None
+    fim = consumidor(instrs, i + 5)
+    if fim is None or (instrs[fim[0]][0], fim[1]) not in (('LOADN', 0), ('STOREN', 1)):
+        return None
+    k = _inteiro(instrs[i + 1])
+    m = _inteiro(instrs[i + 4])
+    if k is None or m is None:
+        return None
+    return 6, [['PUSHGP', None], instrs[i + 3], ['PUSHI', k - m], ['ADD', None]]
+
+
+# REGRAS GLOBAIS (precisam de ver o programa inteiro)
+
+def _instrucao_das_labels(instrs):
+    """Label -> índice da primeira instrução real a seguir a ela (numa só passagem)"""
+    posicoes = {}
+    pendentes = []
+    for i, (op, arg) in enumerate(instrs):
+        if op == 'LABEL':
+            pendentes.append(arg)
+        elif pendentes:
+            for label in pendentes:
+                posicoes[label] = i
+            pendentes.clear()
+    for label in pendentes:
+        posicoes[label] = len(instrs)
+    return posicoes
+
+
+def _destino_final(instrs, labels, destino, finais):
+    """Label onde acaba a cadeia de JUMPs que começa em destino (None se for um ciclo)
+
+    labels dá a primeira instrução de cada label e finais guarda as cadeias já resolvidas:
+    cada label é seguida uma só vez, mesmo quando há milhares de labels seguidas e de JUMPs
+    encadeados (como no fim de uma cadeia de else-if).
+    """
+    caminho = []
+    vistos = set()
+    while destino not in finais:
+        if destino in vistos:
+            final = None
+            break
+        caminho.append(destino)
+        vistos.add(destino)
+        if destino not in labels:
+            final = destino
+            break
+        j = labels[destino]
+        if j < len(instrs) and instrs[j][0] == 'JUMP':
+            destino = instrs[j][1]
+        else:
+            final = destino
+            break
+    else:
+        final = finais[destino]
+    for label in caminho:
+        finais[label] = final
+    return final
+
+
+def encadear_saltos(instrs):
+    """JUMP/JZ L, com L: JUMP M -> JUMP/JZ M"""
+    labels = _instrucao_das_labels(instrs)
+    finais = {}
+    hits = 0
+    for instr in instrs:
+        if instr[0] not in SALTOS:
+            continue
+        destino = _destino_final(instrs, labels, instr[1], finais)
+        if destino is not None and destino != instr[1]:
+            instr[1] = destino
+            hits += 1
+    return hits
+
+
+def salto_para_seguinte(instrs):
+    """JUMP L imediatamente antes de L: desaparece (JZ L passa a POP 1)"""
+    hits = 0
+    i = 0
+    while i < len(instrs):
+        op, arg = instrs[i]
+        if op in SALTOS:
+            j = i + 1
+            alvos = set()
+            while j < len(instrs) and instrs[j][0] == 'LABEL':
+                alvos.add(instrs[j][1])
+                j += 1
+            if arg in alvos:
+                instrs[i:i + 1] = [] if op == 'JUMP' else [['POP', 1]]
+                hits += 1
+                continue
+        i += 1
+    return hits
+
+
+def codigo_morto(instrs):
+    """Remove instruções entre um JUMP/STOP/RETURN e a label seguinte"""
+    hits = 0
+    i = 0
+    while i < len(instrs):
+        if instrs[i][0] in FIM_FLUXO:
+            j = i + 1
+            while j < len(instrs) and instrs[j][0] != 'LABEL':
+                j += 1
+            if j > i + 1:
+                hits += j - i - 1
+                del instrs[i + 1:j]
+        i += 1
+    return hits
+
+
+def labels_sem_uso(instrs, preservar=()):
+    """Remove labels que nenhum JUMP, JZ ou PUSHA referencia (exceto as de preservar)"""
+    usadas = {arg for op, arg in instrs if op in ('JUMP', 'JZ', 'PUSHA')}
+    usadas.update(preservar)
+    antes = len(instrs)
+    instrs[:] = [instr for instr in instrs if instr[0] != 'LABEL' or instr[1] in usadas]
+    return antes - len(instrs)
+
+
+# Tabela de regras: (nome, função). A ordem é a ordem de aplicação em cada iteração.
+REGRAS = [
+    ('dobrar_constantes', dobrar_constantes),
+    ('not_constante', not_constante),
+    ('elemento_neutro', elemento_neutro),
+    ('negacao_dupla', negacao_dupla),
+    ('inverter_comparacao', inverter_comparacao),
+    ('condicao_constante', condicao_constante),
+    ('acesso_array_constante', acesso_array_constante),
+    ('base_array', base_array),
+    ('encadear_saltos', encadear_saltos),
+    ('salto_para_seguinte', salto_para_seguinte),
+    ('codigo_morto', codigo_morto),
+    ('labels_sem_uso', labels_sem_uso),
+]
+
+
+class OtimizadorPeephole:
+    def __init__(self, regras=None, desativadas=()):
+        """regras: nomes das regras a usar (por omissão todas); desativadas: nomes a excluir"""
+        disponiveis = dict(REGRAS)
+        if regras is None:
+            regras = [nome for nome, _ in REGRAS]
+        for nome in list(regras) + list(desativadas):
+            if nome not in disponiveis:
+                raise ValueError(f"Regra peephole desconhecida: {nome}")
+        self.regras = [(nome, disponiveis[nome]) for nome in regras if nome not in desativadas]
+        self.hits = Counter()
+        self.iteracoes = 0
+
+    def otimizar(self, codigo, preservar=()):
+        """Devolve um novo buffer de instruções (como GeradorCodigo.codigo)
+
+        preservar: labels referidas fora de codigo (quando o programa é otimizado aos
+        pedaços), que labels_sem_uso não pode tirar.
+        """
+        instrs = decompor(codigo)
+        self.iteracoes = 0
+        mudou = True
+        while mudou and self.iteracoes < MAX_ITERACOES:
+            mudou = False
+            self.iteracoes += 1
+            for nome, regra in self.regras:
+                hits = regra(instrs, preservar) if regra is labels_sem_uso else regra(instrs)
+                if hits:
+                    self.hits[nome] += hits
+                    mudou = True
+        return compor(instrs)
+
+    def relatorio(self):
+        linhas = [f"Peephole: {self.iteracoes} iterações"]
+        for nome, _ in self.regras:
+            linhas.append(f"  {nome:<24} {self.hits[nome]}")
+        return "\n".join(linhas)
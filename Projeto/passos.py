@@ -0,0 +1,643 @@
+import time
+
+import blocos
+from blocos import EFEITO_PILHA, ESCRITAS, ESCRITAS_INDIRETAS, LEITURAS
+from otimizador import EMPILHA_UM
+
+# GESTOR DE PASSOS SOBRE O GRAFO DE BLOCOS
+# Com -O, corre sobre o código que sai do otimizador peephole (já na forma que os custos
+# dos passos assumem) e, se mudar alguma coisa, o peephole volta a correr a seguir. O
+# buffer de instruções é partido em unidades e blocos básicos (blocos.py), cada passo da
+# tabela PASSOS altera as unidades no lugar e devolve o número de vezes que foi aplicado, e
+# no fim o grafo volta a ser um buffer EWVM. O gestor mede o tempo de cada passo e quantas
+# instruções tirou.
+#
+# Um passo recebe (unidades, preservar). Quando muda os sucessores de uma unidade chama
+# unidade.ligar(); quando só muda instruções dentro dos blocos limpa unidade.analises.
+
+
+def _valor_constante(bloco, i):
+    """Inteiro guardado pelo STORE na posição i do bloco (se for PUSHI k / STORE)"""
+    if i == 0:
+        return None
+    op, arg = bloco.instrs[i - 1]
+    if op != 'PUSHI' or not isinstance(arg, int):
+        return None
+    return arg
+
+
+def propagar_constantes(unidades, preservar=()):
+    """PUSHG/PUSHL x -> PUSHI k quando todas as definições de x que chegam guardam k"""
+    hits = 0
+    for unidade in unidades:
+        entrada = unidade.analise(blocos.definicoes)
+        por_id = {id(b): b for b in unidade.blocos}
+        variaveis = frozenset(unidade.variaveis())
+        globais = frozenset(v for v in variaveis if v[0] == 'G')
+        mudou = 0
+
+        def visitar(i, instr, atual):
+            nonlocal mudou
+            op, arg = instr
+            if op not in LEITURAS:
+                return
+            defs = atual.get((LEITURAS[op], arg))
+            if not defs or None in defs:
+                return
+            valores = {_valor_constante(por_id[b], j) for b, j in defs}
+            if len(valores) == 1 and None not in valores:
+                instr[0] = 'PUSHI'
+                instr[1] = valores.pop()
+                mudou += 1
+
+        for b in unidade.blocos:
+            blocos.transferir_definicoes(b, entrada[id(b)], variaveis, globais, visitar)
+        if mudou:
+            unidade.analises.clear()
+            hits += mudou
+    return hits
+
+
+def stores_mortos(unidades, preservar=()):
+    """Tira os STOREG/STOREL de variáveis que não são lidas antes de voltarem a ser escritas
+
+    O valor guardado passa a ser tirado com POP 1, ou deixa de ser empilhado se vier de
+    uma só instrução sem efeitos (PUSHI, PUSHG, ...).
+    """
+    hits = 0
+    for unidade in unidades:
+        vivas_saida = unidade.analise(blocos.vivacidade)
+        variaveis = frozenset(unidade.variaveis())
+        globais = frozenset(v for v in variaveis if v[0] == 'G')
+        mudou = 0
+        for b in unidade.blocos:
+            vivas = set(vivas_saida[id(b)])
+            novas = []
+            i = len(b.instrs) - 1
+            while i >= 0:
+                instr = b.instrs[i]
+                op, arg = instr
+                if op in ESCRITAS and (ESCRITAS[op], arg) not in vivas:
+                    mudou += 1
+                    if i > 0 and b.instrs[i - 1][0] in EMPILHA_UM:
+                        i -= 2
+                    else:
+                        novas.append(['POP', 1])
+                        i -= 1
+                    continue
+                lidas, escritas = blocos.usos_e_definicoes(instr, variaveis, globais)
+                vivas.difference_update(escritas)
+                vivas.update(lidas)
+                novas.append(instr)
+                i -= 1
+            novas.reverse()
+            b.instrs = novas
+        if mudou:
+            unidade.analises.clear()
+            hits += mudou
+    return hits
+
+
+def _base_acesso(instrs, p):
+    """(deslocamento, posições a tirar) do acesso a array cujo endereço vem do PUSHGP em p
+
+    O par (endereço, índice) de um acesso só é consumido pelo LOADN/STOREN, que soma os
+    dois: um PUSHI k / PADD no endereço e um PUSHI c / ADD|SUB no fim do índice podem sair
+    dali e passar para uma base gp + k ± c. None se não há nada a tirar, se o índice que
+    fica é uma constante (o peephole junta esses acessos num PUSHG) ou se o par não chega
+    inteiro a um LOADN/STOREN.
+    """
+    tirar = []
+    deslocamento = 0
+    endereco = p
+    if (p + 2 < len(instrs) and instrs[p + 1][0] == 'PUSHI' and isinstance(instrs[p + 1][1], int)
+            and instrs[p + 2][0] == 'PADD'):
+        deslocamento = instrs[p + 1][1]
+        tirar += [p + 1, p + 2]
+        endereco = p + 2
+    fim = blocos.consumidor(instrs, endereco)
+    if fim is None:
+        return None
+    j, acima = fim
+    if (instrs[j][0], acima) not in (('LOADN', 1), ('STOREN', 2)):
+        return None
+    # O índice é o último valor a ficar sozinho por cima do endereço antes de j
+    r = None
+    atual = 0
+    for q in range(endereco + 1, j):
+        tirados, postos = blocos.efeito_pilha(*instrs[q])
+        atual += postos - tirados
+        if atual == 1:
+            r = q
+    if r is None or blocos.consumidor(instrs, r) != (j, acima - 1):
+        return None
+    inicio = endereco + 1
+    op, arg = instrs[r]
+    if (op in ('ADD', 'SUB') and r - 2 >= inicio and instrs[r - 1][0] == 'PUSHI'
+            and isinstance(instrs[r - 1][1], int) and blocos.consumidor(instrs, r - 1) == (r, 0)):
+        deslocamento += instrs[r - 1][1] if op == 'ADD' else -instrs[r - 1][1]
+        tirar += [r - 1, r]
+        r -= 2
+    if not tirar or (r == inicio and instrs[r][0] == 'PUSHI'):
+        return None
+    return deslocamento, tirar
+
+
+def bases_arrays(unidades, preservar=()):
+    """PUSHGP / PUSHI k / PADD / i / PUSHI c / SUB -> PUSHG b / i, com b := gp + k - c
+
+    A base de cada deslocamento (a posição do array menos o limite inferior) é uma global
+    calculada uma vez a seguir ao START: o gp não muda, por isso a base serve em todo o
+    programa e nos subprogramas. Só se cria a base de um deslocamento que é usado dentro
+    de um ciclo; cada acesso poupa duas instruções por cada PUSHI / operação que sai.
+    """
+    principal = None
+    for unidade in unidades:
+        if unidade.blocos and unidade.blocos[0].instrs[:1] and \
+                unidade.blocos[0].instrs[0][0] == 'START':
+            principal = unidade
+    if principal is None:
+        return 0  # um pedaço do programa em streaming: o início do main está noutro lado
+    acessos = []
+    em_ciclo = set()
+    for unidade in unidades:
+        dentro = None  # blocos dentro de ciclos, só se a unidade tiver acessos
+        for b in unidade.blocos:
+            for p, (op, _) in enumerate(b.instrs):
+                if op == 'PUSHGP':
+                    acesso = _base_acesso(b.instrs, p)
+                    if acesso is None:
+                        continue
+                    if dentro is None:
+                        dentro = set().union(*(c for _, c in unidade.analise(blocos.ciclos)))
+                    acessos.append((unidade, b, p) + acesso)
+                    if id(b) in dentro:
+                        em_ciclo.add(acesso[0])
+    if not acessos:
+        return 0
+    frame = blocos.Frame(principal)
+    bases = {0: None}  # deslocamento 0: a base é o próprio PUSHGP
+    for deslocamento in sorted(em_ciclo - {0}):
+        var = frame.reservar()
+        if var is None:
+            break
+        bases[deslocamento] = var[1]
+    hits = 0
+    tirar = {}
+    mudadas = set()
+    for unidade, b, p, deslocamento, posicoes in acessos:
+        if deslocamento not in bases:
+            continue
+        if bases[deslocamento] is not None:
+            b.instrs[p] = ['PUSHG', bases[deslocamento]]
+        tirar.setdefault(id(b), (b, []))[1].extend(posicoes)
+        mudadas.add(id(unidade))
+        hits += 1
+    for b, posicoes in tirar.values():
+        for i in sorted(posicoes, reverse=True):
+            del b.instrs[i]
+    if frame.pushn is not None:
+        inicio = []
+        for deslocamento, pos in bases.items():
+            if pos is not None:
+                inicio += [['PUSHGP', None], ['PUSHI', deslocamento], ['PADD', None],
+                           ['STOREG', pos]]
+        instrs = frame.entrada.instrs
+        i = next(k for k, instr in enumerate(instrs) if instr is frame.pushn)
+        instrs[i + 1:i + 1] = inicio
+    frame.fechar()
+    for unidade in unidades:
+        if id(unidade) in mudadas or unidade is principal:
+            unidade.analises.clear()
+    return hits
+
+
+def _passo_inducao(instrs, i, var):
+    """Passo s se a instrução i é o fim de var := var ± s, senão None"""
+    if i < 3:
+        return None
+    (op_le, arg_le), (op_k, s), (op, _) = instrs[i - 3:i]
+    if op_le not in LEITURAS or (LEITURAS[op_le], arg_le) != var or op_k != 'PUSHI' \
+            or not isinstance(s, int) or op not in ('ADD', 'SUB'):
+        return None
+    return s if op == 'ADD' else -s
+
+
+def _produtos(instrs):
+    """(variável, constante, posição) de cada PUSHx v / PUSHI c / MUL (ou c * v)"""
+    for i in range(len(instrs) - 2):
+        if instrs[i + 2][0] != 'MUL':
+            continue
+        (op0, a0), (op1, a1) = instrs[i], instrs[i + 1]
+        if op0 in LEITURAS and op1 == 'PUSHI' and isinstance(a1, int):
+            yield (LEITURAS[op0], a0), a1, i
+        elif op0 == 'PUSHI' and isinstance(a0, int) and op1 in LEITURAS:
+            yield (LEITURAS[op1], a1), a0, i
+
+
+def _antes_da_condicao(bloco, var):
+    """Posição onde começa o cálculo do valor que o JZ do bloco tira (o fim do bloco se não
+    acaba em JZ ou se esse cálculo pode escrever var)"""
+    fim = len(bloco.instrs)
+    if bloco.terminador is None or bloco.terminador[0] != 'JZ':
+        return fim
+    falta = 1
+    for i in range(fim - 1, -1, -1):
+        op, arg = bloco.instrs[i]
+        efeito = blocos.efeito_pilha(op, arg)
+        if efeito is None or (op in ESCRITAS and (ESCRITAS[op], arg) == var) \
+                or (op == 'CALL' and var[0] == 'G'):
+            return fim
+        falta += efeito[0] - efeito[1]
+        if falta == 0:
+            return i
+        if falta < 0:
+            return fim
+    return fim
+
+
+def _reduzir_inducao(unidade, frame, externas):
+    """Troca um produto i * c num ciclo por um temporário t que avança com i
+
+    i é uma variável de indução: dentro do ciclo só é escrita por i := i ± s. t recebe
+    i * c nos predecessores da cabeça que estão fora do ciclo e t := t ± s * c a seguir a
+    cada passo de i. As escritas em arrays não contam (não chegam às variáveis simples),
+    as chamadas sim para as globais. Cada uso do produto poupa duas instruções e o passo de
+    t custa quatro por volta; um uso num ciclo de dentro conta 8 vezes por cada nível.
+    Devolve True se fez uma troca (as análises da unidade ficam por refazer).
+    """
+    por_id = {id(b): b for b in unidade.blocos}
+    lacos = {}
+    for cabeca, corpo in unidade.analise(blocos.ciclos):
+        if id(cabeca) in lacos:
+            lacos[id(cabeca)][1].update(corpo)
+        else:
+            lacos[id(cabeca)] = (cabeca, set(corpo))
+    nivel = {}
+    for _, corpo in lacos.values():
+        for x in corpo:
+            nivel[x] = nivel.get(x, 0) + 1
+    for cabeca, corpo in lacos.values():
+        fora = [p for p in cabeca.predecessores if id(p) not in corpo]
+        if not fora or any(label in externas for label in cabeca.labels):
+            continue
+        escritas = {}
+        chamada = False
+        produtos = {}
+        for x in corpo:
+            b = por_id[x]
+            for i, (op, arg) in enumerate(b.instrs):
+                if op in ESCRITAS:
+                    escritas.setdefault((ESCRITAS[op], arg), []).append((b, i))
+                elif op == 'CALL':
+                    chamada = True
+            for var, c, i in _produtos(b.instrs):
+                produtos.setdefault((var, c), []).append((b, i))
+        for (var, c), usos in produtos.items():
+            defs = escritas.get(var, ())
+            if len(defs) != 1 or (var[0] == 'G' and chamada):
+                continue
+            b_passo, i_passo = defs[0]
+            s = _passo_inducao(b_passo.instrs, i_passo, var)
+            if s is None:
+                continue
+            peso = sum(8 ** (nivel[id(b)] - nivel[id(cabeca)]) for b, _ in usos)
+            if 2 * peso <= 4:
+                continue
+            temp = frame.reservar()
+            if temp is None:
+                return False
+            tipo, pos = temp
+            leitura = 'PUSHL' if tipo == 'L' else 'PUSHG'
+            escrita = 'STOREL' if tipo == 'L' else 'STOREG'
+            le_var = 'PUSHL' if var[0] == 'L' else 'PUSHG'
+            edicoes = [(b, i, i + 3, [[leitura, pos]]) for b, i in usos]
+            edicoes.append((b_passo, i_passo + 1, i_passo + 1,
+                            [[leitura, pos], ['PUSHI', s * c], ['ADD', None], [escrita, pos]]))
+            for p in fora:
+                i = _antes_da_condicao(p, var)
+                edicoes.append((p, i, i,
+                                [[le_var, var[1]], ['PUSHI', c], ['MUL', None], [escrita, pos]]))
+            edicoes.sort(key=lambda e: (id(e[0]), e[1], e[2]), reverse=True)
+            for b, inicio, fim, novas in edicoes:
+                b.instrs[inicio:fim] = novas
+            return True
+    return False
+
+
+def reducao_forca(unidades, preservar=()):
+    """Troca multiplicações por somas
+
+    Um produto i * c num ciclo em que i é a variável de indução passa a um temporário que
+    soma s * c de cada vez que i soma s (_reduzir_inducao). Os x * 2 que ficam passam a
+    x + x: na EWVM são as mesmas três instruções, mas uma soma em vez de um produto.
+    """
+    externas = set(preservar)
+    for unidade in unidades:
+        for b in unidade.blocos:
+            if b.externo and b.terminador is not None and b.terminador[0] in ('JUMP', 'JZ'):
+                externas.add(b.terminador[1])
+    hits = 0
+    for unidade in unidades:
+        frame = blocos.Frame(unidade)
+        mudou = 0
+        tem_produtos = any(True for b in unidade.blocos for _ in _produtos(b.instrs))
+        while tem_produtos and _reduzir_inducao(unidade, frame, externas):
+            unidade.analises.clear()
+            mudou += 1
+        for b in unidade.blocos:
+            for var, c, i in list(_produtos(b.instrs)):
+                if c == 2:
+                    le = ['PUSHL' if var[0] == 'L' else 'PUSHG', var[1]]
+                    b.instrs[i:i + 3] = [le, list(le), ['ADD', None]]
+                    mudou += 1
+        frame.fechar()
+        if mudou:
+            unidade.analises.clear()
+            hits += mudou
+    return hits
+
+
+# Operações sem efeitos cujo resultado só depende dos operandos (e, para PUSHG/PUSHL,
+# LOADN e LOAD, da memória lida, que entra na chave com a sua versão)
+PURAS = frozenset(('PUSHI', 'PUSHF', 'PUSHS', 'PUSHGP', 'PUSHA', 'PADD', 'ADD', 'SUB', 'MUL',
+                   'DIV', 'MOD', 'FADD', 'FSUB', 'FMUL', 'FDIV', 'EQUAL', 'INF', 'INFEQ',
+                   'SUP', 'SUPEQ', 'AND', 'OR', 'NOT', 'ITOF', 'FTOI', 'CHARAT', 'STRLEN',
+                   'CHRCODE', 'ATOI', 'ATOF'))
+LEITURAS_MEMORIA = ('LOADN', 'LOAD')
+
+
+def _cadeias(unidade):
+    """Blocos seguidos em que cada um só é alcançado a partir do anterior (blocos estendidos)"""
+    cadeias = []
+    for b in unidade.blocos:
+        if cadeias and b.predecessores == [cadeias[-1][-1]]:
+            cadeias[-1].append(b)
+        else:
+            cadeias.append([b])
+    return cadeias
+
+
+def _ocorrencias(cadeia):
+    """Expressões repetidas numa cadeia de blocos: (ocorrencias, guardadas, custo)
+
+    Cada valor na stack é numerado pela operação e pelos números dos operandos (numeração
+    de valores); as leituras de variáveis entram com a versão da variável e as de arrays
+    com a época da memória, que muda também com as escritas diretas (um STOREG pode ser
+    um elemento de um array depois de bases_arrays e do peephole). Só contam as expressões que não são constantes e
+    que ocupam instruções seguidas de um bloco, como (posição do bloco na cadeia, bloco,
+    início, fim). ocorrencias: {número: [ocorrência]}; guardadas: [(ocorrência, variável)]
+    para as que repetem um valor que ainda está guardado numa variável; custo: instruções
+    de cada número.
+    """
+    numeros = {}
+    custo = []
+    constante = []
+    versao = {}
+    epoca = 0  # muda com as escritas indiretas e as chamadas
+    memoria = 0  # muda com essas e com todas as escritas diretas (lida por LOADN e LOAD)
+    guardado = {}  # número -> (variável, versão, época) onde o valor ficou guardado
+    ocorrencias = {}
+    guardadas = []
+
+    def numerar(chave, c, k):
+        n = numeros.get(chave)
+        if n is None:
+            n = numeros[chave] = len(custo)
+            custo.append(c)
+            constante.append(k)
+        return n
+
+    # (número, início, fim) de um valor desconhecido; os que faltam na pilha (valores de
+    # antes do bloco ou que se perderam) também são opacos
+    opaco = (None, None, None)
+    for k, b in enumerate(cadeia):
+        pilha = []
+        for i, (op, arg) in enumerate(b.instrs):
+            if op in LEITURAS:
+                var = (LEITURAS[op], arg)
+                pilha.append((numerar((op, arg, versao.get(var, 0), epoca), 1, False), i, i))
+                continue
+            if op in PURAS or op in LEITURAS_MEMORIA:
+                tirados = EFEITO_PILHA[op][0]
+                if tirados <= len(pilha):
+                    operandos = pilha[len(pilha) - tirados:]
+                else:
+                    operandos = [opaco] * (tirados - len(pilha)) + pilha
+                del pilha[max(len(pilha) - tirados, 0):]
+                numeros_ops = tuple(o[0] for o in operandos)
+                if None in numeros_ops:
+                    pilha.append(opaco)
+                    continue
+                le_memoria = op in LEITURAS_MEMORIA
+                n = numerar((op, arg, memoria if le_memoria else 0) + numeros_ops,
+                            1 + sum(custo[x] for x in numeros_ops),
+                            not le_memoria and all(constante[x] for x in numeros_ops))
+                inicio = operandos[0][1] if operandos else i
+                if any(a[2] is None or c[1] is None or a[2] + 1 != c[1]
+                       for a, c in zip(operandos, operandos[1:] + [(None, i, None)])):
+                    inicio = None  # os operandos não estão seguidos (DUP, SWAP, ...)
+                if inicio is not None and not constante[n] and i > inicio:
+                    ocorrencia = (k, b, inicio, i)
+                    lugar = guardado.get(n)
+                    if lugar and versao.get(lugar[0], 0) == lugar[1] and epoca == lugar[2]:
+                        guardadas.append((ocorrencia, lugar[0]))
+                    else:
+                        ocorrencias.setdefault(n, []).append(ocorrencia)
+                pilha.append((n, inicio, i))
+                continue
+
+            # Instruções com efeitos: os valores que tiram perdem-se e os que põem são opacos
+            if op in ESCRITAS:
+                var = (ESCRITAS[op], arg)
+                versao[var] = versao.get(var, 0) + 1
+                memoria += 1
+                n = pilha[-1][0] if pilha else None
+                if n is not None and not constante[n] and custo[n] > 1:
+                    guardado[n] = (var, versao[var], epoca)
+            elif op in ESCRITAS_INDIRETAS:
+                epoca += 1
+                memoria += 1
+            if op == 'DUP':
+                copias = [(n, None, None) for n, _, _ in pilha[max(len(pilha) - arg, 0):]]
+                pilha.extend([opaco] * (arg - len(copias)) + copias)
+            elif op == 'PUSHN':
+                pilha = []  # o que ficar por baixo passa a opaco, como no início do bloco
+            elif op == 'POP':
+                del pilha[max(len(pilha) - arg, 0):]
+            elif op in EFEITO_PILHA:
+                tirados, postos = EFEITO_PILHA[op]
+                del pilha[max(len(pilha) - tirados, 0):]
+                pilha.extend([opaco] * postos)
+                if op == 'CALL':
+                    # O subprograma escreve no resultado, que está na stack de quem chama
+                    pilha = []
+            else:
+                pilha = []
+                epoca += 1
+                memoria += 1
+    return ocorrencias, guardadas, custo
+
+
+def _sobrepoe(ocupados, ocorrencias):
+    return any(not (fim < a or f < inicio)
+               for _, b, inicio, fim in ocorrencias for a, f in ocupados.get(id(b), ()))
+
+
+def subexpressoes_comuns(unidades, preservar=()):
+    """Reutiliza o valor de uma expressão repetida em vez de a voltar a calcular
+
+    Trabalha em cadeias de blocos em que cada bloco só é alcançado a partir do anterior.
+    Se o valor ainda está guardado numa variável (x := a[i]; ... a[i]), a repetição passa a
+    ler a variável. Senão a primeira ocorrência ganha DUP 1 / STORE temporário e as
+    seguintes leem o temporário, quando isso poupa instruções: uma expressão com c
+    instruções poupa c - 1 em cada repetição e custa 2. Uma repetição depois de um JZ conta
+    metade por cada salto condicional (não se sabe quantas vezes o ramo corre).
+    """
+    hits = 0
+    for unidade in unidades:
+        frame = blocos.Frame(unidade)
+        temporarios = []  # reutilizados entre cadeias: cada um só vive dentro de uma
+        mudou = 0
+        for cadeia in _cadeias(unidade):
+            condicionais = [0]
+            for b in cadeia:
+                jz = b.terminador is not None and b.terminador[0] == 'JZ'
+                condicionais.append(condicionais[-1] + jz)
+            usados = 0
+            while True:
+                ocorrencias, guardadas, custo = _ocorrencias(cadeia)
+                ocupados = {}
+                edicoes = []
+
+                def substituir(ocorrencia, novas):
+                    _, b, inicio, fim = ocorrencia
+                    ocupados.setdefault(id(b), []).append((inicio, fim))
+                    edicoes.append((b, inicio, fim + 1, novas))
+
+                # Primeiro as que leem uma variável (as maiores primeiro: não custam nada)
+                guardadas.sort(key=lambda g: g[0][3] - g[0][2], reverse=True)
+                for ocorrencia, (tipo, pos) in guardadas:
+                    if not _sobrepoe(ocupados, [ocorrencia]):
+                        substituir(ocorrencia, [['PUSHL' if tipo == 'L' else 'PUSHG', pos]])
+                        mudou += 1
+
+                candidatos = []
+                for n, ocs in ocorrencias.items():
+                    primeira = condicionais[ocs[0][0]]
+                    ganho = sum((custo[n] - 1) * 0.5 ** (condicionais[k] - primeira)
+                                for k, _, _, _ in ocs[1:]) - 2
+                    if ganho > 0:
+                        candidatos.append((ganho, n))
+                candidatos.sort(reverse=True)
+                for _, n in candidatos:
+                    ocs = ocorrencias[n]
+                    if _sobrepoe(ocupados, ocs):
+                        continue  # fica para a volta seguinte
+                    if usados == len(temporarios):
+                        temp = frame.reservar()
+                        if temp is None:
+                            break
+                        temporarios.append(temp)
+                    tipo, pos = temporarios[usados]
+                    usados += 1
+                    _, b, inicio, fim = ocs[0]
+                    ocupados.setdefault(id(b), []).append((inicio, fim))
+                    escrita = 'STOREL' if tipo == 'L' else 'STOREG'
+                    edicoes.append((b, fim + 1, fim + 1, [['DUP', 1], [escrita, pos]]))
+                    for ocorrencia in ocs[1:]:
+                        substituir(ocorrencia, [['PUSHL' if tipo == 'L' else 'PUSHG', pos]])
+                        mudou += 1
+                if not edicoes:
+                    break
+                # Do fim para o início; na mesma posição, a substituição antes da inserção
+                edicoes.sort(key=lambda e: (e[1], e[2]), reverse=True)
+                for b, inicio, fim, novas in edicoes:
+                    b.instrs[inicio:fim] = novas
+        frame.fechar()
+        if mudou:
+            unidade.analises.clear()
+            hits += mudou
+    return hits
+
+
+def inalcancaveis(unidades, preservar=()):
+    """Tira os blocos a que não se chega a partir da entrada da unidade"""
+    # Labels saltadas de outra unidade (ou de fora do código) não se podem perder
+    externas = set(preservar)
+    for unidade in unidades:
+        for b in unidade.blocos:
+            if b.externo and b.terminador is not None and b.terminador[0] in ('JUMP', 'JZ'):
+                externas.add(b.terminador[1])
+    hits = 0
+    for unidade in unidades:
+        vistos = blocos.alcancaveis(unidade)
+        restantes = [b for b in unidade.blocos
+                     if id(b) in vistos or any(label in externas for label in b.labels)]
+        if len(restantes) != len(unidade.blocos):
+            hits += sum(len(b) for b in unidade.blocos) - sum(len(b) for b in restantes)
+            unidade.blocos = restantes
+            unidade.ligar()
+    return hits
+
+
+# Tabela de passos: (nome, função), pela ordem em que correm
+PASSOS = [
+    ('propagar_constantes', propagar_constantes),
+    ('stores_mortos', stores_mortos),
+    ('bases_arrays', bases_arrays),
+    ('reducao_forca', reducao_forca),
+    ('subexpressoes_comuns', subexpressoes_comuns),
+    ('inalcancaveis', inalcancaveis),
+]
+
+
+class EstatisticaPasso:
+    def __init__(self):
+        self.execucoes = 0
+        self.aplicacoes = 0
+        self.tempo = 0.0
+        self.instrucoes_antes = 0
+        self.instrucoes_depois = 0
+
+
+class GestorPassos:
+    def __init__(self, passos=None, desativados=()):
+        """passos: nomes dos passos a usar (por omissão todos); desativados: nomes a excluir"""
+        disponiveis = dict(PASSOS)
+        if passos is None:
+            passos = [nome for nome, _ in PASSOS]
+        for nome in list(passos) + list(desativados):
+            if nome not in disponiveis:
+                raise ValueError(f"Passo desconhecido: {nome}")
+        self.passos = [(nome, disponiveis[nome]) for nome in passos if nome not in desativados]
+        self.estatisticas = {nome: EstatisticaPasso() for nome, _ in self.passos}
+        self.mudou = False  # algum passo mudou o código na última execução
+
+    def executar(self, codigo, preservar=()):
+        """Devolve um novo buffer de instruções depois de correr os passos
+
+        preservar: labels referidas fora de codigo (como em OtimizadorPeephole.otimizar).
+        """
+        unidades = blocos.construir(codigo, preservar)
+        self.mudou = False
+        for nome, passo in self.passos:
+            estatistica = self.estatisticas[nome]
+            antes = blocos.contar(unidades)
+            inicio = time.perf_counter()
+            aplicacoes = passo(unidades, preservar)
+            self.mudou = self.mudou or aplicacoes > 0
+            estatistica.aplicacoes += aplicacoes
+            estatistica.tempo += time.perf_counter() - inicio
+            estatistica.execucoes += 1
+            estatistica.instrucoes_antes += antes
+            estatistica.instrucoes_depois += blocos.contar(unidades)
+        return blocos.baixar(unidades)
+
+    def relatorio(self):
+        linhas = ["Passos (aplicações, tempo, instruções antes -> depois):"]
+        for nome, _ in self.passos:
+            e = self.estatisticas[nome]
+            linhas.append(f"  {nome:<24} {e.aplicacoes:>6} {e.tempo * 1000:>9.1f} ms"
+                          f"  {e.instrucoes_antes} -> {e.instrucoes_depois}")
+        return "\n".join(linhas)
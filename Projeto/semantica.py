@@ -1,5 +1,6 @@
 import sys
 from sin import parse_file, parse_string
+from arvore import No, Expressao, de_tuplo, tabela_despacho, executar
 
 class TabelaSimbolos:
     def __init__(self):
@@ -45,18 +46,27 @@ class AnalisadorSemantico:
         self.tabela = TabelaSimbolos()
         self.erros = []
         self.tipo_retorno_atual = None
+        self.despacho = tabela_despacho(type(self))
 
     def registar_erro(self, msg):
         self.erros.append(f"Erro Semântico: {msg}")
 
     def visit(self, node):
+        return executar(self.passo, node, self.concluir)
+
+    # Os métodos que visitam filhos são geradores: `tipo = yield filho` devolve o tipo do
+    # filho, visitado pelo motor de arvore.executar com uma pilha explícita
+    def passo(self, node):
+        # Nós: um acesso ao dicionário classe -> método
+        metodo = self.despacho.get(node.__class__)
+        if metodo is not None:
+            return metodo(self, node)
+
         if node is None:
             return None
         
         if isinstance(node, list):
-            for item in node:
-                self.visit(item)
-            return None
+            return self.visitar_lista(node)
 
         # Valores primitivos retornam tipo diretamente
         if isinstance(node, bool):
@@ -68,52 +78,62 @@ class AnalisadorSemantico:
         if isinstance(node, str):
             return {'categoria': 'STRING'}
 
+        # Compatibilidade: uma AST em tuplos é convertida para nós
         if isinstance(node, tuple):
-            tipo_no = node[0]
-            metodo_nome = f'visit_{tipo_no}'
-            visitante = getattr(self, metodo_nome, self.visit_generico)
-            return visitante(node)
+            return self.passo(de_tuplo(node))
+        if isinstance(node, No):
+            return self.visit_generico(node)
         
         return None
 
+    def concluir(self, node, tipo):
+        if isinstance(node, Expressao):
+            # Lido pelo gerador (GeradorCodigo.tipo_de); '' marca uma expressão com erro
+            node.tipo = tipo['categoria'] if tipo else ''
+
+    def visitar_lista(self, node):
+        for item in node:
+            yield item
+
     def visit_generico(self, node):
         return None
 
     # ESTRUTURA DO PROGRAMA
 
     def visit_gramatica(self, node):
-        self.visit(node[1])
+        yield node.programa
 
     def visit_programa(self, node):
-        _, cabecalho, corpo = node
-        self.visit(cabecalho)
-        self.visit(corpo)
+        yield node.cabecalho
+        yield node.corpo
 
     def visit_cabecalho(self, node):
-        _, titulo, subprogs, vars_globais = node
+        subprogs = node.subprogramas
+        vars_globais = node.variaveis
         
         if vars_globais:
-            self.visit(vars_globais)
+            yield vars_globais
             
         if subprogs:
-            self.visit(subprogs)
+            yield subprogs
 
     # DECLARAÇÕES DE VARIÁVEIS
 
     def visit_var_section(self, node):
-        self.visit(node[1])
+        for decl in node.declaracoes:
+            self.visit_var_decl(decl)
 
     def visit_var_decl(self, node):
-        _, lista_id, tipo_raw = node
+        lista_id = node.nomes
+        tipo_raw = node.tipo
         
         # Construir tipo_info estruturado
-        if isinstance(tipo_raw, tuple) and tipo_raw[0] == 'array':
-            # tipo_raw = ('array', min, max, tipo_base)
+        if isinstance(tipo_raw, No) and tipo_raw.etiqueta == 'array':
             tipo_info = {
                 'categoria': 'ARRAY',
-                'min_index': tipo_raw[1],
-                'max_index': tipo_raw[2],
-                'tipo_base': str(tipo_raw[3]).upper()
+                'min_index': tipo_raw.minimo,
+                'max_index': tipo_raw.maximo,
+                'tipo_base': str(tipo_raw.tipo_base).upper()
             }
         else:
             tipo_info = {
@@ -122,88 +142,73 @@ class AnalisadorSemantico:
             }
 
         for nome_var in lista_id:
-            sucesso = self.tabela.declarar_variavel(nome_var, tipo_info)
+            # Uma entrada por nome: o GeradorVerificado (fundido.py) guarda nela a posição
+            sucesso = self.tabela.declarar_variavel(nome_var, dict(tipo_info))
             if not sucesso:
                 self.registar_erro(f"Variável '{nome_var}' já declarada neste escopo.")
 
     # SUBPROGRAMAS
 
     def visit_function(self, node):
-        _, nome, params, tipo_ret, corpo = node
+        self.entrar_subprograma(node)
+        yield node.bloco
+        self.sair_subprograma()
+
+    visit_procedure = visit_function
+
+    def entrar_subprograma(self, node):
+        """Declara a função/procedimento e abre o seu escopo com os parâmetros"""
+        nome = node.nome
+        params = node.parametros
+        funcao = node.etiqueta == 'function'
         
         tipos_params = []
         if params:
             for p in params:
-                tipo_p = str(p[2]).upper()
-                quantidade = len(p[1])
+                tipo_p = str(p.tipo).upper()
+                quantidade = len(p.nomes)
                 for _ in range(quantidade):
                     tipos_params.append(tipo_p)
 
-        tipo_ret_str = str(tipo_ret).upper()
+        tipo_ret_str = str(node.tipo).upper() if funcao else None
         
         if not self.tabela.declarar_funcao(nome, tipo_ret_str, tipos_params):
-            self.registar_erro(f"Função '{nome}' já definida.")
+            if funcao:
+                self.registar_erro(f"Função '{nome}' já definida.")
+            else:
+                self.registar_erro(f"Procedimento '{nome}' já definido.")
 
         self.tabela.entrar_escopo()
-        self.tipo_retorno_atual = tipo_ret_str
 
-        # Nome da função como variável de retorno
-        self.tabela.declarar_variavel(nome, {'categoria': tipo_ret_str, 'tipo_base': None})
+        if funcao:
+            self.tipo_retorno_atual = tipo_ret_str
+            # Nome da função como variável de retorno
+            self.tabela.declarar_variavel(nome, {'categoria': tipo_ret_str, 'tipo_base': None})
 
         if params:
             for p in params:
-                ids_params = p[1]
-                tipo_p = str(p[2]).upper()
-                for pid in ids_params:
+                tipo_p = str(p.tipo).upper()
+                for pid in p.nomes:
                     self.tabela.declarar_variavel(pid, {'categoria': tipo_p, 'tipo_base': None})
 
-        self.visit(corpo)
-
+    def sair_subprograma(self):
         self.tabela.sair_escopo()
         self.tipo_retorno_atual = None
 
-    def visit_procedure(self, node):
-        _, nome, params, corpo = node
-        
-        tipos_params = []
-        if params:
-            for p in params:
-                tipo_p = str(p[2]).upper()
-                quantidade = len(p[1])
-                for _ in range(quantidade):
-                    tipos_params.append(tipo_p)
-
-        if not self.tabela.declarar_funcao(nome, None, tipos_params):
-            self.registar_erro(f"Procedimento '{nome}' já definido.")
-
-        self.tabela.entrar_escopo()
-
-        if params:
-            for p in params:
-                ids_params = p[1]
-                tipo_p = str(p[2]).upper()
-                for pid in ids_params:
-                    self.tabela.declarar_variavel(pid, {'categoria': tipo_p, 'tipo_base': None})
-
-        self.visit(corpo)
-        self.tabela.sair_escopo()
-
     def visit_bloco(self, node):
-        _, decls, corpo_instrucoes = node
-        if decls:
-            self.visit(decls)
-        self.visit(corpo_instrucoes)
+        if node.declaracoes:
+            yield node.declaracoes
+        yield node.corpo
 
     # INSTRUÇÕES
 
     def visit_begin_end(self, node):
-        self.visit(node[1])
+        for instrucao in node.instrucoes:
+            yield instrucao
 
     def visit_assign(self, node):
-        _, var_node, expr_node = node
-        
-        tipo_var = self.visit(var_node)
-        tipo_expr = self.visit(expr_node)
+        tipo_var = (yield node.alvo)
+        tipo_expr = (yield node.expressao)
 
         if not tipo_var or not tipo_expr:
             return
@@ -221,25 +226,24 @@ class AnalisadorSemantico:
         self.registar_erro(f"Atribuição incompatível: '{cat_expr}' -> '{cat_var}'")
 
     def visit_if(self, node):
-        _, cond, stmt_then, stmt_else = node
+        stmt_else = node.senao
         
-        tipo_cond = self.visit(cond)
+        tipo_cond = (yield node.condicao)
         if tipo_cond and tipo_cond['categoria'] != 'BOOLEAN':
             self.registar_erro(f"Condição IF deve ser BOOLEAN, não {tipo_cond['categoria']}")
         
-        self.visit(stmt_then)
+        yield node.entao
         if stmt_else:
-            self.visit(stmt_else)
+            yield stmt_else
 
     def visit_while(self, node):
-        _, cond, corpo = node
-        tipo_cond = self.visit(cond)
+        tipo_cond = (yield node.condicao)
         if tipo_cond and tipo_cond['categoria'] != 'BOOLEAN':
             self.registar_erro(f"Condição WHILE deve ser BOOLEAN, não {tipo_cond['categoria']}")
-        self.visit(corpo)
+        yield node.corpo
 
     def visit_for(self, node):
-        _, var_nome, inicio, fim, direcao, corpo = node
+        var_nome = node.variavel
         
         var_info = self.tabela.procurar_variavel(var_nome)
         if not var_info:
@@ -247,23 +251,23 @@ class AnalisadorSemantico:
         elif var_info['categoria'] != 'INTEGER':
             self.registar_erro(f"Variável de controlo do FOR deve ser INTEGER.")
 
-        t_inicio = self.visit(inicio)
-        t_fim = self.visit(fim)
+        t_inicio = (yield node.inicio)
+        t_fim = (yield node.fim)
         
         if t_inicio and t_inicio['categoria'] != 'INTEGER':
             self.registar_erro("Limite inicial do FOR deve ser INTEGER.")
         if t_fim and t_fim['categoria'] != 'INTEGER':
             self.registar_erro("Limite final do FOR deve ser INTEGER.")
             
-        self.visit(corpo)
+        yield node.corpo
 
     # EXPRESSÕES
 
     def visit_binop(self, node):
-        _, op, esq, dir_node = node
+        op = node.op
         
-        t_esq = self.visit(esq)
-        t_dir = self.visit(dir_node)
+        t_esq = (yield node.esq)
+        t_dir = (yield node.dir)
         
         if not t_esq or not t_dir:
             return {'categoria': 'REAL'}  # Tipo dummy para evitar cascata de erros
@@ -323,8 +327,8 @@ class AnalisadorSemantico:
         return {'categoria': 'REAL'}
 
     def visit_unop(self, node):
-        _, op, operand = node
-        t = self.visit(operand)
+        op = node.op
+        t = (yield node.operando)
         
         if not t:
             return None
@@ -343,10 +347,18 @@ class AnalisadorSemantico:
         
         return t
 
+    def visit_char(self, node):
+        # Literal de um caracter já dobrado (ver dobragem.py)
+        return {'categoria': 'CHAR'}
+
+    def visit_expandida(self, node):
+        # Chamada de função já expandida e verificada (ver expandir.py)
+        return {'categoria': node.tipo}
+
     # VARIÁVEIS E ACESSO
 
     def visit_var(self, node):
-        nome = node[1]
+        nome = node.nome
         info = self.tabela.procurar_variavel(nome)
         if not info:
             self.registar_erro(f"Variável '{nome}' não declarada.")
@@ -354,14 +366,14 @@ class AnalisadorSemantico:
         return info
 
     def visit_array_access(self, node):
-        _, nome, expr_index = node
+        nome = node.nome
         info = self.tabela.procurar_variavel(nome)
         
         if not info:
             self.registar_erro(f"'{nome}' não foi declarado.")
             return None
         
-        t_index = self.visit(expr_index)
+        t_index = (yield node.indice)
         if t_index and t_index['categoria'] != 'INTEGER':
             self.registar_erro("Índice de array/string deve ser INTEGER.")
 
@@ -376,14 +388,15 @@ class AnalisadorSemantico:
         return {'categoria': info['tipo_base']}
 
     def visit_call(self, node):
-        _, nome, args = node
+        nome = node.nome
+        args = node.argumentos
 
         # Built-in: LENGTH
         if nome.lower() == 'length':
             if len(args) != 1:
                 self.registar_erro("LENGTH requer 1 argumento.")
             else:
-                arg_tipo = self.visit(args[0])
+                arg_tipo = (yield args[0])
                 if arg_tipo and arg_tipo['categoria'] not in ['STRING', 'ARRAY']:
                     self.registar_erro("LENGTH requer STRING ou ARRAY.")
             return {'categoria': 'INTEGER'}
@@ -404,7 +417,7 @@ class AnalisadorSemantico:
 
         # Validar tipos
         for i, (arg_node, tipo_esp) in enumerate(zip(args, params_esperados)):
-            tipo_passado = self.visit(arg_node)
+            tipo_passado = (yield arg_node)
             if tipo_passado:
                 cat_pass = tipo_passado['categoria']
                 if cat_pass != tipo_esp:
@@ -418,19 +431,19 @@ class AnalisadorSemantico:
         return None
 
     def visit_readln(self, node):
-        for v in node[1]:
-            tipo = self.visit(v)
+        for v in node.itens:
+            tipo = (yield v)
             # Verifica se é L-value válido (variável ou array access)
-            if isinstance(v, tuple) and v[0] == 'var':
-                if not self.tabela.procurar_variavel(v[1]):
-                    self.registar_erro(f"Variável '{v[1]}' no readln não existe.")
+            if isinstance(v, No) and v.etiqueta == 'var':
+                if not self.tabela.procurar_variavel(v.nome):
+                    self.registar_erro(f"Variável '{v.nome}' no readln não existe.")
     
     def visit_read(self, node):
-        self.visit_readln(node)
+        return self.visit_readln(node)
 
     def visit_writeln(self, node):
-        for expr in node[1]:
-            self.visit(expr)
+        for expr in node.itens:
+            yield expr
             
     def visit_write(self, node):
-        self.visit_writeln(node)
\ No newline at end of file
+        return self.visit_writeln(node)
\ No newline at end of file
@@ -0,0 +1,222 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sin import SCANNERS
+from compilador import Compilador
+from maquina import escrever_vm
+from cache import CacheCompilacao, PASTA_OMISSAO
+
+# SERVIDOR DE COMPILAÇÃO
+# Processo de longa duração que mantém o compilador carregado (PLY, tabelas do parser,
+# analisador e gerador) e compila a pedido, para cada ficheiro não pagar o arranque.
+#
+# Uso: python3 servidor.py [--socket CAMINHO | --stdio] [--cache [DIR]]
+#
+# Protocolo: uma linha JSON por pedido e uma linha JSON por resposta, com o mesmo 'id'.
+#   {"id": 1, "ficheiro": "/abs/teste1.pas", "otimizar": false}   escreve o .vm ao lado do .pas
+#   {"id": 2, "fonte": "program X; ...", "saida": "/abs/x.vm"}     'saida' é opcional; sem ela
+#                                                                  o código vem na resposta
+#   {"id": 3, "comando": "estado"} / {"comando": "parar"}
+# Resposta: {"id", "estado": "ok"|"erro", "diagnosticos": [...], "saida"?, "codigo"?, "tempos"}
+# Os pedidos de uma ligação são tratados em paralelo; as respostas podem vir fora de ordem.
+
+SOCKET_OMISSAO = f"/tmp/plc2025-{os.getuid()}.sock"
+LIMITE_LINHA = 16 * 1024 * 1024  # bytes por pedido (o código fonte pode vir na linha)
+
+
+class ServidorCompilacao:
+    def __init__(self, threads=None, scanner='ply', cache=None):
+        self.executor = ThreadPoolExecutor(threads)
+        self.scanner = scanner
+        self.cache = cache
+        self.local = threading.local()  # um Compilador por thread e por opções
+        self.pedidos = 0
+        self.inicio = time.time()
+        self.parado = None  # asyncio.Event criado dentro do ciclo de eventos
+
+    def compilador(self, otimizar):
+        compiladores = getattr(self.local, 'compiladores', None)
+        if compiladores is None:
+            compiladores = self.local.compiladores = {}
+        if otimizar not in compiladores:
+            compiladores[otimizar] = Compilador(self.scanner, otimizar=otimizar, cache=self.cache)
+        return compiladores[otimizar]
+
+    def compilar(self, pedido):
+        """Trata um pedido de compilação (corre numa thread do executor)"""
+        compilador = self.compilador(bool(pedido.get('otimizar', False)))
+        saida = pedido.get('saida')
+        if 'ficheiro' in pedido:
+            ficheiro = pedido['ficheiro']
+            try:
+                resultado = compilador.compilar_ficheiro(ficheiro)
+            except (OSError, UnicodeDecodeError) as e:
+                return {'estado': 'erro', 'diagnosticos': [f"Erro ao ler ficheiro: {e}"]}
+            if not saida:
+                saida = ficheiro[:-4] + '.vm' if ficheiro.endswith('.pas') else ficheiro + '.vm'
+        elif 'fonte' in pedido:
+            resultado = compilador.compilar(pedido['fonte'])
+        else:
+            return {'estado': 'erro', 'diagnosticos': ["Pedido sem 'ficheiro' nem 'fonte'"]}
+
+        resposta = {'estado': 'ok' if resultado.sucesso else 'erro',
+                    'diagnosticos': resultado.diagnosticos, 'tempos': resultado.tempos}
+        if resultado.sucesso:
+            if saida:
+                try:
+                    escrever_vm(resultado.codigo, saida)
+                    resposta['saida'] = saida
+                except OSError as e:
+                    resposta['estado'] = 'erro'
+                    resposta['diagnosticos'].append(f"Erro ao escrever ficheiro: {e}")
+            else:
+                resposta['codigo'] = list(resultado.codigo.linhas())
+        return resposta
+
+    async def responder(self, linha):
+        try:
+            pedido = json.loads(linha)
+            if not isinstance(pedido, dict):
+                raise ValueError("o pedido tem de ser um objeto JSON")
+        except ValueError as e:
+            return {'id': None, 'estado': 'erro', 'diagnosticos': [f"Pedido inválido: {e}"]}
+
+        comando = pedido.get('comando')
+        if comando == 'estado':
+            resposta = {'estado': 'ok', 'pedidos': self.pedidos,
+                        'ativo_ha': time.time() - self.inicio, 'pid': os.getpid()}
+        elif comando == 'parar':
+            self.parado.set()
+            resposta = {'estado': 'ok'}
+        elif comando is not None:
+            resposta = {'estado': 'erro', 'diagnosticos': [f"Comando desconhecido: {comando}"]}
+        else:
+            self.pedidos += 1
+            inicio = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            resposta = await loop.run_in_executor(self.executor, self.compilar, pedido)
+            resposta['tempos'] = dict(resposta.get('tempos', {}), servidor=time.perf_counter() - inicio)
+        resposta['id'] = pedido.get('id')
+        return resposta
+
+    async def atender(self, reader, writer):
+        """Lê pedidos de uma ligação até ao fim; cada pedido é tratado numa tarefa própria"""
+        tarefas = set()
+
+        async def tratar(linha):
+            resposta = await self.responder(linha)
+            writer.write(json.dumps(resposta, ensure_ascii=False).encode() + b'\n')
+            await writer.drain()
+
+        try:
+            while True:
+                linha = await reader.readline()
+                if not linha:
+                    break
+                if linha.strip():
+                    tarefa = asyncio.create_task(tratar(linha))
+                    tarefas.add(tarefa)
+                    tarefa.add_done_callback(tarefas.discard)
+            if tarefas:
+                await asyncio.gather(*tarefas)
+        except (ConnectionError, ValueError):
+            pass  # cliente desligou-se ou enviou uma linha maior do que o limite
+        except asyncio.CancelledError:
+            pass  # o servidor está a terminar (comando 'parar')
+        finally:
+            writer.close()
+
+    async def servir_unix(self, caminho):
+        self.parado = asyncio.Event()
+        if os.path.exists(caminho):
+            os.unlink(caminho)
+        servidor = await asyncio.start_unix_server(self.atender, path=caminho, limit=LIMITE_LINHA)
+        print(f"A ouvir em {caminho}", file=sys.stderr)
+        try:
+            async with servidor:
+                await self.parado.wait()
+        finally:
+            if os.path.exists(caminho):
+                os.unlink(caminho)
+
+    async def servir_stdio(self):
+        """Protocolo de linhas em stdin/stdout (termina no fim de stdin ou com 'parar')"""
+        self.parado = asyncio.Event()
+        atendimento = asyncio.create_task(self.atender(LeitorStdin(), EscritorStdout()))
+        parar = asyncio.create_task(self.parado.wait())
+        await asyncio.wait([atendimento, parar], return_when=asyncio.FIRST_COMPLETED)
+
+
+class LeitorStdin:
+    """readline() assíncrono sobre stdin (pipes, ficheiros ou terminais)
+
+    Lê numa thread daemon, para o processo poder terminar com 'parar' mesmo com stdin aberto.
+    """
+
+    def __init__(self):
+        self.linhas = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+
+        def ler():
+            # os.read e não sys.stdin: o objeto com buffer não pode ficar bloqueado ao terminar
+            resto = b''
+            while True:
+                dados = os.read(sys.stdin.fileno(), 1 << 16)
+                if not dados:
+                    break
+                *linhas, resto = (resto + dados).split(b'\n')
+                for linha in linhas:
+                    loop.call_soon_threadsafe(self.linhas.put_nowait, linha + b'\n')
+            if resto:
+                loop.call_soon_threadsafe(self.linhas.put_nowait, resto)
+            loop.call_soon_threadsafe(self.linhas.put_nowait, b'')
+
+        threading.Thread(target=ler, daemon=True).start()
+
+    async def readline(self):
+        return await self.linhas.get()
+
+
+class EscritorStdout:
+    """Interface mínima de StreamWriter sobre stdout (uma resposta por linha, escrita logo)"""
+
+    def write(self, dados):
+        sys.stdout.buffer.write(dados)
+        sys.stdout.buffer.flush()
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        sys.stdout.buffer.flush()
+
+
+if __name__ == "__main__":
+    cli = argparse.ArgumentParser(description="Servidor de compilação Pascal -> EWVM")
+    modo = cli.add_mutually_exclusive_group()
+    modo.add_argument('--socket', default=SOCKET_OMISSAO, metavar='CAMINHO',
+                      help=f"socket Unix onde ouvir (por omissão {SOCKET_OMISSAO})")
+    modo.add_argument('--stdio', action='store_true', help="lê pedidos de stdin e responde em stdout")
+    cli.add_argument('--threads', type=int, default=None, help="threads de compilação")
+    cli.add_argument('--scanner', choices=SCANNERS, default='ply')
+    cli.add_argument('--cache', nargs='?', const='', metavar='DIR',
+                     help="reutiliza compilações guardadas em disco (por omissão em ~/.cache/plc2025)")
+    opcoes = cli.parse_args()
+
+    cache = None
+    if opcoes.cache is not None:
+        cache = CacheCompilacao(opcoes.cache or PASTA_OMISSAO)
+    servidor = ServidorCompilacao(opcoes.threads, opcoes.scanner, cache)
+    try:
+        if opcoes.stdio:
+            asyncio.run(servidor.servir_stdio())
+        else:
+            asyncio.run(servidor.servir_unix(opcoes.socket))
+    except KeyboardInterrupt:
+        pass
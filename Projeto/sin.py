@@ -1,5 +1,14 @@
+import os
+import sys
+import re
+import copy
+from bisect import bisect_right
 import ply.yacc as yacc
-from lex import tokens, lexer
+import lex
+from lex import tokens, obter_lexer
+from arvore import (No, Gramatica, Programa, Cabecalho, Titulo, VarSection, VarDecl, TipoArray,
+                    Function, Procedure, Param, Bloco, BeginEnd, Assign, If, While, For, Call,
+                    Write, Writeln, Read, Readln, Binop, Unop, Var, ArrayAccess)
 
 # Precedência e associatividade dos operadores
 precedence = (
@@ -14,16 +23,40 @@ precedence = (
 )
 
 
+# POSIÇÕES
+# Cada nó recebe a linha e a coluna (a contar de 1) de um token da sua produção: a
+# palavra-chave da instrução, o operador da expressão ou o identificador.
+# O início das linhas é calculado uma vez por texto (guardado no lexer) e procurado por
+# bisseção: procurar o '\n' anterior a cada token é quadrático num programa de uma só linha.
+
+def inicios_linhas(lexer):
+    texto = lexer.lexdata
+    if getattr(lexer, 'texto_linhas', None) is not texto:
+        lexer.texto_linhas = texto
+        lexer.inicios_linhas = [0] + [m.end() for m in re.finditer('\n', texto)]
+    return lexer.inicios_linhas
+
+
+def pos(p, i):
+    lexpos = p.lexpos(i)
+    inicios = inicios_linhas(p.lexer)
+    return {'linha': p.lineno(i), 'coluna': lexpos - inicios[bisect_right(inicios, lexpos) - 1] + 1}
+
+
+def pos_de(no):
+    return {'linha': no.linha, 'coluna': no.coluna}
+
+
 # ESTRUTURA PRINCIPAL DO PROGRAMA
 
 def p_gramatica(p):
     '''gramatica : programa '.' '''
-    p[0] = ('gramatica', p[1])
+    p[0] = Gramatica(p[1], **pos_de(p[1]))
 
 
 def p_programa(p):
     '''programa : cabecalho corpo'''
-    p[0] = ('programa', p[1], p[2])
+    p[0] = Programa(p[1], p[2], **pos_de(p[1]))
 
 
 def p_cabecalho(p):
@@ -36,28 +69,28 @@ def p_cabecalho(p):
         # Ambas existem - combinar declarações
         decls_ini = vars_iniciais[1] if vars_iniciais else []
         decls_fim = vars_finais[1] if vars_finais else []
-        vars_combinadas = ('var_section', decls_ini + decls_fim)
+        vars_combinadas = VarSection(decls_ini + decls_fim, **pos_de(vars_iniciais))
     elif vars_iniciais:
         vars_combinadas = vars_iniciais
     elif vars_finais:
         vars_combinadas = vars_finais
     else:
         vars_combinadas = None
-    p[0] = ('cabecalho', p[1], p[3], vars_combinadas)
+    p[0] = Cabecalho(p[1], p[3], vars_combinadas, **pos_de(p[1]))
 
 
 def p_declaracoes_variaveis_finais(p):
     '''declaracoes_variaveis_finais : VAR declaracoes
                                     | empty'''
     if len(p) == 3:
-        p[0] = ('var_section', p[2])
+        p[0] = VarSection(p[2], **pos(p, 1))
     else:
         p[0] = None
 
 
 def p_titulo(p):
     '''titulo : PROGRAM ID ';' '''
-    p[0] = ('titulo', p[2])
+    p[0] = Titulo(p[2], **pos(p, 1))
 
 
 # DECLARAÇÃO DE SUBPROGRAMAS (PROCEDURES E FUNCTIONS)
@@ -69,30 +102,31 @@ def p_declaracao_subprogramas(p):
     if len(p) == 2:
         p[0] = []
     else:
-        p[0] = p[1] + [p[2]]
+        p[1].append(p[2])
+        p[0] = p[1]
 
 
 def p_procedure_declaration(p):
     '''procedure_declaration : PROCEDURE ID ';' bloco_subprograma ';'
                              | PROCEDURE ID '(' parametros ')' ';' bloco_subprograma ';' '''
     if len(p) == 6:
-        p[0] = ('procedure', p[2], [], p[4])
+        p[0] = Procedure(p[2], [], p[4], **pos(p, 1))
     else:
-        p[0] = ('procedure', p[2], p[4], p[7])
+        p[0] = Procedure(p[2], p[4], p[7], **pos(p, 1))
 
 
 def p_function_declaration(p):
     '''function_declaration : FUNCTION ID ':' tipo ';' bloco_subprograma ';'
                             | FUNCTION ID '(' parametros ')' ':' tipo ';' bloco_subprograma ';' '''
     if len(p) == 8:
-        p[0] = ('function', p[2], [], p[4], p[6])
+        p[0] = Function(p[2], [], p[4], p[6], **pos(p, 1))
     else:
-        p[0] = ('function', p[2], p[4], p[7], p[9])
+        p[0] = Function(p[2], p[4], p[7], p[9], **pos(p, 1))
 
 
 def p_bloco_subprograma(p):
     '''bloco_subprograma : declaracoes_variaveis corpo'''
-    p[0] = ('bloco', p[1], p[2])
+    p[0] = Bloco(p[1], p[2], **pos_de(p[2]))
 
 
 def p_parametros(p):
@@ -103,11 +137,13 @@ def p_parametros(p):
 
 def p_lista_parametros(p):
     '''lista_parametros : lista_id ':' tipo
-                        | lista_id ':' tipo ';' lista_parametros'''
+                        | lista_parametros ';' lista_id ':' tipo'''
+    # Recursiva à esquerda: cada redução acrescenta ao fim da lista (tempo linear)
     if len(p) == 4:
-        p[0] = [('param', p[1], p[3])]
+        p[0] = [Param(p[1], p[3], **pos(p, 2))]
     else:
-        p[0] = [('param', p[1], p[3])] + p[5]
+        p[1].append(Param(p[3], p[5], **pos(p, 4)))
+        p[0] = p[1]
 
 
 # DECLARAÇÕES DE VARIÁVEIS
@@ -116,23 +152,24 @@ def p_declaracoes_variaveis(p):
     '''declaracoes_variaveis : VAR declaracoes
                              | empty'''
     if len(p) == 3:
-        p[0] = ('var_section', p[2])
+        p[0] = VarSection(p[2], **pos(p, 1))
     else:
         p[0] = None
 
 
 def p_declaracoes(p):
     '''declaracoes : declaracao
-                   | declaracao declaracoes'''
+                   | declaracoes declaracao'''
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = [p[1]] + p[2]
+        p[1].append(p[2])
+        p[0] = p[1]
 
 
 def p_declaracao(p):
     '''declaracao : lista_id ':' tipo ';' '''
-    p[0] = ('var_decl', p[1], p[3])
+    p[0] = VarDecl(p[1], p[3], **pos(p, 2))
 
 
 def p_lista_id(p):
@@ -141,7 +178,8 @@ def p_lista_id(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 
 # TIPOS
@@ -153,28 +191,31 @@ def p_tipo(p):
             | CHAR
             | STRING
             | tipo_array'''
-    p[0] = p[1] if isinstance(p[1], str) else p[1]
+    p[0] = p[1]
 
 
 def p_tipo_array(p):
     '''tipo_array : ARRAY '[' NUMBER RANGE NUMBER ']' OF tipo'''
-    p[0] = ('array', p[3], p[5], p[8])
+    p[0] = TipoArray(p[3], p[5], p[8], **pos(p, 1))
 
 
 # CORPO DO PROGRAMA
 
 def p_corpo(p):
     '''corpo : BEGIN lista_instrucoes END'''
-    p[0] = ('begin_end', p[2])
+    p[0] = BeginEnd(p[2], **pos(p, 1))
 
 
 def p_lista_instrucoes(p):
     '''lista_instrucoes : instrucao
                         | lista_instrucoes ';' instrucao'''
+    # As listas são estendidas no lugar (append), para o parsing ser linear no número de instruções
     if len(p) == 2:
         p[0] = [p[1]] if p[1] is not None else []
     else:
-        p[0] = p[1] + ([p[3]] if p[3] is not None else [])
+        if p[3] is not None:
+            p[1].append(p[3])
+        p[0] = p[1]
 
 
 # INSTRUÇÕES
@@ -194,21 +235,21 @@ def p_instrucao(p):
 
 def p_bloco(p):
     '''bloco : BEGIN lista_instrucoes END'''
-    p[0] = ('begin_end', p[2])
+    p[0] = BeginEnd(p[2], **pos(p, 1))
 
 
 def p_atribuicao(p):
     '''atribuicao : variavel ASSIGN expressao'''
-    p[0] = ('assign', p[1], p[3])
+    p[0] = Assign(p[1], p[3], **pos(p, 2))
 
 
 def p_chamada_procedimento(p):
     '''chamada_procedimento : ID '(' lista_expressao ')'
                             | ID'''
     if len(p) == 2:
-        p[0] = ('call', p[1], [])
+        p[0] = Call(p[1], [], **pos(p, 1))
     else:
-        p[0] = ('call', p[1], p[3])
+        p[0] = Call(p[1], p[3], **pos(p, 1))
 
 
 # COMANDOS DE ENTRADA/SAÍDA
@@ -218,11 +259,11 @@ def p_leitura(p):
                | READLN '(' lista_variaveis ')'
                | READLN'''
     if len(p) == 2:
-        p[0] = ('readln', [])
+        p[0] = Readln([], **pos(p, 1))
     elif p[1].lower() == 'read':
-        p[0] = ('read', p[3])
+        p[0] = Read(p[3], **pos(p, 1))
     else:
-        p[0] = ('readln', p[3])
+        p[0] = Readln(p[3], **pos(p, 1))
 
 
 def p_escrita(p):
@@ -230,11 +271,11 @@ def p_escrita(p):
                | WRITELN '(' lista_expressao ')'
                | WRITELN'''
     if len(p) == 2:
-        p[0] = ('writeln', [])
+        p[0] = Writeln([], **pos(p, 1))
     elif p[1].lower() == 'write':
-        p[0] = ('write', p[3])
+        p[0] = Write(p[3], **pos(p, 1))
     else:
-        p[0] = ('writeln', p[3])
+        p[0] = Writeln(p[3], **pos(p, 1))
 
 
 def p_lista_variaveis(p):
@@ -243,7 +284,8 @@ def p_lista_variaveis(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 
 # ESTRUTURAS DE CONTROLE
@@ -252,20 +294,20 @@ def p_if_statement(p):
     '''if_statement : IF expressao THEN instrucao
                     | IF expressao THEN instrucao ELSE instrucao'''
     if len(p) == 5:
-        p[0] = ('if', p[2], p[4], None)
+        p[0] = If(p[2], p[4], None, **pos(p, 1))
     else:
-        p[0] = ('if', p[2], p[4], p[6])
+        p[0] = If(p[2], p[4], p[6], **pos(p, 1))
 
 
 def p_while_statement(p):
     '''while_statement : WHILE expressao DO instrucao'''
-    p[0] = ('while', p[2], p[4])
+    p[0] = While(p[2], p[4], **pos(p, 1))
 
 
 def p_for_statement(p):
     '''for_statement : FOR ID ASSIGN expressao TO expressao DO instrucao
                      | FOR ID ASSIGN expressao DOWNTO expressao DO instrucao'''
-    p[0] = ('for', p[2], p[4], p[6], p[5].lower(), p[8])
+    p[0] = For(p[2], p[4], p[6], p[5].lower(), p[8], **pos(p, 1))
 
 
 # EXPRESSÕES
@@ -276,7 +318,8 @@ def p_lista_expressao(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 
 def p_expressao(p):
@@ -291,7 +334,7 @@ def p_expressao_logica(p):
     if len(p) == 2:
         p[0] = p[1]
     else:
-        p[0] = ('binop', p[2].lower(), p[1], p[3])
+        p[0] = Binop(p[2].lower(), p[1], p[3], **pos(p, 2))
 
 
 def p_expressao_relacional(p):
@@ -300,7 +343,7 @@ def p_expressao_relacional(p):
     if len(p) == 2:
         p[0] = p[1]
     else:
-        p[0] = ('binop', p[2], p[1], p[3])
+        p[0] = Binop(p[2], p[1], p[3], **pos(p, 2))
 
 
 def p_operador_relacional(p):
@@ -311,6 +354,9 @@ def p_operador_relacional(p):
                            | GREATER_THAN
                            | GREATER_THAN_OR_EQUAL_TO'''
     p[0] = p[1]
+    # Posição do operador, para o nó binop
+    p.set_lineno(0, p.lineno(1))
+    p.set_lexpos(0, p.lexpos(1))
 
 
 def p_expressao_aritmetica(p):
@@ -320,7 +366,7 @@ def p_expressao_aritmetica(p):
     if len(p) == 2:
         p[0] = p[1]
     else:
-        p[0] = ('binop', p[2], p[1], p[3])
+        p[0] = Binop(p[2], p[1], p[3], **pos(p, 2))
 
 
 def p_termo(p):
@@ -332,7 +378,7 @@ def p_termo(p):
     if len(p) == 2:
         p[0] = p[1]
     else:
-        p[0] = ('binop', p[2].lower() if isinstance(p[2], str) and p[2].isupper() else p[2], p[1], p[3])
+        p[0] = Binop(p[2].lower() if isinstance(p[2], str) and p[2].isupper() else p[2], p[1], p[3], **pos(p, 2))
 
 
 def p_fator(p):
@@ -352,17 +398,17 @@ def p_fator(p):
 
 def p_fator_not(p):
     '''fator : NOT fator'''
-    p[0] = ('unop', 'not', p[2])
+    p[0] = Unop('not', p[2], **pos(p, 1))
 
 
 def p_fator_menos_unario(p):
     '''fator : '-' fator %prec UMINUS'''
-    p[0] = ('unop', '-', p[2])
+    p[0] = Unop('-', p[2], **pos(p, 1))
 
 
 def p_fator_mais_unario(p):
     '''fator : '+' fator %prec UMINUS'''
-    p[0] = ('unop', '+', p[2])
+    p[0] = Unop('+', p[2], **pos(p, 1))
 
 
 # VARIÁVEIS E CHAMADAS DE FUNÇÃO
@@ -371,18 +417,18 @@ def p_variavel(p):
     '''variavel : ID
                 | ID '[' expressao ']' '''
     if len(p) == 2:
-        p[0] = ('var', p[1])
+        p[0] = Var(p[1], **pos(p, 1))
     else:
-        p[0] = ('array_access', p[1], p[3])
+        p[0] = ArrayAccess(p[1], p[3], **pos(p, 1))
 
 
 def p_chamada_funcao(p):
     '''chamada_funcao : ID '(' lista_expressao ')'
                       | LENGTH '(' expressao ')' '''
     if len(p) == 5 and p[1].lower() == 'length':
-        p[0] = ('call', 'length', [p[3]])
+        p[0] = Call('length', [p[3]], **pos(p, 1))
     else:
-        p[0] = ('call', p[1], p[3])
+        p[0] = Call(p[1], p[3], **pos(p, 1))
 
 
 # Empty
@@ -394,54 +440,181 @@ def p_empty(p):
 
 # TRATAMENTO DE ERROS
 
+def mensagem_erro_sintaxe(p):
+    if p:
+        return f"Erro de sintaxe no token '{p.value}' (tipo: {p.type}) na linha {p.lineno}"
+    return "Erro de sintaxe: fim de arquivo inesperado"
+
+
 def p_error(p):
+    print(mensagem_erro_sintaxe(p))
     if p:
-        print(f"Erro de sintaxe no token '{p.value}' (tipo: {p.type}) na linha {p.lineno}")
-        parser.errok()
-    else:
-        print("Erro de sintaxe: fim de arquivo inesperado")
+        obter_parser().errok()
 
 
 # PARSER
-parser = yacc.yacc()
+# As tabelas LALR vêm de tabelas_parser.py, gerado com 'python3 sin.py --gerar-tabelas' (e a
+# tabela do lexer com elas). Com as tabelas, o arranque não reflete nem valida a gramática,
+# nem escreve parser.out/parsetab.py: só liga as ações p_* às produções. O parser é construído
+# na primeira utilização. Se a gramática mudar, é preciso voltar a gerar as tabelas
+# (verificar_tabelas() deteta tabelas desatualizadas).
+
+_parser = None
+
+
+def obter_parser():
+    """Parser partilhado do módulo (construído na primeira chamada)"""
+    global _parser
+    if _parser is None:
+        try:
+            import tabelas_parser
+            tabela = yacc.LRTable()
+            tabela.read_table(tabelas_parser)
+            tabela.bind_callables(globals())
+            _parser = yacc.LRParser(tabela, p_error)
+        except (ImportError, yacc.VersionError):
+            # Sem tabelas (ou de outra versão do PLY): gera-as em memória, sem escrever ficheiros
+            _parser = yacc.yacc(module=sys.modules[__name__], debug=False, write_tables=False)
+    return _parser
+
+
+def assinatura_gramatica():
+    reflexao = yacc.ParserReflect(dict(globals()))
+    reflexao.get_all()
+    return reflexao.signature()
+
+
+def verificar_tabelas():
+    """Lista de problemas das tabelas pré-calculadas (vazia se estiverem de acordo com o código)"""
+    problemas = []
+    try:
+        import tabelas_parser
+    except ImportError:
+        problemas.append("tabelas_parser.py não existe")
+    else:
+        if tabelas_parser._lr_signature != assinatura_gramatica():
+            problemas.append("tabelas_parser.py não corresponde à gramática")
+    try:
+        import tabelas_lexer
+    except ImportError:
+        problemas.append("tabelas_lexer.py não existe")
+    else:
+        import tempfile
+        with tempfile.TemporaryDirectory() as pasta:
+            lex.escrever_tabela(pasta)
+            with open(os.path.join(pasta, 'tabelas_lexer.py')) as nova, open(tabelas_lexer.__file__) as atual:
+                if nova.read() != atual.read():
+                    problemas.append("tabelas_lexer.py não corresponde às regras do lexer")
+    return problemas
+
+
+def gerar_tabelas(pasta=None):
+    """Gera tabelas_parser.py e tabelas_lexer.py (validando a gramática e as regras)"""
+    pasta = pasta or os.path.dirname(os.path.abspath(__file__))
+    lex.escrever_tabela(pasta)
+    # Gera de raiz num módulo com outro nome (o yacc reutilizaria as tabelas existentes)
+    yacc.yacc(module=sys.modules[__name__], debug=False, tabmodule='_tabelas_novas', outputdir=pasta)
+    with open(os.path.join(pasta, '_tabelas_novas.py')) as f:
+        texto = f.read().replace('# _tabelas_novas.py', '# tabelas_parser.py', 1)
+    with open(os.path.join(pasta, 'tabelas_parser.py'), 'w') as f:
+        f.write(texto)
+    os.unlink(os.path.join(pasta, '_tabelas_novas.py'))
 
 # Auxiliar
 def print_ast(node, indent=0):
-    """Imprime a AST de forma hierárquica"""
-    spacing = "  " * indent
-    
-    if isinstance(node, tuple):
-        print(f"{spacing}({node[0]}")
-        for child in node[1:]:
-            if child is not None:
-                print_ast(child, indent + 1)
-        print(f"{spacing})")
-    elif isinstance(node, list):
-        if node:  # Só imprime se a lista não estiver vazia
-            print(f"{spacing}[")
-            for item in node:
-                if item is not None:
-                    print_ast(item, indent + 1)
-            print(f"{spacing}]")
+    """Imprime a AST de forma hierárquica
+
+    Usa uma pilha explícita (e não recursão), para árvores de qualquer profundidade.
+    """
+    pilha = [(node, indent)]
+    while pilha:
+        node, indent = pilha.pop()
+        spacing = "  " * indent
+        
+        if isinstance(node, Fecho):
+            print(f"{spacing}{node.texto}")
+        elif isinstance(node, (tuple, No)):
+            print(f"{spacing}({node[0]}")
+            pilha.append((Fecho(')'), indent))
+            filhos = [child for child in node[1:] if child is not None]
+            pilha.extend((child, indent + 1) for child in reversed(filhos))
+        elif isinstance(node, list):
+            if node:  # Só imprime se a lista não estiver vazia
+                print(f"{spacing}[")
+                pilha.append((Fecho(']'), indent))
+                pilha.extend((item, indent + 1) for item in reversed(node) if item is not None)
+        else:
+            print(f"{spacing}{repr(node)}")
+
+
+class Fecho:
+    """Marca na pilha do print_ast: o parêntese a fechar depois dos filhos"""
+    def __init__(self, texto):
+        self.texto = texto
+
+SCANNERS = ('ply', 'rapido')
+
+def criar_lexer(scanner='ply', diagnosticos=None):
+    """Devolve um lexer novo (linha 1): o do PLY (lex.py) ou o de expressão mestra (lex_rapido.py)
+
+    Com uma lista em diagnosticos, os erros léxicos são lá guardados em vez de impressos.
+    """
+    if scanner == 'rapido':
+        from lex_rapido import LexerRapido
+        novo = LexerRapido()
+    elif scanner == 'ply':
+        # clone() partilha as expressões regulares já compiladas, mas não o estado
+        novo = obter_lexer().clone()
+        novo.lineno = 1
     else:
-        print(f"{spacing}{repr(node)}")
+        raise ValueError(f"Scanner desconhecido: {scanner}")
+    novo.diagnosticos = diagnosticos
+    return novo
+
+
+def criar_parser(reportar):
+    """Parser com estado próprio (partilha as tabelas LALR) que passa os erros de sintaxe a reportar(msg)"""
+    novo = copy.copy(obter_parser())
+
+    def erro(p):
+        reportar(mensagem_erro_sintaxe(p))
+        if p:
+            novo.errok()
+
+    novo.errorfunc = erro
+    return novo
 
 # para testar com: python3 sin.py
-def parse_file(filename):
+def parse_file(filename, scanner='ply'):
     """Lê um arquivo e retorna a AST"""
     try:
         with open(filename, 'r') as f:
             data = f.read()
-        return parser.parse(data, lexer=lexer)
+        return obter_parser().parse(data, lexer=criar_lexer(scanner))
     except FileNotFoundError:
         print(f"Erro: Arquivo '{filename}' não encontrado.")
         return None
 
-def parse_string(code):
-    return parser.parse(code, lexer=lexer)
-
-# if __name__ == '__main__':
-#     print("Teste do Parser")
-#     code = "program Teste; begin writeln('Ola'); end."
-#     result = parse_string(code)
-#     print(result)
\ No newline at end of file
+def parse_string(code, scanner='ply'):
+    return obter_parser().parse(code, lexer=criar_lexer(scanner))
+
+def __getattr__(nome):
+    # Compatibilidade: sin.parser continua a existir, construído só quando é usado
+    if nome == 'parser':
+        return obter_parser()
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+
+# Regenerar as tabelas depois de alterar a gramática ou o lexer: python3 sin.py --gerar-tabelas
+if __name__ == '__main__':
+    if sys.argv[1:] == ['--gerar-tabelas']:
+        gerar_tabelas()
+        print("Tabelas geradas: tabelas_parser.py, tabelas_lexer.py")
+    elif sys.argv[1:] == ['--verificar-tabelas']:
+        problemas = verificar_tabelas()
+        for problema in problemas:
+            print(problema)
+        sys.exit(1 if problemas else 0)
+    else:
+        print("Uso: python3 sin.py --gerar-tabelas | --verificar-tabelas")
+        sys.exit(2)
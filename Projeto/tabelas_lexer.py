@@ -0,0 +1,10 @@
+# tabelas_lexer.py. This file automatically created by PLY (version 3.11). Don't edit!
+_tabversion   = '3.10'
+_lextokens    = set(('AND', 'ARRAY', 'ASSIGN', 'BEGIN', 'BOOLEAN', 'CHAR', 'DIV', 'DO', 'DOWNTO', 'ELSE', 'END', 'EQUALS', 'FALSE', 'FOR', 'FUNCTION', 'GREATER_THAN', 'GREATER_THAN_OR_EQUAL_TO', 'ID', 'IF', 'INTEGER', 'LENGTH', 'LESS_THAN', 'LESS_THAN_OR_EQUAL_TO', 'MOD', 'NOT', 'NOT_EQUALS', 'NUMBER', 'OF', 'OR', 'PROCEDURE', 'PROGRAM', 'RANGE', 'READ', 'READLN', 'REAL', 'REAL_NUMBER', 'STRING', 'STRING_LITERAL', 'THEN', 'TO', 'TRUE', 'VAR', 'WHILE', 'WRITE', 'WRITELN'))
+_lexreflags   = 64
+_lexliterals  = ';,().:[]+-*/'
+_lexstateinfo = {'INITIAL': 'inclusive'}
+_lexstatere   = {'INITIAL': [("(?P<t_ASSIGN>:=)|(?P<t_EQUALS>=)|(?P<t_NOT_EQUALS><>|!=)|(?P<t_LESS_THAN_OR_EQUAL_TO><=)|(?P<t_GREATER_THAN_OR_EQUAL_TO>>=)|(?P<t_LESS_THAN><)|(?P<t_GREATER_THAN>>)|(?P<t_RANGE>\\.\\.)|(?P<t_STRING_LITERAL>'([^']|'')*')|(?P<t_REAL_NUMBER>\\d+\\.\\d+)|(?P<t_NUMBER>\\d+)|(?P<t_ID>[a-zA-Z_][a-zA-Z0-9_]*)|(?P<t_COMMENT_BRACE>\\{[^}]*\\})|(?P<t_COMMENT_PAREN>\\(\\*(.|\\n)*?\\*\\))|(?P<t_newline>\\n+)", [None, ('t_ASSIGN', 'ASSIGN'), ('t_EQUALS', 'EQUALS'), ('t_NOT_EQUALS', 'NOT_EQUALS'), ('t_LESS_THAN_OR_EQUAL_TO', 'LESS_THAN_OR_EQUAL_TO'), ('t_GREATER_THAN_OR_EQUAL_TO', 'GREATER_THAN_OR_EQUAL_TO'), ('t_LESS_THAN', 'LESS_THAN'), ('t_GREATER_THAN', 'GREATER_THAN'), ('t_RANGE', 'RANGE'), ('t_STRING_LITERAL', 'STRING_LITERAL'), None, ('t_REAL_NUMBER', 'REAL_NUMBER'), ('t_NUMBER', 'NUMBER'), ('t_ID', 'ID'), ('t_COMMENT_BRACE', 'COMMENT_BRACE'), ('t_COMMENT_PAREN', 'COMMENT_PAREN'), None, ('t_newline', 'newline')])]}
+_lexstateignore = {'INITIAL': ' \t'}
+_lexstateerrorf = {'INITIAL': 't_error'}
+_lexstateeoff = {}
@@ -0,0 +1,129 @@
+
+# tabelas_parser.py
+# This file is automatically generated. Do not edit.
+# pylint: disable=W,C,R
+_tabversion = '3.10'
+
+_lr_method = 'LALR'
+
+_lr_signature = "leftORleftANDrightNOTleftEQUALSNOT_EQUALSLESS_THANLESS_THAN_OR_EQUAL_TOGREATER_THANGREATER_THAN_OR_EQUAL_TOleft+-left*/DIVMODrightUMINUSAND ARRAY ASSIGN BEGIN BOOLEAN CHAR DIV DO DOWNTO ELSE END EQUALS FALSE FOR FUNCTION GREATER_THAN GREATER_THAN_OR_EQUAL_TO ID IF INTEGER LENGTH LESS_THAN LESS_THAN_OR_EQUAL_TO MOD NOT NOT_EQUALS NUMBER OF OR PROCEDURE PROGRAM RANGE READ READLN REAL REAL_NUMBER STRING STRING_LITERAL THEN TO TRUE VAR WHILE WRITE WRITELNgramatica : programa '.' programa : cabecalho corpocabecalho : titulo declaracoes_variaveis declaracao_subprogramas declaracoes_variaveis_finaisdeclaracoes_variaveis_finais : VAR declaracoes\n                                    | emptytitulo : PROGRAM ID ';' declaracao_subprogramas : declaracao_subprogramas procedure_declaration\n                               | declaracao_subprogramas function_declaration\n                               | emptyprocedure_declaration : PROCEDURE ID ';' bloco_subprograma ';'\n                             | PROCEDURE ID '(' parametros ')' ';' bloco_subprograma ';' function_declaration : FUNCTION ID ':' tipo ';' bloco_subprograma ';'\n                            | FUNCTION ID '(' parametros ')' ':' tipo ';' bloco_subprograma ';' bloco_subprograma : declaracoes_variaveis corpoparametros : lista_parametros\n                  | emptylista_parametros : lista_id ':' tipo\n                        | lista_parametros ';' lista_id ':' tipodeclaracoes_variaveis : VAR declaracoes\n                             | emptydeclaracoes : declaracao\n                   | declaracoes declaracaodeclaracao : lista_id ':' tipo ';' lista_id : ID\n                | lista_id ',' IDtipo : INTEGER\n            | REAL\n            | BOOLEAN\n            | CHAR\n            | STRING\n            | tipo_arraytipo_array : ARRAY '[' NUMBER RANGE NUMBER ']' OF tipocorpo : BEGIN lista_instrucoes ENDlista_instrucoes : instrucao\n                        | lista_instrucoes ';' instrucaoinstrucao : atribuicao\n                 | leitura\n                 | escrita\n                 | if_statement\n                 | while_statement\n                 | for_statement\n                 | chamada_procedimento\n                 | bloco\n                 | emptybloco : BEGIN lista_instrucoes ENDatribuicao : variavel ASSIGN expressaochamada_procedimento : ID '(' lista_expressao ')'\n                            | IDleitura : READ '(' lista_variaveis ')'\n               | READLN '(' lista_variaveis ')'\n               | READLNescrita : WRITE '(' lista_expressao ')'\n               | WRITELN '(' lista_expressao ')'\n               | WRITELNlista_variaveis : variavel\n                       | lista_variaveis ',' variavelif_statement : IF expressao THEN instrucao\n                    | IF expressao THEN instrucao ELSE instrucaowhile_statement : WHILE expressao DO instrucaofor_statement : FOR ID ASSIGN expressao TO expressao DO instrucao\n                     | FOR ID ASSIGN expressao DOWNTO expressao DO instrucaolista_expressao : expressao\n                       | lista_expressao ',' expressaoexpressao : expressao_logicaexpressao_logica : expressao_logica OR expressao_relacional\n                        | expressao_logica AND expressao_relacional\n                        | expressao_relacionalexpressao_relacional : expressao_aritmetica operador_relacional expressao_aritmetica\n                            | expressao_aritmeticaoperador_relacional : EQUALS\n                           | NOT_EQUALS\n                           | LESS_THAN\n                           | LESS_THAN_OR_EQUAL_TO\n                           | GREATER_THAN\n                           | GREATER_THAN_OR_EQUAL_TOexpressao_aritmetica : expressao_aritmetica '+' termo\n                            | expressao_aritmetica '-' termo\n                            | termotermo : termo '*' fator\n             | termo '/' fator\n             | termo DIV fator\n             | termo MOD fator\n             | fatorfator : NUMBER\n             | REAL_NUMBER\n             | STRING_LITERAL\n             | TRUE\n             | FALSE\n             | variavel\n             | chamada_funcao\n             | '(' expressao ')' fator : NOT fatorfator : '-' fator %prec UMINUSfator : '+' fator %prec UMINUSvariavel : ID\n                | ID '[' expressao ']' chamada_funcao : ID '(' lista_expressao ')'\n                      | LENGTH '(' expressao ')' empty :"
+    
+_lr_action_items = {'PROGRAM':([0,],[5,]),'$end':([1,6,],[0,-1,]),'.':([2,7,42,],[6,-2,-33,]),'BEGIN':([3,4,8,9,11,13,34,35,36,37,40,43,72,73,74,76,79,92,114,118,153,157,161,167,178,183,186,187,188,198,201,203,207,],[8,-99,13,-99,-20,13,-99,-9,-19,-21,-6,13,-3,-7,-8,-5,-22,13,13,-4,-99,-23,13,8,-10,-99,13,13,-99,-12,-11,-99,-13,]),'VAR':([4,9,11,34,35,36,37,40,73,74,79,153,157,178,183,188,198,201,203,207,],[10,-99,-20,75,-9,-19,-21,-6,-7,-8,-22,10,-23,-10,10,10,-12,-11,10,-13,]),'PROCEDURE':([4,9,11,34,35,36,37,40,73,74,79,157,178,198,201,207,],[-99,-99,-20,77,-9,-19,-21,-6,-7,-8,-22,-23,-10,-12,-11,-13,]),'FUNCTION':([4,9,11,34,35,36,37,40,73,74,79,157,178,198,201,207,],[-99,-99,-20,78,-9,-19,-21,-6,-7,-8,-22,-23,-10,-12,-11,-13,]),'ID':([5,8,10,13,30,31,32,36,37,43,44,45,46,47,48,53,55,64,65,70,71,75,77,78,79,81,92,93,94,95,96,97,98,99,100,101,102,103,105,106,107,108,112,113,114,115,118,131,134,154,156,157,161,164,165,181,186,187,],[12,33,39,33,66,66,69,39,-21,33,66,87,87,66,66,66,66,66,66,66,66,39,119,120,-22,129,33,66,66,66,66,66,-70,-71,-72,-73,-74,-75,66,66,66,66,66,66,33,66,39,87,66,39,39,-23,33,66,66,39,33,33,]),'READ':([8,13,43,92,114,161,186,187,],[26,26,26,26,26,26,26,26,]),'READLN':([8,13,43,92,114,161,186,187,],[27,27,27,27,27,27,27,27,]),'WRITE':([8,13,43,92,114,161,186,187,],[28,28,28,28,28,28,28,28,]),'WRITELN':([8,13,43,92,114,161,186,187,],[29,29,29,29,29,29,29,29,]),'IF':([8,13,43,92,114,161,186,187,],[30,30,30,30,30,30,30,30,]),'WHILE':([8,13,43,92,114,161,186,187,],[31,31,31,31,31,31,31,31,]),'FOR':([8,13,43,92,114,161,186,187,],[32,32,32,32,32,32,32,32,]),'END':([8,13,14,15,16,17,18,19,20,21,22,23,24,27,29,33,41,43,50,51,52,54,56,57,58,59,60,61,62,63,66,82,83,84,92,104,109,111,114,130,132,133,135,136,137,138,139,140,141,142,143,144,145,146,149,151,152,161,162,163,175,186,187,194,195,],[-99,-99,42,-34,-36,-37,-38,-39,-40,-41,-42,-43,-44,-51,-54,-48,82,-99,-64,-67,-69,-78,-83,-84,-85,-86,-87,-88,-89,-90,-95,-45,-35,-46,-99,-94,-93,-92,-99,-49,-50,-52,-53,-57,-65,-66,-68,-76,-77,-79,-80,-81,-82,-91,-59,-47,-96,-99,-97,-98,-58,-99,-99,-60,-61,]),';':([8,12,13,14,15,16,17,18,19,20,21,22,23,24,27,29,33,41,42,43,50,51,52,54,56,57,58,59,60,61,62,63,66,82,83,84,92,104,109,111,114,119,121,122,123,124,125,126,127,130,132,133,135,136,137,138,139,140,141,142,143,144,145,146,149,151,152,161,162,163,166,169,172,175,179,180,186,187,190,191,194,195,196,199,202,205,206,],[-99,40,-99,43,-34,-36,-37,-38,-39,-40,-41,-42,-43,-44,-51,-54,-48,43,-33,-99,-64,-67,-69,-78,-83,-84,-85,-86,-87,-88,-89,-90,-95,-45,-35,-46,-99,-94,-93,-92,-99,153,157,-26,-27,-28,-29,-30,-31,-49,-50,-52,-53,-57,-65,-66,-68,-76,-77,-79,-80,-81,-82,-91,-59,-47,-96,-99,-97,-98,178,181,183,-58,-14,188,-99,-99,-17,198,-60,-61,201,203,-18,207,-32,]),'ELSE':([16,17,18,19,20,21,22,23,24,27,29,33,50,51,52,54,56,57,58,59,60,61,62,63,66,82,84,92,104,109,111,114,130,132,133,135,136,137,138,139,140,141,142,143,144,145,146,149,151,152,161,162,163,175,186,187,194,195,],[-36,-37,-38,-39,-40,-41,-42,-43,-44,-51,-54,-48,-64,-67,-69,-78,-83,-84,-85,-86,-87,-88,-89,-90,-95,-45,-46,-99,-94,-93,-92,-99,-49,-50,-52,-53,161,-65,-66,-68,-76,-77,-79,-80,-81,-82,-91,-59,-47,-96,-99,-97,-98,-58,-99,-99,-60,-61,]),'ASSIGN':([25,33,69,152,],[44,-95,115,-96,]),'(':([26,27,28,29,30,31,33,44,47,48,53,55,64,65,66,67,70,71,93,94,95,96,97,98,99,100,101,102,103,105,106,107,108,112,113,115,119,120,134,164,165,],[45,46,47,48,64,64,70,64,64,64,64,64,64,64,112,113,64,64,64,64,64,64,64,-70,-71,-72,-73,-74,-75,64,64,64,64,64,64,64,154,156,64,64,64,]),'NUMBER':([30,31,44,47,48,53,55,64,65,70,71,93,94,95,96,97,98,99,100,101,102,103,105,106,107,108,112,113,115,134,158,164,165,185,],[57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,-70,-71,-72,-73,-74,-75,57,57,57,57,57,57,57,57,174,57,57,193,]),'REAL_NUMBER':([30,31,44,47,48,53,55,64,65,70,71,93,94,95,96,97,98,99,100,101,102,103,105,106,107,108,112,113,115,134,164,165,],[58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,-70,-71,-72,-73,-74,-75,58,58,58,58,58,58,58,58,58,58,]),'STRING_LITERAL':([30,31,44,47,48,53,55,64,65,70,71,93,94,95,96,97,98,99,100,101,102,103,105,106,107,108,112,113,115,134,164,165,],[59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,-70,-71,-72,-73,-74,-75,59,59,59,59,59,59,59,59,59,59,]),'TRUE':([30,31,44,47,48,53,55,64,65,70,71,93,94,95,96,97,98,99,100,101,102,103,105,106,107,108,112,113,115,134,164,165,],[60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,60,-70,-71,-72,-73,-74,-75,60,60,60,60,60,60,60,60,60,60,]),'FALSE':([30,31,44,47,48,53,55,64,65,70,71,93,94,95,96,97,98,99,100,101,102,103,105,106,107,108,112,113,115,134,164,165,],[61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,-70,-71,-72,-73,-74,-75,61,61,61,61,61,61,61,61,61,61,]),'NOT':([30,31,44,47,48,53,55,64,65,70,71,93,94,95,96,97,98,99,100,101,102,103,105,106,107,108,112,113,115,134,164,165,],[65,65,65,65,65,65,65,65,65,65,65,65,65,65,65,65,-70,-71,-72,-73,-74,-75,65,65,65,65,65,65,65,65,65,65,]),'-':([30,31,44,47,48,52,53,54,55,56,57,58,59,60,61,62,63,64,65,66,70,71,93,94,95,96,97,98,99,100,101,102,103,104,105,106,107,108,109,111,112,113,115,134,139,140,141,142,143,144,145,146,152,162,163,164,165,],[55,55,55,55,55,97,55,-78,55,-83,-84,-85,-86,-87,-88,-89,-90,55,55,-95,55,55,55,55,55,55,55,-70,-71,-72,-73,-74,-75,-94,55,55,55,55,-93,-92,55,55,55,55,97,-76,-77,-79,-80,-81,-82,-91,-96,-97,-98,55,55,]),'+':([30,31,44,47,48,52,53,54,55,56,57,58,59,60,61,62,63,64,65,66,70,71,93,94,95,96,97,98,99,100,101,102,103,104,105,106,107,108,109,111,112,113,115,134,139,140,141,142,143,144,145,146,152,162,163,164,165,],[53,53,53,53,53,96,53,-78,53,-83,-84,-85,-86,-87,-88,-89,-90,53,53,-95,53,53,53,53,53,53,53,-70,-71,-72,-73,-74,-75,-94,53,53,53,53,-93,-92,53,53,53,53,96,-76,-77,-79,-80,-81,-82,-91,-96,-97,-98,53,53,]),'LENGTH':([30,31,44,47,48,53,55,64,65,70,71,93,94,95,96,97,98,99,100,101,102,103,105,106,107,108,112,113,115,134,164,165,],[67,67,67,67,67,67,67,67,67,67,67,67,67,67,67,67,-70,-71,-72,-73,-74,-75,67,67,67,67,67,67,67,67,67,67,]),'[':([33,66,87,128,],[71,71,71,158,]),':':([38,39,120,129,171,184,189,],[80,-24,155,-25,182,192,197,]),',':([38,39,50,51,52,54,56,57,58,59,60,61,62,63,66,85,86,87,88,89,90,91,104,109,111,116,129,137,138,139,140,141,142,143,144,145,146,147,152,159,160,162,163,171,189,],[81,-24,-64,-67,-69,-78,-83,-84,-85,-86,-87,-88,-89,-90,-95,131,-55,-95,131,134,-62,134,-94,-93,-92,134,-25,-65,-66,-68,-76,-77,-79,-80,-81,-82,-91,134,-96,-56,-63,-97,-98,81,81,]),'THEN':([49,50,51,52,54,56,57,58,59,60,61,62,63,66,104,109,111,137,138,139,140,141,142,143,144,145,146,152,162,163,],[92,-64,-67,-69,-78,-83,-84,-85,-86,-87,-88,-89,-90,-95,-94,-93,-92,-65,-66,-68,-76,-77,-79,-80,-81,-82,-91,-96,-97,-98,]),'DO':([50,51,52,54,56,57,58,59,60,61,62,63,66,68,104,109,111,137,138,139,140,141,142,143,144,145,146,152,162,163,176,177,],[-64,-67,-69,-78,-83,-84,-85,-86,-87,-88,-89,-90,-95,114,-94,-93,-92,-65,-66,-68,-76,-77,-79,-80,-81,-82,-91,-96,-97,-98,186,187,]),')':([50,51,52,54,56,57,58,59,60,61,62,63,66,85,86,87,88,89,90,91,104,109,110,111,116,122,123,124,125,126,127,137,138,139,140,141,142,143,144,145,146,147,148,152,154,156,159,160,162,163,168,169,170,173,190,202,206,],[-64,-67,-69,-78,-83,-84,-85,-86,-87,-88,-89,-90,-95,130,-55,-95,132,133,-62,135,-94,-93,146,-92,151,-26,-27,-28,-29,-30,-31,-65,-66,-68,-76,-77,-79,-80,-81,-82,-91,162,163,-96,-99,-99,-56,-63,-97,-98,180,-15,-16,184,-17,-18,-32,]),']':([50,51,52,54,56,57,58,59,60,61,62,63,66,104,109,111,117,137,138,139,140,141,142,143,144,145,146,152,162,163,193,],[-64,-67,-69,-78,-83,-84,-85,-86,-87,-88,-89,-90,-95,-94,-93,-92,152,-65,-66,-68,-76,-77,-79,-80,-81,-82,-91,-96,-97,-98,200,]),'TO':([50,51,52,54,56,57,58,59,60,61,62,63,66,104,109,111,137,138,139,140,141,142,143,144,145,146,150,152,162,163,],[-64,-67,-69,-78,-83,-84,-85,-86,-87,-88,-89,-90,-95,-94,-93,-92,-65,-66,-68,-76,-77,-79,-80,-81,-82,-91,164,-96,-97,-98,]),'DOWNTO':([50,51,52,54,56,57,58,59,60,61,62,63,66,104,109,111,137,138,139,140,141,142,143,144,145,146,150,152,162,163,],[-64,-67,-69,-78,-83,-84,-85,-86,-87,-88,-89,-90,-95,-94,-93,-92,-65,-66,-68,-76,-77,-79,-80,-81,-82,-91,165,-96,-97,-98,]),'OR':([50,51,52,54,56,57,58,59,60,61,62,63,66,104,109,111,137,138,139,140,141,142,143,144,145,146,152,162,163,],[93,-67,-69,-78,-83,-84,-85,-86,-87,-88,-89,-90,-95,-94,-93,-92,-65,-66,-68,-76,-77,-79,-80,-81,-82,-91,-96,-97,-98,]),'AND':([50,51,52,54,56,57,58,59,60,61,62,63,66,104,109,111,137,138,139,140,141,142,143,144,145,146,152,162,163,],[94,-67,-69,-78,-83,-84,-85,-86,-87,-88,-89,-90,-95,-94,-93,-92,-65,-66,-68,-76,-77,-79,-80,-81,-82,-91,-96,-97,-98,]),'EQUALS':([52,54,56,57,58,59,60,61,62,63,66,104,109,111,140,141,142,143,144,145,146,152,162,163,],[98,-78,-83,-84,-85,-86,-87,-88,-89,-90,-95,-94,-93,-92,-76,-77,-79,-80,-81,-82,-91,-96,-97,-98,]),'NOT_EQUALS':([52,54,56,57,58,59,60,61,62,63,66,104,109,111,140,141,142,143,144,145,146,152,162,163,],[99,-78,-83,-84,-85,-86,-87,-88,-89,-90,-95,-94,-93,-92,-76,-77,-79,-80,-81,-82,-91,-96,-97,-98,]),'LESS_THAN':([52,54,56,57,58,59,60,61,62,63,66,104,109,111,140,141,142,143,144,145,146,152,162,163,],[100,-78,-83,-84,-85,-86,-87,-88,-89,-90,-95,-94,-93,-92,-76,-77,-79,-80,-81,-82,-91,-96,-97,-98,]),'LESS_THAN_OR_EQUAL_TO':([52,54,56,57,58,59,60,61,62,63,66,104,109,111,140,141,142,143,144,145,146,152,162,163,],[101,-78,-83,-84,-85,-86,-87,-88,-89,-90,-95,-94,-93,-92,-76,-77,-79,-80,-81,-82,-91,-96,-97,-98,]),'GREATER_THAN':([52,54,56,57,58,59,60,61,62,63,66,104,109,111,140,141,142,143,144,145,146,152,162,163,],[102,-78,-83,-84,-85,-86,-87,-88,-89,-90,-95,-94,-93,-92,-76,-77,-79,-80,-81,-82,-91,-96,-97,-98,]),'GREATER_THAN_OR_EQUAL_TO':([52,54,56,57,58,59,60,61,62,63,66,104,109,111,140,141,142,143,144,145,146,152,162,163,],[103,-78,-83,-84,-85,-86,-87,-88,-89,-90,-95,-94,-93,-92,-76,-77,-79,-80,-81,-82,-91,-96,-97,-98,]),'*':([54,56,57,58,59,60,61,62,63,66,104,109,111,140,141,142,143,144,145,146,152,162,163,],[105,-83,-84,-85,-86,-87,-88,-89,-90,-95,-94,-93,-92,105,105,-79,-80,-81,-82,-91,-96,-97,-98,]),'/':([54,56,57,58,59,60,61,62,63,66,104,109,111,140,141,142,143,144,145,146,152,162,163,],[106,-83,-84,-85,-86,-87,-88,-89,-90,-95,-94,-93,-92,106,106,-79,-80,-81,-82,-91,-96,-97,-98,]),'DIV':([54,56,57,58,59,60,61,62,63,66,104,109,111,140,141,142,143,144,145,146,152,162,163,],[107,-83,-84,-85,-86,-87,-88,-89,-90,-95,-94,-93,-92,107,107,-79,-80,-81,-82,-91,-96,-97,-98,]),'MOD':([54,56,57,58,59,60,61,62,63,66,104,109,111,140,141,142,143,144,145,146,152,162,163,],[108,-83,-84,-85,-86,-87,-88,-89,-90,-95,-94,-93,-92,108,108,-79,-80,-81,-82,-91,-96,-97,-98,]),'INTEGER':([80,155,182,192,197,204,],[122,122,122,122,122,122,]),'REAL':([80,155,182,192,197,204,],[123,123,123,123,123,123,]),'BOOLEAN':([80,155,182,192,197,204,],[124,124,124,124,124,124,]),'CHAR':([80,155,182,192,197,204,],[125,125,125,125,125,125,]),'STRING':([80,155,182,192,197,204,],[126,126,126,126,126,126,]),'ARRAY':([80,155,182,192,197,204,],[128,128,128,128,128,128,]),'RANGE':([174,],[185,]),'OF':([200,],[204,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'gramatica':([0,],[1,]),'programa':([0,],[2,]),'cabecalho':([0,],[3,]),'titulo':([0,],[4,]),'corpo':([3,167,],[7,179,]),'declaracoes_variaveis':([4,153,183,188,203,],[9,167,167,167,167,]),'empty':([4,8,9,13,34,43,92,114,153,154,156,161,183,186,187,188,203,],[11,24,35,24,76,24,24,24,11,170,170,24,11,24,24,11,11,]),'lista_instrucoes':([8,13,],[14,41,]),'instrucao':([8,13,43,92,114,161,186,187,],[15,15,83,136,149,175,194,195,]),'atribuicao':([8,13,43,92,114,161,186,187,],[16,16,16,16,16,16,16,16,]),'leitura':([8,13,43,92,114,161,186,187,],[17,17,17,17,17,17,17,17,]),'escrita':([8,13,43,92,114,161,186,187,],[18,18,18,18,18,18,18,18,]),'if_statement':([8,13,43,92,114,161,186,187,],[19,19,19,19,19,19,19,19,]),'while_statement':([8,13,43,92,114,161,186,187,],[20,20,20,20,20,20,20,20,]),'for_statement':([8,13,43,92,114,161,186,187,],[21,21,21,21,21,21,21,21,]),'chamada_procedimento':([8,13,43,92,114,161,186,187,],[22,22,22,22,22,22,22,22,]),'bloco':([8,13,43,92,114,161,186,187,],[23,23,23,23,23,23,23,23,]),'variavel':([8,13,30,31,43,44,45,46,47,48,53,55,64,65,70,71,92,93,94,95,96,97,105,106,107,108,112,113,114,115,131,134,161,164,165,186,187,],[25,25,62,62,25,62,86,86,62,62,62,62,62,62,62,62,25,62,62,62,62,62,62,62,62,62,62,62,25,62,159,62,25,62,62,25,25,]),'declaracao_subprogramas':([9,],[34,]),'declaracoes':([10,75,],[36,118,]),'declaracao':([10,36,75,118,],[37,79,37,79,]),'lista_id':([10,36,75,118,154,156,181,],[38,38,38,38,171,171,189,]),'expressao':([30,31,44,47,48,64,70,71,112,113,115,134,164,165,],[49,68,84,90,90,110,90,117,90,148,150,160,176,177,]),'expressao_logica':([30,31,44,47,48,64,70,71,112,113,115,134,164,165,],[50,50,50,50,50,50,50,50,50,50,50,50,50,50,]),'expressao_relacional':([30,31,44,47,48,64,70,71,93,94,112,113,115,134,164,165,],[51,51,51,51,51,51,51,51,137,138,51,51,51,51,51,51,]),'expressao_aritmetica':([30,31,44,47,48,64,70,71,93,94,95,112,113,115,134,164,165,],[52,52,52,52,52,52,52,52,52,52,139,52,52,52,52,52,52,]),'termo':([30,31,44,47,48,64,70,71,93,94,95,96,97,112,113,115,134,164,165,],[54,54,54,54,54,54,54,54,54,54,54,140,141,54,54,54,54,54,54,]),'fator':([30,31,44,47,48,53,55,64,65,70,71,93,94,95,96,97,105,106,107,108,112,113,115,134,164,165,],[56,56,56,56,56,104,109,56,111,56,56,56,56,56,56,56,142,143,144,145,56,56,56,56,56,56,]),'chamada_funcao':([30,31,44,47,48,53,55,64,65,70,71,93,94,95,96,97,105,106,107,108,112,113,115,134,164,165,],[63,63,63,63,63,63,63,63,63,63,63,63,63,63,63,63,63,63,63,63,63,63,63,63,63,63,]),'declaracoes_variaveis_finais':([34,],[72,]),'procedure_declaration':([34,],[73,]),'function_declaration':([34,],[74,]),'lista_variaveis':([45,46,],[85,88,]),'lista_expressao':([47,48,70,112,],[89,91,116,147,]),'operador_relacional':([52,],[95,]),'tipo':([80,155,182,192,197,204,],[121,172,190,199,202,206,]),'tipo_array':([80,155,182,192,197,204,],[127,127,127,127,127,127,]),'bloco_subprograma':([153,183,188,203,],[166,191,196,205,]),'parametros':([154,156,],[168,173,]),'lista_parametros':([154,156,],[169,169,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> gramatica","S'",1,None,None,None),
+  ('gramatica -> programa .','gramatica',2,'p_gramatica','sin.py',24),
+  ('programa -> cabecalho corpo','programa',2,'p_programa','sin.py',29),
+  ('cabecalho -> titulo declaracoes_variaveis declaracao_subprogramas declaracoes_variaveis_finais','cabecalho',4,'p_cabecalho','sin.py',34),
+  ('declaracoes_variaveis_finais -> VAR declaracoes','declaracoes_variaveis_finais',2,'p_declaracoes_variaveis_finais','sin.py',54),
+  ('declaracoes_variaveis_finais -> empty','declaracoes_variaveis_finais',1,'p_declaracoes_variaveis_finais','sin.py',55),
+  ('titulo -> PROGRAM ID ;','titulo',3,'p_titulo','sin.py',63),
+  ('declaracao_subprogramas -> declaracao_subprogramas procedure_declaration','declaracao_subprogramas',2,'p_declaracao_subprogramas','sin.py',70),
+  ('declaracao_subprogramas -> declaracao_subprogramas function_declaration','declaracao_subprogramas',2,'p_declaracao_subprogramas','sin.py',71),
+  ('declaracao_subprogramas -> empty','declaracao_subprogramas',1,'p_declaracao_subprogramas','sin.py',72),
+  ('procedure_declaration -> PROCEDURE ID ; bloco_subprograma ;','procedure_declaration',5,'p_procedure_declaration','sin.py',81),
+  ('procedure_declaration -> PROCEDURE ID ( parametros ) ; bloco_subprograma ;','procedure_declaration',8,'p_procedure_declaration','sin.py',82),
+  ('function_declaration -> FUNCTION ID : tipo ; bloco_subprograma ;','function_declaration',7,'p_function_declaration','sin.py',90),
+  ('function_declaration -> FUNCTION ID ( parametros ) : tipo ; bloco_subprograma ;','function_declaration',10,'p_function_declaration','sin.py',91),
+  ('bloco_subprograma -> declaracoes_variaveis corpo','bloco_subprograma',2,'p_bloco_subprograma','sin.py',99),
+  ('parametros -> lista_parametros','parametros',1,'p_parametros','sin.py',104),
+  ('parametros -> empty','parametros',1,'p_parametros','sin.py',105),
+  ('lista_parametros -> lista_id : tipo','lista_parametros',3,'p_lista_parametros','sin.py',110),
+  ('lista_parametros -> lista_parametros ; lista_id : tipo','lista_parametros',5,'p_lista_parametros','sin.py',111),
+  ('declaracoes_variaveis -> VAR declaracoes','declaracoes_variaveis',2,'p_declaracoes_variaveis','sin.py',123),
+  ('declaracoes_variaveis -> empty','declaracoes_variaveis',1,'p_declaracoes_variaveis','sin.py',124),
+  ('declaracoes -> declaracao','declaracoes',1,'p_declaracoes','sin.py',132),
+  ('declaracoes -> declaracoes declaracao','declaracoes',2,'p_declaracoes','sin.py',133),
+  ('declaracao -> lista_id : tipo ;','declaracao',4,'p_declaracao','sin.py',142),
+  ('lista_id -> ID','lista_id',1,'p_lista_id','sin.py',147),
+  ('lista_id -> lista_id , ID','lista_id',3,'p_lista_id','sin.py',148),
+  ('tipo -> INTEGER','tipo',1,'p_tipo','sin.py',159),
+  ('tipo -> REAL','tipo',1,'p_tipo','sin.py',160),
+  ('tipo -> BOOLEAN','tipo',1,'p_tipo','sin.py',161),
+  ('tipo -> CHAR','tipo',1,'p_tipo','sin.py',162),
+  ('tipo -> STRING','tipo',1,'p_tipo','sin.py',163),
+  ('tipo -> tipo_array','tipo',1,'p_tipo','sin.py',164),
+  ('tipo_array -> ARRAY [ NUMBER RANGE NUMBER ] OF tipo','tipo_array',8,'p_tipo_array','sin.py',169),
+  ('corpo -> BEGIN lista_instrucoes END','corpo',3,'p_corpo','sin.py',176),
+  ('lista_instrucoes -> instrucao','lista_instrucoes',1,'p_lista_instrucoes','sin.py',181),
+  ('lista_instrucoes -> lista_instrucoes ; instrucao','lista_instrucoes',3,'p_lista_instrucoes','sin.py',182),
+  ('instrucao -> atribuicao','instrucao',1,'p_instrucao','sin.py',195),
+  ('instrucao -> leitura','instrucao',1,'p_instrucao','sin.py',196),
+  ('instrucao -> escrita','instrucao',1,'p_instrucao','sin.py',197),
+  ('instrucao -> if_statement','instrucao',1,'p_instrucao','sin.py',198),
+  ('instrucao -> while_statement','instrucao',1,'p_instrucao','sin.py',199),
+  ('instrucao -> for_statement','instrucao',1,'p_instrucao','sin.py',200),
+  ('instrucao -> chamada_procedimento','instrucao',1,'p_instrucao','sin.py',201),
+  ('instrucao -> bloco','instrucao',1,'p_instrucao','sin.py',202),
+  ('instrucao -> empty','instrucao',1,'p_instrucao','sin.py',203),
+  ('bloco -> BEGIN lista_instrucoes END','bloco',3,'p_bloco','sin.py',208),
+  ('atribuicao -> variavel ASSIGN expressao','atribuicao',3,'p_atribuicao','sin.py',213),
+  ('chamada_procedimento -> ID ( lista_expressao )','chamada_procedimento',4,'p_chamada_procedimento','sin.py',218),
+  ('chamada_procedimento -> ID','chamada_procedimento',1,'p_chamada_procedimento','sin.py',219),
+  ('leitura -> READ ( lista_variaveis )','leitura',4,'p_leitura','sin.py',229),
+  ('leitura -> READLN ( lista_variaveis )','leitura',4,'p_leitura','sin.py',230),
+  ('leitura -> READLN','leitura',1,'p_leitura','sin.py',231),
+  ('escrita -> WRITE ( lista_expressao )','escrita',4,'p_escrita','sin.py',241),
+  ('escrita -> WRITELN ( lista_expressao )','escrita',4,'p_escrita','sin.py',242),
+  ('escrita -> WRITELN','escrita',1,'p_escrita','sin.py',243),
+  ('lista_variaveis -> variavel','lista_variaveis',1,'p_lista_variaveis','sin.py',253),
+  ('lista_variaveis -> lista_variaveis , variavel','lista_variaveis',3,'p_lista_variaveis','sin.py',254),
+  ('if_statement -> IF expressao THEN instrucao','if_statement',4,'p_if_statement','sin.py',265),
+  ('if_statement -> IF expressao THEN instrucao ELSE instrucao','if_statement',6,'p_if_statement','sin.py',266),
+  ('while_statement -> WHILE expressao DO instrucao','while_statement',4,'p_while_statement','sin.py',274),
+  ('for_statement -> FOR ID ASSIGN expressao TO expressao DO instrucao','for_statement',8,'p_for_statement','sin.py',279),
+  ('for_statement -> FOR ID ASSIGN expressao DOWNTO expressao DO instrucao','for_statement',8,'p_for_statement','sin.py',280),
+  ('lista_expressao -> expressao','lista_expressao',1,'p_lista_expressao','sin.py',287),
+  ('lista_expressao -> lista_expressao , expressao','lista_expressao',3,'p_lista_expressao','sin.py',288),
+  ('expressao -> expressao_logica','expressao',1,'p_expressao','sin.py',297),
+  ('expressao_logica -> expressao_logica OR expressao_relacional','expressao_logica',3,'p_expressao_logica','sin.py',302),
+  ('expressao_logica -> expressao_logica AND expressao_relacional','expressao_logica',3,'p_expressao_logica','sin.py',303),
+  ('expressao_logica -> expressao_relacional','expressao_logica',1,'p_expressao_logica','sin.py',304),
+  ('expressao_relacional -> expressao_aritmetica operador_relacional expressao_aritmetica','expressao_relacional',3,'p_expressao_relacional','sin.py',312),
+  ('expressao_relacional -> expressao_aritmetica','expressao_relacional',1,'p_expressao_relacional','sin.py',313),
+  ('operador_relacional -> EQUALS','operador_relacional',1,'p_operador_relacional','sin.py',321),
+  ('operador_relacional -> NOT_EQUALS','operador_relacional',1,'p_operador_relacional','sin.py',322),
+  ('operador_relacional -> LESS_THAN','operador_relacional',1,'p_operador_relacional','sin.py',323),
+  ('operador_relacional -> LESS_THAN_OR_EQUAL_TO','operador_relacional',1,'p_operador_relacional','sin.py',324),
+  ('operador_relacional -> GREATER_THAN','operador_relacional',1,'p_operador_relacional','sin.py',325),
+  ('operador_relacional -> GREATER_THAN_OR_EQUAL_TO','operador_relacional',1,'p_operador_relacional','sin.py',326),
+  ('expressao_aritmetica -> expressao_aritmetica + termo','expressao_aritmetica',3,'p_expressao_aritmetica','sin.py',331),
+  ('expressao_aritmetica -> expressao_aritmetica - termo','expressao_aritmetica',3,'p_expressao_aritmetica','sin.py',332),
+  ('expressao_aritmetica -> termo','expressao_aritmetica',1,'p_expressao_aritmetica','sin.py',333),
+  ('termo -> termo * fator','termo',3,'p_termo','sin.py',341),
+  ('termo -> termo / fator','termo',3,'p_termo','sin.py',342),
+  ('termo -> termo DIV fator','termo',3,'p_termo','sin.py',343),
+  ('termo -> termo MOD fator','termo',3,'p_termo','sin.py',344),
+  ('termo -> fator','termo',1,'p_termo','sin.py',345),
+  ('fator -> NUMBER','fator',1,'p_fator','sin.py',353),
+  ('fator -> REAL_NUMBER','fator',1,'p_fator','sin.py',354),
+  ('fator -> STRING_LITERAL','fator',1,'p_fator','sin.py',355),
+  ('fator -> TRUE','fator',1,'p_fator','sin.py',356),
+  ('fator -> FALSE','fator',1,'p_fator','sin.py',357),
+  ('fator -> variavel','fator',1,'p_fator','sin.py',358),
+  ('fator -> chamada_funcao','fator',1,'p_fator','sin.py',359),
+  ('fator -> ( expressao )','fator',3,'p_fator','sin.py',360),
+  ('fator -> NOT fator','fator',2,'p_fator_not','sin.py',368),
+  ('fator -> - fator','fator',2,'p_fator_menos_unario','sin.py',373),
+  ('fator -> + fator','fator',2,'p_fator_mais_unario','sin.py',378),
+  ('variavel -> ID','variavel',1,'p_variavel','sin.py',385),
+  ('variavel -> ID [ expressao ]','variavel',4,'p_variavel','sin.py',386),
+  ('chamada_funcao -> ID ( lista_expressao )','chamada_funcao',4,'p_chamada_funcao','sin.py',394),
+  ('chamada_funcao -> LENGTH ( expressao )','chamada_funcao',4,'p_chamada_funcao','sin.py',395),
+  ('empty -> <empty>','empty',0,'p_empty','sin.py',405),
+]
@@ -0,0 +1,39 @@
+import io
+import os
+
+from compilador import Compilador
+from interpretador import MaquinaVirtual, Programa, carregar_instrucoes
+
+
+def compilar(fonte, **opcoes):
+    """Código EWVM de fonte; falha o teste se a compilação dá erros"""
+    resultado = Compilador(**opcoes).compilar(fonte)
+    assert resultado.sucesso, resultado.diagnosticos
+    return resultado.codigo
+
+
+def correr(codigo, entrada='', maquina=MaquinaVirtual):
+    """O que o programa escreve ao correr no interpretador (ou noutra MaquinaVirtual)"""
+    saida = io.StringIO()
+    programa = codigo if isinstance(codigo, Programa) else carregar_instrucoes(codigo)
+    maquina(programa, io.StringIO(entrada), saida).executar()
+    return saida.getvalue()
+
+
+def saida(fonte, entrada='', **opcoes):
+    return correr(compilar(fonte, **opcoes), entrada)
+
+
+PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROGRAMAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'programas')
+
+
+def programa(nome):
+    """(fonte, entrada) de testes/programas/nome.pas e, se existir, nome.in"""
+    with open(os.path.join(PROGRAMAS, nome + '.pas')) as f:
+        fonte = f.read()
+    entrada = ''
+    if os.path.exists(os.path.join(PROGRAMAS, nome + '.in')):
+        with open(os.path.join(PROGRAMAS, nome + '.in')) as f:
+            entrada = f.read()
+    return fonte, entrada
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Os módulos do compilador importam-se uns aos outros pelo nome (correm a partir de Projeto)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,129 @@
+import random
+
+# PROGRAMAS PASCAL ALEATÓRIOS PARA TESTES DIFERENCIAIS
+# Cada semente dá um programa com um array global, uma função e um procedimento (com
+# variáveis próprias e ciclos) e um programa principal com atribuições, if/else, for
+# (to, downto e com limite calculado), while, acessos a arrays com índices compostos e
+# chamadas. Os valores ficam limitados (mod 1000) e os índices caem sempre dentro do array,
+# por isso o programa corre sem erros e a saída só depende do compilador.
+
+GLOBAIS = ['a', 'b', 'c', 'd']
+OPERADORES = ['+', '-', '*', '+', 'div', 'mod']
+RELACIONAIS = ['<', '>', '=', '<=', '>=', '<>']
+
+
+class GeradorProgramas:
+    def __init__(self, semente):
+        self.r = random.Random(semente)
+
+    def indice(self, expressao):
+        return f"(({expressao}) mod 10 + 10) mod 10 + 1"
+
+    def expressao(self, nomes, nivel=0, chamadas=True):
+        r = self.r
+        x = r.random()
+        if nivel > 2 or x < 0.3:
+            return r.choice(nomes + [str(r.randint(0, 9))])
+        if x < 0.45:
+            if r.random() < 0.5:
+                return f"arr[{self.indice(self.expressao(nomes, nivel + 1, chamadas))}]"
+            return f"arr[{self.indice(r.choice(nomes))}]"
+        if x < 0.52 and chamadas:
+            return (f"f({self.expressao(nomes, nivel + 1, False)}, "
+                    f"{self.expressao(nomes, nivel + 1, False)})")
+        op = r.choice(OPERADORES)
+        if op in ('div', 'mod'):
+            return f"({self.expressao(nomes, nivel + 1, chamadas)}) {op} {r.randint(1, 5)}"
+        return (f"({self.expressao(nomes, nivel + 1, chamadas)} {op} "
+                f"{self.expressao(nomes, nivel + 1, chamadas)})")
+
+    def condicao(self, nomes, chamadas=True):
+        r = self.r
+        c = (f"{self.expressao(nomes, 1, chamadas)} {r.choice(RELACIONAIS)} "
+             f"{self.expressao(nomes, 1, chamadas)}")
+        if r.random() < 0.2:
+            c = f"({c}) and ({self.expressao(nomes, 2, chamadas)} > {r.randint(0, 5)})"
+        return c
+
+    def instrucao(self, nomes, nivel, contadores, chamadas=True, em_ciclo=()):
+        """contadores: variáveis que podem controlar ciclos; em_ciclo: as que já controlam
+        um ciclo de fora (não se lhes atribui)"""
+        r = self.r
+        x = r.random()
+        alvos = [v for v in nomes if v not in em_ciclo]
+        if nivel > 2 or x < 0.4:
+            valor = f"({self.expressao(nomes, 0, chamadas)}) mod 1000"
+            if r.random() < 0.3:
+                return f"arr[{self.indice(self.expressao(nomes, 1, chamadas))}] := {valor}"
+            return f"{r.choice(alvos)} := {valor}"
+        if x < 0.5:
+            return f"writeln({self.expressao(nomes, 0, chamadas)})"
+        if x < 0.6 and chamadas:
+            return f"p({self.expressao(nomes, 1, False)})"
+        if x < 0.75:
+            s = (f"if {self.condicao(nomes, chamadas)} then "
+                 f"{self.bloco(nomes, nivel + 1, contadores, chamadas, em_ciclo)}")
+            if r.random() < 0.5:
+                s += f" else {self.bloco(nomes, nivel + 1, contadores, chamadas, em_ciclo)}"
+            return s
+        livres = [v for v in contadores if v not in em_ciclo]
+        if not livres:
+            return f"writeln({self.expressao(nomes, 0, chamadas)})"
+        v = r.choice(livres)
+        corpo = lambda: self.bloco(nomes, nivel + 1, contadores, chamadas, em_ciclo + (v,))
+        if x < 0.88:
+            inicio, fim = r.randint(-2, 3), r.randint(0, 6)
+            if r.random() < 0.3:
+                return f"for {v} := {fim} downto {inicio} do {corpo()}"
+            if r.random() < 0.3:
+                limite = self.expressao([u for u in nomes if u != v], 2, chamadas)
+                return f"for {v} := {inicio} to {limite} mod 7 do {corpo()}"
+            return f"for {v} := {inicio} to {fim} do {corpo()}"
+        return (f"begin {v} := 0; while {v} < {r.randint(0, 5)} do "
+                f"begin {corpo()}; {v} := {v} + 1 end end")
+
+    def bloco(self, nomes, nivel, contadores, chamadas=True, em_ciclo=()):
+        n = self.r.randint(1, 3)
+        return "begin " + "; ".join(self.instrucao(nomes, nivel, contadores, chamadas, em_ciclo)
+                                    for _ in range(n)) + " end"
+
+    def instrucoes(self, minimo, maximo, nomes, contadores, chamadas=True):
+        return "; ".join(self.instrucao(nomes, 1 if not chamadas else 0, contadores, chamadas)
+                         for _ in range(self.r.randint(minimo, maximo)))
+
+    def programa(self):
+        corpo_f = self.instrucoes(1, 4, ['x', 'y', 'u', 'w'], ['u', 'w'], False)
+        corpo_p = self.instrucoes(1, 3, ['z', 'a', 'b', 't'], ['t'], False)
+        principal = self.instrucoes(3, 8, GLOBAIS + ['i', 'j'], ['i', 'j'])
+        return f"""program Aleatorio;
+var
+arr: array[1..10] of integer;
+a, b, c, d, i, j: integer;
+function f(x, y: integer): integer;
+var
+u, w: integer;
+begin
+u := 0; w := 1;
+{corpo_f};
+f := (x + u * 3 + w) mod 1000;
+end;
+procedure p(z: integer);
+var
+t: integer;
+begin
+t := z;
+{corpo_p};
+c := (c + t) mod 1000;
+end;
+begin
+a := 1; b := 2; c := 3; d := 4;
+for i := 1 to 10 do arr[i] := i;
+{principal};
+writeln(a, b, c, d);
+for i := 1 to 10 do writeln(arr[i]);
+end.
+"""
+
+
+def programa_aleatorio(semente):
+    return GeradorProgramas(semente).programa()
@@ -0,0 +1,12 @@
+program al;
+{ Um elemento de array escrito com um índice constante (STOREG depois das otimizações)
+  entre duas leituras de v[i] com o mesmo i }
+var i, x, y: integer; v: array[1..5] of integer;
+begin
+  readln(i);
+  v[i] := 9;
+  x := v[i] * 3;
+  v[3] := 99;
+  y := v[i] * 3;
+  writeln(x, ' ', y);
+end.
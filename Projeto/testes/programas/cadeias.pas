@@ -0,0 +1,16 @@
+program cadeias;
+{ Strings: comprimento, caracteres indexados e comparações }
+var s: string; i, uns, zeros: integer; ok: boolean;
+begin
+  readln(s);
+  uns := 0; zeros := 0;
+  for i := 1 to length(s) do
+    if s[i] = '1' then uns := uns + 1
+    else if s[i] = '0' then zeros := zeros + 1;
+  ok := (uns > zeros) or ((length(s) < 3) and (s[1] = 'a'));
+  writeln(uns, ' ', zeros, ' ', length(s));
+  if ok then writeln('mais uns') else writeln('mais zeros');
+  i := length(s);
+  while (i > 0) and (s[i] <> '0') do i := i - 1;
+  writeln(i);
+end.
@@ -0,0 +1,48 @@
+program chamadas;
+{ Ciclos for em cada nível de chamadas, funções pequenas em ciclos e recursão }
+var i, n, t: integer; v: array[1..8] of integer;
+function quadrado(x: integer): integer;
+begin
+  quadrado := x * x;
+end;
+function maior(a, b: integer): integer;
+begin
+  if a > b then maior := a else maior := b;
+end;
+function fib(k: integer): integer;
+begin
+  if k < 2 then fib := k else fib := fib(k - 1) + fib(k - 2);
+end;
+procedure Q(m: integer);
+var k: integer;
+begin
+  for k := m downto 1 do t := t + k;
+end;
+procedure P(m: integer);
+var j: integer;
+begin
+  for j := 1 to m do Q(j + 2);
+end;
+function F(m: integer): integer;
+var j, s: integer;
+begin
+  s := 0;
+  for j := 1 to m do
+  begin
+    P(2);
+    s := s + quadrado(j);
+  end;
+  F := s;
+end;
+begin
+  n := 3; t := 0;
+  for i := 1 to n do
+  begin
+    P(5);
+    writeln(i, ' ', t);
+  end;
+  for i := 1 to 2 do writeln(F(i + 1), ' ', t);
+  for i := 1 to 8 do v[i] := maior(quadrado(i - 4), fib(i));
+  for i := 1 to 8 do write(v[i], ' ');
+  writeln;
+end.
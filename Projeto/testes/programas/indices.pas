@@ -0,0 +1,15 @@
+program indices;
+{ Índices compostos e limites inferiores diferentes de 1, num array que não está no
+  endereço 0 }
+var x, i, s: integer; v: array[1..10] of integer; w: array[0..9] of integer;
+begin
+  for i := 1 to 10 do v[i] := i - 1;
+  for i := 0 to 9 do w[i] := i * i;
+  readln(x);
+  writeln(v[(x - 1) * 2]);
+  v[(x - 2) * 2] := 50;
+  writeln(v[4], ' ', v[x - 1], ' ', v[x + 1 - 1]);
+  s := 0;
+  for i := 1 to 4 do s := s + v[2 * i] + w[(i - 1) * 3] - w[i mod 3];
+  writeln(s, ' ', w[v[x] mod 10]);
+end.
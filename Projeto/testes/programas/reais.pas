@@ -0,0 +1,14 @@
+program reais;
+{ Divisões entre inteiros e entre reais, com e sem constantes }
+var x, y: real; n: integer;
+begin
+  x := 7/2;
+  writeln(x);
+  writeln(7/2, ' ', 7.0/2, ' ', -7/2);
+  n := 9;
+  y := n/2 + 1/4;
+  writeln(y);
+  writeln(7 div 2, ' ', 7 mod 2, ' ', -7 div 2, ' ', -7 mod 2);
+  x := 1.5 * 4;
+  writeln(x, ' ', x + 0.25);
+end.
@@ -0,0 +1,48 @@
+program subprogramas;
+var
+  v: array[1..5] of integer;
+  g, k, s, n: integer;
+procedure soma(x: integer);
+begin
+  g := g + x;
+end;
+function dobro(x: integer): integer;
+begin
+  dobro := x + x;
+end;
+function triplo(y: integer): integer;
+var r: integer;
+begin
+  r := dobro(y) + y;
+  triplo := r;
+end;
+function fat(m: integer): integer;
+begin
+  if m <= 1 then fat := 1 else fat := m * fat(m - 1);
+end;
+function conta(n: integer): integer;
+var g, i: integer;
+begin
+  g := 0;
+  for i := 1 to n do
+  begin
+    soma(i);
+    g := g + dobro(i);
+  end;
+  conta := g;
+end;
+procedure ler;
+begin
+  readln(n);
+end;
+begin
+  g := 5; s := 0; n := 3;
+  for k := 1 to 5 do v[k] := k * k;
+  ler;
+  for k := 1 to n do
+  begin
+    s := s + conta(k) + triplo(k) + fat(k);
+    soma(triplo(k));
+  end;
+  writeln(s, ' ', g);
+end.
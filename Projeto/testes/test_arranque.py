@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+
+from sin import verificar_tabelas
+
+PASTA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Folga larga: o arranque com as tabelas pré-calculadas leva dezenas de ms
+LIMITE_ARRANQUE = 2.0
+
+# Num processo novo: o yacc não pode validar a gramática e o parser só se constrói no primeiro
+# parse. Escreve o tempo até à primeira AST e a saída do programa compilado
+ARRANQUE = """
+import io, sys, time
+inicio = time.perf_counter()
+sys.path.insert(0, %(pasta)r)
+import ply.yacc as yacc
+
+def proibido(*args, **kwargs):
+    raise AssertionError('yacc.yacc() chamado no arranque')
+
+yacc.yacc = proibido
+import sin
+assert sin._parser is None, 'parser construído no import'
+ast = sin.parse_string("program A; var x: integer; begin x := 1; writeln(x) end.")
+assert ast is not None
+print(time.perf_counter() - inicio)
+
+from compilador import Compilador
+from interpretador import MaquinaVirtual, carregar_instrucoes
+resultado = Compilador().compilar(
+    "program B; var i, s: integer; begin s := 0; for i := 1 to 10 do s := s + i; writeln(s) end.")
+saida = io.StringIO()
+MaquinaVirtual(carregar_instrucoes(resultado.codigo), io.StringIO(), saida).executar()
+print(saida.getvalue(), end='')
+"""
+
+
+def test_tabelas_de_acordo_com_o_codigo():
+    assert verificar_tabelas() == []
+
+
+def test_arranque_a_frio(tmp_path):
+    r = subprocess.run([sys.executable, '-c', ARRANQUE % {'pasta': PASTA}], cwd=tmp_path,
+                       capture_output=True, text=True)
+    assert r.returncode == 0, r.stderr
+    tempo, saida = r.stdout.split('\n', 1)
+    assert float(tempo) < LIMITE_ARRANQUE
+    assert saida == '55\n'
+    # Sem parser.out/parsetab.py, nem na pasta atual nem no projeto
+    assert os.listdir(tmp_path) == []
+    assert not {'parser.out', 'parsetab.py'} & set(os.listdir(PASTA))
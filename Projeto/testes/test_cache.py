@@ -0,0 +1,84 @@
+import os
+import shutil
+import subprocess
+import sys
+
+from apoio import PROJETO, programa
+from cache import CacheCompilacao
+from compilador import Compilador
+
+
+def test_acerto_e_falha(tmp_path):
+    cache = CacheCompilacao(str(tmp_path))
+    fonte, _ = programa('chamadas')
+    primeiro = Compilador(otimizar=True, cache=cache).compilar(fonte)
+    assert not primeiro.da_cache and (cache.acertos, cache.falhas) == (0, 1)
+    # Outra instância, a mesma pasta: acerto, com o mesmo código e sem correr nenhuma fase
+    compilador = Compilador(otimizar=True, cache=CacheCompilacao(str(tmp_path)))
+    segundo = compilador.compilar(fonte)
+    assert segundo.da_cache and list(segundo.tempos) == ['cache']
+    assert segundo.codigo == primeiro.codigo
+    assert compilador.dobrador is None and compilador.cache.acertos == 1
+    # Outras opções ou outro código fonte são outra entrada
+    assert not Compilador(cache=cache).compilar(fonte).da_cache
+    assert not Compilador(otimizar=True, cache=cache).compilar(fonte + ' ').da_cache
+    assert len(cache.entradas()) == 3
+
+
+def test_erros_tambem_ficam_na_cache(tmp_path):
+    cache = CacheCompilacao(str(tmp_path))
+    fonte = "program e; begin x := 1 end."
+    primeiro = Compilador(cache=cache).compilar(fonte)
+    segundo = Compilador(cache=cache).compilar(fonte)
+    assert segundo.da_cache and not segundo.sucesso
+    assert segundo.diagnosticos == primeiro.diagnosticos != []
+
+
+def test_entrada_estragada(tmp_path):
+    cache = CacheCompilacao(str(tmp_path))
+    fonte, _ = programa('chamadas')
+    Compilador(cache=cache).compilar(fonte)
+    (_, _, caminho), = cache.entradas()
+    with open(caminho, 'wb') as f:
+        f.write(b'lixo')
+    resultado = Compilador(cache=cache).compilar(fonte)
+    assert not resultado.da_cache and resultado.sucesso
+
+
+def test_versao_do_compilador_na_chave(tmp_path):
+    cache = CacheCompilacao(str(tmp_path))
+    chave = cache.chave('program x; begin end.', ())
+    cache.versao = 'outra'
+    assert cache.chave('program x; begin end.', ()) != chave
+
+
+def test_apaga_as_entradas_usadas_ha_mais_tempo(tmp_path):
+    cache = CacheCompilacao(str(tmp_path), limite=10 * 1000)
+    for i in range(8):
+        cache.guardar(f'{i:02d}' + 'a' * 62, {'dados': bytes(1000)})
+        os.utime(cache.caminho(f'{i:02d}' + 'a' * 62), ns=(i * 10 ** 9, i * 10 ** 9))
+    assert len(cache.entradas()) == 8
+    # Ler a 0 torna-a a mais recente: as que saem são a 1, 2, ...
+    assert cache.obter('00' + 'a' * 62) is not None
+    for i in range(8, 12):
+        cache.guardar(f'{i:02d}' + 'a' * 62, {'dados': bytes(1000)})
+        os.utime(cache.caminho(f'{i:02d}' + 'a' * 62), ns=(10 ** 12 + i, 10 ** 12 + i))
+    assert cache.tamanho() <= cache.limite
+    restantes = {os.path.basename(os.path.dirname(c)) for _, _, c in cache.entradas()}
+    assert '00' in restantes and '01' not in restantes and '11' in restantes
+    cache.limpar()
+    assert cache.entradas() == []
+
+
+def test_estatisticas_num_acerto(tmp_path):
+    shutil.copy(os.path.join(PROJETO, 'teste3.pas'), tmp_path)
+    comando = [sys.executable, os.path.join(PROJETO, 'maquina.py'), str(tmp_path / 'teste3.pas'),
+               '-O', '--estatisticas', '--cache', str(tmp_path / 'cache')]
+    falha = subprocess.run(comando, capture_output=True, text=True)
+    acerto = subprocess.run(comando, capture_output=True, text=True)
+    assert falha.returncode == acerto.returncode == 0
+    assert 'Peephole' in falha.stdout and 'Cache: 0 acertos, 1 falhas' in falha.stdout
+    # Num acerto nenhuma otimização correu: só aparece o relatório da cache
+    linhas = acerto.stdout.splitlines()
+    assert linhas[0].startswith('Cache: 1 acertos, 0 falhas') and linhas[1].startswith('Sucesso!')
+    assert len(linhas) == 2
@@ -0,0 +1,54 @@
+import os
+import threading
+
+from apoio import PROGRAMAS, compilar, programa
+from compilador import Compilador
+from gerador import programa_aleatorio
+
+NOMES = sorted(n[:-4] for n in os.listdir(PROGRAMAS) if n.endswith('.pas'))
+COM_ERROS = """
+program erros;
+var x: integer;
+begin
+  x := y + 1;
+  z := 'a';
+end.
+"""
+
+
+def test_compilacoes_seguidas_na_mesma_instancia():
+    compilador = Compilador(otimizar=True)
+    com_erros = compilador.compilar(COM_ERROS)
+    assert not com_erros.sucesso and com_erros.diagnosticos
+    # Os erros de uma unidade não passam para a seguinte
+    for nome in NOMES:
+        resultado = compilador.compilar(programa(nome)[0])
+        assert resultado.sucesso and resultado.diagnosticos == []
+        assert resultado.codigo == compilar(programa(nome)[0], otimizar=True)
+    assert compilador.compilar(COM_ERROS).diagnosticos == com_erros.diagnosticos
+
+
+def test_threads_com_uma_instancia_cada():
+    # Cada thread compila tudo duas vezes com o seu Compilador (metade com o scanner do PLY)
+    fontes = [programa(nome)[0] for nome in NOMES] + \
+        [programa_aleatorio(s) for s in range(4)] + [COM_ERROS]
+    esperado = [(r.codigo, r.diagnosticos) for r in
+                (Compilador(otimizar=True, scanner='rapido').compilar(f) for f in fontes)]
+    resultados = {}
+
+    def trabalhar(k, scanner):
+        compilador = Compilador(otimizar=True, scanner=scanner)
+        for _ in range(2):
+            for i, fonte in enumerate(fontes):
+                r = compilador.compilar(fonte)
+                resultados.setdefault((k, i), []).append((r.codigo, r.diagnosticos))
+
+    threads = [threading.Thread(target=trabalhar, args=(k, 'ply' if k % 2 else 'rapido'))
+               for k in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for (k, i), obtidos in resultados.items():
+        assert obtidos == [esperado[i]] * 2, (k, i)
+    assert len(resultados) == 4 * len(fontes)
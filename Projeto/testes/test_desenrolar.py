@@ -0,0 +1,97 @@
+import pytest
+
+from apoio import correr, saida
+from compilador import Compilador
+
+
+def programa(ciclos):
+    """Programa com um array v[1..20] e os ciclos dados; no fim escreve v, s e i (os ciclos
+    à volta usam o limite n, que não é constante)"""
+    return f"""
+program ciclos;
+var v: array[1..20] of integer;
+    i, j, s, n: integer;
+procedure mexe;
+begin
+  i := i + 100;
+end;
+begin
+  n := 20;
+  for i := 1 to n do v[i] := 0;
+  s := 0;
+  {ciclos};
+  for j := 1 to n do write(v[j], ' ');
+  writeln(s);
+  writeln(i);
+end.
+"""
+
+
+def desenrolar(fonte, **opcoes):
+    """(contagens do desenrolador, saída) com -O"""
+    compilador = Compilador(otimizar=True, **opcoes)
+    resultado = compilador.compilar(fonte)
+    assert resultado.sucesso, resultado.diagnosticos
+    return compilador.desenrolador.desenrolados, correr(resultado.codigo)
+
+
+@pytest.mark.parametrize('ciclos, contagens', [
+    # Poucas voltas: o ciclo sai todo
+    ("for i := 1 to 5 do v[i] := i * i", {'completo': 1}),
+    ("for i := 6 downto 2 do v[i] := v[i + 1] + i", {'completo': 1}),
+    # Mais voltas: 4 cópias por volta e 17 mod 4 à frente
+    ("for i := 2 to 18 do begin v[i] := v[i - 1] + i; s := s + v[i] end", {'parcial': 1}),
+    ("for i := 19 downto 1 do v[i] := v[i + 1] + 2 * i", {'parcial': 1}),
+    # i lido fora dos índices: avança entre as cópias
+    ("for i := 1 to 13 do s := s * 3 mod 1000 + i * i - i", {'parcial': 1}),
+    # Nenhuma volta: i fica com o valor inicial
+    ("for i := 5 to 1 do v[i] := 1", {'vazio': 1}),
+    ("for i := 1 downto 5 do v[i] := 1", {'vazio': 1}),
+    # O ciclo de fora só se o de dentro saiu todo (um while no corpo não se copia)
+    ("for j := 1 to 3 do for i := 1 to 4 do v[i + j] := v[i + j] + j", {'completo': 2}),
+    ("for j := 1 to 3 do for i := 1 to 13 do v[i + j] := v[i + j] + j", {'parcial': 1}),
+])
+def test_desenrolamento(ciclos, contagens):
+    fonte = programa(ciclos)
+    desenrolados, resultado = desenrolar(fonte)
+    assert dict(desenrolados) == contagens
+    assert resultado == saida(fonte)
+
+
+@pytest.mark.parametrize('ciclos', [
+    # O corpo escreve a variável de controlo
+    "for i := 1 to 5 do begin v[i] := i; if i = 3 then i := 4 end",
+    # Um procedimento pode mexer numa variável de controlo global
+    "for i := 1 to 3 do begin s := s + i; mexe end",
+    # Limites que não são constantes
+    "for i := 1 to s + 4 do v[i] := i",
+])
+def test_ciclos_que_ficam(ciclos):
+    fonte = programa(ciclos)
+    desenrolados, resultado = desenrolar(fonte)
+    assert not desenrolados
+    assert resultado == saida(fonte)
+
+
+def test_fator_um_so_desenrola_ciclos_curtos():
+    fonte = programa("for i := 1 to 5 do v[i] := i; for i := 1 to 20 do s := s + v[i]")
+    desenrolados, resultado = desenrolar(fonte, fator_desenrolar=1)
+    assert dict(desenrolados) == {'completo': 1}
+    assert resultado == saida(fonte)
+
+
+def test_orcamento():
+    fonte = programa("for i := 1 to 8 do v[i] := i; for i := 1 to 20 do s := s + v[i]")
+    desenrolados, resultado = desenrolar(fonte, orcamento_desenrolar=0)
+    assert dict(desenrolados) == {'orcamento': 2}
+    assert resultado == saida(fonte)
+    compilador = Compilador(otimizar=True, orcamento_desenrolar=30)
+    compilador.compilar(fonte)
+    assert 0 < compilador.desenrolador.crescimento <= 30
+
+
+def test_opcoes_invalidas():
+    with pytest.raises(ValueError):
+        Compilador(otimizar=True, fator_desenrolar=0)
+    with pytest.raises(ValueError):
+        Compilador(otimizar=True, orcamento_desenrolar=-1)
@@ -0,0 +1,121 @@
+import os
+
+import pytest
+
+import benchmark
+from apoio import PROGRAMAS, compilar, correr, programa
+from compilador import Compilador
+from gerador import programa_aleatorio
+from instrucoes import escrever_vmb
+from interpretador import carregar_ficheiro
+from maquina import escrever_vm
+from passos import PASSOS
+from tradutor import MaquinaTraduzida
+
+# Cada programa corre compilado sem otimizações (a referência) e com cada configuração de -O;
+# a saída tem de ser a mesma
+CONFIGURACOES = {
+    'O': {'otimizar': True},
+    'sem_passos': {'otimizar': True, 'passos_desativados': tuple(n for n, _ in PASSOS)},
+    'sem_dobragem': {'otimizar': True, 'dobragem': False},
+    'sem_rotacao': {'otimizar': True, 'rotacao': False},
+    'sem_desenrolar': {'otimizar': True, 'orcamento_desenrolar': 0},
+    'desenrolar_curtos': {'otimizar': True, 'fator_desenrolar': 1},
+    'desenrolar_3': {'otimizar': True, 'fator_desenrolar': 3},
+    'desenrolar_8': {'otimizar': True, 'fator_desenrolar': 8, 'orcamento_desenrolar': 5000},
+    'sem_expansao': {'otimizar': True, 'maximo_expansao': 0},
+    'expansao_sem_orcamento': {'otimizar': True, 'orcamento_expansao': 0},
+    'expansao_grande': {'otimizar': True, 'maximo_expansao': 200, 'orcamento_expansao': 5000},
+}
+CONFIGURACOES.update((f'sem_{nome}', {'otimizar': True, 'passos_desativados': (nome,)})
+                     for nome, _ in PASSOS)
+
+PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRADAS_TESTES = {1: '', 2: '7\n', 3: '5\n', 4: '1\n2\n3\n4\n5\n', 5: '1010\n'}
+SEMENTES = range(40)
+
+
+def _exemplos():
+    """(nome, fonte, entrada) dos programas de exemplo"""
+    for n, entrada in ENTRADAS_TESTES.items():
+        with open(os.path.join(PROJETO, f'teste{n}.pas')) as f:
+            yield f'teste{n}', f.read(), entrada
+    for nome in sorted(os.listdir(PROGRAMAS)):
+        if nome.endswith('.pas'):
+            yield (nome[:-4],) + programa(nome[:-4])
+    # As cargas do benchmark, com poucas repetições
+    b = benchmark
+    yield 'primos', b.PRIMOS % {'limite': 200}, ''
+    yield 'soma_array', b.SOMA_ARRAY % {'repeticoes': 5}, ''
+    yield 'binario', b.BINARIO % {'repeticoes': 3}, '1011' * 5 + '\n'
+    yield 'limite_caro', b.LIMITE_CARO % {'repeticoes': 3}, 'x' * 40 + '\n'
+    yield 'guardas', b.GUARDAS % {'repeticoes': 3}, ''
+    yield 'bolha', b.BOLHA % {'repeticoes': 2}, ''
+    yield 'histograma', b.HISTOGRAMA % {'repeticoes': 3}, ''
+    yield 'matriz', b.MATRIZ % {'repeticoes': 1}, ''
+    yield 'janela', b.JANELA % {'repeticoes': 10}, ''
+    yield 'ajudantes', b.AJUDANTES % {'repeticoes': 3}, ''
+
+
+EXEMPLOS = list(_exemplos())
+
+
+def _comparar(fonte, entrada, configuracoes):
+    referencia = correr(compilar(fonte), entrada)
+    for nome, opcoes in configuracoes.items():
+        assert correr(compilar(fonte, **opcoes), entrada) == referencia, nome
+
+
+@pytest.mark.parametrize('nome, fonte, entrada', EXEMPLOS, ids=[e[0] for e in EXEMPLOS])
+def test_exemplos(nome, fonte, entrada):
+    _comparar(fonte, entrada, CONFIGURACOES)
+
+
+@pytest.mark.parametrize('semente', SEMENTES)
+def test_programas_aleatorios(semente):
+    _comparar(programa_aleatorio(semente), '', CONFIGURACOES)
+
+
+# Os mesmos programas, sem e com -O, a correr traduzidos para closures Python
+@pytest.mark.parametrize('nome, fonte, entrada', EXEMPLOS, ids=[e[0] for e in EXEMPLOS])
+def test_tradutor(nome, fonte, entrada):
+    for opcoes in ({}, {'otimizar': True}):
+        codigo = compilar(fonte, **opcoes)
+        assert correr(codigo, entrada, MaquinaTraduzida) == correr(codigo, entrada), opcoes
+
+
+@pytest.mark.parametrize('semente', SEMENTES)
+def test_tradutor_programas_aleatorios(semente):
+    fonte = programa_aleatorio(semente)
+    for opcoes in ({}, {'otimizar': True}):
+        codigo = compilar(fonte, **opcoes)
+        assert correr(codigo, '', MaquinaTraduzida) == correr(codigo, ''), opcoes
+
+
+# Os mesmos programas, sem e com -O, escritos em .vm e em .vmb e carregados do ficheiro
+# e compilados em streaming direto para o .vm (sem -O o texto é o mesmo)
+def _comparar_ficheiros(fonte, entrada, pasta):
+    for opcoes in ({}, {'otimizar': True}):
+        codigo = compilar(fonte, **opcoes)
+        referencia = correr(codigo, entrada)
+        for extensao, escrever in (('.vm', escrever_vm), ('.vmb', escrever_vmb)):
+            nome = str(pasta / ('programa' + extensao))
+            escrever(codigo, nome)
+            assert correr(carregar_ficheiro(nome), entrada) == referencia, (opcoes, extensao)
+        nome = str(pasta / 'streaming.vm')
+        resultado = Compilador(**opcoes).compilar_para(fonte, nome)
+        assert resultado.saida == nome and resultado.codigo is None
+        assert correr(carregar_ficheiro(nome), entrada) == referencia, (opcoes, 'streaming')
+        if not opcoes:
+            with open(nome) as f, open(str(pasta / 'programa.vm')) as g:
+                assert f.read() == g.read()
+
+
+@pytest.mark.parametrize('nome, fonte, entrada', EXEMPLOS, ids=[e[0] for e in EXEMPLOS])
+def test_ficheiros(nome, fonte, entrada, tmp_path):
+    _comparar_ficheiros(fonte, entrada, tmp_path)
+
+
+@pytest.mark.parametrize('semente', SEMENTES)
+def test_ficheiros_programas_aleatorios(semente, tmp_path):
+    _comparar_ficheiros(programa_aleatorio(semente), '', tmp_path)
@@ -0,0 +1,41 @@
+import pytest
+
+from apoio import compilar, saida
+from otimizador import decompor
+from dobragem import DobradorConstantes
+
+DIVISOES = """
+program divisoes;
+var x: real; n: integer;
+begin
+  x := 7/2;
+  writeln(x);
+  writeln(7/2);
+  writeln(7.0/2);
+  writeln(-7/2);
+  n := 9;
+  writeln(n/2 + 1/4);
+  writeln(7 div 2, 7 mod 2, -7 div 2, -7 mod 2);
+end.
+"""
+
+
+@pytest.mark.parametrize('l, op, r, valor', [
+    (7, '/', 2, 3.5), (-7, '/', 2, -3.5), (7.0, '/', 2, 3.5), (7, '/', 0, None),
+    (-7, 'div', 2, -3), (-7, 'mod', 2, -1), (2, '+', 3.5, 5.5),
+])
+def test_calcular(l, op, r, valor):
+    assert DobradorConstantes().calcular(op, l, r) == valor
+
+
+def test_divisao_real():
+    assert saida(DIVISOES) == '3.5\n3.5\n3.5\n-3.5\n4.75\n31-3-1\n'
+    # n/2: o operando inteiro passa a REAL e a divisão é um FDIV
+    codigo = decompor(compilar("program d; var n: integer; begin n := 9; writeln(n/2) end."))
+    i = codigo.index(['FDIV', None])
+    assert codigo[i - 4:i + 2] == [['PUSHG', 0], ['ITOF', None], ['PUSHI', 2], ['ITOF', None],
+                                   ['FDIV', None], ['WRITEF', None]]
+
+
+def test_dobragem_nao_muda_a_saida():
+    assert saida(DIVISOES, otimizar=True) == saida(DIVISOES)
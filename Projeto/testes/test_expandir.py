@@ -0,0 +1,60 @@
+from apoio import correr, programa, saida
+from compilador import Compilador
+
+# Em testes/programas/subprogramas.pas, fat é recursiva e ler tem um readln: ficam chamadas.
+# conta tem uma variável g que tapa a global que soma escreve, por isso o soma(i) dentro de
+# conta também fica
+SUBPROGRAMAS, ENTRADA = programa('subprogramas')
+
+# Um array local não se expande (ver _escalares)
+ARRAY_LOCAL = """
+program local;
+var k: integer;
+function total(x: integer): integer;
+var w: array[1..2] of integer;
+begin
+  w[1] := x; w[2] := 5;
+  total := w[1] + w[2];
+end;
+begin
+  k := total(3);
+  writeln(k);
+end.
+"""
+
+
+def expandir(fonte, **opcoes):
+    """(expansor, saída) com -O"""
+    compilador = Compilador(otimizar=True, **opcoes)
+    resultado = compilador.compilar(fonte)
+    assert resultado.sucesso, resultado.diagnosticos
+    return compilador.expansor, correr(resultado.codigo, ENTRADA)
+
+
+def test_expansao():
+    expansor, resultado = expandir(SUBPROGRAMAS)
+    assert sorted(expansor.modelos) == ['conta', 'dobro', 'soma', 'triplo']
+    # dobro dentro de conta e de triplo; conta e triplo (duas vezes) no programa principal
+    assert expansor.expandidas == {'dobro': 2, 'triplo': 2, 'conta': 1, 'soma': 1}
+    assert expansor.funcoes == 3
+    assert resultado == saida(SUBPROGRAMAS, ENTRADA) == '103 55\n'
+
+
+def test_sem_expansao():
+    expansor, resultado = expandir(SUBPROGRAMAS, maximo_expansao=0)
+    assert not expansor.modelos and not expansor.expandidas
+    assert resultado == '103 55\n'
+
+
+def test_orcamento():
+    # Sem orçamento só se expandem as chamadas que não fazem crescer o programa
+    expansor, resultado = expandir(SUBPROGRAMAS, orcamento_expansao=0)
+    assert expansor.expandidas == {'dobro': 2, 'orcamento': 4}
+    assert expansor.crescimento <= 0
+    assert resultado == '103 55\n'
+
+
+def test_array_local():
+    compilador = Compilador(otimizar=True)
+    assert compilador.compilar(ARRAY_LOCAL).sucesso
+    assert not compilador.expansor.modelos
@@ -0,0 +1,160 @@
+import os
+
+import pytest
+
+from apoio import compilar, correr
+from compilador import Compilador
+from fundido import GeradorVerificado
+from gerador import programa_aleatorio
+from maquina import linhas_vm, escrever_vm
+from sin import parse_string
+from test_diferencial import EXEMPLOS
+
+# O modo fundido tem de dar o mesmo que as duas travessias: sem -O o mesmo código, com -O
+# (que no modo fundido não tem os passos sobre a AST) a mesma saída
+
+ESCOPOS = """
+program Escopos;
+var i, n, total: integer;
+    v: array[1..4] of integer;
+    nome: string;
+procedure soma(limite: integer);
+var k: integer;
+    w: array[0..2] of integer;
+begin
+  k := 0;
+  for n := 1 to limite do k := k + n;
+  for n := 0 to 2 do w[n] := k * n;
+  total := total + w[2];
+  readln(k);
+  writeln('soma ', limite, ' = ', k, ' ', w[1])
+end;
+procedure conta;
+var k: integer;
+begin
+  k := 10;
+  while k > 7 do k := k - 1;
+  total := total + k
+end;
+function fat(m: integer): integer;
+var i, acc: integer;
+begin
+  acc := 1;
+  for i := 2 to m do acc := acc * i;
+  fat := acc
+end;
+function letra(palavra: string; pos: integer): char;
+begin
+  letra := palavra[pos]
+end;
+begin
+  total := 0;
+  readln(i);
+  readln(nome);
+  for n := 1 to 4 do v[n] := fat(n);
+  soma(i);
+  conta;
+  writeln(total, ' ', v[4], ' ', letra(nome, 2), ' ', fat(i) / 4)
+end.
+"""
+
+ERROS = """
+program Erros;
+var a, b: integer;
+    r: real;
+    s: string;
+    v: array[1..5] of integer;
+    a: boolean;
+function f(x: integer; y: real): integer;
+var t: integer;
+    x: integer;
+begin
+  t := y;
+  f := t + z;
+  if t then f := 1;
+end;
+function f(x: integer): integer;
+begin
+  f := x
+end;
+procedure p(n: integer);
+var k, a: integer;
+    c: char;
+begin
+  for c := 1 to n do k := k + 'a';
+  while k do k := k - 1;
+  readln(q);
+  a := s[r];
+  p(1, 2);
+  g(k)
+end;
+begin
+  a := 1.5;
+  b := not a;
+  s := s + 1;
+  v[true] := 3;
+  b := v div 2;
+  b := a mod r;
+  if (a < b) and (s) then writeln(-s);
+  while a = s do b := length(b);
+  b := f(1, 'x');
+  b := b[1];
+  p(r);
+  for r := 1 to 2.5 do writeln(r);
+  readln(v[1], zz);
+  b := (a = 1) or 2
+end.
+"""
+
+CASOS = [(nome, fonte, entrada) for nome, fonte, entrada in EXEMPLOS]
+CASOS += [(f'aleatorio{semente}', programa_aleatorio(semente), '') for semente in range(40)]
+CASOS.append(('escopos', ESCOPOS, '5\nabc\n7\n'))
+
+
+def linhas(fonte, **opcoes):
+    return list(linhas_vm(compilar(fonte, **opcoes)))
+
+
+@pytest.mark.parametrize('nome, fonte, entrada', CASOS, ids=[c[0] for c in CASOS])
+def test_igual_as_duas_travessias(nome, fonte, entrada):
+    assert linhas(fonte, fundido=True) == linhas(fonte)
+    assert correr(compilar(fonte, fundido=True, otimizar=True), entrada) == correr(compilar(fonte), entrada)
+
+
+@pytest.mark.parametrize('otimizar', [False, True])
+def test_mesmos_erros(otimizar):
+    duas = Compilador(otimizar=otimizar).compilar(ERROS)
+    uma = Compilador(fundido=True, otimizar=otimizar).compilar(ERROS)
+    assert uma.codigo is None and duas.codigo is None
+    assert len(duas.diagnosticos) > 30
+    # A mesma lista, por outra ordem: cada nó é verificado depois de gerado
+    assert sorted(uma.diagnosticos) == sorted(duas.diagnosticos)
+
+
+def test_uma_so_tabela():
+    gerador = GeradorVerificado()
+    gerador.visit(parse_string(ESCOPOS))
+    assert not gerador.erros
+    # O gerador não preenche as suas tabelas: os nomes estão na do verificador, com a posição
+    assert not gerador.tabela_simbolos and not gerador.info_arrays
+    assert gerador.funcoes is gerador.verificador.tabela.funcoes
+    assert set(gerador.funcoes) == {'soma', 'conta', 'fat', 'letra'}
+    globais = gerador.verificador.tabela.escopos[0]
+    assert globais['i']['local'] == ('G', 0)
+    assert globais['v'] == {'categoria': 'ARRAY', 'min_index': 1, 'max_index': 4,
+                            'tipo_base': 'INTEGER', 'local': ('G', 3)}
+
+
+def test_streaming(tmp_path):
+    referencia = str(tmp_path / 'duas.vm')
+    escrever_vm(compilar(ESCOPOS), referencia)
+    for opcoes in ({}, {'otimizar': True}):
+        nome = str(tmp_path / 'uma.vm')
+        resultado = Compilador(fundido=True, **opcoes).compilar_para(ESCOPOS, nome)
+        assert resultado.saida == nome
+        if not opcoes:
+            with open(nome) as f, open(referencia) as g:
+                assert f.read() == g.read()
+    nome = str(tmp_path / 'erros.vm')
+    assert not Compilador(fundido=True).compilar_para(ERROS, nome).sucesso
+    assert not os.path.exists(nome)
@@ -0,0 +1,56 @@
+import struct
+
+import pytest
+
+from apoio import compilar, correr
+from instrucoes import Instrucoes, MAGIA_VMB, escrever_vmb, ler_vmb
+from interpretador import ErroVM, carregar_binario
+
+FONTE = """
+program Constantes;
+var x: real;
+begin
+  x := 2.5;
+  writeln('ola', ' ', 'ola', x * 1.5, ' ', 'ola');
+  writeln(7 div 2)
+end.
+"""
+
+
+def vmb(codigo, tmp_path):
+    nome = str(tmp_path / 'programa.vmb')
+    escrever_vmb(codigo, nome)
+    with open(nome, 'rb') as f:
+        return f.read()
+
+
+def test_ida_e_volta(tmp_path):
+    codigo = compilar(FONTE)
+    dados = vmb(codigo, tmp_path)
+    assert dados.startswith(MAGIA_VMB)
+    assert ler_vmb(dados) == codigo.resolver()
+    # Cada string fica uma só vez na tabela de constantes
+    _, n_cadeias, n_reais, _ = struct.unpack_from('<4I', dados, len(MAGIA_VMB))
+    assert (n_cadeias, n_reais) == (2, 2)
+    assert correr(carregar_binario(dados)) == correr(codigo) == 'ola ola3.75 ola\n3\n'
+
+
+def test_ficheiros_invalidos(tmp_path):
+    dados = vmb(compilar(FONTE), tmp_path)
+    with pytest.raises(ErroVM, match="Não é um ficheiro .vmb"):
+        carregar_binario(b'JUMP main\n')
+    for tamanho in (len(MAGIA_VMB) + 3, len(MAGIA_VMB) + 20, len(dados) - 3):
+        with pytest.raises(ErroVM, match="inválido"):
+            carregar_binario(dados[:tamanho])
+    # Um opcode que não existe (o byte da primeira instrução)
+    inicio = len(MAGIA_VMB) + 16
+    with pytest.raises(ErroVM, match="Opcode inválido"):
+        carregar_binario(dados[:inicio] + bytes([255]) + dados[inicio + 1:])
+
+
+def test_operando_grande_demais(tmp_path):
+    codigo = Instrucoes()
+    codigo.emitir('START')
+    codigo.emitir('PUSHI', 1 << 70)
+    with pytest.raises(ValueError):
+        escrever_vmb(codigo, str(tmp_path / 'grande.vmb'))
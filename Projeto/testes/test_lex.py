@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from apoio import PROGRAMAS, compilar
+from sin import criar_lexer
+
+PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXEMPLOS = sorted([os.path.join(PROJETO, n) for n in os.listdir(PROJETO) if n.endswith('.pas')] +
+                  [os.path.join(PROGRAMAS, n) for n in os.listdir(PROGRAMAS) if n.endswith('.pas')])
+
+CASOS = [
+    'program x; begin end.   ',
+    'program x; begin end.\t',
+    'program x; begin end. \t \n  \t',
+    '   \t',
+    '',
+    "writeln('it''s', '', 'a''''b')",
+    'x := 3.14; for i := 1..5 do y <> z != w <= v >= u',
+    '(* comentário\n com *) linhas *) {outro\n} a',
+    'a @ b # c\n$',
+    'x := 1;\r\ny := 2;\r\n',
+    'TRUE False tRuE BEGIN End',
+    "'por fechar",
+    '{ por fechar',
+    '(* por fechar',
+]
+
+
+def tokens(scanner, fonte):
+    """[(tipo, valor, linha, posição)] e os diagnósticos de um scanner"""
+    diagnosticos = []
+    lexer = criar_lexer(scanner, diagnosticos)
+    lexer.input(fonte)
+    resultado = []
+    tok = lexer.token()
+    while tok is not None:
+        resultado.append((tok.type, tok.value, tok.lineno, tok.lexpos))
+        tok = lexer.token()
+    return resultado, diagnosticos
+
+
+@pytest.mark.parametrize('nome', EXEMPLOS, ids=os.path.basename)
+def test_exemplos(nome):
+    with open(nome) as f:
+        fonte = f.read()
+    assert tokens('rapido', fonte) == tokens('ply', fonte)
+
+
+@pytest.mark.parametrize('nome', EXEMPLOS, ids=os.path.basename)
+def test_compilar_com_o_scanner_rapido(nome):
+    with open(nome) as f:
+        fonte = f.read()
+    assert compilar(fonte, scanner='rapido') == compilar(fonte)
+
+
+@pytest.mark.parametrize('fonte', CASOS)
+def test_casos(fonte):
+    assert tokens('rapido', fonte) == tokens('ply', fonte)
+
+
+def test_espacos_no_fim_nao_sao_ilegais():
+    for fonte in ('program x; begin end.   ', 'program x; begin end.\t'):
+        assert tokens('rapido', fonte)[1] == []
@@ -0,0 +1,82 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+import lote
+from apoio import PROGRAMAS, PROJETO, compilar
+from maquina import escrever_vm
+
+NOMES = sorted(n for n in os.listdir(PROGRAMAS) if n.endswith('.pas'))
+ERRADO = "program errado;\nbegin\n  x := 1;\nend.\n"
+
+
+@pytest.fixture
+def pasta(tmp_path):
+    """Os programas de testes/programas repartidos por duas pastas, mais um com erros"""
+    fontes = tmp_path / 'fontes'
+    (fontes / 'sub').mkdir(parents=True)
+    for i, nome in enumerate(NOMES):
+        shutil.copy(os.path.join(PROGRAMAS, nome), fontes / ('sub' if i % 2 else '') / nome)
+    (fontes / 'sub' / 'errado.pas').write_text(ERRADO)
+    return fontes
+
+
+def esperado(tmp_path, nome, **opcoes):
+    """Texto do .vm que o Compilador dá para testes/programas/nome"""
+    with open(os.path.join(PROGRAMAS, nome)) as f:
+        codigo = compilar(f.read(), **opcoes)
+    destino = str(tmp_path / 'esperado.vm')
+    escrever_vm(codigo, destino)
+    with open(destino) as f:
+        return f.read()
+
+
+def test_expandir_entradas(pasta, tmp_path):
+    ficheiros = lote.expandir_entradas([str(pasta)])
+    assert ficheiros == sorted(ficheiros)
+    assert sorted(os.path.basename(f) for f in ficheiros) == sorted(NOMES + ['errado.pas'])
+    assert lote.expandir_entradas([str(pasta / '*.pas')]) == \
+        sorted(str(f) for f in pasta.glob('*.pas'))
+    manifesto = tmp_path / 'lista.txt'
+    manifesto.write_text("# dois ficheiros\nfontes/sub/errado.pas\n\nfontes/%s  # o primeiro\n"
+                         % NOMES[0])
+    assert lote.expandir_entradas([str(manifesto)]) == sorted(
+        [str(pasta / 'sub' / 'errado.pas'), str(pasta / NOMES[0])])
+
+
+@pytest.mark.parametrize('processos', [1, 2])
+def test_compilar_pasta(pasta, tmp_path, processos):
+    saida = tmp_path / 'saida'
+    ficheiros = lote.expandir_entradas([str(pasta)])
+    resumos = lote.compilar_lote(ficheiros, processos, str(saida), otimizar=True)
+    assert [r['ficheiro'] for r in resumos] == ficheiros
+    for r in resumos:
+        nome = os.path.basename(r['ficheiro'])
+        if nome == 'errado.pas':
+            assert r['estado'] == 'erro' and r['saida'] is None and r['diagnosticos']
+            continue
+        assert r['estado'] == 'ok' and r['diagnosticos'] == []
+        # A mesma estrutura de pastas debaixo de saida
+        relativo = os.path.relpath(r['ficheiro'][:-4] + '.vm', str(pasta))
+        assert r['saida'] == str(saida / relativo)
+        with open(r['saida']) as f:
+            assert f.read() == esperado(tmp_path, nome, otimizar=True)
+    assert not (saida / 'sub' / 'errado.vm').exists()
+
+
+def test_linha_de_comando(pasta, tmp_path):
+    resumo = tmp_path / 'resumo.json'
+    r = subprocess.run([sys.executable, os.path.join(PROJETO, 'lote.py'), str(pasta), '-j', '2',
+                        '-q', '--resumo', str(resumo)], capture_output=True, text=True)
+    # Há um ficheiro com erros: o código de saída é 1 e só esse aparece na listagem
+    assert r.returncode == 1, r.stderr
+    assert 'errado.pas' in r.stdout and NOMES[0] not in r.stdout
+    assert f"{len(NOMES)}/{len(NOMES) + 1} compilados" in r.stdout
+    resumos = json.loads(resumo.read_text())
+    assert sum(x['estado'] == 'ok' for x in resumos) == len(NOMES)
+    # Sem --saida, os .vm ficam ao lado dos .pas
+    assert (pasta / NOMES[0]).with_suffix('.vm').exists()
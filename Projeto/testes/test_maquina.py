@@ -0,0 +1,47 @@
+import pytest
+
+from apoio import saida
+
+# Um for em cada nível: o limite de cada ciclo fica num temporário que as chamadas de
+# dentro não podem reutilizar
+CHAMADAS_EM_CICLOS = """
+program aninhados;
+var i, n, t: integer;
+procedure Q(m: integer);
+var k: integer;
+begin
+  for k := m downto 1 do t := t + k;
+end;
+procedure P(m: integer);
+var j: integer;
+begin
+  for j := 1 to m do Q(j + 2);
+end;
+function F(m: integer): integer;
+var j, s: integer;
+begin
+  s := 0;
+  for j := 1 to m do
+  begin
+    P(2);
+    s := s + j;
+  end;
+  F := s;
+end;
+begin
+  n := 3; t := 0;
+  for i := 1 to n do
+  begin
+    P(5);
+    writeln(i, ' ', t);
+  end;
+  for i := 1 to 2 do writeln(F(i + 1), ' ', t);
+end.
+"""
+
+ESPERADO = '1 80\n2 160\n3 240\n3 272\n6 320\n'
+
+
+@pytest.mark.parametrize('opcoes', [{}, {'otimizar': True}, {'otimizar': True, 'maximo_expansao': 0}])
+def test_for_com_chamadas_aninhadas(opcoes):
+    assert saida(CHAMADAS_EM_CICLOS, **opcoes) == ESPERADO
@@ -0,0 +1,40 @@
+from apoio import saida
+from otimizador import base_array
+
+# O array não fica no endereço 0 (o deslocamento k da base não é nulo)
+INDICE_COMPOSTO = """
+program indices;
+var x, i: integer; v: array[1..10] of integer;
+begin
+  for i := 1 to 10 do v[i] := i - 1;
+  readln(x);
+  writeln(v[(x - 1) * 2]);
+  v[(x - 2) * 2] := 50;
+  writeln(v[4], v[x - 1]);
+end.
+"""
+
+
+def test_base_array_so_quando_o_sub_acaba_o_indice():
+    instrs = [['PUSHGP', None], ['PUSHI', 2], ['PADD', None], ['PUSHG', 0], ['PUSHI', 1],
+              ['SUB', None], ['LOADN', None]]
+    assert base_array(instrs) == 1
+    assert instrs == [['PUSHGP', None], ['PUSHG', 0], ['PUSHI', 1], ['ADD', None], ['LOADN', None]]
+
+    # v[(x - 1) * 2]: o SUB é de x - 1, não do índice todo
+    instrs = [['PUSHGP', None], ['PUSHI', 2], ['PADD', None], ['PUSHG', 0], ['PUSHI', 1],
+              ['SUB', None], ['PUSHI', 2], ['MUL', None], ['PUSHI', 1], ['SUB', None],
+              ['LOADN', None]]
+    assert base_array(instrs) == 0
+
+
+def test_base_array_com_store():
+    instrs = [['PUSHGP', None], ['PUSHI', 2], ['PADD', None], ['PUSHG', 0], ['PUSHI', 1],
+              ['SUB', None], ['PUSHG', 1], ['PUSHI', 3], ['ADD', None], ['STOREN', None]]
+    assert base_array(instrs) == 1
+    assert instrs[:4] == [['PUSHGP', None], ['PUSHG', 0], ['PUSHI', 1], ['ADD', None]]
+
+
+def test_indice_composto_com_e_sem_otimizacao():
+    assert saida(INDICE_COMPOSTO, '4\n') == '5\n502\n'
+    assert saida(INDICE_COMPOSTO, '4\n', otimizar=True) == '5\n502\n'
@@ -0,0 +1,181 @@
+import pytest
+
+import blocos
+import passos
+from apoio import compilar, correr, programa, saida
+from otimizador import compor, decompor
+
+
+def aplicar(passo, instrs, preservar=()):
+    """(aplicações, instruções) de um passo sobre uma lista de [op, arg]"""
+    unidades = blocos.construir(compor(instrs), preservar)
+    aplicacoes = passo(unidades, preservar)
+    return aplicacoes, decompor(blocos.baixar(unidades))
+
+
+def test_construir_e_baixar_sem_passos():
+    fonte, entrada = programa('chamadas')
+    codigo = compilar(fonte)
+    assert decompor(blocos.baixar(blocos.construir(codigo))) == decompor(codigo)
+    assert decompor(passos.GestorPassos(passos=[]).executar(codigo)) == decompor(codigo)
+
+
+def test_passo_desconhecido():
+    with pytest.raises(ValueError):
+        passos.GestorPassos(desativados=['nao_existe'])
+
+
+def test_propagar_constantes():
+    instrs = [['START', None], ['PUSHI', 5], ['STOREG', 0], ['PUSHG', 0], ['WRITEI', None],
+              ['STOP', None]]
+    assert aplicar(passos.propagar_constantes, instrs) == (1, [
+        ['START', None], ['PUSHI', 5], ['STOREG', 0], ['PUSHI', 5], ['WRITEI', None],
+        ['STOP', None]])
+
+
+def test_propagar_constantes_com_definicoes_diferentes():
+    instrs = [['START', None], ['PUSHI', 1], ['STOREG', 0], ['PUSHG', 1], ['JZ', 'l'],
+              ['PUSHI', 2], ['STOREG', 0], ['LABEL', 'l'], ['PUSHG', 0], ['WRITEI', None],
+              ['STOP', None]]
+    assert aplicar(passos.propagar_constantes, instrs) == (0, instrs)
+
+
+def test_stores_mortos():
+    instrs = [['START', None], ['PUSHI', 1], ['STOREG', 0], ['PUSHI', 2], ['STOREG', 0],
+              ['PUSHG', 0], ['WRITEI', None], ['STOP', None]]
+    assert aplicar(passos.stores_mortos, instrs) == (1, [
+        ['START', None], ['PUSHI', 2], ['STOREG', 0], ['PUSHG', 0], ['WRITEI', None],
+        ['STOP', None]])
+
+
+def test_stores_mortos_antes_de_uma_chamada():
+    # O subprograma lê a global: o primeiro STOREG não está morto
+    instrs = [['START', None], ['PUSHI', 1], ['STOREG', 0], ['PUSHA', 'p'], ['CALL', None],
+              ['PUSHI', 2], ['STOREG', 0], ['PUSHG', 0], ['WRITEI', None], ['STOP', None],
+              ['LABEL', 'p'], ['PUSHG', 0], ['WRITEI', None], ['RETURN', None]]
+    assert aplicar(passos.stores_mortos, instrs) == (0, instrs)
+
+
+def test_inalcancaveis():
+    instrs = [['START', None], ['JUMP', 'l'], ['PUSHI', 9], ['WRITEI', None], ['LABEL', 'l'],
+              ['STOP', None]]
+    assert aplicar(passos.inalcancaveis, instrs) == (2, [
+        ['START', None], ['JUMP', 'l'], ['LABEL', 'l'], ['STOP', None]])
+
+
+def test_inalcancaveis_preserva_labels_de_fora():
+    instrs = [['START', None], ['JUMP', 'l'], ['LABEL', 'fora'], ['PUSHI', 9],
+              ['WRITEI', None], ['LABEL', 'l'], ['STOP', None]]
+    assert aplicar(passos.inalcancaveis, instrs, preservar={'fora'})[0] == 0
+
+
+def ciclo(corpo):
+    """for g10 := 1 to 10 do corpo, com um array nas globais 0..9"""
+    return ([['START', None], ['PUSHN', 12], ['PUSHI', 1], ['STOREG', 10], ['LABEL', 'c'],
+             ['PUSHG', 10], ['PUSHI', 10], ['INFEQ', None], ['JZ', 'f']] + corpo +
+            [['PUSHG', 10], ['PUSHI', 1], ['ADD', None], ['STOREG', 10], ['JUMP', 'c'],
+             ['LABEL', 'f'], ['STOP', None]])
+
+
+# v[i] := i * 3, com v: array[1..10]
+GUARDAR_ELEMENTO = [['PUSHGP', None], ['PUSHG', 10], ['PUSHI', 1], ['SUB', None],
+                    ['PUSHG', 10], ['PUSHI', 3], ['MUL', None], ['STOREN', None]]
+PRODUTO = [['PUSHG', 10], ['PUSHI', 3], ['MUL', None], ['WRITEI', None]]
+
+
+def test_bases_arrays():
+    aplicacoes, instrs = aplicar(passos.bases_arrays, ciclo(GUARDAR_ELEMENTO))
+    assert aplicacoes == 1
+    # A base gp - 1 é calculada uma vez numa global nova, a seguir ao PUSHN
+    assert instrs[:6] == [['START', None], ['PUSHN', 13], ['PUSHGP', None], ['PUSHI', -1],
+                          ['PADD', None], ['STOREG', 12]]
+    assert instrs[13:16] == [['PUSHG', 12], ['PUSHG', 10], ['PUSHG', 10]]
+    assert correr(compor(instrs)) == correr(compor(ciclo(GUARDAR_ELEMENTO)))
+
+
+def test_bases_arrays_fora_de_ciclos():
+    instrs = [['START', None], ['PUSHN', 12], ['PUSHGP', None], ['PUSHG', 10], ['PUSHI', 1],
+              ['SUB', None], ['LOADN', None], ['WRITEI', None], ['STOP', None]]
+    assert aplicar(passos.bases_arrays, instrs) == (0, instrs)
+
+
+def test_bases_arrays_sem_start():
+    # Um pedaço de código em streaming: não há onde pôr o cálculo das bases
+    instrs = ciclo(GUARDAR_ELEMENTO)[1:]
+    assert aplicar(passos.bases_arrays, instrs) == (0, instrs)
+
+
+def test_reducao_forca_variavel_de_inducao():
+    aplicacoes, instrs = aplicar(passos.reducao_forca, ciclo(PRODUTO * 3))
+    assert aplicacoes == 1
+    assert 'MUL' not in [op for op, _ in instrs[8:]]
+    # t := i * 3 antes do ciclo e t := t + 3 a seguir a i := i + 1
+    assert instrs[4:8] == [['PUSHG', 10], ['PUSHI', 3], ['MUL', None], ['STOREG', 12]]
+    assert instrs[23:27] == [['PUSHG', 12], ['PUSHI', 3], ['ADD', None], ['STOREG', 12]]
+    assert correr(compor(instrs)) == correr(compor(ciclo(PRODUTO * 3)))
+
+
+def test_reducao_forca_com_poucos_usos():
+    # Um só uso poupa duas instruções por volta e o passo de t custa quatro
+    assert aplicar(passos.reducao_forca, ciclo(PRODUTO))[0] == 0
+
+
+def test_reducao_forca_com_outra_escrita_da_variavel():
+    instrs = ciclo([['PUSHI', 5], ['STOREG', 10]] + PRODUTO * 3)
+    assert aplicar(passos.reducao_forca, instrs) == (0, instrs)
+
+
+def test_reducao_forca_produto_por_dois():
+    instrs = [['START', None], ['PUSHN', 1], ['PUSHG', 0], ['PUSHI', 2], ['MUL', None],
+              ['WRITEI', None], ['STOP', None]]
+    assert aplicar(passos.reducao_forca, instrs) == (1, [
+        ['START', None], ['PUSHN', 1], ['PUSHG', 0], ['PUSHG', 0], ['ADD', None],
+        ['WRITEI', None], ['STOP', None]])
+
+
+EXPRESSAO = [['PUSHG', 0], ['PUSHG', 1], ['ADD', None], ['PUSHG', 2], ['MUL', None]]
+ELEMENTO = [['PUSHGP', None], ['PUSHG', 0], ['LOADN', None], ['PUSHG', 2], ['MUL', None]]
+
+
+def test_subexpressoes_comuns():
+    instrs = ([['START', None], ['PUSHN', 3]] + EXPRESSAO + [['WRITEI', None]] + EXPRESSAO +
+              [['WRITEI', None], ['STOP', None]])
+    assert aplicar(passos.subexpressoes_comuns, instrs) == (1, [
+        ['START', None], ['PUSHN', 4]] + EXPRESSAO + [
+        ['DUP', 1], ['STOREG', 3], ['WRITEI', None], ['PUSHG', 3], ['WRITEI', None],
+        ['STOP', None]])
+
+
+def test_subexpressoes_comuns_com_operando_escrito():
+    instrs = ([['START', None], ['PUSHN', 3]] + EXPRESSAO +
+              [['WRITEI', None], ['PUSHI', 7], ['STOREG', 1]] + EXPRESSAO +
+              [['WRITEI', None], ['STOP', None]])
+    assert aplicar(passos.subexpressoes_comuns, instrs) == (0, instrs)
+
+
+def test_subexpressoes_comuns_com_escrita_de_outra_global():
+    # STOREG 4 não toca nos operandos: a expressão guardada em 5 é reutilizada
+    instrs = ([['START', None], ['PUSHN', 6]] + EXPRESSAO +
+              [['STOREG', 5], ['PUSHI', 99], ['STOREG', 4]] + EXPRESSAO +
+              [['WRITEI', None], ['STOP', None]])
+    assert aplicar(passos.subexpressoes_comuns, instrs)[1][-3:] == [
+        ['PUSHG', 5], ['WRITEI', None], ['STOP', None]]
+
+
+def test_subexpressoes_comuns_com_leitura_de_memoria():
+    instrs = ([['START', None], ['PUSHN', 6]] + ELEMENTO + [['WRITEI', None]] + ELEMENTO +
+              [['WRITEI', None], ['STOP', None]])
+    assert aplicar(passos.subexpressoes_comuns, instrs)[0] == 1
+    # Um STOREG pode escrever no elemento lido pelo LOADN (o array é global)
+    instrs = ([['START', None], ['PUSHN', 6]] + ELEMENTO +
+              [['WRITEI', None], ['PUSHI', 99], ['STOREG', 4]] + ELEMENTO +
+              [['WRITEI', None], ['STOP', None]])
+    assert aplicar(passos.subexpressoes_comuns, instrs) == (0, instrs)
+
+
+def test_subexpressoes_com_elemento_escrito_diretamente():
+    # v[3] := 99 passa a um STOREG; a segunda leitura de v[i] não pode reutilizar a primeira
+    fonte, entrada = programa('al')
+    assert saida(fonte, entrada) == '27 297\n'
+    assert saida(fonte, entrada, otimizar=True) == '27 297\n'
+    assert saida(fonte, entrada, otimizar=True, maximo_expansao=0, fator_desenrolar=1) == '27 297\n'
@@ -0,0 +1,41 @@
+import contextlib
+import io
+import sys
+
+import pytest
+
+from apoio import saida
+from benchmark import programas_profundos
+from sin import parse_string, print_ast
+
+# Muito acima do limite de recursão do Python: as travessias têm de usar a pilha explícita
+EXPRESSOES = 100000   # níveis das árvores de expressões (soma, parênteses, sinais)
+INSTRUCOES = 20000    # if/else encadeados e cadeias de and
+OTIMIZADO = 5000      # com -O (os passos sobre blocos são mais lentos)
+
+
+def esperado(nome, n):
+    return {'soma': n, 'sinais': 1 if n % 2 == 0 else -1}.get(nome, 1)
+
+
+@pytest.mark.parametrize('nome, n', [('soma', EXPRESSOES), ('parenteses', EXPRESSOES),
+                                     ('sinais', EXPRESSOES), ('senao_se', INSTRUCOES),
+                                     ('e_logico', INSTRUCOES)])
+def test_programa_profundo(nome, n):
+    assert n > sys.getrecursionlimit()
+    assert saida(programas_profundos(n)[nome]) == f"{esperado(nome, n)}\n"
+
+
+@pytest.mark.parametrize('nome', ['soma', 'parenteses', 'sinais', 'senao_se', 'e_logico'])
+def test_programa_profundo_otimizado(nome):
+    fonte = programas_profundos(OTIMIZADO)[nome]
+    assert saida(fonte, otimizar=True) == f"{esperado(nome, OTIMIZADO)}\n"
+
+
+def test_print_ast_profundo():
+    ast = parse_string(programas_profundos(3000)['soma'])
+    with contextlib.redirect_stdout(io.StringIO()) as destino:
+        print_ast(ast)
+    # Os x da soma, o da declaração, os dois alvos de atribuição e o do writeln
+    assert destino.getvalue().count("'x'") == 3000 + 4
+    assert destino.getvalue().count('(binop') == 3000 - 1
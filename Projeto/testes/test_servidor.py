@@ -0,0 +1,77 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import pytest
+
+from apoio import PROJETO, compilar, programa
+from cliente import pedir
+from maquina import escrever_vm
+
+ERRADO = "program errado; begin x := 1 end."
+
+
+@pytest.fixture
+def servidor(tmp_path):
+    """Caminho do socket de um servidor.py a correr (parado no fim do teste)"""
+    caminho = str(tmp_path / 's.sock')
+    processo = subprocess.Popen([sys.executable, os.path.join(PROJETO, 'servidor.py'),
+                                 '--socket', caminho, '--threads', '2'],
+                                stderr=subprocess.PIPE, text=True)
+    limite = time.monotonic() + 10
+    while not os.path.exists(caminho):
+        assert processo.poll() is None, processo.stderr.read()
+        assert time.monotonic() < limite, 'o servidor não arrancou'
+        time.sleep(0.05)
+    yield caminho
+    if processo.poll() is None:
+        processo.kill()
+    processo.wait()
+    processo.stderr.close()
+
+
+def test_pedidos_numa_ligacao(servidor, tmp_path):
+    fonte, _ = programa('chamadas')
+    shutil.copy(os.path.join(PROJETO, 'teste3.pas'), tmp_path)
+    respostas = pedir([
+        {'fonte': fonte},
+        {'fonte': fonte, 'otimizar': True},
+        {'ficheiro': str(tmp_path / 'teste3.pas')},
+        {'fonte': ERRADO},
+        {'comando': 'estado'},
+    ], servidor)
+    codigo, otimizado, ficheiro, errado, estado = respostas
+    assert codigo['estado'] == 'ok' and codigo['codigo'] == list(compilar(fonte).linhas())
+    assert otimizado['codigo'] == list(compilar(fonte, otimizar=True).linhas())
+    assert ficheiro['estado'] == 'ok' and ficheiro['saida'] == str(tmp_path / 'teste3.vm')
+    with open(os.path.join(PROJETO, 'teste3.pas')) as f:
+        escrever_vm(compilar(f.read()), str(tmp_path / 'esperado.vm'))
+    assert (tmp_path / 'teste3.vm').read_text() == (tmp_path / 'esperado.vm').read_text()
+    assert errado['estado'] == 'erro' and errado['diagnosticos'] and 'codigo' not in errado
+    assert estado['estado'] == 'ok' and estado['pedidos'] >= 4
+
+
+def test_pedidos_invalidos_e_parar(servidor):
+    sem_nada, desconhecido = pedir([{}, {'comando': 'dormir'}], servidor)
+    assert sem_nada['estado'] == desconhecido['estado'] == 'erro'
+    assert pedir([{'comando': 'parar'}], servidor)[0]['estado'] == 'ok'
+    limite = time.monotonic() + 10
+    while os.path.exists(servidor):
+        assert time.monotonic() < limite, 'o servidor não parou'
+        time.sleep(0.05)
+
+
+def test_stdio():
+    fonte, _ = programa('chamadas')
+    pedidos = [{'id': 'a', 'fonte': fonte}, {'id': 'b', 'fonte': ERRADO}]
+    r = subprocess.run([sys.executable, os.path.join(PROJETO, 'servidor.py'), '--stdio'],
+                       input=''.join(json.dumps(p) + '\n' for p in pedidos) + 'não é json\n',
+                       capture_output=True, text=True, timeout=60)
+    respostas = [json.loads(linha) for linha in r.stdout.splitlines()]
+    por_id = {x['id']: x for x in respostas}
+    assert por_id['a']['codigo'] == list(compilar(fonte).linhas())
+    assert por_id['b']['estado'] == 'erro'
+    assert por_id[None]['diagnosticos'][0].startswith('Pedido inválido')
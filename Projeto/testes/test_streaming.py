@@ -0,0 +1,77 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import maquina
+from apoio import PROJETO, compilar, programa
+from benchmark import programa_sintetico
+from cache import CacheCompilacao
+from compilador import Compilador
+
+
+def ler(nome):
+    with open(nome) as f:
+        return f.read()
+
+
+def test_escreve_por_pedacos(tmp_path, monkeypatch):
+    # Sem -O o main sai instrução a instrução: o buffer do gerador nunca tem o programa todo
+    pedacos = []
+    escrever = maquina.SaidaVM.escrever
+
+    def registar(self, codigo):
+        pedacos.append(len(codigo))
+        escrever(self, codigo)
+
+    monkeypatch.setattr(maquina.SaidaVM, 'escrever', registar)
+    fonte = programa_sintetico(2000)
+    nome = str(tmp_path / 'grande.vm')
+    assert Compilador().compilar_para(fonte, nome).sucesso
+    assert len(pedacos) > 1000 and max(pedacos) < sum(pedacos) // 100
+    referencia = str(tmp_path / 'referencia.vm')
+    maquina.escrever_vm(compilar(fonte), referencia)
+    # O JUMP main do início e o PUSHN das globais já estão certos no ficheiro
+    assert ler(nome) == ler(referencia)
+
+
+@pytest.mark.parametrize('fonte', [
+    "program e; begin x := 1 end.",  # erro semântico
+    "program e; begin x := end.",    # erro de sintaxe
+])
+def test_erro_nao_deixa_ficheiro(fonte, tmp_path):
+    nome = str(tmp_path / 'e.vm')
+    for opcoes in ({}, {'otimizar': True}):
+        resultado = Compilador(**opcoes).compilar_para(fonte, nome)
+        assert not resultado.sucesso and resultado.diagnosticos
+        assert not os.path.exists(nome)
+
+
+def test_com_cache(tmp_path):
+    # Com cache compila tudo e escreve no fim: o acerto também escreve o ficheiro
+    fonte, _ = programa('chamadas')
+    cache = CacheCompilacao(str(tmp_path / 'cache'))
+    referencia = str(tmp_path / 'referencia.vm')
+    maquina.escrever_vm(compilar(fonte, otimizar=True), referencia)
+    for acerto in (False, True):
+        nome = str(tmp_path / f'{acerto}.vm')
+        resultado = Compilador(otimizar=True, cache=cache).compilar_para(fonte, nome)
+        assert resultado.da_cache == acerto
+        assert ler(nome) == ler(referencia)
+
+
+def test_linha_de_comando(tmp_path):
+    fonte, _ = programa('chamadas')
+    for nome in ('normal', 'streaming'):
+        with open(tmp_path / f'{nome}.pas', 'w') as f:
+            f.write(fonte)
+    maquina_py = os.path.join(PROJETO, 'maquina.py')
+    for nome in ('normal', 'streaming'):
+        opcoes = ['--streaming'] if nome == 'streaming' else []
+        subprocess.run([sys.executable, maquina_py, *opcoes, f'{nome}.pas'], cwd=tmp_path,
+                       check=True, capture_output=True)
+    assert ler(tmp_path / 'streaming.vm') == ler(tmp_path / 'normal.vm')
+    falha = subprocess.run([sys.executable, maquina_py, '--streaming', '--vmb', 'normal.pas'],
+                           cwd=tmp_path, capture_output=True, text=True)
+    assert falha.returncode != 0 and '--streaming' in falha.stderr
@@ -0,0 +1,35 @@
+import io
+
+import pytest
+
+from apoio import compilar, programa
+from interpretador import ErroVM, MaquinaVirtual, carregar_instrucoes
+from tradutor import MaquinaTraduzida, gerar_fonte, lideres
+
+
+def maquinas(codigo, entrada=''):
+    programa_vm = carregar_instrucoes(codigo)
+    return (MaquinaVirtual(programa_vm, io.StringIO(entrada), io.StringIO()),
+            MaquinaTraduzida(programa_vm, io.StringIO(entrada), io.StringIO(), contar=True))
+
+
+@pytest.mark.parametrize('opcoes', [{}, {'otimizar': True}])
+def test_conta_as_mesmas_instrucoes(opcoes):
+    fonte, entrada = programa('chamadas')
+    vm, traduzida = maquinas(compilar(fonte, **opcoes), entrada)
+    assert traduzida.executar() == vm.executar()
+    assert traduzida.saida.getvalue() == vm.saida.getvalue()
+
+
+def test_um_bloco_por_lider():
+    fonte, _ = programa('chamadas')
+    programa_vm = carregar_instrucoes(compilar(fonte))
+    fonte_python = gerar_fonte(programa_vm)
+    assert all(f"    def b{i}():" in fonte_python for i in lideres(programa_vm))
+
+
+def test_erro_de_execucao():
+    codigo = compilar("program z; var a, b: integer; begin a := 1; b := 0; writeln(a div b) end.")
+    for maquina in maquinas(codigo):
+        with pytest.raises(ErroVM, match='division'):
+            maquina.executar()
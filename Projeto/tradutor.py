@@ -0,0 +1,397 @@
+import sys
+from interpretador import (
+    ErroVM, NOMES_OPCODES, MaquinaVirtual, carregar_ficheiro, _div_inteira, _mod_inteiro,
+    PUSHI, PUSHF, PUSHS, PUSHG, STOREG, PUSHL, STOREL,
+    PUSHN, PUSHGP, PUSHFP, PUSHA, PADD, LOADN, STOREN, LOAD, STORE,
+    POP, DUP, SWAP,
+    ADD, SUB, MUL, DIV, MOD,
+    FADD, FSUB, FMUL, FDIV, ITOF, FTOI,
+    EQUAL, INF, INFEQ, SUP, SUPEQ, NOT, AND, OR,
+    JUMP, JZ, CALL, RETURN, START, STOP, NOP,
+    CHARAT, STRLEN, CHRCODE, ATOI, ATOF, READ,
+    WRITEI, WRITEF, WRITES, WRITECHR, WRITELN,
+)
+
+# COMPILAÇÃO DE PROGRAMAS EWVM PARA CLOSURES PYTHON
+# Cada bloco básico do programa é traduzido uma vez para uma função Python (gerada como
+# código fonte e compilada com exec). Dentro do bloco a stack é simulada em tempo de
+# tradução: "PUSHG 3 / PUSHI 1 / ADD / STOREG 3" passa a ser "s[3] = s[3] + 1".
+# Cada bloco devolve o endereço do bloco seguinte e um ciclo simples encadeia-os.
+# Os blocos são estendidos: um JZ sai do bloco só quando salta, senão a execução continua
+# na mesma função.
+
+OPS_TERMINAIS = {JUMP, CALL, RETURN, STOP}
+
+OPS_ARITMETICOS = {ADD: '+', SUB: '-', MUL: '*', PADD: '+'}
+OPS_FLOAT = {FADD: '+', FSUB: '-', FMUL: '*', FDIV: '/'}
+OPS_RELACIONAIS = {EQUAL: '==', INF: '<', INFEQ: '<=', SUP: '>', SUPEQ: '>='}
+
+
+def _atoi(x):
+    return int(x.strip())
+
+
+def _atof(x):
+    return float(x.strip())
+
+
+def _div(a, b):
+    if isinstance(a, float) or isinstance(b, float):
+        return a / b
+    return _div_inteira(a, b)
+
+
+class Valor:
+    """Entrada da stack simulada: expressão Python e as posições de memória que lê"""
+    __slots__ = ('expr', 'deps', 'booleano')
+
+    def __init__(self, expr, deps=frozenset(), booleano=False):
+        self.expr = expr
+        self.deps = deps        # conjunto com 'g' (globais), 'l' (locais) e/ou 'mem' (LOADN)
+        self.booleano = booleano
+
+    def valor(self):
+        """Expressão com o valor inteiro (os booleanos Python passam a 0/1)"""
+        if self.booleano:
+            return f"(1 if {self.expr} else 0)"
+        return self.expr
+
+    def condicao(self):
+        return self.expr
+
+    def trivial(self):
+        if self.deps or self.booleano:
+            return False
+        return self.expr.isidentifier() or self.expr.lstrip('-').isdigit()
+
+
+DEPS_MEMORIA = frozenset(('g', 'l', 'mem'))
+
+
+def lideres(programa):
+    """Endereços onde começa cada bloco básico"""
+    ops = programa.ops
+    args = programa.args
+    inicio = {0}
+    inicio.update(programa.labels.values())
+    for pc, op in enumerate(ops):
+        if op in (JUMP, JZ, PUSHA):
+            inicio.add(args[pc])
+        if op in OPS_TERMINAIS and pc + 1 < len(ops):
+            inicio.add(pc + 1)
+    return sorted(i for i in inicio if i < len(ops))
+
+
+class TradutorBloco:
+    """Traduz um bloco básico [ini, fim) para o corpo de uma função Python"""
+
+    def __init__(self, programa, ini, fim, contar):
+        self.programa = programa
+        self.ini = ini
+        self.fim = fim
+        self.contar = contar
+        self.linhas = []
+        self.pilha = []
+        self.n_temps = 0
+        self.usa_fp = False
+
+    def emitir(self, linha):
+        self.linhas.append(linha)
+
+    def temp(self, expr):
+        nome = f"t{self.n_temps}"
+        self.n_temps += 1
+        self.emitir(f"{nome} = {expr}")
+        return Valor(nome)
+
+    def fp(self):
+        self.usa_fp = True
+        return 'fp'
+
+    def sair(self, destino, pc, indentacao=''):
+        """Sai do bloco na instrução pc (conta as instruções executadas desde o início)"""
+        if self.contar:
+            self.emitir(f"{indentacao}C[0] += {pc + 1 - self.ini}")
+        self.emitir(f"{indentacao}return {destino}")
+
+    def desempilhar(self):
+        if self.pilha:
+            return self.pilha.pop()
+        # A stack simulada está vazia: o valor vem da stack real
+        return self.temp("s.pop()")
+
+    def materializar(self, deps):
+        """Avalia já as entradas pendentes que leem memória que vai ser alterada"""
+        for i, v in enumerate(self.pilha):
+            if v.deps & deps:
+                self.pilha[i] = self.temp(v.valor())
+
+    def descarregar(self):
+        """Passa toda a stack simulada para a stack real"""
+        if not self.pilha:
+            return
+        if len(self.pilha) == 1:
+            self.emitir(f"s.append({self.pilha[0].valor()})")
+        else:
+            valores = ", ".join(v.valor() for v in self.pilha)
+            self.emitir(f"s.extend(({valores},))")
+        self.pilha = []
+
+    def traduzir(self):
+        ops = self.programa.ops
+        args = self.programa.args
+        terminou = False
+        for pc in range(self.ini, self.fim):
+            op = ops[pc]
+            a = args[pc]
+            if self.traduzir_instrucao(op, a, pc):
+                terminou = True
+                break
+
+        if not terminou:
+            self.descarregar()
+            self.sair(self.fim, self.fim - 1)
+
+        corpo = self.linhas
+        if self.usa_fp:
+            corpo = ["fp = R[0]"] + corpo
+        return corpo
+
+    def traduzir_instrucao(self, op, a, pc):
+        """Traduz uma instrução; devolve True se terminar o bloco"""
+        pilha = self.pilha
+
+        if op in (PUSHI, PUSHF, PUSHS, PUSHA):
+            pilha.append(Valor(repr(a)))
+        elif op == PUSHG:
+            pilha.append(Valor(f"s[{a}]", frozenset(('g',))))
+        elif op == PUSHL:
+            pilha.append(Valor(f"s[{self.fp()} + {a}]", frozenset(('l',))))
+        elif op == PUSHGP:
+            pilha.append(Valor("0"))
+        elif op == PUSHFP:
+            pilha.append(Valor(self.fp()))
+        elif op == STOREG:
+            v = self.desempilhar()
+            self.materializar(DEPS_MEMORIA)
+            self.emitir(f"s[{a}] = {v.valor()}")
+        elif op == STOREL:
+            v = self.desempilhar()
+            self.materializar(DEPS_MEMORIA)
+            self.emitir(f"s[{self.fp()} + {a}] = {v.valor()}")
+        elif op in OPS_ARITMETICOS:
+            b = self.desempilhar()
+            x = self.desempilhar()
+            pilha.append(Valor(f"({x.valor()} {OPS_ARITMETICOS[op]} {b.valor()})", x.deps | b.deps))
+        elif op in OPS_RELACIONAIS:
+            b = self.desempilhar()
+            x = self.desempilhar()
+            pilha.append(Valor(f"({x.valor()} {OPS_RELACIONAIS[op]} {b.valor()})", x.deps | b.deps, True))
+        elif op == DIV:
+            b = self.desempilhar()
+            x = self.desempilhar()
+            pilha.append(Valor(f"_div({x.valor()}, {b.valor()})", x.deps | b.deps))
+        elif op == MOD:
+            b = self.desempilhar()
+            x = self.desempilhar()
+            pilha.append(Valor(f"_mod({x.valor()}, {b.valor()})", x.deps | b.deps))
+        elif op in OPS_FLOAT:
+            b = self.desempilhar()
+            x = self.desempilhar()
+            pilha.append(Valor(f"(float({x.valor()}) {OPS_FLOAT[op]} {b.valor()})", x.deps | b.deps))
+        elif op == NOT:
+            x = self.desempilhar()
+            pilha.append(Valor(f"(not {x.condicao()})", x.deps, True))
+        elif op in (AND, OR):
+            b = self.desempilhar()
+            x = self.desempilhar()
+            conector = 'and' if op == AND else 'or'
+            esq = x.condicao() if x.booleano else f"({x.expr} != 0)"
+            dir_ = b.condicao() if b.booleano else f"({b.expr} != 0)"
+            pilha.append(Valor(f"({esq} {conector} {dir_})", x.deps | b.deps, True))
+        elif op == ITOF:
+            x = self.desempilhar()
+            pilha.append(Valor(f"float({x.valor()})", x.deps))
+        elif op == FTOI:
+            x = self.desempilhar()
+            pilha.append(Valor(f"int({x.valor()})", x.deps))
+        elif op == LOADN:
+            n = self.desempilhar()
+            x = self.desempilhar()
+            pilha.append(Valor(f"s[{x.valor()} + {n.valor()}]", x.deps | n.deps | {'mem'}))
+        elif op == LOAD:
+            x = self.desempilhar()
+            pilha.append(Valor(f"s[{x.valor()} + {a}]", x.deps | {'mem'}))
+        elif op == STOREN:
+            v = self.desempilhar()
+            n = self.desempilhar()
+            x = self.desempilhar()
+            self.materializar(DEPS_MEMORIA)
+            self.emitir(f"s[{x.valor()} + {n.valor()}] = {v.valor()}")
+        elif op == STORE:
+            v = self.desempilhar()
+            x = self.desempilhar()
+            self.materializar(DEPS_MEMORIA)
+            self.emitir(f"s[{x.valor()} + {a}] = {v.valor()}")
+        elif op == CHARAT:
+            n = self.desempilhar()
+            x = self.desempilhar()
+            pilha.append(Valor(f"ord({x.valor()}[{n.valor()}])", x.deps | n.deps))
+        elif op == STRLEN:
+            x = self.desempilhar()
+            pilha.append(Valor(f"len({x.valor()})", x.deps))
+        elif op == CHRCODE:
+            x = self.desempilhar()
+            pilha.append(Valor(f"ord({x.valor()}[0])", x.deps))
+        elif op == ATOI:
+            x = self.desempilhar()
+            pilha.append(Valor(f"_atoi({x.valor()})", x.deps))
+        elif op == ATOF:
+            x = self.desempilhar()
+            pilha.append(Valor(f"_atof({x.valor()})", x.deps))
+        elif op == READ:
+            # Tem efeitos (consome a entrada): avaliado imediatamente, pela ordem
+            pilha.append(self.temp("ler()"))
+        elif op in (WRITEI, WRITES):
+            self.emitir(f"write(str({self.desempilhar().valor()}))")
+        elif op == WRITEF:
+            self.emitir(f"write(str(float({self.desempilhar().valor()})))")
+        elif op == WRITECHR:
+            self.emitir(f"write(chr({self.desempilhar().valor()}))")
+        elif op == WRITELN:
+            self.emitir("write('\\n')")
+        elif op == POP:
+            for _ in range(a):
+                if pilha:
+                    pilha.pop()
+                else:
+                    self.emitir("s.pop()")
+        elif op == DUP:
+            if len(pilha) < a:
+                self.descarregar()
+                self.emitir(f"s.extend(s[len(s) - {a}:])")
+            else:
+                topo = len(pilha) - a
+                for i in range(topo, len(pilha)):
+                    if not pilha[i].trivial():
+                        pilha[i] = self.temp(pilha[i].valor())
+                pilha.extend(pilha[topo:])
+        elif op == SWAP:
+            b = self.desempilhar()
+            x = self.desempilhar()
+            pilha.append(b)
+            pilha.append(x)
+        elif op == PUSHN:
+            self.descarregar()
+            self.emitir(f"s.extend([0] * {a})")
+        elif op == START:
+            self.descarregar()
+            self.emitir("R[0] = fp = len(s)")
+            self.usa_fp = True
+        elif op == NOP:
+            pass
+        elif op == JUMP:
+            self.descarregar()
+            self.sair(a, pc)
+            return True
+        elif op == JZ:
+            c = self.desempilhar()
+            if self.pilha:
+                c = self.temp(c.condicao())
+            self.descarregar()
+            self.emitir(f"if not {c.condicao()}:")
+            self.sair(a, pc, '    ')
+        elif op == CALL:
+            alvo = self.desempilhar()
+            if self.pilha:
+                alvo = self.temp(alvo.valor())
+            self.descarregar()
+            self.emitir(f"chamadas.append(({pc + 1}, R[0]))")
+            self.emitir("R[0] = len(s)")
+            self.sair(alvo.valor(), pc)
+            return True
+        elif op == RETURN:
+            self.pilha = []
+            self.emitir(f"del s[{self.fp()}:]")
+            self.emitir("r, R[0] = chamadas.pop()")
+            self.sair('r', pc)
+            return True
+        elif op == STOP:
+            self.descarregar()
+            self.sair(None, pc)
+            return True
+        else:
+            raise ErroVM(f"Tradução não suportada para {NOMES_OPCODES[op]}")
+        return False
+
+
+def gerar_fonte(programa, contar=False):
+    """Gera o código Python da fábrica de blocos de um programa"""
+    inicios = lideres(programa)
+    limites = inicios[1:] + [len(programa.ops)]
+
+    linhas = ["def _fabrica(s, R, C, chamadas, write, ler, _div, _mod, _atoi, _atof):"]
+    nomes = []
+    for ini, fim in zip(inicios, limites):
+        corpo = TradutorBloco(programa, ini, fim, contar).traduzir()
+        nome = f"b{ini}"
+        nomes.append((ini, nome))
+        linhas.append(f"    def {nome}():")
+        for linha in corpo:
+            linhas.append(f"        {linha}")
+    entradas = ", ".join(f"{ini}: {nome}" for ini, nome in nomes)
+    linhas.append(f"    return {{{entradas}}}")
+    return "\n".join(linhas) + "\n"
+
+
+class MaquinaTraduzida(MaquinaVirtual):
+    """Executa um Programa depois de o traduzir para closures Python"""
+
+    def __init__(self, programa, entrada=None, saida=None, contar=False):
+        super().__init__(programa, entrada, saida)
+        self.contar = contar
+        self.fonte = gerar_fonte(programa, contar)
+        self.codigo = compile(self.fonte, '<ewvm>', 'exec')
+
+    def executar(self):
+        ambiente = {}
+        exec(self.codigo, ambiente)
+        s = self.pilha
+        R = [0]
+        C = [0]
+        blocos = ambiente['_fabrica'](s, R, C, [], self.saida.write, self.ler_linha,
+                                      _div, _mod_inteiro, _atoi, _atof)
+        # Tabela indexada por endereço para os saltos e para o CALL (PUSHA dá o endereço)
+        tabela = [None] * len(self.programa.ops)
+        for endereco, bloco in blocos.items():
+            tabela[endereco] = bloco
+
+        b = 0
+        try:
+            while b is not None:
+                b = tabela[b]()
+        except ErroVM:
+            raise
+        except (IndexError, TypeError, ValueError, ZeroDivisionError) as e:
+            raise ErroVM(f"Erro de execução no bloco {b}: {e}")
+        finally:
+            self.instrucoes_executadas += C[0]
+        return C[0]
+
+
+# MAIN
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python3 tradutor.py <ficheiro.vm> [--fonte]")
+        sys.exit(1)
+
+    try:
+        programa = carregar_ficheiro(sys.argv[1])
+        vm = MaquinaTraduzida(programa)
+        if '--fonte' in sys.argv[2:]:
+            print(vm.fonte)
+        else:
+            vm.executar()
+    except (ErroVM, OSError) as e:
+        print(f"Erro: {e}")
+        sys.exit(1)